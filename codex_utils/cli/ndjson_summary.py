@@ -1,13 +1,22 @@
-"""Aggregate Codex NDJSON metric shards into tabular summaries."""
+"""Aggregate Codex NDJSON metric shards into tabular summaries.
+
+Summaries are computed in a single streaming pass. The CLI keeps a small
+checkpoint sidecar (per-shard byte offsets plus aggregate state) so re-runs
+only read newly appended bytes, and ``--follow`` tails a live run.
+"""
 
 from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
 import json
+import math
+import os
+import time
 from collections.abc import Mapping as MappingABC
 from pathlib import Path
-from typing import Any, Iterable, Sequence
+from typing import Any, Iterable, Iterator, Sequence
 
 FIELDNAMES: Sequence[str] = (
     "run_id",
@@ -28,10 +37,27 @@ FIELDNAMES: Sequence[str] = (
     "last_manifest_id",
     "first_phase",
     "last_phase",
+    "p50_value",
+    "p90_value",
+    "p99_value",
 )
 
 
-def _iter_metric_files(run_dir: Path) -> list[Path]:
+QUANTILES: Sequence[float] = (0.5, 0.9, 0.99)
+CHECKPOINT_VERSION = 1
+_HEAD_BYTES = 64
+
+
+def _is_checkpoint(path: Path) -> bool:
+    name = path.name.removesuffix(".tmp")
+    return name == ".metrics_summary.ckpt.json" or name.endswith(".summary-ckpt.json")
+
+
+def _iter_metric_files(run_dir: Path, pattern: str | None = None) -> list[Path]:
+    if run_dir.is_file():
+        return [run_dir]
+    if pattern:
+        return sorted(path for path in run_dir.glob(pattern) if not _is_checkpoint(path))
     base = run_dir / "metrics.ndjson"
     rotated: list[tuple[int, Path]] = []
     for candidate in run_dir.glob("metrics.ndjson.*"):
@@ -46,24 +72,41 @@ def _iter_metric_files(run_dir: Path) -> list[Path]:
     return ordered
 
 
-def _load_rows(run_dir: Path) -> list[dict[str, Any]]:
-    files = _iter_metric_files(run_dir)
+def _iter_new_rows(path: Path, offset: int, on_offset: Any) -> Iterator[dict[str, Any]]:
+    """Yield JSON objects appended to ``path`` after ``offset``.
+
+    ``on_offset`` is called with the byte offset just past every consumed
+    line. A trailing line without a newline is only consumed once it parses,
+    so a record still being written is picked up on the next pass.
+    """
+
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        position = offset
+        for raw in handle:
+            complete = raw.endswith(b"\n")
+            line = raw.strip()
+            payload: Any = None
+            if line:
+                try:
+                    payload = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    if not complete:
+                        return
+            position += len(raw)
+            on_offset(position)
+            if isinstance(payload, dict):
+                yield payload
+
+
+def _load_rows(run_dir: Path, *, pattern: str | None = None) -> list[dict[str, Any]]:
+    files = _iter_metric_files(run_dir, pattern)
     if not files:
         raise FileNotFoundError(f"No metrics NDJSON files found in {run_dir}")
     rows: list[dict[str, Any]] = []
     for path in files:
         try:
-            with path.open("r", encoding="utf-8") as handle:
-                for raw in handle:
-                    line = raw.strip()
-                    if not line:
-                        continue
-                    try:
-                        payload = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if isinstance(payload, dict):
-                        rows.append(payload)
+            rows.extend(_iter_new_rows(path, 0, lambda _: None))
         except FileNotFoundError:
             continue
     return rows
@@ -83,16 +126,111 @@ def _sort_key(timestamp: str | None, step: int | None) -> tuple[str, int]:
     return ts_key, step_key
 
 
-def _summarise_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
-    summary: dict[tuple[str, str, str, str], dict[str, Any]] = {}
-    for row in rows:
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error (DDSketch-style).
+
+    Values are mapped to buckets of relative width ``alpha`` so any reported
+    quantile is within ``alpha`` of a true sample value. When more than
+    ``max_buckets`` buckets exist the lowest ones are merged.
+    """
+
+    def __init__(self, alpha: float = 0.01, max_buckets: int = 2048) -> None:
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self._gamma**index / (self._gamma + 1)
+
+    def add(self, value: float) -> None:
+        if math.isnan(value) or math.isinf(value):
+            return
+        self.count += 1
+        if value > 1e-12:
+            idx = self._index(value)
+            self.positive[idx] = self.positive.get(idx, 0) + 1
+            self._collapse(self.positive, lowest=True)
+        elif value < -1e-12:
+            idx = self._index(-value)
+            self.negative[idx] = self.negative.get(idx, 0) + 1
+            self._collapse(self.negative, lowest=False)
+        else:
+            self.zero += 1
+
+    def _collapse(self, buckets: dict[int, int], *, lowest: bool) -> None:
+        if len(self.positive) + len(self.negative) <= self.max_buckets or len(buckets) < 2:
+            return
+        ordered = sorted(buckets)
+        victim, target = (ordered[0], ordered[1]) if lowest else (ordered[-1], ordered[-2])
+        buckets[target] += buckets.pop(victim)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for idx in sorted(self.negative, reverse=True):
+            seen += self.negative[idx]
+            if seen > rank:
+                return -self._value(idx)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for idx in sorted(self.positive):
+            seen += self.positive[idx]
+            if seen > rank:
+                return self._value(idx)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "max_buckets": self.max_buckets,
+            "positive": [[k, v] for k, v in self.positive.items()],
+            "negative": [[k, v] for k, v in self.negative.items()],
+            "zero": self.zero,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_json(cls, payload: MappingABC[str, Any]) -> "QuantileSketch":
+        sketch = cls(float(payload["alpha"]), int(payload["max_buckets"]))
+        sketch.positive = {int(k): int(v) for k, v in payload["positive"]}
+        sketch.negative = {int(k): int(v) for k, v in payload["negative"]}
+        sketch.zero = int(payload["zero"])
+        sketch.count = int(payload["count"])
+        return sketch
+
+
+def _quantile_field(q: float) -> str:
+    return f"p{round(q * 100):02d}_value"
+
+
+class StreamingSummary:
+    """One-pass per-metric aggregator; state round-trips through JSON."""
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, str, str, str], dict[str, Any]] = {}
+        self._sketches: dict[tuple[str, str, str, str], QuantileSketch] = {}
+        self.rows_seen = 0
+
+    def update(self, row: MappingABC[str, Any]) -> None:
+        self.rows_seen += 1
         run_id = str(row.get("run_id") or "unknown")
         split = str(row.get("split") or "")
-        metric = str(row.get("metric") or "")
+        metric = str(row.get("metric") or row.get("key") or "")
         dataset_val = row.get("dataset")
         dataset = "" if dataset_val in (None, "") else str(dataset_val)
         key = (run_id, split, metric, dataset)
-        entry = summary.get(key)
+        entry = self._entries.get(key)
         if entry is None:
             entry = {
                 "run_id": run_id,
@@ -119,7 +257,8 @@ def _summarise_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
                 "_last_sort_key": None,
                 "_max_step": None,
             }
-            summary[key] = entry
+            self._entries[key] = entry
+            self._sketches[key] = QuantileSketch()
 
         entry["count"] += 1
 
@@ -181,24 +320,211 @@ def _summarise_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
                 entry["min_value"] = numeric_value
             if entry["max_value"] is None or numeric_value > entry["max_value"]:
                 entry["max_value"] = numeric_value
+            self._sketches[key].add(numeric_value)
+
+    def rows(self) -> list[dict[str, Any]]:
+        result: list[dict[str, Any]] = []
+        for key, state in self._entries.items():
+            entry = {k: v for k, v in state.items() if not k.startswith("_")}
+            max_step = state.get("_max_step")
+            if entry.get("last_step") is None and max_step is not None:
+                entry["last_step"] = max_step
+            if state["_numeric_count"]:
+                entry["mean_value"] = state["_numeric_sum"] / state["_numeric_count"]
+            sketch = self._sketches[key]
+            for q in QUANTILES:
+                entry[_quantile_field(q)] = sketch.quantile(q)
+            result.append(entry)
+
+        return sorted(
+            result,
+            key=lambda item: (item["run_id"], item["split"], item["metric"], item["dataset"]),
+        )
 
-    result: list[dict[str, Any]] = []
-    for entry in summary.values():
-        numeric_count = entry.pop("_numeric_count")
-        numeric_sum = entry.pop("_numeric_sum")
-        entry.pop("_first_sort_key", None)
-        entry.pop("_last_sort_key", None)
-        max_step = entry.pop("_max_step", None)
-        if entry.get("last_step") is None and max_step is not None:
-            entry["last_step"] = max_step
-        if numeric_count:
-            entry["mean_value"] = numeric_sum / numeric_count
-        result.append(entry)
-
-    return sorted(
-        result,
-        key=lambda item: (item["run_id"], item["split"], item["metric"], item["dataset"]),
-    )
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "rows_seen": self.rows_seen,
+            "entries": [
+                {**entry, "_sketch": self._sketches[key].to_json()}
+                for key, entry in self._entries.items()
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, payload: MappingABC[str, Any]) -> "StreamingSummary":
+        summary = cls()
+        summary.rows_seen = int(payload.get("rows_seen", 0))
+        for raw in payload.get("entries", []):
+            entry = dict(raw)
+            sketch = QuantileSketch.from_json(entry.pop("_sketch"))
+            for field in ("_first_sort_key", "_last_sort_key"):
+                if entry.get(field) is not None:
+                    entry[field] = tuple(entry[field])
+            key = (entry["run_id"], entry["split"], entry["metric"], entry["dataset"])
+            summary._entries[key] = entry
+            summary._sketches[key] = sketch
+        return summary
+
+
+def _summarise_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    summary = StreamingSummary()
+    for row in rows:
+        summary.update(row)
+    return summary.rows()
+
+
+def _file_identity(stat: os.stat_result) -> str:
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+def _head_digest(path: Path, length: int) -> str:
+    with path.open("rb") as handle:
+        return hashlib.blake2b(handle.read(length), digest_size=16).hexdigest()
+
+
+def default_checkpoint_path(run_dir: Path) -> Path:
+    if run_dir.is_file():
+        return run_dir.with_name(f".{run_dir.name}.summary-ckpt.json")
+    return run_dir / ".metrics_summary.ckpt.json"
+
+
+class IncrementalSummarizer:
+    """Summarise metric shards in one pass, resuming from a checkpoint sidecar.
+
+    The sidecar stores the byte offset reached in every shard (keyed by
+    device/inode so renames during log rotation are followed) together with
+    the serialized :class:`StreamingSummary`. Re-runs only read bytes appended
+    since the last checkpoint; if a shard shrank or its leading bytes changed
+    the checkpoint is discarded and the run is rescanned from scratch.
+    """
+
+    def __init__(
+        self,
+        run_dir: str | Path,
+        *,
+        pattern: str | None = None,
+        checkpoint: str | Path | bool | None = True,
+    ) -> None:
+        self.run_dir = Path(run_dir).expanduser().resolve()
+        self.pattern = pattern
+        if checkpoint is True:
+            self.checkpoint_path: Path | None = default_checkpoint_path(self.run_dir)
+        elif checkpoint:
+            self.checkpoint_path = Path(checkpoint).expanduser().resolve()
+        else:
+            self.checkpoint_path = None
+        self.summary = StreamingSummary()
+        self._files: dict[str, dict[str, Any]] = {}
+        self._load_checkpoint()
+
+    def _load_checkpoint(self) -> None:
+        path = self.checkpoint_path
+        if path is None or not path.exists():
+            return
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if payload.get("version") != CHECKPOINT_VERSION or payload.get("pattern") != (
+                self.pattern
+            ):
+                return
+            summary = StreamingSummary.from_json(payload["summary"])
+            files = {str(k): dict(v) for k, v in payload["files"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self.summary = summary
+        self._files = files
+
+    def _save_checkpoint(self) -> None:
+        path = self.checkpoint_path
+        if path is None:
+            return
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "pattern": self.pattern,
+            "files": self._files,
+            "summary": self.summary.to_json(),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _reset(self) -> None:
+        self.summary = StreamingSummary()
+        self._files = {}
+
+    def _validated_offsets(self, files: Sequence[Path]) -> dict[Path, tuple[str, int]]:
+        offsets: dict[Path, tuple[str, int]] = {}
+        for path in files:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            ident = _file_identity(stat)
+            state = self._files.get(ident)
+            offset = int(state["offset"]) if state else 0
+            if state and (
+                stat.st_size < offset
+                or _head_digest(path, min(offset, _HEAD_BYTES)) != state.get("head")
+            ):
+                # Truncated or replaced shard: aggregates can no longer be trusted.
+                self._reset()
+                return self._validated_offsets(files)
+            offsets[path] = (ident, offset)
+        return offsets
+
+    def update(self) -> int:
+        """Consume bytes appended since the last call; return the new row count."""
+
+        files = _iter_metric_files(self.run_dir, self.pattern)
+        if not files and not self._files:
+            raise FileNotFoundError(f"No metrics NDJSON files found in {self.run_dir}")
+        before = self.summary.rows_seen
+        for path, (ident, offset) in self._validated_offsets(files).items():
+            state = self._files.setdefault(ident, {"offset": offset})
+            state["path"] = path.name
+
+            def _advance(position: int, state: dict[str, Any] = state) -> None:
+                state["offset"] = position
+
+            try:
+                for row in _iter_new_rows(path, offset, _advance):
+                    self.summary.update(row)
+            except FileNotFoundError:
+                continue
+            state["head"] = _head_digest(path, min(int(state["offset"]), _HEAD_BYTES))
+        self._save_checkpoint()
+        return self.summary.rows_seen - before
+
+    def rows(self) -> list[dict[str, Any]]:
+        return self.summary.rows()
+
+    def follow(
+        self,
+        callback: Any,
+        *,
+        interval: float = 1.0,
+        max_updates: int | None = None,
+        sleep: Any = time.sleep,
+    ) -> None:
+        """Tail the run, invoking ``callback(rows)`` whenever new records arrive.
+
+        The callback also fires once up front. Stops after ``max_updates``
+        polls when given, otherwise runs until interrupted.
+        """
+
+        self.update()
+        callback(self.rows())
+        polls = 0
+        while max_updates is None or polls < max_updates:
+            sleep(interval)
+            polls += 1
+            try:
+                new_rows = self.update()
+            except FileNotFoundError:
+                continue
+            if new_rows:
+                callback(self.rows())
 
 
 def _write_csv(dest: Path, rows: Sequence[dict[str, Any]]) -> Path:
@@ -232,29 +558,46 @@ class NdjsonSummarizer:
 
     fieldnames: Sequence[str] = FIELDNAMES
 
-    def __init__(self, run_dir: str | Path) -> None:
+    def __init__(
+        self,
+        run_dir: str | Path,
+        *,
+        pattern: str | None = None,
+        checkpoint: str | Path | bool | None = False,
+    ) -> None:
         self.run_dir = Path(run_dir).expanduser().resolve()
+        self.pattern = pattern
+        self.checkpoint = checkpoint
 
     def collect(self) -> list[dict[str, Any]]:
-        return _load_rows(self.run_dir)
+        return _load_rows(self.run_dir, pattern=self.pattern)
+
+    def incremental(self) -> IncrementalSummarizer:
+        return IncrementalSummarizer(self.run_dir, pattern=self.pattern, checkpoint=self.checkpoint)
 
     def summarise(self) -> list[dict[str, Any]]:
-        rows = self.collect()
-        return _summarise_rows(rows)
+        incremental = self.incremental()
+        incremental.update()
+        return incremental.rows()
 
     def write(self, fmt: str, destination: str | Path | None = None) -> Path:
         summary = self.summarise()
-        suffix = fmt.lower()
-        dest_path = (
-            Path(destination).expanduser().resolve()
-            if destination
-            else self.run_dir / f"metrics_summary.{suffix}"
-        )
-        if suffix == "csv":
-            return _write_csv(dest_path, summary)
-        if suffix == "parquet":
-            return _write_parquet(dest_path, summary)
-        raise SystemExit(f"Unsupported output format: {fmt}")
+        return _write_summary(summary, fmt, self._default_dest(fmt, destination))
+
+    def _default_dest(self, fmt: str, destination: str | Path | None) -> Path:
+        if destination:
+            return Path(destination).expanduser().resolve()
+        base_dir = self.run_dir if self.run_dir.is_dir() else self.run_dir.parent
+        return base_dir / f"metrics_summary.{fmt.lower()}"
+
+
+def _write_summary(summary: Sequence[dict[str, Any]], fmt: str, dest: Path) -> Path:
+    suffix = fmt.lower()
+    if suffix == "csv":
+        return _write_csv(dest, summary)
+    if suffix == "parquet":
+        return _write_parquet(dest, summary)
+    raise SystemExit(f"Unsupported output format: {fmt}")
 
 
 def summarize_directory(
@@ -268,23 +611,26 @@ def summarize_directory(
 
 def _handle_summarize(args: argparse.Namespace) -> int:
     run_dir = Path(args.input).expanduser().resolve()
+    summarizer = NdjsonSummarizer(run_dir, checkpoint=not getattr(args, "no_checkpoint", False))
+    dest = summarizer._default_dest(args.output, args.dest)
+    if getattr(args, "follow", False):
+
+        def _emit(summary: list[dict[str, Any]]) -> None:
+            output_path = _write_summary(summary, args.output, dest)
+            print(f"Wrote {output_path} ({len(summary)} rows)", flush=True)
+
+        try:
+            summarizer.incremental().follow(_emit, interval=args.interval)
+        except FileNotFoundError as exc:
+            raise SystemExit(str(exc)) from exc
+        except KeyboardInterrupt:
+            pass
+        return 0
     try:
-        summarizer = NdjsonSummarizer(run_dir)
         summary = summarizer.summarise()
     except FileNotFoundError as exc:
         raise SystemExit(str(exc)) from exc
-    suffix = args.output.lower()
-    dest = (
-        Path(args.dest).expanduser().resolve()
-        if args.dest
-        else (run_dir / f"metrics_summary.{suffix}")
-    )
-    if suffix == "csv":
-        output_path = _write_csv(dest, summary)
-    elif suffix == "parquet":
-        output_path = _write_parquet(dest, summary)
-    else:  # pragma: no cover - argparse guards choices
-        raise SystemExit(f"Unsupported output format: {args.output}")
+    output_path = _write_summary(summary, args.output, dest)
     print(f"Wrote {output_path} ({len(summary)} rows)")
     return 0
 
@@ -306,6 +652,22 @@ def build_parser() -> argparse.ArgumentParser:
         "--dest",
         help="Optional explicit destination path. Defaults to <run_dir>/metrics_summary.<ext>",
     )
+    summarize.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep tailing the shards and rewrite the summary as new records arrive",
+    )
+    summarize.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds for --follow",
+    )
+    summarize.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Do not read or write the incremental checkpoint sidecar",
+    )
     summarize.set_defaults(func=_handle_summarize)
     return parser
 
@@ -319,4 +681,13 @@ def main(argv: Sequence[str] | None = None) -> int:
     return args.func(args)
 
 
-__all__ = ["FIELDNAMES", "NdjsonSummarizer", "build_parser", "main", "summarize_directory"]
+__all__ = [
+    "FIELDNAMES",
+    "IncrementalSummarizer",
+    "NdjsonSummarizer",
+    "QuantileSketch",
+    "StreamingSummary",
+    "build_parser",
+    "main",
+    "summarize_directory",
+]
@@ -15,6 +15,42 @@ CREATE TABLE artifact (
   created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+CREATE TABLE chunk (
+  sha256           CHAR(64) PRIMARY KEY,
+  size_bytes       BIGINT NOT NULL,
+  compression      TEXT NOT NULL,
+  blob_bytes       BYTEA,
+  object_url       TEXT,
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE artifact_chunk (
+  artifact_id      UUID NOT NULL REFERENCES artifact(id),
+  seq              INTEGER NOT NULL,
+  chunk_sha256     CHAR(64) NOT NULL REFERENCES chunk(sha256),
+  PRIMARY KEY (artifact_id, seq)
+);
+
+CREATE INDEX IF NOT EXISTS idx_artifact_chunk_sha ON artifact_chunk(chunk_sha256);
+
+CREATE TABLE compression_dict (
+  id               UUID PRIMARY KEY,
+  file_type        TEXT NOT NULL,
+  version          INTEGER NOT NULL,
+  codec            TEXT NOT NULL,
+  sha256           CHAR(64) NOT NULL,
+  dict_bytes       BYTEA NOT NULL,
+  sample_count     INTEGER NOT NULL,
+  sample_bytes     BIGINT NOT NULL,
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (file_type, version)
+);
+
+CREATE TABLE artifact_dict (
+  artifact_id      UUID PRIMARY KEY REFERENCES artifact(id),
+  dict_id          UUID NOT NULL REFERENCES compression_dict(id)
+);
+
 CREATE TABLE item (
   id               UUID PRIMARY KEY,
   repo             TEXT NOT NULL,
@@ -77,6 +113,46 @@ CREATE TABLE artifact (
   created_at     TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 ) ENGINE=InnoDB;
 
+CREATE TABLE chunk (
+  sha256         CHAR(64) PRIMARY KEY,
+  size_bytes     BIGINT NOT NULL,
+  compression    VARCHAR(16) NOT NULL,
+  blob_bytes     LONGBLOB,
+  object_url     TEXT,
+  created_at     TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+CREATE TABLE artifact_chunk (
+  artifact_id    CHAR(36) NOT NULL,
+  seq            INT NOT NULL,
+  chunk_sha256   CHAR(64) NOT NULL,
+  PRIMARY KEY (artifact_id, seq),
+  FOREIGN KEY (artifact_id) REFERENCES artifact(id),
+  FOREIGN KEY (chunk_sha256) REFERENCES chunk(sha256)
+) ENGINE=InnoDB;
+
+CREATE INDEX IF NOT EXISTS idx_artifact_chunk_sha ON artifact_chunk(chunk_sha256);
+
+CREATE TABLE compression_dict (
+  id             CHAR(36) PRIMARY KEY,
+  file_type      VARCHAR(64) NOT NULL,
+  version        INT NOT NULL,
+  codec          VARCHAR(16) NOT NULL,
+  sha256         CHAR(64) NOT NULL,
+  dict_bytes     LONGBLOB NOT NULL,
+  sample_count   INT NOT NULL,
+  sample_bytes   BIGINT NOT NULL,
+  created_at     TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (file_type, version)
+) ENGINE=InnoDB;
+
+CREATE TABLE artifact_dict (
+  artifact_id    CHAR(36) PRIMARY KEY,
+  dict_id        CHAR(36) NOT NULL,
+  FOREIGN KEY (artifact_id) REFERENCES artifact(id),
+  FOREIGN KEY (dict_id) REFERENCES compression_dict(id)
+) ENGINE=InnoDB;
+
 CREATE TABLE item (
   id             CHAR(36) PRIMARY KEY,
   repo           VARCHAR(512) NOT NULL,
@@ -142,6 +218,42 @@ CREATE TABLE artifact (
   created_at     TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+CREATE TABLE chunk (
+  sha256         TEXT PRIMARY KEY,
+  size_bytes     INTEGER NOT NULL,
+  compression    TEXT NOT NULL,
+  blob_bytes     BLOB,
+  object_url     TEXT,
+  created_at     TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE artifact_chunk (
+  artifact_id    TEXT NOT NULL REFERENCES artifact(id),
+  seq            INTEGER NOT NULL,
+  chunk_sha256   TEXT NOT NULL REFERENCES chunk(sha256),
+  PRIMARY KEY (artifact_id, seq)
+);
+
+CREATE INDEX IF NOT EXISTS idx_artifact_chunk_sha ON artifact_chunk(chunk_sha256);
+
+CREATE TABLE compression_dict (
+  id             TEXT PRIMARY KEY,
+  file_type      TEXT NOT NULL,
+  version        INTEGER NOT NULL,
+  codec          TEXT NOT NULL,
+  sha256         TEXT NOT NULL,
+  dict_bytes     BLOB NOT NULL,
+  sample_count   INTEGER NOT NULL,
+  sample_bytes   INTEGER NOT NULL,
+  created_at     TEXT NOT NULL DEFAULT (datetime('now')),
+  UNIQUE (file_type, version)
+);
+
+CREATE TABLE artifact_dict (
+  artifact_id    TEXT PRIMARY KEY REFERENCES artifact(id),
+  dict_id        TEXT NOT NULL REFERENCES compression_dict(id)
+);
+
 CREATE TABLE item (
   id             TEXT PRIMARY KEY,
   repo           TEXT NOT NULL,
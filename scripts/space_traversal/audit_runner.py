@@ -8,6 +8,10 @@ This file includes:
 - Optional duplication heuristic switch (cfg.scoring.dup.heuristic):
     - "simple" uses file-stem duplication ratio (default)
     - "token_similarity" uses dup_similarity.estimate() if present, else fallback
+    - "minhash" uses dup_similarity.estimate_content() (MinHash-LSH over file
+      contents, threshold cfg.scoring.dup.threshold), else fallback
+- One shared, incremental file index (file_index.scan) reused by S1, S4 and S7;
+  hashes persist in <artifacts_dir>/_file_index_cache.json between runs
 """
 
 from __future__ import annotations
@@ -52,6 +56,12 @@ except Exception:
         print("Failed to import capability_scoring utilities.", file=sys.stderr)
         sys.exit(1)
 
+# Shared incremental file index
+try:
+    from scripts.space_traversal import file_index
+except Exception:
+    import file_index  # type: ignore
+
 # Optional token-similarity duplication heuristic
 try:
     from scripts.space_traversal import dup_similarity  # type: ignore
@@ -67,6 +77,9 @@ SAFE_TEXT_EXT = {".py", ".md", ".rst", ".toml", ".yaml", ".yml", ".json", ".txt"
 MAX_READ_BYTES = 200_000
 SAFEGUARD_KEYWORDS = ["sha256", "checksum", "rng", "seed", "offline", "WANDB_MODE"]
 VERSION = "1.1.0"
+MAX_HASH_BYTES = 2_000_000
+INDEX_CACHE_NAME = "_file_index_cache.json"
+MINHASH_CACHE_NAME = "_minhash_cache.json"
 
 SKIP_DIR_PREFIXES = (
     ".git/",
@@ -129,20 +142,33 @@ def info(msg: str):
     print(f"[INFO] {msg}")
 
 
+# Repository scan shared by every stage of one process (see repo_files)
+_REPO_FILES: List[Dict[str, Any]] | None = None
+
+
+def repo_files(cfg, refresh: bool = False) -> List[Dict[str, Any]]:
+    """Return the shared file index, scanning the repository at most once per run.
+
+    Hashes are cached in ``<artifacts_dir>/_file_index_cache.json`` so a
+    rescan only rehashes files whose size, mtime or inode changed.
+    """
+    global _REPO_FILES
+    if _REPO_FILES is None or refresh:
+        cache = Path(cfg["output"]["artifacts_dir"]) / INDEX_CACHE_NAME
+        _REPO_FILES = file_index.scan(
+            ROOT,
+            cache,
+            skip_prefixes=SKIP_DIR_PREFIXES,
+            hash_limit=MAX_HASH_BYTES,
+            workers=(cfg.get("options", {}) or {}).get("index_workers"),
+        )
+    return _REPO_FILES
+
+
 def stage_s1_index(cfg):
     out_dir = Path(cfg["output"]["artifacts_dir"])
     out_dir.mkdir(parents=True, exist_ok=True)
-    files_meta = []
-    for p in sorted(ROOT.rglob("*")):
-        if p.is_dir():
-            continue
-        rel = p.relative_to(ROOT).as_posix()
-        if any(rel.startswith(prefix) for prefix in SKIP_DIR_PREFIXES):
-            continue
-        ext = p.suffix.lower()
-        size = p.stat().st_size
-        sha = _sha256_file(p) if size < 2_000_000 else None
-        files_meta.append({"path": rel, "ext": ext, "size": size, "sha": sha})
+    files_meta = repo_files(cfg, refresh=True)
     idx = {
         "generated": time.time(),
         "count": len(files_meta),
@@ -349,9 +375,34 @@ def _duplication_ratio_simple(evidence_files: List[str]) -> float:
     return min(1.0, dup / max(1, len(stems)))
 
 
+_MINHASH_CACHE: Any = None
+
+
+def _minhash_cache(cfg: dict) -> Any:
+    """Return the per-process MinHash signature cache (persisted in the artifacts dir)."""
+    global _MINHASH_CACHE
+    if _MINHASH_CACHE is None:
+        path = Path(cfg["output"]["artifacts_dir"]) / MINHASH_CACHE_NAME
+        _MINHASH_CACHE = dup_similarity.SignatureCache(path)  # type: ignore[union-attr]
+    return _MINHASH_CACHE
+
+
 def _duplication_ratio(cfg: dict, evidence_files: List[str]) -> float:
     """Switchable duplication heuristic with safe fallback."""
-    heuristic = (cfg.get("scoring", {}) or {}).get("dup", {}).get("heuristic", "simple")
+    dup_cfg = (cfg.get("scoring", {}) or {}).get("dup", {}) or {}
+    heuristic = dup_cfg.get("heuristic", "simple")
+    if heuristic == "minhash" and dup_similarity is not None:
+        try:
+            hashes = {f["path"]: f["sha"] for f in repo_files(cfg)}
+            return dup_similarity.estimate_content(  # type: ignore[attr-defined]
+                evidence_files,
+                ROOT,
+                float(dup_cfg.get("threshold", 0.8)),
+                cache=_minhash_cache(cfg),
+                hashes=hashes,
+            )
+        except Exception as e:  # pragma: no cover
+            warn(f"dup_similarity failed ({e}); falling back to simple heuristic")
     if heuristic == "token_similarity" and dup_similarity is not None:
         try:
             return dup_similarity.estimate(evidence_files, ROOT)  # type: ignore[attr-defined]
@@ -360,14 +411,21 @@ def _duplication_ratio(cfg: dict, evidence_files: List[str]) -> float:
     return _duplication_ratio_simple(evidence_files)
 
 
-def estimate_test_depth(cap_id: str, evidence_files: List[str]) -> float:
+def estimate_test_depth(
+    cap_id: str, evidence_files: List[str], test_modules: List[str] | None = None
+) -> float:
     test_files = [f for f in evidence_files if f.startswith("tests/")]
     token = cap_id.split("-")[0]
-    tests_dir = ROOT / "tests"
-    if tests_dir.exists():
-        for candidate in sorted(tests_dir.rglob("*.py")):
-            if token in candidate.name.lower():
-                test_files.append(candidate.relative_to(ROOT).as_posix())
+    if test_modules is None:
+        tests_dir = ROOT / "tests"
+        test_modules = (
+            [p.relative_to(ROOT).as_posix() for p in sorted(tests_dir.rglob("*.py"))]
+            if tests_dir.exists()
+            else []
+        )
+    for candidate in test_modules:
+        if token in Path(candidate).name.lower():
+            test_files.append(candidate)
     uniq = {f for f in test_files}
     if not evidence_files:
         return 0.0
@@ -423,15 +481,19 @@ def stage_s4_scoring(cfg, raw_caps):
         for ef in cap["evidence_files"]:
             if ef not in file_cache:
                 file_cache[ef] = read_file_text_safe(ROOT / ef)
-    for p in sorted(ROOT.rglob("*.md")):
-        rel = p.relative_to(ROOT).as_posix()
-        file_cache.setdefault(rel, read_file_text_safe(p))
+    indexed = repo_files(cfg)
+    for f in indexed:
+        if f["ext"] == ".md":
+            file_cache.setdefault(f["path"], read_file_text_safe(ROOT / f["path"]))
+    test_modules = [
+        f["path"] for f in indexed if f["path"].startswith("tests/") and f["ext"] == ".py"
+    ]
 
     scored: List[Dict[str, Any]] = []
     for cap in raw_caps:
         functionality = len(cap["found_patterns"]) / max(1, len(cap["required_patterns"]))
         consistency = 1.0 - _duplication_ratio(cfg, cap["evidence_files"])
-        tests = estimate_test_depth(cap["id"], cap["evidence_files"])
+        tests = estimate_test_depth(cap["id"], cap["evidence_files"], test_modules)
         safeguards = safeguard_score(cap["evidence_files"], file_cache)
         documentation = docs_score(cap["id"], file_cache)
         # Clamp to [0,1] then apply component caps
@@ -475,6 +537,8 @@ def stage_s4_scoring(cfg, raw_caps):
     }
     out = artifacts_dir / "capabilities_scored.json"
     out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if _MINHASH_CACHE is not None:
+        _MINHASH_CACHE.save()
     return scored
 
 
@@ -543,9 +607,7 @@ def stage_s7_manifest(cfg):
         "timestamp": time.time(),
         "version": VERSION,
         "repo_root_sha": _sha256_bytes(
-            json.dumps(
-                sorted([f.as_posix() for f in ROOT.rglob("*") if f.is_file()]), sort_keys=True
-            ).encode()
+            json.dumps([f["path"] for f in repo_files(cfg)], sort_keys=True).encode()
         ),
         "artifacts": [],
         "weights": cfg["weights"],
@@ -673,6 +735,25 @@ def command_explain(args, cfg):
     print(f"  Total score: {float(score_value):.4f}")
 
 
+def command_dups(args, cfg):
+    if dup_similarity is None:
+        print("dup_similarity module unavailable.", file=sys.stderr)
+        sys.exit(2)
+    files = [f for f in repo_files(cfg) if f["ext"] in SAFE_TEXT_EXT]
+    cache = _minhash_cache(cfg)
+    pairs = dup_similarity.near_duplicates(  # type: ignore[attr-defined]
+        [f["path"] for f in files],
+        ROOT,
+        args.threshold,
+        cache=cache,
+        hashes={f["path"]: f["sha"] for f in files},
+    )
+    cache.save()
+    print("PATH_A,PATH_B,JACCARD")
+    for a, b, sim in pairs:
+        print(f"{a},{b},{sim:.4f}")
+
+
 def run_full(cfg):
     ctx = stage_s1_index(cfg)
     facets = stage_s2_facets(cfg, ctx)
@@ -734,6 +815,10 @@ def main():
     diff_p.add_argument("--new", required=True, help="New report/JSON path")
     exp_p = sub.add_parser("explain", help="Explain a capability's score")
     exp_p.add_argument("capability", help="Capability ID to explain")
+    dups_p = sub.add_parser("dups", help="List near-duplicate text files (MinHash-LSH)")
+    dups_p.add_argument(
+        "--threshold", type=float, default=0.8, help="Minimum content Jaccard similarity"
+    )
 
     args = parser.parse_args()
     if args.command is None:
@@ -751,6 +836,8 @@ def main():
         command_diff(args, cfg)
     elif args.command == "explain":
         command_explain(args, cfg)
+    elif args.command == "dups":
+        command_dups(args, cfg)
     else:
         parser.print_help()
 
@@ -9,24 +9,47 @@ Intent:
 API:
 - estimate(evidence_files: list[str], repo_root: Path) -> float
   Returns duplication ratio in [0,1] based on token overlap clustering.
+- near_duplicates(files, repo_root, threshold=0.8, ...) -> list[(a, b, jaccard)]
+  Content near-duplicate pairs via MinHash signatures + LSH banding, each
+  candidate verified with exact Jaccard; sorted by (a, b).
+- estimate_content(evidence_files, repo_root, ...) -> float
+  Duplication ratio in [0,1] from near_duplicates (similar pairs / all pairs).
 
 Notes:
 - Default implementation uses lowercased stem-token Jaccard overlap.
-- This scaffold is intentionally conservative: it does NOT read file contents
-  (to stay fast/offline) unless future configs opt-in.
+- estimate() is intentionally conservative: it does NOT read file contents
+  (to stay fast/offline); the content APIs read at most MAX_READ_BYTES per file.
 - If evidence_files is empty or single-entry, returns 0.0 duplication.
 - Inspired by simple Jaccard similarity patterns commonly seen in open-source
   analysis tools (e.g., overlap of word tokens).
-
-Future hooks (v1.2.x):
-- Optional content tokenization (bounded bytes, stable tokenizer)
-- Minhash/LSH for larger sets (still offline)
+- MinHash (one-permutation hashing with rotation densification) uses a seeded
+  universal hash over blake2b shingle hashes, so signatures are identical
+  across runs and machines. LSH only proposes
+  candidates (no pairwise scan); exact verification removes false positives.
+- Signatures are cached per file sha256 in a JSON SignatureCache, keyed to the
+  MinHash parameters, so unchanged files are not re-shingled on later runs.
 """
 
 from __future__ import annotations
 
+import bisect
+import hashlib
+import json
+import os
+import random
+import re
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+MAX_READ_BYTES = 200_000
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+SEED = 1
+CACHE_VERSION = 1
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD_RE = re.compile(r"\w+")
 
 
 def _stem_tokens(path: str) -> Set[str]:
@@ -90,3 +113,263 @@ def estimate(evidence_files: List[str], repo_root: Path) -> float:
         return 0.0
     ratio = similar_pairs / total_pairs
     return max(0.0, min(1.0, ratio))
+
+
+# ---------------------------------------------------------------------------
+# MinHash + LSH content similarity
+# ---------------------------------------------------------------------------
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """
+    Return the set of hashed k-word shingles of *text*.
+
+    Texts shorter than *k* words yield a single shingle; empty texts yield an
+    empty set. Hashes are 64-bit blake2b digests (stable across processes).
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    grams = (" ".join(words[i : i + k]) for i in range(max(1, len(words) - k + 1)))
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big")
+        for g in grams
+    }
+
+
+@lru_cache(maxsize=None)
+def _mixer(seed: int) -> Tuple[int, int]:
+    rng = random.Random(seed)
+    return rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)
+
+
+def minhash_signature(
+    shingle_set: Set[int], num_perm: int = NUM_PERM, seed: int = SEED
+) -> Tuple[int, ...]:
+    """
+    Return the MinHash signature of *shingle_set* (empty tuple for an empty set).
+
+    Uses one-permutation hashing: every shingle is hashed once with a seeded
+    universal hash, split into *num_perm* bins by value, and each bin keeps its
+    minimum, so the cost is O(len(shingle_set) + num_perm) rather than one
+    pass per permutation. Empty bins are filled by rotation from the next
+    non-empty bin (with a per-distance offset), which keeps two signatures'
+    per-position collision probability equal to their Jaccard similarity.
+    """
+    if not shingle_set:
+        return ()
+    a, b = _mixer(seed)
+    width = _MERSENNE_PRIME // num_perm + 1
+    mins: List[Optional[int]] = [None] * num_perm
+    for x in shingle_set:
+        bin_idx, value = divmod((a * x + b) % _MERSENNE_PRIME, width)
+        current = mins[bin_idx]
+        if current is None or value < current:
+            mins[bin_idx] = value
+    filled = [i for i, v in enumerate(mins) if v is not None]
+    sig: List[int] = []
+    for i, value in enumerate(mins):
+        if value is None:
+            j = filled[bisect.bisect_left(filled, i) % len(filled)]
+            value = mins[j] + ((j - i) % num_perm) * width  # type: ignore[operator]
+        sig.append(value)
+    return tuple(sig)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) with bands * rows <= num_perm for a Jaccard *threshold*.
+
+    Minimises the false-negative plus false-positive area of the banding
+    S-curve 1 - (1 - s**rows)**bands around the threshold. False negatives
+    are weighted higher because candidates are verified exactly afterwards.
+    """
+    steps = 200
+
+    def area(lo: float, hi: float, rows: int, bands: int, miss: bool) -> float:
+        width = (hi - lo) / steps
+        total = 0.0
+        for i in range(steps):
+            s = lo + (i + 0.5) * width
+            p = 1.0 - (1.0 - s**rows) ** bands
+            total += (1.0 - p if miss else p) * width
+        return total
+
+    best: Tuple[float, int, int] | None = None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        fp = area(0.0, threshold, rows, bands, miss=False)
+        fn = area(threshold, 1.0, rows, bands, miss=True)
+        cost = 0.25 * fp + 0.75 * fn
+        if best is None or cost < best[0]:
+            best = (cost, bands, rows)
+    assert best is not None
+    return best[1], best[2]
+
+
+class SignatureCache:
+    """
+    JSON cache of MinHash signatures keyed by file sha256.
+
+    Entries are only valid for the parameters they were computed with; a cache
+    written with different (num_perm, seed, shingle_size) starts empty.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        num_perm: int = NUM_PERM,
+        seed: int = SEED,
+        shingle_size: int = SHINGLE_SIZE,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.params = {"num_perm": num_perm, "seed": seed, "shingle_size": shingle_size}
+        self.signatures: Dict[str, List[int]] = {}
+        self.dirty = False
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if (
+                isinstance(data, dict)
+                and data.get("version") == CACHE_VERSION
+                and data.get("params") == self.params
+                and isinstance(data.get("signatures"), dict)
+            ):
+                self.signatures = data["signatures"]
+
+    def get(self, sha: str) -> Optional[Tuple[int, ...]]:
+        sig = self.signatures.get(sha)
+        return tuple(sig) if sig is not None else None
+
+    def put(self, sha: str, signature: Tuple[int, ...]) -> None:
+        self.signatures[sha] = list(signature)
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": CACHE_VERSION, "params": self.params, "signatures": self.signatures}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def _sha256_file(p: Path) -> Optional[str]:
+    h = hashlib.sha256()
+    try:
+        with open(p, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 16), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def _read_text(p: Path) -> Optional[str]:
+    try:
+        with open(p, "rb") as fh:
+            data = fh.read(MAX_READ_BYTES)
+    except OSError:
+        return None
+    return data.decode("utf-8", errors="ignore")
+
+
+def near_duplicates(
+    files: Iterable[str],
+    repo_root: Path,
+    threshold: float = 0.8,
+    *,
+    cache: Optional[SignatureCache] = None,
+    hashes: Optional[Mapping[str, Optional[str]]] = None,
+    bands: Optional[int] = None,
+) -> List[Tuple[str, str, float]]:
+    """
+    Find pairs of files whose content shingle Jaccard similarity >= *threshold*.
+
+    Args:
+      files: repository-relative paths (duplicates are ignored)
+      repo_root: Path the paths are relative to
+      threshold: minimum exact Jaccard similarity in (0, 1]
+      cache: SignatureCache reused across calls/runs (signatures keyed by sha256)
+      hashes: optional precomputed sha256 per path (e.g. from the S1 file index);
+        missing entries are hashed here
+      bands: LSH band count override (rows = num_perm // bands)
+
+    Returns:
+      list of (path_a, path_b, jaccard) with path_a < path_b, sorted by (a, b).
+    """
+    if not 0.0 < threshold <= 1.0:
+        raise ValueError("threshold must be in (0, 1]")
+    cache = cache if cache is not None else SignatureCache()
+    num_perm = cache.params["num_perm"]
+    seed = cache.params["seed"]
+    k = cache.params["shingle_size"]
+    if bands is None:
+        bands, rows = lsh_params(threshold, num_perm)
+    else:
+        rows = num_perm // bands
+    paths = sorted({p for p in files if p})
+    shingle_sets: Dict[str, Set[int]] = {}
+
+    def shingle_set(path: str) -> Set[int]:
+        if path not in shingle_sets:
+            text = _read_text(repo_root / path)
+            shingle_sets[path] = shingles(text, k) if text is not None else set()
+        return shingle_sets[path]
+
+    signatures: Dict[str, Tuple[int, ...]] = {}
+    for path in paths:
+        sha = (hashes or {}).get(path) or _sha256_file(repo_root / path)
+        if sha is None:
+            continue
+        sig = cache.get(sha)
+        if sig is None:
+            sig = minhash_signature(shingle_set(path), num_perm, seed)
+            cache.put(sha, sig)
+        if sig:
+            signatures[path] = sig
+
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+    for path, sig in signatures.items():
+        for band in range(bands):
+            buckets[(band, sig[band * rows : (band + 1) * rows])].append(path)
+    candidates: Set[Tuple[str, str]] = set()
+    for members in buckets.values():
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                a, b = members[i], members[j]
+                candidates.add((a, b) if a < b else (b, a))
+
+    pairs: List[Tuple[str, str, float]] = []
+    for a, b in sorted(candidates):
+        sim = _jaccard(shingle_set(a), shingle_set(b))
+        if sim >= threshold:
+            pairs.append((a, b, round(sim, 6)))
+    return pairs
+
+
+def estimate_content(
+    evidence_files: List[str],
+    repo_root: Path,
+    threshold: float = 0.8,
+    *,
+    cache: Optional[SignatureCache] = None,
+    hashes: Optional[Mapping[str, Optional[str]]] = None,
+) -> float:
+    """
+    Content-based duplication ratio: near-duplicate pairs / all pairs, in [0, 1].
+
+    Same ratio definition as estimate(), but similarity is measured on file
+    contents via near_duplicates() instead of on path stems.
+    """
+    files = sorted({p for p in evidence_files if p})
+    n = len(files)
+    if n <= 1:
+        return 0.0
+    similar = near_duplicates(files, repo_root, threshold, cache=cache, hashes=hashes)
+    return max(0.0, min(1.0, len(similar) / (n * (n - 1) / 2)))
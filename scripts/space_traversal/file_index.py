@@ -0,0 +1,197 @@
+"""
+file_index.py — Shared, incremental filesystem index for the audit runner
+
+Intent:
+- Walk the repository once per audit run and hand the same file list to every
+  stage (S1 context index, S4 docs/test lookups, S7 manifest) instead of each
+  stage calling ``rglob`` on its own.
+- Persist (size, mtime_ns, inode, sha256) per file between runs so only files
+  whose stat signature changed are rehashed.
+
+API:
+- scan(root, cache_path=None, *, skip_prefixes=(), hash_limit=..., workers=None)
+  -> list[dict] sorted by path, one ``{"path", "ext", "size", "mtime_ns",
+  "inode", "sha"}`` entry per regular file.
+
+Notes:
+- Directories are listed with ``os.scandir`` on a thread pool; skipped prefixes
+  prune whole subtrees and symlinked directories are not followed.
+- A cached hash is reused only when size, mtime and inode all match and the
+  file was last modified well before the cached scan started ("racily clean"
+  files, touched within RACY_WINDOW_NS of that scan, are always rehashed).
+- Files of ``hash_limit`` bytes or more are indexed with ``sha: None``.
+- The cache is a plain JSON file; a missing, corrupt or foreign cache simply
+  triggers a full rehash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CACHE_VERSION = 1
+HASH_LIMIT = 2_000_000
+# files modified this close to the previous scan's start may have changed within
+# the filesystem's timestamp granularity, so their cached hash is not trusted
+RACY_WINDOW_NS = 2 * 10**9
+
+# (rel_path, size, mtime_ns, inode)
+_Stat = Tuple[str, int, int, int]
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _skipped(rel: str, skip_prefixes: Iterable[str]) -> bool:
+    return any(rel.startswith(prefix) for prefix in skip_prefixes)
+
+
+def _list_dir(
+    root: Path, rel_dir: str, skip_prefixes: Tuple[str, ...]
+) -> Tuple[List[_Stat], List[str]]:
+    """Return (files, subdirectories) directly under ``root / rel_dir``."""
+
+    files: List[_Stat] = []
+    subdirs: List[str] = []
+    try:
+        it = os.scandir(root / rel_dir if rel_dir else root)
+    except OSError:
+        return files, subdirs
+    with it:
+        for entry in it:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _skipped(rel + "/", skip_prefixes):
+                        subdirs.append(rel)
+                    continue
+                if not entry.is_file() or _skipped(rel, skip_prefixes):
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue  # vanished or broken symlink
+            files.append((rel, st.st_size, st.st_mtime_ns, st.st_ino))
+    return files, subdirs
+
+
+def _walk(root: Path, skip_prefixes: Tuple[str, ...], pool: ThreadPoolExecutor) -> List[_Stat]:
+    found: List[_Stat] = []
+    pending = [pool.submit(_list_dir, root, "", skip_prefixes)]
+    while pending:
+        files, subdirs = pending.pop().result()
+        found.extend(files)
+        pending.extend(pool.submit(_list_dir, root, d, skip_prefixes) for d in subdirs)
+    return found
+
+
+def load_cache(cache_path: Optional[Path], root: Path) -> Tuple[Dict[str, list], int]:
+    """Return ``(entries, scanned_ns)`` from *cache_path*, or empty on any mismatch."""
+
+    if cache_path is None or not cache_path.exists():
+        return {}, 0
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, 0
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != CACHE_VERSION
+        or data.get("root") != root.as_posix()
+        or not isinstance(data.get("entries"), dict)
+    ):
+        return {}, 0
+    return data["entries"], int(data.get("scanned_ns", 0))
+
+
+def save_cache(
+    cache_path: Path, root: Path, entries: List[Dict[str, Any]], scanned_ns: int
+) -> None:
+    payload = {
+        "version": CACHE_VERSION,
+        "root": root.as_posix(),
+        "scanned_ns": scanned_ns,
+        "entries": {
+            e["path"]: [e["size"], e["mtime_ns"], e["inode"], e["sha"]] for e in entries
+        },
+    }
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, cache_path)
+
+
+def scan(
+    root: Path,
+    cache_path: Optional[Path] = None,
+    *,
+    skip_prefixes: Iterable[str] = (),
+    hash_limit: int = HASH_LIMIT,
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Index every regular file under *root*, reusing hashes from *cache_path*.
+
+    Args:
+      root: directory to index; entry paths are POSIX paths relative to it
+      cache_path: JSON cache read before and rewritten after the scan (optional)
+      skip_prefixes: relative path prefixes to exclude (``"dir/"`` prunes a subtree)
+      hash_limit: files of at least this many bytes are not hashed
+      workers: thread count for listing and hashing (default: executor default)
+
+    Returns:
+      list of file entries sorted by path.
+    """
+    root = Path(root)
+    prefixes = tuple(skip_prefixes)
+    cached, cached_scan_ns = load_cache(cache_path, root)
+    scanned_ns = time.time_ns()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        stats = sorted(_walk(root, prefixes, pool))
+        entries: List[Dict[str, Any]] = []
+        to_hash: List[Dict[str, Any]] = []
+        for rel, size, mtime_ns, inode in stats:
+            entry = {
+                "path": rel,
+                "ext": Path(rel).suffix.lower(),
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "inode": inode,
+                "sha": None,
+            }
+            entries.append(entry)
+            if size >= hash_limit:
+                continue
+            prev = cached.get(rel)
+            if (
+                isinstance(prev, list)
+                and len(prev) == 4
+                and prev[:3] == [size, mtime_ns, inode]
+                and mtime_ns < cached_scan_ns - RACY_WINDOW_NS
+                and prev[3]
+            ):
+                entry["sha"] = prev[3]
+            else:
+                to_hash.append(entry)
+        hashes = pool.map(lambda e: _safe_sha(root / e["path"]), to_hash)
+        for entry, sha in zip(to_hash, hashes):
+            entry["sha"] = sha
+    if cache_path is not None:
+        save_cache(cache_path, root, entries, scanned_ns)
+    return entries
+
+
+def _safe_sha(path: Path) -> Optional[str]:
+    try:
+        return _sha256_file(path)
+    except OSError:
+        return None
@@ -6,18 +6,20 @@ import logging
 import os
 import re
 import time
-from collections.abc import MutableMapping
+from collections.abc import AsyncIterator, MutableMapping, Sequence
 from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 import torch
 from codex_ml.peft.peft_adapter import apply_lora
 from codex_ml.registry.models import get_model
 from codex_ml.registry.tokenizers import get_tokenizer
+from codex_ml.safety.sanitizers import StreamRedactor
+from services.api.scheduler import InferenceScheduler
 
 try:
     from codex_ml.tokenization.adapter import WhitespaceTokenizer
@@ -57,8 +59,12 @@ _rate_count = 0
 ACTIVE_SESSIONS: list[MutableMapping[str, Any]] = []
 
 
+def _secret_filter_disabled() -> bool:
+    return os.getenv("DISABLE_SECRET_FILTER", "0") == "1"
+
+
 def _mask_secrets(payload: str) -> str:
-    if os.getenv("DISABLE_SECRET_FILTER", "0") == "1":
+    if _secret_filter_disabled():
         return payload
     redacted = payload
     for pattern in SECRET_PATTERNS:
@@ -217,14 +223,52 @@ def _load_components() -> tuple[Any, Any]:
         model.eval()
         if os.getenv("API_USE_LORA", "0") == "1":
             model = apply_lora(model)
+        quantization = os.getenv("API_QUANTIZATION")
+        if quantization:
+            from codex_ml.models.quantization import quantize_model
+
+            model = quantize_model(model, quantization, inplace=True)
         app.state.tokenizer = tokenizer
         app.state.model = model
         logger.info("Loaded API model", extra={"model": model_name, "tokenizer": tokenizer_name})
     return app.state.tokenizer, app.state.model
 
 
+def _greedy_step(model: Any, batch: Sequence[list[int]]) -> list[int]:
+    """Return the argmax next token for every sequence in ``batch``.
+
+    Sequences are grouped by length so each forward pass is a dense batch and
+    the model never has to understand padding or attention masks.
+    """
+
+    buckets: dict[int, list[int]] = {}
+    for index, tokens in enumerate(batch):
+        buckets.setdefault(len(tokens), []).append(index)
+    next_tokens = [0] * len(batch)
+    with torch.no_grad():
+        for indices in buckets.values():
+            input_ids = torch.tensor([batch[i] for i in indices], dtype=torch.long)
+            logits = _extract_logits(model(input_ids))
+            for i, token in zip(indices, logits[:, -1].argmax(dim=-1).tolist()):
+                next_tokens[i] = int(token)
+    return next_tokens
+
+
+def _get_scheduler() -> InferenceScheduler:
+    scheduler = getattr(app.state, "scheduler", None)
+    if scheduler is None:
+        scheduler = InferenceScheduler(
+            lambda batch: _greedy_step(app.state.model, batch),
+            max_batch_size=int(os.getenv("API_MAX_BATCH_SIZE", "8")),
+            max_wait_ms=float(os.getenv("API_MAX_BATCH_WAIT_MS", "5")),
+        )
+        app.state.scheduler = scheduler
+    return scheduler
+
+
 class InferRequest(BaseModel):
     prompt: str = Field(..., min_length=1, max_length=16000)
+    max_new_tokens: int = Field(1, ge=1, le=256)
 
 
 class InferResponse(BaseModel):
@@ -283,14 +327,23 @@ async def _startup() -> None:
     app.state.worker_task = asyncio.create_task(worker())
 
 
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    scheduler = getattr(app.state, "scheduler", None)
+    if scheduler is not None:
+        await scheduler.stop()
+        scheduler.close()
+        # a restarted app (or the next test client) builds a fresh scheduler
+        app.state.scheduler = None
+
+
 def _rate_key(_: InferRequest) -> str:
     return "infer"
 
 
-@app.post("/infer", response_model=InferResponse)
-@rate_limiter(calls=30, period=60.0, key_func=_rate_key)
-async def infer(req: InferRequest) -> InferResponse:
-    tokenizer, model = _load_components()
+def _prepare_prompt(req: InferRequest, tokenizer: Any, model: Any) -> tuple[str, list[int], int]:
+    """Validate, mask and encode ``req``; return the prompt, its ids and the token budget."""
+
     try:
         prompt_to_encode = validate_input(req.prompt, input_type="html")
         enforce_content_policies(prompt_to_encode)
@@ -309,20 +362,37 @@ async def infer(req: InferRequest) -> InferResponse:
         }
         logger.warning("prompt exceeds model context", extra=detail)
         raise HTTPException(status_code=400, detail=detail)
-    if not tokens:
-        return InferResponse(completion="", tokens=0)
-    input_ids = torch.tensor([tokens], dtype=torch.long)
-    with torch.no_grad():
-        raw_output = model(input_ids)
-        logits = _extract_logits(raw_output)
-        next_token = int(logits[0, -1].argmax().item())
-    generated = [*tokens, next_token]
-    decoded = tokenizer.decode(generated)
-    masked = _mask_secrets(decoded)
+    max_new_tokens = req.max_new_tokens
+    if limit is not None:
+        # The final token is never fed back, so the context must hold L + n - 1.
+        max_new_tokens = max(1, min(max_new_tokens, limit - len(tokens) + 1))
+    return masked_prompt, tokens, max_new_tokens
+
+
+def _render_completion(
+    tokenizer: Any, masked_prompt: str, tokens: list[int], generated: list[int]
+) -> str:
+    masked = _mask_secrets(tokenizer.decode(generated))
     if WhitespaceTokenizer is not None and isinstance(tokenizer, WhitespaceTokenizer):
         pieces = [masked_prompt] if masked_prompt else []
-        pieces.append(str(next_token))
+        pieces.extend(str(token) for token in generated[len(tokens) :])
         masked = " ".join(pieces).strip()
+    return masked
+
+
+def _sse_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/infer", response_model=InferResponse)
+@rate_limiter(calls=30, period=60.0, key_func=_rate_key)
+async def infer(req: InferRequest) -> InferResponse:
+    tokenizer, model = _load_components()
+    masked_prompt, tokens, max_new_tokens = _prepare_prompt(req, tokenizer, model)
+    if not tokens:
+        return InferResponse(completion="", tokens=0)
+    generated = await _get_scheduler().submit(tokens, max_new_tokens=max_new_tokens)
+    masked = _render_completion(tokenizer, masked_prompt, tokens, generated)
     logger.info(
         "infer request",
         extra={
@@ -334,6 +404,61 @@ async def infer(req: InferRequest) -> InferResponse:
     return InferResponse(completion=masked, tokens=len(generated))
 
 
+def _stream_rate_key(*_: Any, **__: Any) -> str:
+    return "infer"
+
+
+@app.post("/infer/stream")
+@rate_limiter(calls=30, period=60.0, key_func=_stream_rate_key)
+async def infer_stream(req: InferRequest, request: Request) -> StreamingResponse:
+    """Stream generated tokens as Server-Sent Events.
+
+    ``token`` events carry the decoded completion text as it settles; a final
+    ``done`` event carries the masked completion in the same shape as
+    ``/infer``. Secrets span several tokens, so the accumulated text is masked
+    as a whole and a tail that could still become a secret is held back until
+    it is settled. Token ids are only included when the secret filter is
+    disabled, since they would let a client rebuild masked text. When the
+    client disconnects the request is cancelled and leaves the decode batch.
+    """
+
+    tokenizer, model = _load_components()
+    masked_prompt, tokens, max_new_tokens = _prepare_prompt(req, tokenizer, model)
+
+    async def events() -> AsyncIterator[str]:
+        if not tokens:
+            yield _sse_event("done", {"completion": "", "tokens": 0})
+            return
+        generated = list(tokens)
+        raw_ids = _secret_filter_disabled()
+        redactor = StreamRedactor(SECRET_PATTERNS, _mask_secrets)
+        decoded = ""
+        stream = _get_scheduler().stream(tokens, max_new_tokens=max_new_tokens)
+        try:
+            async for token in stream:
+                if await request.is_disconnected():
+                    logger.info("infer stream cancelled", extra={"tokens_out": len(generated)})
+                    return
+                generated.append(token)
+                text = tokenizer.decode(generated[len(tokens) :])
+                piece, decoded = text[len(decoded) :], text
+                if raw_ids:
+                    yield _sse_event("token", {"token": token, "text": piece})
+                    continue
+                settled = redactor.feed(piece)
+                if settled:
+                    yield _sse_event("token", {"text": settled})
+        finally:
+            await stream.aclose()
+        rest = redactor.flush()
+        if rest:
+            yield _sse_event("token", {"text": rest})
+        completion = _render_completion(tokenizer, masked_prompt, tokens, generated)
+        yield _sse_event("done", {"completion": completion, "tokens": len(generated)})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.post("/train")
 async def train(req: TrainRequest) -> dict[str, Any]:
     if req.notes:
@@ -0,0 +1,214 @@
+"""Continuous batching scheduler for the inference API.
+
+Requests are queued by the async handlers and drained by a single background
+worker. The worker forms dynamic batches bounded by ``max_batch_size`` and
+``max_wait_ms``, runs each decode step in a worker thread so the event loop
+stays responsive, and admits newly queued requests into the in-flight batch at
+every step boundary. Each request resolves its own future once it has produced
+``max_new_tokens`` tokens (or emitted ``eos_id``); streaming callers additionally
+receive every token as soon as its step completes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("codex_ml.api.scheduler")
+
+StepFn = Callable[[Sequence[list[int]]], list[int]]
+
+
+@dataclass
+class _Sequence:
+    tokens: list[int]
+    remaining: int
+    future: asyncio.Future[list[int]]
+    channel: asyncio.Queue[int | None] | None = None
+    prompt_len: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.prompt_len = len(self.tokens)
+
+    def emit(self, token: int) -> None:
+        if self.channel is not None:
+            self.channel.put_nowait(token)
+
+    def finish(self, exc: BaseException | None = None) -> None:
+        if not self.future.done():
+            if exc is None:
+                self.future.set_result(self.tokens)
+            elif isinstance(exc, asyncio.CancelledError):
+                self.future.cancel()
+            else:
+                self.future.set_exception(exc)
+        if self.channel is not None:
+            self.channel.put_nowait(None)
+
+
+class InferenceScheduler:
+    """Batch concurrent decode requests and run them off the event loop.
+
+    ``step_fn`` receives the current token ids of every active sequence and
+    must return one next-token id per sequence. It is always invoked from a
+    single dedicated thread, so models need not be thread-safe.
+    """
+
+    def __init__(
+        self,
+        step_fn: StepFn,
+        *,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        queue_size: int = 256,
+        eos_id: int | None = None,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+        self.step_fn = step_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue_size = queue_size
+        self.eos_id = eos_id
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="codex-infer")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[_Sequence] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.steps = 0
+
+    # lifecycle ----------------------------------------------------------
+    def _ensure_worker(self) -> asyncio.Queue[_Sequence]:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._task is None or self._task.done() or self._loop is not loop:
+            # Queues and tasks are bound to a loop; rebuild them when the
+            # serving loop changes (e.g. between test clients).
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def stop(self) -> None:
+        """Cancel the worker and fail any request still waiting in the queue."""
+
+        task, queue = self._task, self._queue
+        self._task = None
+        self._queue = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if queue is not None:
+            while not queue.empty():
+                queue.get_nowait().finish(RuntimeError("inference scheduler stopped"))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # public API ---------------------------------------------------------
+    async def submit(self, tokens: Sequence[int], max_new_tokens: int = 1) -> list[int]:
+        """Queue ``tokens`` for decoding and return prompt plus generated ids."""
+
+        if not tokens:
+            raise ValueError("tokens must be non-empty")
+        if max_new_tokens < 1:
+            raise ValueError("max_new_tokens must be >= 1")
+        queue = self._ensure_worker()
+        future: asyncio.Future[list[int]] = asyncio.get_running_loop().create_future()
+        await queue.put(_Sequence(list(tokens), max_new_tokens, future))
+        return await future
+
+    async def stream(self, tokens: Sequence[int], max_new_tokens: int = 1) -> AsyncIterator[int]:
+        """Queue ``tokens`` and yield each generated id as soon as it is decoded.
+
+        Closing the iterator early (e.g. because the client disconnected)
+        cancels the request; the worker drops it at the next step boundary.
+        """
+
+        if not tokens:
+            raise ValueError("tokens must be non-empty")
+        if max_new_tokens < 1:
+            raise ValueError("max_new_tokens must be >= 1")
+        queue = self._ensure_worker()
+        future: asyncio.Future[list[int]] = asyncio.get_running_loop().create_future()
+        channel: asyncio.Queue[int | None] = asyncio.Queue()
+        await queue.put(_Sequence(list(tokens), max_new_tokens, future, channel))
+        try:
+            while (token := await channel.get()) is not None:
+                yield token
+            await future  # surface step failures to the consumer
+        finally:
+            if not future.done():
+                future.cancel()
+
+    # worker -------------------------------------------------------------
+    async def _collect(self, queue: asyncio.Queue[_Sequence], active: list[_Sequence]) -> None:
+        if not active:
+            # Idle: block for the first request, then wait up to ``max_wait``
+            # for more requests to fill the batch.
+            active.append(await queue.get())
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.max_wait
+            while len(active) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    active.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        # Step boundary: admit whatever is already waiting without blocking.
+        while len(active) < self.max_batch_size:
+            try:
+                active.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        loop = asyncio.get_running_loop()
+        active: list[_Sequence] = []
+        try:
+            while True:
+                await self._collect(queue, active)
+                # Requests whose callers went away no longer consume compute.
+                active = [seq for seq in active if not seq.future.done()]
+                if not active:
+                    continue
+                batch = [seq.tokens for seq in active]
+                try:
+                    next_tokens = await loop.run_in_executor(self._executor, self.step_fn, batch)
+                    if len(next_tokens) != len(batch):
+                        raise RuntimeError("step_fn returned a mismatched number of tokens")
+                except Exception as exc:
+                    logger.exception("inference step failed", extra={"batch": len(batch)})
+                    for seq in active:
+                        seq.finish(exc)
+                    active = []
+                    continue
+                self.steps += 1
+                still_running: list[_Sequence] = []
+                for seq, token in zip(active, next_tokens):
+                    token = int(token)
+                    seq.tokens.append(token)
+                    seq.remaining -= 1
+                    seq.emit(token)
+                    if seq.remaining <= 0 or (self.eos_id is not None and token == self.eos_id):
+                        seq.finish()
+                    else:
+                        still_running.append(seq)
+                active = still_running
+        except asyncio.CancelledError as exc:
+            for seq in active:
+                seq.finish(exc)
+            raise
+
+
+__all__ = ["InferenceScheduler", "StepFn"]
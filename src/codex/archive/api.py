@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-import json
 import os
 import uuid
-from pathlib import Path
 
 from .dal import ArchiveDAL
-from .util import sha256_hex, utcnow_iso, zlib_compress
+from .util import append_evidence, sha256_hex, utcnow_iso, zlib_compress
 
 __all__ = [
     "store",
@@ -18,15 +16,10 @@ __all__ = [
     "recent_tombstones",
 ]
 
-EVIDENCE_DIR = Path(os.getenv("CODEX_EVIDENCE_DIR", ".codex/evidence")).resolve()
-EVIDENCE_DIR.mkdir(parents=True, exist_ok=True)
-EVIDENCE_FILE = EVIDENCE_DIR / "archive_ops.jsonl"
-
 
 def _evidence_append(rec: dict[str, object]) -> None:
-    EVIDENCE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with EVIDENCE_FILE.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(rec, sort_keys=True) + "\n")
+    # resolved per call so CODEX_EVIDENCE_DIR set after import is honoured
+    append_evidence(dict(rec))
 
 
 def store(
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import datetime as _dt
+import hashlib
 import json
 import os
 import sqlite3
+import threading
+import time
 import uuid
-from collections.abc import Callable, Iterable, Iterator, Mapping
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -18,14 +22,18 @@ except Exception:  # pragma: no cover
     sa = None
 
 from . import schema
+from .blobstore import BlobStore
 from .config import ArchiveAppConfig as RuntimeArchiveConfig
-from .util import ensure_directory, json_dumps_sorted, utcnow
+from .util import ISO_FORMAT, ensure_directory, json_dumps_sorted, utcnow
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
     from .config import ArchiveAppConfig as SettingsArchiveConfig
 
 Params = dict[str, Any]
 
+# storage drivers whose artifact rows legitimately carry no ``blob_bytes``
+_EXTERNAL_DRIVERS = frozenset({"chunked", "fs"})
+
 
 @dataclass(frozen=True)
 class ArchiveConfig:
@@ -66,16 +74,28 @@ def infer_backend(url: str) -> str:
 class ArchiveDAL:
     """Archive data access layer supporting PostgreSQL, MariaDB, and SQLite."""
 
-    def __init__(self, config: ArchiveConfig | None = None, *, apply_schema: bool = True) -> None:
+    def __init__(
+        self,
+        config: ArchiveConfig | None = None,
+        *,
+        apply_schema: bool = True,
+        blob_store: BlobStore | None = None,
+    ) -> None:
         self.config = config or ArchiveConfig.from_env()
         self.backend = self.config.backend
         self.url = self.config.url
+        # optional external payload store; ``None`` keeps payloads in the database
+        self.blob_store = blob_store
+        # dictionaries are immutable once stored, so their bytes are cached by id
+        self._dictionaries: dict[str, bytes] = {}
         self._conn: sqlite3.Connection | None = None
         self._engine: Any | None = None
+        # serialises use of the shared SQLite connection across threads
+        self._lock = threading.RLock()
         if self.backend == "sqlite":
             path = self._sqlite_path(self.url)
             ensure_directory(path.parent)
-            self._conn = sqlite3.connect(str(path))
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
             self._conn.row_factory = sqlite3.Row
         else:
             if sa is None:  # pragma: no cover - informative guard
@@ -115,11 +135,66 @@ class ArchiveDAL:
         metadata: dict[str, Any],
         context: dict[str, Any],
         tags: Iterable[str] | None = None,
+        chunk_refs: Sequence[str] | None = None,
     ) -> dict[str, Any]:
-        """Persist an archive record, returning the stored row."""
+        """Persist an archive record, returning the stored row.
+
+        ``chunk_refs`` lists, in order, the chunk hashes (already stored via
+        :meth:`store_chunks`) making up a ``storage_driver="chunked"`` artifact.
+        An optional ``artifact_payload["dict_id"]`` names the compression
+        dictionary (see :meth:`store_dictionary`) the payload was compressed with.
+        """
+
+        with self._transaction() as execute:
+            return self._record_archive(
+                execute,
+                utcnow(),
+                repo=repo,
+                path=path,
+                commit_sha=commit_sha,
+                language=language,
+                reason=reason,
+                kind=kind,
+                artifact_payload=artifact_payload,
+                archived_by=archived_by,
+                metadata=metadata,
+                context=context,
+                tags=tags,
+                chunk_refs=chunk_refs,
+            )
+
+    def record_archives(self, entries: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Persist many archive records in a single transaction.
+
+        Each entry holds the keyword arguments of :meth:`record_archive`. The
+        batch commits or rolls back as a whole.
+        """
 
         now = utcnow()
+        with self._transaction() as execute:
+            return [self._record_archive(execute, now, **entry) for entry in entries]
+
+    def _record_archive(
+        self,
+        execute: Callable[..., Any],
+        now: str,
+        *,
+        repo: str,
+        path: str,
+        commit_sha: str,
+        language: str | None,
+        reason: str,
+        kind: str,
+        artifact_payload: dict[str, Any],
+        archived_by: str,
+        metadata: dict[str, Any],
+        context: dict[str, Any],
+        tags: Iterable[str] | None = None,
+        chunk_refs: Sequence[str] | None = None,
+    ) -> dict[str, Any]:
         tombstone_id = str(uuid.uuid4())
+        artifact_payload = dict(self._externalize(artifact_payload))
+        dict_id = artifact_payload.pop("dict_id", None)
         meta_copy = dict(metadata)
         legal_hold_raw = meta_copy.pop("legal_hold", 0)
         legal_hold_value = _coerce_bool(legal_hold_raw)
@@ -128,113 +203,123 @@ class ArchiveDAL:
             meta_copy.setdefault("legal_hold", True)
         if delete_after_value is not None:
             meta_copy.setdefault("delete_after", delete_after_value)
-        with self._transaction() as execute:
-            artifact = self._get_artifact_by_sha(execute, artifact_payload["content_sha256"])
-            if artifact is None:
-                artifact_id = str(uuid.uuid4())
-                artifact = {
-                    "id": artifact_id,
-                    **artifact_payload,
-                    "created_at": now,
-                }
-                execute(
-                    """
-                    INSERT INTO artifact (
-                        id, content_sha256, size_bytes, compression, mime_type,
-                        storage_driver, blob_bytes, object_url, created_at
-                    ) VALUES (
-                        :id, :content_sha256, :size_bytes, :compression, :mime_type,
-                        :storage_driver, :blob_bytes, :object_url, :created_at
-                    )
-                    """,
-                    artifact,
-                )
-            else:
-                artifact_id = artifact["id"]
-                needs_refresh = (
-                    artifact.get("blob_bytes") is None
-                    or artifact.get("storage_driver") != artifact_payload["storage_driver"]
-                )
-                metadata_changed = any(
-                    artifact.get(field) != artifact_payload[field]
-                    for field in ("size_bytes", "compression", "mime_type")
-                )
-                if needs_refresh or metadata_changed:
-                    execute(
-                        """
-                        UPDATE artifact
-                        SET size_bytes = :size_bytes,
-                            compression = :compression,
-                            mime_type = :mime_type,
-                            storage_driver = :storage_driver,
-                            blob_bytes = :blob_bytes,
-                            object_url = :object_url
-                        WHERE id = :id
-                        """,
-                        {"id": artifact_id, **artifact_payload},
-                    )
-
-            item_id = str(uuid.uuid4())
-            item_payload = {
-                "id": item_id,
-                "repo": repo,
-                "path": path,
-                "commit_sha": commit_sha,
-                "language": language,
-                "kind": kind,
-                "reason": reason,
-                "artifact_id": artifact_id,
-                "metadata": json_dumps_sorted(meta_copy),
-                "archived_by": archived_by,
-                "archived_at": now,
-                "tombstone_id": tombstone_id,
-                "legal_hold": legal_hold_value,
-                "delete_after": delete_after_value,
-                "restored_at": None,
+        artifact = self._get_artifact_by_sha(execute, artifact_payload["content_sha256"])
+        if artifact is None:
+            artifact_id = str(uuid.uuid4())
+            artifact = {
+                "id": artifact_id,
+                **artifact_payload,
+                "created_at": now,
             }
             execute(
                 """
-                INSERT INTO item (
-                    id, repo, path, commit_sha, language, kind, reason, artifact_id,
-                    metadata, archived_by, archived_at, tombstone_id, legal_hold,
-                    delete_after, restored_at
+                INSERT INTO artifact (
+                    id, content_sha256, size_bytes, compression, mime_type,
+                    storage_driver, blob_bytes, object_url, created_at
                 ) VALUES (
-                    :id, :repo, :path, :commit_sha, :language, :kind, :reason, :artifact_id,
-                    :metadata, :archived_by, :archived_at, :tombstone_id, :legal_hold,
-                    :delete_after, :restored_at
+                    :id, :content_sha256, :size_bytes, :compression, :mime_type,
+                    :storage_driver, :blob_bytes, :object_url, :created_at
                 )
                 """,
-                item_payload,
+                artifact,
             )
+            if chunk_refs is not None:
+                self._insert_chunk_refs(execute, artifact_id, chunk_refs)
+            self._set_artifact_dict(execute, artifact_id, dict_id)
+        else:
+            artifact_id = artifact["id"]
+            stored_driver = artifact.get("storage_driver")
+            needs_refresh = (
+                artifact.get("blob_bytes") is None and stored_driver not in _EXTERNAL_DRIVERS
+            ) or stored_driver != artifact_payload["storage_driver"]
+            metadata_changed = any(
+                artifact.get(field) != artifact_payload[field]
+                for field in ("size_bytes", "compression", "mime_type")
+            )
+            if needs_refresh or metadata_changed:
+                execute(
+                    """
+                    UPDATE artifact
+                    SET size_bytes = :size_bytes,
+                        compression = :compression,
+                        mime_type = :mime_type,
+                        storage_driver = :storage_driver,
+                        blob_bytes = :blob_bytes,
+                        object_url = :object_url
+                    WHERE id = :id
+                    """,
+                    {"id": artifact_id, **artifact_payload},
+                )
+                self._set_artifact_dict(execute, artifact_id, dict_id)
+                if needs_refresh:
+                    execute(
+                        "DELETE FROM artifact_chunk WHERE artifact_id = :id",
+                        {"id": artifact_id},
+                    )
+                    if chunk_refs is not None:
+                        self._insert_chunk_refs(execute, artifact_id, chunk_refs)
 
-            event_payload = {
-                "id": str(uuid.uuid4()),
-                "item_id": item_id,
-                "action": "ARCHIVE",
-                "actor": archived_by,
-                "context": json_dumps_sorted(context),
-                "created_at": now,
-            }
-            execute(
-                """
-                INSERT INTO event (id, item_id, action, actor, context, created_at)
-                VALUES (:id, :item_id, :action, :actor, :context, :created_at)
-                """,
-                event_payload,
+        item_id = str(uuid.uuid4())
+        item_payload = {
+            "id": item_id,
+            "repo": repo,
+            "path": path,
+            "commit_sha": commit_sha,
+            "language": language,
+            "kind": kind,
+            "reason": reason,
+            "artifact_id": artifact_id,
+            "metadata": json_dumps_sorted(meta_copy),
+            "archived_by": archived_by,
+            "archived_at": now,
+            "tombstone_id": tombstone_id,
+            "legal_hold": legal_hold_value,
+            "delete_after": delete_after_value,
+            "restored_at": None,
+        }
+        execute(
+            """
+            INSERT INTO item (
+                id, repo, path, commit_sha, language, kind, reason, artifact_id,
+                metadata, archived_by, archived_at, tombstone_id, legal_hold,
+                delete_after, restored_at
+            ) VALUES (
+                :id, :repo, :path, :commit_sha, :language, :kind, :reason, :artifact_id,
+                :metadata, :archived_by, :archived_at, :tombstone_id, :legal_hold,
+                :delete_after, :restored_at
             )
+            """,
+            item_payload,
+        )
 
-            for tag in tags or []:
-                params = {"item_id": item_id, "tag": tag}
-                existing = execute(
-                    "SELECT 1 FROM tag WHERE item_id = :item_id AND tag = :tag",
+        event_payload = {
+            "id": str(uuid.uuid4()),
+            "item_id": item_id,
+            "action": "ARCHIVE",
+            "actor": archived_by,
+            "context": json_dumps_sorted(context),
+            "created_at": now,
+        }
+        execute(
+            """
+            INSERT INTO event (id, item_id, action, actor, context, created_at)
+            VALUES (:id, :item_id, :action, :actor, :context, :created_at)
+            """,
+            event_payload,
+        )
+
+        for tag in tags or []:
+            params = {"item_id": item_id, "tag": tag}
+            existing = execute(
+                "SELECT 1 FROM tag WHERE item_id = :item_id AND tag = :tag",
+                params,
+                fetchone=True,
+            )
+            if existing is None:
+                execute(
+                    "INSERT INTO tag (item_id, tag) VALUES (:item_id, :tag)",
                     params,
-                    fetchone=True,
                 )
-                if existing is None:
-                    execute(
-                        "INSERT INTO tag (item_id, tag) VALUES (:item_id, :tag)",
-                        params,
-                    )
 
         return {
             "tombstone_id": tombstone_id,
@@ -242,6 +327,95 @@ class ArchiveDAL:
             "item_id": item_id,
         }
 
+    def store_chunks(self, chunks: Iterable[tuple[str, int, str, bytes]]) -> int:
+        """Store ``(sha256, size_bytes, compression, blob)`` chunks not yet present.
+
+        Runs in a single transaction and returns the number of new chunks.
+        Chunks that already exist are refreshed as in :meth:`existing_chunks`.
+        """
+
+        stored = 0
+        now = utcnow()
+        with self._transaction() as execute:
+            for sha, size, compression, blob in chunks:
+                if self._refresh_chunk(execute, sha, now):
+                    continue
+                object_url = None
+                if self.blob_store is not None:
+                    object_url, blob = self.blob_store.put(blob), None
+                execute(
+                    """
+                    INSERT INTO chunk (
+                        sha256, size_bytes, compression, blob_bytes, object_url, created_at
+                    ) VALUES (
+                        :sha256, :size_bytes, :compression, :blob_bytes, :object_url, :created_at
+                    )
+                    """,
+                    {
+                        "sha256": sha,
+                        "size_bytes": size,
+                        "compression": compression,
+                        "blob_bytes": blob,
+                        "object_url": object_url,
+                        "created_at": now,
+                    },
+                )
+                stored += 1
+        return stored
+
+    def existing_chunks(self, shas: Iterable[str]) -> set[str]:
+        """Return the subset of ``shas`` already stored as chunks.
+
+        Found chunks are about to be referenced again, so their ``created_at``
+        and blob mtime are reset to now: :meth:`gc_blobs` then treats them like
+        freshly written chunks until the caller records its references.
+        """
+
+        found: set[str] = set()
+        now = utcnow()
+        with self._transaction() as execute:
+            for sha in dict.fromkeys(shas):
+                if self._refresh_chunk(execute, sha, now):
+                    found.add(sha)
+        return found
+
+    def iter_artifact_chunks(
+        self, artifact_id: str, *, page_size: int = 64
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the chunks of a chunked artifact in order, ``page_size`` rows at a time.
+
+        Each row carries ``sha256``, ``size_bytes``, ``compression`` and
+        ``blob_bytes``; only one page is held in memory.
+        """
+
+        seq = 0
+        while True:
+            with self._transaction() as execute:
+                rows = execute(
+                    """
+                    SELECT ac.seq AS seq, c.sha256 AS sha256, c.size_bytes AS size_bytes,
+                           c.compression AS compression, c.blob_bytes AS blob_bytes,
+                           c.object_url AS object_url
+                    FROM artifact_chunk ac
+                    JOIN chunk c ON c.sha256 = ac.chunk_sha256
+                    WHERE ac.artifact_id = :artifact_id AND ac.seq >= :lo AND ac.seq < :hi
+                    ORDER BY ac.seq
+                    """,
+                    {"artifact_id": artifact_id, "lo": seq, "hi": seq + page_size},
+                    fetchall=True,
+                )
+            if not rows:
+                return
+            for row in rows:
+                if row["seq"] != seq:
+                    raise LookupError(f"Artifact {artifact_id} is missing chunk #{seq}")
+                if row["blob_bytes"] is None:
+                    row["blob_bytes"] = self._read_external(row.get("object_url"))
+                else:
+                    row["blob_bytes"] = _as_bytes(row["blob_bytes"])
+                yield row
+                seq += 1
+
     def get_restore_payload(self, tombstone_id: str) -> dict[str, Any]:
         """Return the item and artifact payload for a restore operation."""
 
@@ -250,10 +424,57 @@ class ArchiveDAL:
             if item is None:
                 raise LookupError(f"Unknown tombstone id: {tombstone_id}")
             artifact = self._get_artifact_by_id(execute, item["artifact_id"])
+            dict_row = execute(
+                "SELECT dict_id FROM artifact_dict WHERE artifact_id = :id",
+                {"id": artifact["id"]},
+                fetchone=True,
+            )
+            dictionary = (
+                self._dictionary_bytes(execute, dict_row["dict_id"]) if dict_row else None
+            )
         item_dict = dict(item)
         if isinstance(item_dict.get("metadata"), str):
             item_dict["metadata"] = json.loads(item_dict["metadata"])
-        return {"item": item_dict, "artifact": dict(artifact)}
+        artifact_dict = dict(artifact)
+        artifact_dict["dictionary"] = dictionary
+        if artifact_dict.get("storage_driver") == "fs":
+            try:
+                artifact_dict["blob_bytes"] = self._read_external(artifact_dict.get("object_url"))
+            except LookupError as exc:
+                raise RuntimeError(str(exc)) from exc
+        return {"item": item_dict, "artifact": artifact_dict}
+
+    def artifact_sizes(
+        self, tombstone_ids: Iterable[str], *, batch_size: int = 500
+    ) -> dict[str, dict[str, Any]]:
+        """Return ``{tombstone: {"size_bytes", "storage_driver"}}`` for known tombstones.
+
+        Unknown tombstones are omitted. Lookups run ``batch_size`` ids per query.
+        """
+
+        sizes: dict[str, dict[str, Any]] = {}
+        ids = list(dict.fromkeys(tombstone_ids))
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start : start + batch_size]
+            params = {f"t{index}": value for index, value in enumerate(batch)}
+            placeholders = ", ".join(f":{key}" for key in params)
+            with self._transaction() as execute:
+                rows = execute(
+                    f"""
+                    SELECT i.tombstone_id AS tombstone_id, a.size_bytes AS size_bytes,
+                           a.storage_driver AS storage_driver
+                    FROM item i JOIN artifact a ON a.id = i.artifact_id
+                    WHERE i.tombstone_id IN ({placeholders})
+                    """,
+                    params,
+                    fetchall=True,
+                )
+            for row in rows or []:
+                sizes[row["tombstone_id"]] = {
+                    "size_bytes": int(row["size_bytes"]),
+                    "storage_driver": row["storage_driver"],
+                }
+        return sizes
 
     def record_restore(self, tombstone_id: str, *, actor: str) -> None:
         """Persist restore metadata after a successful restore."""
@@ -386,6 +607,15 @@ class ArchiveDAL:
                     """,
                     {"artifact_id": artifact_id},
                 )
+                # unreferenced chunk rows are reclaimed by garbage collection
+                execute(
+                    "DELETE FROM artifact_chunk WHERE artifact_id = :artifact_id",
+                    {"artifact_id": artifact_id},
+                )
+                execute(
+                    "DELETE FROM artifact_dict WHERE artifact_id = :artifact_id",
+                    {"artifact_id": artifact_id},
+                )
             return blob_scrubbed
 
     def list_items(
@@ -455,6 +685,288 @@ class ArchiveDAL:
         item_dict["events"] = events_payload
         return item_dict
 
+    # ------------------------------------------------------------------
+    # compression dictionaries
+    # ------------------------------------------------------------------
+    def store_dictionary(
+        self,
+        *,
+        file_type: str,
+        codec: str,
+        data: bytes,
+        sample_count: int,
+        sample_bytes: int,
+    ) -> dict[str, Any]:
+        """Store *data* as the next dictionary version for *file_type*.
+
+        Earlier versions are kept so artifacts compressed with them still
+        restore. Returns the stored row without its bytes.
+        """
+
+        with self._transaction() as execute:
+            row = execute(
+                "SELECT MAX(version) AS version FROM compression_dict WHERE file_type = :file_type",
+                {"file_type": file_type},
+                fetchone=True,
+            )
+            record = {
+                "id": str(uuid.uuid4()),
+                "file_type": file_type,
+                "version": int((row or {}).get("version") or 0) + 1,
+                "codec": codec,
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "dict_bytes": data,
+                "sample_count": sample_count,
+                "sample_bytes": sample_bytes,
+                "created_at": utcnow(),
+            }
+            execute(
+                """
+                INSERT INTO compression_dict (
+                    id, file_type, version, codec, sha256, dict_bytes,
+                    sample_count, sample_bytes, created_at
+                ) VALUES (
+                    :id, :file_type, :version, :codec, :sha256, :dict_bytes,
+                    :sample_count, :sample_bytes, :created_at
+                )
+                """,
+                record,
+            )
+        self._dictionaries[record["id"]] = data
+        return {key: value for key, value in record.items() if key != "dict_bytes"}
+
+    def active_dictionaries(self, *, codec: str | None = None) -> dict[str, dict[str, Any]]:
+        """Return the latest dictionary per file type (with ``dict_bytes``).
+
+        ``codec`` restricts the result to dictionaries trained for that codec.
+        """
+
+        with self._transaction() as execute:
+            rows = execute(
+                """
+                SELECT d.* FROM compression_dict d
+                WHERE d.version = (
+                    SELECT MAX(x.version) FROM compression_dict x WHERE x.file_type = d.file_type
+                )
+                """,
+                fetchall=True,
+            )
+        active: dict[str, dict[str, Any]] = {}
+        for row in rows or []:
+            if codec is not None and row["codec"] != codec:
+                continue
+            row["dict_bytes"] = _as_bytes(row["dict_bytes"])
+            self._dictionaries[row["id"]] = row["dict_bytes"]
+            active[row["file_type"]] = row
+        return active
+
+    def list_dictionaries(self) -> list[dict[str, Any]]:
+        """Return every stored dictionary version (without bytes) with its usage count."""
+
+        with self._transaction() as execute:
+            rows = execute(
+                """
+                SELECT d.id, d.file_type, d.version, d.codec, d.sha256, d.sample_count,
+                       d.sample_bytes, d.created_at,
+                       (SELECT COUNT(*) FROM artifact_dict ad WHERE ad.dict_id = d.id)
+                           AS artifacts
+                FROM compression_dict d
+                ORDER BY d.file_type, d.version
+                """,
+                fetchall=True,
+            )
+        return list(rows or [])
+
+    def get_dictionary(self, dict_id: str) -> bytes:
+        """Return the bytes of dictionary *dict_id*."""
+
+        with self._transaction() as execute:
+            return self._dictionary_bytes(execute, dict_id)
+
+    def iter_dictionary_samples(
+        self, *, max_size: int, page_size: int = 200
+    ) -> Iterator[dict[str, Any]]:
+        """Yield whole-blob artifacts of at most *max_size* bytes, newest item first.
+
+        Rows carry ``path`` (of the newest item referencing the artifact),
+        ``compression``, ``blob_bytes`` and ``dict_id``; payloads in the blob
+        store are read from it. Each artifact is yielded once.
+        """
+
+        seen: set[str] = set()
+        offset = 0
+        while True:
+            with self._transaction() as execute:
+                rows = execute(
+                    """
+                    SELECT i.path AS path, a.id AS artifact_id, a.compression AS compression,
+                           a.blob_bytes AS blob_bytes, a.object_url AS object_url,
+                           a.storage_driver AS storage_driver, ad.dict_id AS dict_id
+                    FROM item i
+                    JOIN artifact a ON a.id = i.artifact_id
+                    LEFT JOIN artifact_dict ad ON ad.artifact_id = a.id
+                    WHERE a.size_bytes <= :max_size AND a.storage_driver IN ('db', 'fs')
+                    ORDER BY i.archived_at DESC, i.id
+                    LIMIT :limit OFFSET :offset
+                    """,
+                    {"max_size": max_size, "limit": page_size, "offset": offset},
+                    fetchall=True,
+                )
+            if not rows:
+                return
+            offset += len(rows)
+            for row in rows:
+                if row["artifact_id"] in seen:
+                    continue
+                seen.add(row["artifact_id"])
+                if row["storage_driver"] == "fs":
+                    row["blob_bytes"] = self._read_external(row.get("object_url"))
+                elif row["blob_bytes"] is None:
+                    continue
+                else:
+                    row["blob_bytes"] = _as_bytes(row["blob_bytes"])
+                yield row
+
+    # ------------------------------------------------------------------
+    # blob store maintenance
+    # ------------------------------------------------------------------
+    def migrate_blobs(self, *, to: str, batch_size: int = 100) -> dict[str, int]:
+        """Move artifact and chunk payloads between the database and the blob store.
+
+        ``to="fs"`` writes in-database payloads to the blob store and clears
+        their ``blob_bytes``; ``to="db"`` copies them back. Each batch of
+        ``batch_size`` rows commits on its own, so an interrupted migration
+        can simply be re-run. Files no longer referenced after ``to="db"``
+        are removed by :meth:`gc_blobs`.
+        """
+
+        store = self._require_blob_store()
+        if to == "fs":
+            specs = (
+                (
+                    "artifacts",
+                    "SELECT id AS row_key, blob_bytes FROM artifact "
+                    "WHERE storage_driver = 'db' AND blob_bytes IS NOT NULL LIMIT :limit",
+                    "UPDATE artifact SET storage_driver = 'fs', blob_bytes = NULL, "
+                    "object_url = :url WHERE id = :row_key AND storage_driver = 'db'",
+                ),
+                (
+                    "chunks",
+                    "SELECT sha256 AS row_key, blob_bytes FROM chunk "
+                    "WHERE blob_bytes IS NOT NULL LIMIT :limit",
+                    "UPDATE chunk SET blob_bytes = NULL, object_url = :url WHERE sha256 = :row_key",
+                ),
+            )
+        elif to == "db":
+            specs = (
+                (
+                    "artifacts",
+                    "SELECT id AS row_key, object_url FROM artifact "
+                    "WHERE storage_driver = 'fs' LIMIT :limit",
+                    "UPDATE artifact SET storage_driver = 'db', blob_bytes = :blob, "
+                    "object_url = NULL WHERE id = :row_key AND storage_driver = 'fs'",
+                ),
+                (
+                    "chunks",
+                    "SELECT sha256 AS row_key, object_url FROM chunk "
+                    "WHERE blob_bytes IS NULL AND object_url IS NOT NULL LIMIT :limit",
+                    "UPDATE chunk SET blob_bytes = :blob, object_url = NULL "
+                    "WHERE sha256 = :row_key",
+                ),
+            )
+        else:
+            raise ValueError(f"Unknown blob migration target: {to}")
+
+        moved = {"artifacts": 0, "chunks": 0, "bytes": 0}
+        for label, select_sql, update_sql in specs:
+            while True:
+                with self._transaction() as execute:
+                    rows = execute(select_sql, {"limit": batch_size}, fetchall=True) or []
+                if not rows:
+                    break
+                updates: list[Params] = []
+                for row in rows:
+                    if to == "fs":
+                        blob = _as_bytes(row["blob_bytes"])
+                        updates.append({"row_key": row["row_key"], "url": store.put(blob)})
+                    else:
+                        blob = store.get(row["object_url"])
+                        updates.append({"row_key": row["row_key"], "blob": blob})
+                    moved["bytes"] += len(blob)
+                with self._transaction() as execute:
+                    for params in updates:
+                        execute(update_sql, params)
+                moved[label] += len(updates)
+        return moved
+
+    def compact(self) -> bool:
+        """Reclaim space freed by a migration (SQLite ``VACUUM``); False if unsupported."""
+
+        if self.backend != "sqlite" or self._conn is None:
+            return False
+        self._conn.commit()
+        self._conn.execute("VACUUM")
+        return True
+
+    def verify_blobs(self) -> dict[str, Any]:
+        """Check that every blob referenced by the database exists and is intact."""
+
+        store = self._require_blob_store()
+        missing: list[str] = []
+        corrupt: list[str] = []
+        referenced = self._referenced_blob_urls()
+        for url in sorted(referenced):
+            if not store.exists(url):
+                missing.append(url)
+            elif not store.verify(url):
+                corrupt.append(url)
+        return {
+            "checked": len(referenced),
+            "missing": missing,
+            "corrupt": corrupt,
+            "ok": not missing and not corrupt,
+        }
+
+    def gc_blobs(self, *, grace_seconds: float = 3600.0, dry_run: bool = False) -> dict[str, Any]:
+        """Delete unreferenced chunk rows and blob files older than ``grace_seconds``.
+
+        The grace period protects payloads written or reused (see
+        :meth:`existing_chunks`) by archive operations that have not committed
+        their references yet; it should exceed the longest expected archive run.
+        """
+
+        cutoff = time.time() - grace_seconds
+        cutoff_iso = _dt.datetime.fromtimestamp(cutoff, _dt.timezone.utc).strftime(ISO_FORMAT)
+        orphan_sql = (
+            "FROM chunk WHERE created_at < :cutoff AND NOT EXISTS ("
+            "SELECT 1 FROM artifact_chunk ac WHERE ac.chunk_sha256 = chunk.sha256)"
+        )
+        with self._transaction() as execute:
+            orphans = execute(
+                f"SELECT sha256, object_url {orphan_sql}", {"cutoff": cutoff_iso}, fetchall=True
+            ) or []
+            if orphans and not dry_run:
+                execute(f"DELETE {orphan_sql}", {"cutoff": cutoff_iso})
+        report: dict[str, Any] = {
+            "dry_run": dry_run,
+            "chunk_rows": len(orphans),
+            "blobs": 0,
+            "temp_files": 0,
+        }
+        if self.blob_store is None:
+            return report
+        referenced = self._referenced_blob_urls()
+        if dry_run:
+            referenced -= {row["object_url"] for row in orphans if row.get("object_url")}
+        for url, mtime in list(self.blob_store.iter_urls()):
+            if url in referenced or mtime >= cutoff:
+                continue
+            if dry_run or self.blob_store.delete(url):
+                report["blobs"] += 1
+        if not dry_run:
+            report["temp_files"] = self.blob_store.sweep_temp(cutoff)
+        return report
+
     # ------------------------------------------------------------------
     # helpers
     # ------------------------------------------------------------------
@@ -473,24 +985,25 @@ class ArchiveDAL:
         if self.backend == "sqlite":
             if self._conn is None:
                 raise RuntimeError("SQLite connection is not initialised")
-            cursor = self._conn.cursor()
-            try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                try:
 
-                def execute_sql(
-                    sql: str,
-                    params: Params | None = None,
-                    fetchone: bool = False,
-                    fetchall: bool = False,
-                ) -> Any:
-                    return self._sqlite_execute(cursor, sql, params, fetchone, fetchall)
+                    def execute_sql(
+                        sql: str,
+                        params: Params | None = None,
+                        fetchone: bool = False,
+                        fetchall: bool = False,
+                    ) -> Any:
+                        return self._sqlite_execute(cursor, sql, params, fetchone, fetchall)
 
-                yield execute_sql
-                self._conn.commit()
-            except Exception:
-                self._conn.rollback()
-                raise
-            finally:
-                cursor.close()
+                    yield execute_sql
+                    self._conn.commit()
+                except Exception:
+                    self._conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
         else:
             if self._engine is None:
                 raise RuntimeError("SQLAlchemy engine is not initialised")
@@ -540,6 +1053,91 @@ class ArchiveDAL:
             "SELECT * FROM artifact WHERE content_sha256 = :sha", {"sha": sha}, fetchone=True
         )
 
+    def _externalize(self, artifact_payload: dict[str, Any]) -> dict[str, Any]:
+        """Move an in-database payload to the blob store when one is configured."""
+
+        blob = artifact_payload.get("blob_bytes")
+        if self.blob_store is None or artifact_payload.get("storage_driver") != "db":
+            return artifact_payload
+        if blob is None:
+            return artifact_payload
+        return {
+            **artifact_payload,
+            "storage_driver": "fs",
+            "blob_bytes": None,
+            "object_url": self.blob_store.put(blob),
+        }
+
+    def _require_blob_store(self) -> BlobStore:
+        if self.blob_store is None:
+            raise RuntimeError("No blob store configured; set storage.blob_store = 'fs'")
+        return self.blob_store
+
+    def _referenced_blob_urls(self) -> set[str]:
+        with self._transaction() as execute:
+            rows = execute(
+                "SELECT object_url FROM artifact WHERE storage_driver = 'fs' "
+                "UNION SELECT object_url FROM chunk WHERE object_url IS NOT NULL",
+                fetchall=True,
+            )
+        return {row["object_url"] for row in rows or [] if row.get("object_url")}
+
+    def _read_external(self, object_url: str | None) -> bytes:
+        if not object_url:
+            raise LookupError("Payload has no stored bytes or object URL")
+        if self.blob_store is None:
+            raise RuntimeError(
+                f"Payload {object_url} lives in a blob store; configure storage.blob_store"
+            )
+        return self.blob_store.get(object_url)
+
+    def _refresh_chunk(self, execute: Callable[..., Any], sha: str, now: str) -> bool:
+        """Mark chunk ``sha`` as just used; return ``False`` when it is not stored."""
+
+        row = execute(
+            "SELECT object_url FROM chunk WHERE sha256 = :sha", {"sha": sha}, fetchone=True
+        )
+        if row is None:
+            return False
+        execute("UPDATE chunk SET created_at = :now WHERE sha256 = :sha", {"now": now, "sha": sha})
+        if self.blob_store is not None and row.get("object_url"):
+            self.blob_store.touch(row["object_url"])
+        return True
+
+    def _insert_chunk_refs(
+        self, execute: Callable[..., Any], artifact_id: str, chunk_refs: Sequence[str]
+    ) -> None:
+        for seq, sha in enumerate(chunk_refs):
+            execute(
+                """
+                INSERT INTO artifact_chunk (artifact_id, seq, chunk_sha256)
+                VALUES (:artifact_id, :seq, :chunk_sha256)
+                """,
+                {"artifact_id": artifact_id, "seq": seq, "chunk_sha256": sha},
+            )
+
+    def _set_artifact_dict(
+        self, execute: Callable[..., Any], artifact_id: str, dict_id: str | None
+    ) -> None:
+        execute("DELETE FROM artifact_dict WHERE artifact_id = :id", {"id": artifact_id})
+        if dict_id is not None:
+            execute(
+                "INSERT INTO artifact_dict (artifact_id, dict_id) VALUES (:id, :dict_id)",
+                {"id": artifact_id, "dict_id": dict_id},
+            )
+
+    def _dictionary_bytes(self, execute: Callable[..., Any], dict_id: str) -> bytes:
+        cached = self._dictionaries.get(dict_id)
+        if cached is not None:
+            return cached
+        row = execute(
+            "SELECT dict_bytes FROM compression_dict WHERE id = :id", {"id": dict_id}, fetchone=True
+        )
+        if row is None:
+            raise LookupError(f"Unknown compression dictionary: {dict_id}")
+        data = self._dictionaries[dict_id] = _as_bytes(row["dict_bytes"])
+        return data
+
     def _get_artifact_by_id(self, execute: Callable[..., Any], artifact_id: str) -> dict[str, Any]:
         artifact = execute(
             "SELECT * FROM artifact WHERE id = :id", {"id": artifact_id}, fetchone=True
@@ -556,6 +1154,12 @@ class ArchiveDAL:
         )
 
 
+def _as_bytes(raw: Any) -> bytes:
+    if isinstance(raw, memoryview):  # pragma: no cover - driver specific
+        return raw.tobytes()
+    return bytes(raw)
+
+
 def _coerce_bool(value: Any) -> int:
     """Normalise truthy inputs to 0/1 for SQL storage."""
 
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import contextvars
 import csv
+import heapq
 import json
-from collections.abc import Callable, Iterable, Iterator
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -14,6 +17,10 @@ from .config import BatchConfig, PerformanceConfig
 from .perf import TimingMetrics, timer
 from .retry import RetryConfig, retry_with_backoff
 
+# rough restore cost model used by BatchRestore.plan: decompress+write rate and per-item cost
+PLAN_THROUGHPUT_BYTES = 200 * 1024 * 1024
+PLAN_ITEM_OVERHEAD_SECONDS = 0.005
+
 
 @dataclass(frozen=True)
 class BatchItem:
@@ -64,6 +71,30 @@ class BatchResult:
         }
 
 
+@dataclass
+class BatchPlan:
+    """Dry-run estimate for a batch restore."""
+
+    total: int
+    found: int
+    missing: list[str]
+    total_bytes: int
+    overwrites: int
+    workers: int
+    estimated_seconds: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "found": self.found,
+            "missing": self.missing,
+            "total_bytes": self.total_bytes,
+            "overwrites": self.overwrites,
+            "workers": self.workers,
+            "estimated_seconds": round(self.estimated_seconds, 3),
+        }
+
+
 class BatchManifest:
     """Loader for CSV/JSON batch manifests."""
 
@@ -136,22 +167,38 @@ class BatchRestore:
         self.performance_config = performance_config or PerformanceConfig()
         self.progress_callback = progress_callback
 
+    @property
+    def workers(self) -> int:
+        return max(1, self.batch_config.concurrent)
+
     def restore(self, manifest: BatchManifest) -> BatchResult:
+        """Restore every manifest item on up to ``batch_config.concurrent`` threads.
+
+        Results keep manifest order; the progress callback runs on the calling
+        thread as items complete. Failures are recorded per item and never
+        abort the batch. Evidence records from all workers share one
+        :func:`~codex.evidence.evidence_batch`, written when the batch ends.
+        """
+
+        # imported lazily: codex.evidence imports this package
+        from codex.evidence import evidence_batch
+
         total = len(manifest.items)
-        results: list[dict[str, Any]] = []
+        slots: list[dict[str, Any] | None] = [None] * total
         succeeded = 0
         failed = 0
         performance_enabled = self.performance_config.enabled
-        with _optional_timer(performance_enabled, "batch_restore") as metrics:
-            for index, item in enumerate(manifest.items, start=1):
-                entry = self._restore_single(item)
+        with evidence_batch(), _optional_timer(performance_enabled, "batch_restore") as metrics:
+            completed = self._run(manifest.items)
+            for index, (position, entry) in enumerate(completed, start=1):
                 if entry["status"] == "SUCCESS":
                     succeeded += 1
                 else:
                     failed += 1
-                results.append(entry)
+                slots[position] = entry
                 if self.progress_callback:
                     self.progress_callback(index, total, entry)
+        results = [entry for entry in slots if entry is not None]
         return BatchResult(
             total=total,
             succeeded=succeeded,
@@ -160,12 +207,59 @@ class BatchRestore:
             metrics=metrics if performance_enabled else None,
         )
 
+    def plan(
+        self,
+        manifest: BatchManifest,
+        *,
+        throughput_bytes: float = PLAN_THROUGHPUT_BYTES,
+        item_overhead_seconds: float = PLAN_ITEM_OVERHEAD_SECONDS,
+    ) -> BatchPlan:
+        """Estimate bytes and wall time for :meth:`restore` without writing anything.
+
+        Artifact sizes come from the archive; the time estimate schedules the
+        largest items first across the worker pool using a fixed
+        ``throughput_bytes`` per second and ``item_overhead_seconds`` per item.
+        """
+
+        items = manifest.items
+        sizes = self.service.dal.artifact_sizes(item.tombstone for item in items)
+        found = [sizes[item.tombstone]["size_bytes"] for item in items if item.tombstone in sizes]
+        missing = sorted({item.tombstone for item in items if item.tombstone not in sizes})
+        costs = [item_overhead_seconds + size / throughput_bytes for size in found]
+        workers = min(self.workers, max(1, len(costs)))
+        return BatchPlan(
+            total=len(items),
+            found=len(found),
+            missing=missing,
+            total_bytes=sum(found),
+            overwrites=sum(1 for item in items if item.output.exists()),
+            workers=workers,
+            estimated_seconds=_makespan(costs, workers),
+        )
+
     def save_results(self, path: Path, result: BatchResult) -> Path:
         path.parent.mkdir(parents=True, exist_ok=True)
         with path.open("w", encoding="utf-8") as handle:
             json.dump(result.to_dict(), handle, indent=2)
         return path
 
+    def _run(self, items: Sequence[BatchItem]) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield ``(manifest position, result)`` pairs in completion order."""
+
+        workers = min(self.workers, len(items))
+        if workers <= 1:
+            for position, item in enumerate(items):
+                yield position, self._restore_single(item)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-restore") as pool:
+            # each task runs in a copy of this context so it joins the evidence batch
+            futures = {
+                pool.submit(contextvars.copy_context().run, self._restore_single, item): position
+                for position, item in enumerate(items)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
     def _restore_single(self, item: BatchItem) -> dict[str, Any]:
         restore_fn = self.service.restore_to_path
         decorated = retry_with_backoff(self.retry_config)(restore_fn)
@@ -193,6 +287,15 @@ class BatchRestore:
         return result
 
 
+def _makespan(costs: Iterable[float], workers: int) -> float:
+    """Finish time of *costs* scheduled longest-first onto *workers* lanes."""
+
+    lanes = [0.0] * max(1, workers)
+    for cost in sorted(costs, reverse=True):
+        heapq.heapreplace(lanes, lanes[0] + cost)
+    return max(lanes)
+
+
 @contextmanager
 def _optional_timer(enabled: bool, name: str):
     if enabled:
@@ -0,0 +1,184 @@
+"""Content-addressed payload storage outside the archive database.
+
+:class:`FilesystemBlobStore` keeps compressed payloads in a sharded directory
+tree (``<root>/ab/cd/<sha256>``) keyed by the SHA-256 of the stored bytes,
+so identical payloads are written once and a file can be verified by
+re-hashing it. Writes go to a temporary file in the target directory and are
+published with :func:`os.replace`, so readers never observe partial blobs.
+Rows reference blobs through ``object_url`` values of the form
+``cas://sha256/<digest>``, which stay valid when the store root moves.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Protocol
+
+CAS_PREFIX = "cas://sha256/"
+
+
+class BlobMissingError(LookupError):
+    """Raised when a referenced blob is absent from the store."""
+
+
+class BlobStore(Protocol):
+    """Minimal interface the archive DAL needs from an external blob backend."""
+
+    def put(self, data: bytes) -> str: ...
+
+    def get(self, url: str) -> bytes: ...
+
+    def exists(self, url: str) -> bool: ...
+
+    def verify(self, url: str) -> bool: ...
+
+    def delete(self, url: str) -> bool: ...
+
+    def touch(self, url: str) -> bool: ...
+
+    def iter_urls(self) -> Iterator[tuple[str, float]]: ...
+
+    def sweep_temp(self, older_than: float) -> int: ...
+
+
+def cas_url(digest: str) -> str:
+    return f"{CAS_PREFIX}{digest}"
+
+
+def cas_digest(url: str) -> str:
+    """Return the digest encoded in a ``cas://sha256/`` URL."""
+
+    if not url.startswith(CAS_PREFIX):
+        raise ValueError(f"Not a content-addressed blob URL: {url}")
+    digest = url[len(CAS_PREFIX) :]
+    if len(digest) != 64 or any(ch not in "0123456789abcdef" for ch in digest):
+        raise ValueError(f"Malformed blob digest in URL: {url}")
+    return digest
+
+
+class FilesystemBlobStore:
+    """Sharded, content-addressed blob directory with atomic publication."""
+
+    def __init__(self, root: Path, *, fsync: bool = True) -> None:
+        self.root = Path(root)
+        self.fsync = fsync
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, url: str) -> Path:
+        digest = cas_digest(url)
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put(self, data: bytes) -> str:
+        """Store *data* (if absent) and return its ``cas://`` URL."""
+
+        url = cas_url(hashlib.sha256(data).hexdigest())
+        target = self.path_for(url)
+        if self.touch(url):
+            return url
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", dir=target.parent)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+                if self.fsync:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            os.replace(tmp_name, target)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return url
+
+    def get(self, url: str) -> bytes:
+        try:
+            return self.path_for(url).read_bytes()
+        except FileNotFoundError as exc:
+            raise BlobMissingError(f"Blob missing from store: {url}") from exc
+
+    def exists(self, url: str) -> bool:
+        return self.path_for(url).is_file()
+
+    def verify(self, url: str) -> bool:
+        """True when the blob exists and its bytes still hash to its digest."""
+
+        path = self.path_for(url)
+        digest = hashlib.sha256()
+        try:
+            with path.open("rb") as handle:
+                for block in iter(lambda: handle.read(1024 * 1024), b""):
+                    digest.update(block)
+        except FileNotFoundError:
+            return False
+        return digest.hexdigest() == cas_digest(url)
+
+    def touch(self, url: str) -> bool:
+        """Refresh the blob's mtime so a concurrent GC grace period covers a new reference."""
+
+        try:
+            os.utime(self.path_for(url))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, url: str) -> bool:
+        path = self.path_for(url)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _shard_entries(self) -> Iterator[Path]:
+        for first in sorted(self.root.iterdir()):
+            if not first.is_dir() or len(first.name) != 2:
+                continue
+            for second in sorted(first.iterdir()):
+                if second.is_dir():
+                    yield from sorted(second.iterdir())
+
+    def iter_urls(self) -> Iterator[tuple[str, float]]:
+        """Yield ``(url, mtime)`` for every stored blob."""
+
+        for entry in self._shard_entries():
+            url = cas_url(entry.name)
+            try:
+                cas_digest(url)
+            except ValueError:
+                continue
+            yield url, entry.stat().st_mtime
+
+    def sweep_temp(self, older_than: float) -> int:
+        """Remove temporary files left by interrupted writes before *older_than*."""
+
+        removed = 0
+        for entry in self._shard_entries():
+            if entry.name.startswith(".tmp-") and entry.stat().st_mtime < older_than:
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def open_blob_store(kind: str, root: Path) -> FilesystemBlobStore | None:
+    """Return the configured blob store, or ``None`` for in-database storage."""
+
+    lowered = kind.lower()
+    if lowered == "db":
+        return None
+    if lowered == "fs":
+        return FilesystemBlobStore(root)
+    raise ValueError(f"Unsupported archive blob store: {kind}")
+
+
+__all__ = [
+    "CAS_PREFIX",
+    "BlobMissingError",
+    "BlobStore",
+    "FilesystemBlobStore",
+    "cas_digest",
+    "cas_url",
+    "open_blob_store",
+]
@@ -0,0 +1,108 @@
+"""Content-defined chunking for streaming archive storage.
+
+Chunk boundaries are chosen with a FastCDC-style gear rolling hash: a cut is
+placed where the high bits of the hash (which depend only on the preceding
+64 bytes) are all zero. Because boundaries follow content rather than
+offsets, inserting or deleting bytes only disturbs the chunks around the edit
+and the remaining chunks of a near-identical file hash the same, so they are
+stored once. A stricter mask before ``avg_size`` and a looser one after it
+("normalised chunking") keeps chunk sizes close to the average.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterator
+from typing import BinaryIO
+
+DEFAULT_MIN_SIZE = 16 * 1024
+DEFAULT_AVG_SIZE = 64 * 1024
+DEFAULT_MAX_SIZE = 256 * 1024
+
+
+def _gear_table() -> tuple[int, ...]:
+    # derived from blake2b so boundaries are identical across processes and releases
+    return tuple(
+        int.from_bytes(hashlib.blake2b(bytes([value]), digest_size=8).digest(), "little")
+        for value in range(256)
+    )
+
+
+_GEAR = _gear_table()
+
+
+def _high_mask(bits: int) -> int:
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def _validate(min_size: int, avg_size: int, max_size: int) -> None:
+    if not 0 < min_size <= avg_size <= max_size:
+        raise ValueError("chunk sizes must satisfy 0 < min_size <= avg_size <= max_size")
+    if avg_size & (avg_size - 1):
+        raise ValueError("avg_size must be a power of two")
+
+
+def cut_point(data: bytes | bytearray, min_size: int, avg_size: int, max_size: int) -> int:
+    """Return the length of the first chunk in ``data``."""
+
+    length = len(data)
+    if length <= min_size:
+        return length
+    bits = avg_size.bit_length() - 1
+    mask_strict = _high_mask(bits + 1)
+    mask_loose = _high_mask(max(bits - 1, 1))
+    end = min(length, max_size)
+    normal = min(end, avg_size)
+    gear = _GEAR
+    h = 0
+    # right-shifting gear hash: bytes older than 64 positions have shifted out,
+    # and the sum stays below 2**65 without masking
+    for i in range(min_size, normal):
+        h = (h >> 1) + gear[data[i]]
+        if not h & mask_strict:
+            return i + 1
+    for i in range(normal, end):
+        h = (h >> 1) + gear[data[i]]
+        if not h & mask_loose:
+            return i + 1
+    return end
+
+
+def iter_chunks(
+    stream: BinaryIO,
+    *,
+    min_size: int = DEFAULT_MIN_SIZE,
+    avg_size: int = DEFAULT_AVG_SIZE,
+    max_size: int = DEFAULT_MAX_SIZE,
+    read_size: int = 1024 * 1024,
+) -> Iterator[bytes]:
+    """Yield content-defined chunks read from ``stream``.
+
+    At most ``max(read_size, max_size)`` plus one chunk of input is buffered,
+    so memory stays bounded regardless of the stream length.
+    """
+
+    _validate(min_size, avg_size, max_size)
+    buffer = bytearray()
+    eof = False
+    while True:
+        while not eof and len(buffer) < max_size:
+            data = stream.read(max(read_size, max_size))
+            if data:
+                buffer += data
+            else:
+                eof = True
+        if not buffer:
+            return
+        cut = cut_point(buffer, min_size, avg_size, max_size)
+        yield bytes(buffer[:cut])
+        del buffer[:cut]
+
+
+__all__ = [
+    "DEFAULT_AVG_SIZE",
+    "DEFAULT_MAX_SIZE",
+    "DEFAULT_MIN_SIZE",
+    "cut_point",
+    "iter_chunks",
+]
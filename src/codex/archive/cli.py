@@ -6,6 +6,7 @@ import json
 import logging
 import sys
 from collections.abc import Callable, Iterable
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
 
@@ -15,7 +16,7 @@ from . import schema
 from .batch import BatchManifest, BatchRestore
 from .config import ArchiveAppConfig
 from .logging_config import export_configuration, log_restore, setup_logging
-from .service import ArchiveService
+from .service import ArchiveRequest, ArchiveService
 from .util import append_evidence, redact_text_credentials, redact_url_credentials
 
 
@@ -198,6 +199,71 @@ def store(
     click.echo(json.dumps(payload, indent=2))
 
 
+@cli.command("store-bulk")
+@click.argument("repo")
+@click.argument(
+    "paths", nargs=-1, required=True, type=click.Path(path_type=Path, exists=True, readable=True)
+)
+@click.option(
+    "--reason",
+    default="dead",
+    show_default=True,
+    type=click.Choice(["dead", "pruned", "legacy", "replaced"]),
+    help="Archival reason",
+)
+@click.option("--by", "actor", required=True, help="Actor performing the archive")
+@click.option("--commit", default="HEAD", show_default=True, help="Git commit SHA for provenance")
+@click.option(
+    "--kind", default="code", show_default=True, type=click.Choice(["code", "doc", "asset"])
+)
+@click.option("--tag", "tags", multiple=True, help="Assign tags to every archived item")
+@click.option("--workers", type=int, help="Compression processes (default: CPU count)")
+@click.option("--batch-size", default=500, show_default=True, help="Items per transaction")
+def store_bulk(
+    repo: str,
+    paths: tuple[Path, ...],
+    reason: str,
+    actor: str,
+    commit: str,
+    kind: str,
+    tags: tuple[str, ...],
+    workers: int | None,
+    batch_size: int,
+) -> None:
+    """Archive many files (directories are expanded recursively) in batches."""
+
+    app_config = _load_config()
+    _setup_logger(app_config)
+    service = _service(apply_schema=True, app_config=app_config)
+    commit_sha = _resolve_commit(commit)
+    files: list[Path] = []
+    for entry in paths:
+        if entry.is_dir():
+            files.extend(sorted(p for p in entry.rglob("*") if p.is_file()))
+        else:
+            files.append(entry)
+    requests = [
+        ArchiveRequest(
+            repo=repo,
+            path=file,
+            reason=reason,
+            archived_by=actor,
+            commit_sha=commit_sha,
+            kind=kind,
+            tags=tags,
+        )
+        for file in files
+    ]
+    results = service.archive_paths(requests, workers=workers, batch_size=batch_size)
+    payload = {
+        "archived": len(results),
+        "size_bytes": sum(r.size_bytes for r in results),
+        "compressed_size": sum(r.compressed_size for r in results),
+        "items": [{"tombstone": r.tombstone_id, "path": r.path} for r in results],
+    }
+    click.echo(json.dumps(payload, indent=2))
+
+
 @cli.command("list")
 @click.option("--repo", help="Filter by repo")
 @click.option("--since", help="ISO timestamp filter")
@@ -350,8 +416,11 @@ def restore(tombstone: str, output: Path, actor: str, debug: bool) -> None:
     help="Optional path to write a JSON summary of the batch results.",
 )
 @click.option(
-    "--dry-run", is_flag=True, help="Load and validate the manifest without executing restores"
+    "--dry-run",
+    is_flag=True,
+    help="Validate the manifest and estimate bytes and time without executing restores",
 )
+@click.option("--workers", type=int, help="Concurrent restores (default: batch.concurrent)")
 @click.option(
     "--config-file",
     type=click.Path(path_type=Path, dir_okay=False, exists=True),
@@ -362,6 +431,7 @@ def batch_restore(
     actor: str,
     results_path: Path | None,
     dry_run: bool,
+    workers: int | None,
     config_file: Path | None,
 ) -> None:
     """Restore multiple tombstones from a manifest."""
@@ -369,19 +439,21 @@ def batch_restore(
     app_config = _load_config(config_file)
     logger = _setup_logger(app_config)
     manifest_obj = BatchManifest.from_path(manifest, default_actor=actor)
-
-    if dry_run:
-        click.echo(json.dumps({"total": len(manifest_obj.items)}, indent=2))
-        return
+    batch_config = app_config.batch
+    if workers is not None:
+        batch_config = replace(batch_config, concurrent=max(1, workers))
 
     service = _service(apply_schema=True, app_config=app_config)
     runner = BatchRestore(
         service,
         retry_config=app_config.retry.to_retry_config(),
-        batch_config=app_config.batch,
+        batch_config=batch_config,
         performance_config=app_config.performance,
         progress_callback=_batch_progress_logger(logger, app_config),
     )
+    if dry_run:
+        click.echo(json.dumps(runner.plan(manifest_obj).to_dict(), indent=2))
+        return
     result = runner.restore(manifest_obj)
 
     destination: Path | None = results_path or app_config.batch.results_path
@@ -434,6 +506,105 @@ def purge(tombstone: str, primary: str, secondary: str, reason: str, apply: bool
         click.echo("purge approvals recorded")
 
 
+@cli.command("blob-migrate")
+@click.option(
+    "--to",
+    "target",
+    required=True,
+    type=click.Choice(["fs", "db"]),
+    help="Move payloads into the blob store (fs) or back into the database (db)",
+)
+@click.option("--batch-size", default=100, show_default=True, help="Rows per transaction")
+@click.option("--vacuum", is_flag=True, help="Compact the SQLite database afterwards")
+@click.option("--by", "actor", default="codex", show_default=True, help="Actor recorded")
+def blob_migrate(target: str, batch_size: int, vacuum: bool, actor: str) -> None:
+    """Migrate stored payloads between the database and the blob store."""
+
+    app_config = _load_config()
+    _setup_logger(app_config)
+    service = _service(apply_schema=True, app_config=app_config)
+    moved = service.dal.migrate_blobs(to=target, batch_size=max(1, batch_size))
+    payload: dict[str, Any] = {"target": target, **moved}
+    if vacuum:
+        payload["vacuumed"] = service.dal.compact()
+    append_evidence({"action": "BLOB_MIGRATE", "actor": actor, **payload})
+    click.echo(json.dumps(payload, indent=2))
+
+
+@cli.command("blob-verify")
+def blob_verify() -> None:
+    """Check that every referenced blob exists and matches its digest."""
+
+    app_config = _load_config()
+    _setup_logger(app_config)
+    service = _service(apply_schema=True, app_config=app_config)
+    report = service.dal.verify_blobs()
+    click.echo(json.dumps(report, indent=2))
+    if not report["ok"]:
+        sys.exit(1)
+
+
+@cli.command("blob-gc")
+@click.option(
+    "--grace",
+    "grace_seconds",
+    default=3600.0,
+    show_default=True,
+    help="Only collect payloads older than this many seconds",
+)
+@click.option("--dry-run", is_flag=True, help="Report what would be removed")
+@click.option("--by", "actor", default="codex", show_default=True, help="Actor recorded")
+def blob_gc(grace_seconds: float, dry_run: bool, actor: str) -> None:
+    """Remove unreferenced chunks and blob files."""
+
+    app_config = _load_config()
+    _setup_logger(app_config)
+    service = _service(apply_schema=True, app_config=app_config)
+    report = service.dal.gc_blobs(grace_seconds=grace_seconds, dry_run=dry_run)
+    if not dry_run:
+        append_evidence({"action": "BLOB_GC", "actor": actor, **report})
+    click.echo(json.dumps(report, indent=2))
+
+
+@cli.command("dict-train")
+@click.option("--type", "file_types", multiple=True, help="Only train for these extensions")
+@click.option("--samples", type=int, help="Maximum samples per file type")
+@click.option("--size", "dict_size", type=int, help="Dictionary size in bytes")
+@click.option("--min-samples", default=8, show_default=True, help="Skip sparser file types")
+@click.option("--by", "actor", default="codex", show_default=True, help="Actor recorded")
+def dict_train(
+    file_types: tuple[str, ...],
+    samples: int | None,
+    dict_size: int | None,
+    min_samples: int,
+    actor: str,
+) -> None:
+    """Train new compression dictionary versions from archived small files."""
+
+    app_config = _load_config()
+    _setup_logger(app_config)
+    service = _service(apply_schema=True, app_config=app_config)
+    trained = service.train_dictionaries(
+        file_types=file_types or None,
+        max_samples=samples,
+        dict_size=dict_size,
+        min_samples=max(1, min_samples),
+    )
+    for row in trained:
+        append_evidence({"action": "DICT_TRAIN", "actor": actor, **row})
+    click.echo(json.dumps(trained, indent=2))
+
+
+@cli.command("dict-list")
+def dict_list() -> None:
+    """List stored compression dictionaries and how many artifacts use them."""
+
+    app_config = _load_config()
+    _setup_logger(app_config)
+    service = _service(apply_schema=True, app_config=app_config)
+    click.echo(json.dumps(service.dal.list_dictionaries(), indent=2))
+
+
 @cli.command("health-check")
 @click.option("--debug", is_flag=True, help="Show sensitive diagnostics (full URLs).")
 def health_check(debug: bool) -> None:
@@ -275,6 +275,75 @@ class PerformanceConfig:
         return _mark_explicit_fields(cls.from_dict(payload), payload.keys())
 
 
+@dataclass(frozen=True)
+class StorageConfig:
+    """Artifact storage: payload location, chunked layout and compression dictionaries."""
+
+    chunking: bool = False
+    chunk_min_size: int = 16 * 1024
+    chunk_avg_size: int = 64 * 1024
+    chunk_max_size: int = 256 * 1024
+    blob_store: str = "db"
+    blob_root: Path = Path(".codex/archive_blobs")
+    dictionaries: bool = True
+    dict_max_file_size: int = 64 * 1024
+    dict_size: int = 112_640
+    dict_samples: int = 1000
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "blob_store", self.blob_store.lower())
+        if self.blob_store not in {"db", "fs"}:
+            raise ValueError("Blob store must be either 'db' or 'fs'")
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, _t.Any]) -> StorageConfig:
+        return cls(
+            chunking=_coerce_bool(payload.get("chunking"), default=cls.chunking),
+            chunk_min_size=max(
+                1, _coerce_int(payload.get("chunk_min_size"), default=cls.chunk_min_size)
+            ),
+            chunk_avg_size=max(
+                1, _coerce_int(payload.get("chunk_avg_size"), default=cls.chunk_avg_size)
+            ),
+            chunk_max_size=max(
+                1, _coerce_int(payload.get("chunk_max_size"), default=cls.chunk_max_size)
+            ),
+            blob_store=str(payload.get("blob_store") or cls.blob_store),
+            blob_root=Path(payload["blob_root"]) if payload.get("blob_root") else cls.blob_root,
+            dictionaries=_coerce_bool(payload.get("dictionaries"), default=cls.dictionaries),
+            dict_max_file_size=max(
+                0, _coerce_int(payload.get("dict_max_file_size"), default=cls.dict_max_file_size)
+            ),
+            dict_size=max(1, _coerce_int(payload.get("dict_size"), default=cls.dict_size)),
+            dict_samples=max(1, _coerce_int(payload.get("dict_samples"), default=cls.dict_samples)),
+        )
+
+    @classmethod
+    def from_env(cls, env: dict[str, str]) -> StorageConfig:
+        payload: dict[str, _t.Any] = {}
+        if env.get("CODEX_ARCHIVE_CHUNKING"):
+            payload["chunking"] = env["CODEX_ARCHIVE_CHUNKING"]
+        if env.get("CODEX_ARCHIVE_CHUNK_MIN"):
+            payload["chunk_min_size"] = env["CODEX_ARCHIVE_CHUNK_MIN"]
+        if env.get("CODEX_ARCHIVE_CHUNK_AVG"):
+            payload["chunk_avg_size"] = env["CODEX_ARCHIVE_CHUNK_AVG"]
+        if env.get("CODEX_ARCHIVE_CHUNK_MAX"):
+            payload["chunk_max_size"] = env["CODEX_ARCHIVE_CHUNK_MAX"]
+        if env.get("CODEX_ARCHIVE_BLOB_STORE"):
+            payload["blob_store"] = env["CODEX_ARCHIVE_BLOB_STORE"]
+        if env.get("CODEX_ARCHIVE_BLOB_ROOT"):
+            payload["blob_root"] = env["CODEX_ARCHIVE_BLOB_ROOT"]
+        if env.get("CODEX_ARCHIVE_DICTIONARIES"):
+            payload["dictionaries"] = env["CODEX_ARCHIVE_DICTIONARIES"]
+        if env.get("CODEX_ARCHIVE_DICT_MAX_FILE_SIZE"):
+            payload["dict_max_file_size"] = env["CODEX_ARCHIVE_DICT_MAX_FILE_SIZE"]
+        if env.get("CODEX_ARCHIVE_DICT_SIZE"):
+            payload["dict_size"] = env["CODEX_ARCHIVE_DICT_SIZE"]
+        if env.get("CODEX_ARCHIVE_DICT_SAMPLES"):
+            payload["dict_samples"] = env["CODEX_ARCHIVE_DICT_SAMPLES"]
+        return _mark_explicit_fields(cls.from_dict(payload), payload.keys())
+
+
 @dataclass(frozen=True)
 class ArchiveAppConfig:
     """Top level configuration loaded for CLI commands."""
@@ -284,6 +353,7 @@ class ArchiveAppConfig:
     retry: RetrySettings = field(default_factory=RetrySettings)
     batch: BatchConfig = field(default_factory=BatchConfig)
     performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    storage: StorageConfig = field(default_factory=StorageConfig)
 
     @classmethod
     def from_dict(cls, payload: dict[str, _t.Any]) -> ArchiveAppConfig:
@@ -293,6 +363,7 @@ class ArchiveAppConfig:
             retry=RetrySettings.from_dict(payload.get("retry", {})),
             batch=BatchConfig.from_dict(payload.get("batch", {})),
             performance=PerformanceConfig.from_dict(payload.get("performance", {})),
+            storage=StorageConfig.from_dict(payload.get("storage", {})),
         )
 
     @classmethod
@@ -303,6 +374,7 @@ class ArchiveAppConfig:
             retry=RetrySettings.from_env(env),
             batch=BatchConfig.from_env(env),
             performance=PerformanceConfig.from_env(env),
+            storage=StorageConfig.from_env(env),
         )
 
     @classmethod
@@ -334,6 +406,7 @@ class ArchiveAppConfig:
             retry=_merge(base_config.retry, env_config.retry),
             batch=_merge(base_config.batch, env_config.batch),
             performance=_merge(base_config.performance, env_config.performance),
+            storage=_merge(base_config.storage, env_config.storage),
         )
 
     def to_backend_config(self) -> _ArchiveConfig:
@@ -346,6 +419,7 @@ class ArchiveAppConfig:
             "retry": asdict(self.retry),
             "batch": _serialize_batch(self.batch),
             "performance": asdict(self.performance),
+            "storage": _serialize_storage(self.storage),
         }
 
 
@@ -378,3 +452,9 @@ def _serialize_batch(config: BatchConfig) -> dict[str, _t.Any]:
     if config.results_path is not None:
         payload["results_path"] = str(config.results_path)
     return payload
+
+
+def _serialize_storage(config: StorageConfig) -> dict[str, _t.Any]:
+    payload = asdict(config)
+    payload["blob_root"] = str(config.blob_root)
+    return payload
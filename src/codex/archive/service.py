@@ -4,25 +4,37 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import mimetypes
 import os
 import subprocess
-from collections.abc import Callable, Sequence
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, replace
-from pathlib import Path
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
 from typing import Any
 
 from . import backend as backend_module, config as config_module, retry as retry_module
+from .blobstore import open_blob_store
+from .cdc import iter_chunks
 from .logging_config import log_restore, setup_logging
 from .perf import timer
 from .util import (
     append_evidence,
+    append_evidence_many,
+    chunked as _batched,
+    compress_with_dictionary,
     compression_codec,
     decompress_payload,
+    iter_decompressed,
     redact_text_credentials,
     redact_url_credentials,
     sha256_hex,
+    train_dictionary,
     zstd_compress,
 )
 
@@ -33,6 +45,25 @@ SettingsBackendConfig = config_module.BackendConfig
 RetryPolicyConfig = retry_module.RetryConfig
 retry_with_backoff = retry_module.retry_with_backoff
 
+# new (uncompressed) chunk bytes buffered before a chunk-store transaction
+_CHUNK_FLUSH_BYTES = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArchiveRequest:
+    """A file to archive through :meth:`ArchiveService.archive_paths`."""
+
+    repo: str
+    path: Path
+    reason: str
+    archived_by: str
+    commit_sha: str
+    kind: str = "code"
+    language: str | None = None
+    mime_type: str | None = None
+    tags: Sequence[str] = ()
+    extra_metadata: dict[str, object] | None = None
+
 
 @dataclass(frozen=True)
 class ArchiveResult:
@@ -59,7 +90,11 @@ class ArchiveService:
         settings = self._coerce_settings(config)
         self.config = settings
         backend_config = BackendArchiveConfig.from_settings(settings)
-        self.dal = ArchiveDAL(backend_config, apply_schema=apply_schema)
+        self.dal = ArchiveDAL(
+            backend_config,
+            apply_schema=apply_schema,
+            blob_store=open_blob_store(settings.storage.blob_store, settings.storage.blob_root),
+        )
         self.logger = logger or setup_logging(settings.logging)
         self._retry_policy: RetryPolicyConfig | None = None
         retry_config = settings.retry.to_retry_config()
@@ -70,6 +105,8 @@ class ArchiveService:
             if self._retry_policy
             else self.dal.get_restore_payload
         )
+        # active compression dictionaries by file type, loaded on first use
+        self._dictionaries: dict[str, dict[str, Any]] | None = None
 
     # ------------------------------------------------------------------
     # entry points
@@ -87,73 +124,202 @@ class ArchiveService:
         mime_type: str | None = None,
         tags: Sequence[str] | None = None,
         extra_metadata: dict[str, object] | None = None,
+        chunked: bool | None = None,
     ) -> ArchiveResult:
-        """Archive *path* and return archival metadata."""
+        """Archive *path* and return archival metadata.
+
+        With ``chunked`` (default: ``storage.chunking`` from the settings) the
+        file is streamed through content-defined chunking and only chunks not
+        already in the archive are compressed and stored, so memory stays
+        bounded and repeated regions across files are stored once. In that
+        mode ``compressed_size`` counts the newly stored bytes. Otherwise files
+        up to ``storage.dict_max_file_size`` are compressed with the active
+        dictionary for their file type, if one has been trained.
+        """
+
+        request = ArchiveRequest(
+            repo=repo,
+            path=path,
+            reason=reason,
+            archived_by=archived_by,
+            commit_sha=commit_sha,
+            kind=kind,
+            language=language,
+            mime_type=mime_type,
+            tags=tuple(tags or ()),
+            extra_metadata=extra_metadata,
+        )
+        if self.config.storage.chunking if chunked is None else chunked:
+            sha, size, compressed_size, chunk_refs, chunk_stats = self._store_chunks(path)
+            blob: bytes | None = None
+            dictionary = None
+        else:
+            dictionary = self._dictionary_for(path)
+            sha, size, blob = _compress_file(
+                path.as_posix(), dictionary["dict_bytes"] if dictionary else None
+            )
+            compressed_size = len(blob)
+            chunk_refs, chunk_stats = None, None
+        entry = self._archive_entry(
+            request,
+            sha=sha,
+            size=size,
+            compressed_size=compressed_size,
+            blob=blob,
+            chunk_refs=chunk_refs,
+            chunk_stats=chunk_stats,
+            dictionary=dictionary,
+        )
+        result = self.dal.record_archive(**entry)
+        append_evidence(_archive_evidence(request, result, sha, size, compressed_size))
+        return ArchiveResult(
+            tombstone_id=result["tombstone_id"],
+            sha256=sha,
+            size_bytes=size,
+            compressed_size=compressed_size,
+            repo=repo,
+            path=path.as_posix(),
+        )
+
+    def archive_paths(
+        self,
+        requests: Iterable[ArchiveRequest],
+        *,
+        workers: int | None = None,
+        batch_size: int = 500,
+    ) -> list[ArchiveResult]:
+        """Archive many files with parallel compression and batched commits.
+
+        Files are read and compressed on a process pool of ``workers``
+        processes (default: CPU count; ``1`` compresses inline), each reusing
+        its compressor context. Every ``batch_size`` files are recorded in a
+        single transaction, so a failure rolls back only the current batch;
+        evidence for the whole call goes through one
+        :func:`~codex.evidence.evidence_batch`. Payloads are stored as whole blobs
+        (``storage.chunking`` does not apply), using trained dictionaries as
+        :meth:`archive_path` does; results follow input order.
+        """
+
+        # imported lazily: codex.evidence imports this package
+        from codex.evidence import evidence_batch
+
+        workers = (os.cpu_count() or 1) if workers is None else max(1, workers)
+        results: list[ArchiveResult] = []
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            with evidence_batch():
+                for batch in _batched(requests, size=max(1, batch_size)):
+                    paths = [request.path.as_posix() for request in batch]
+                    dictionaries = [self._dictionary_for(request.path) for request in batch]
+                    # a dictionary shared by a task chunk is pickled once per chunk
+                    dict_bytes = [entry["dict_bytes"] if entry else None for entry in dictionaries]
+                    if executor is not None:
+                        chunksize = max(1, len(paths) // (workers * 4))
+                        compressed = list(
+                            executor.map(_compress_file, paths, dict_bytes, chunksize=chunksize)
+                        )
+                    else:
+                        compressed = list(map(_compress_file, paths, dict_bytes))
+                    entries = [
+                        self._archive_entry(
+                            request,
+                            sha=sha,
+                            size=size,
+                            compressed_size=len(blob),
+                            blob=blob,
+                            dictionary=dictionary,
+                        )
+                        for request, (sha, size, blob), dictionary in zip(
+                            batch, compressed, dictionaries, strict=True
+                        )
+                    ]
+                    rows = self.dal.record_archives(entries)
+                    evidence = []
+                    for request, (sha, size, blob), row in zip(
+                        batch, compressed, rows, strict=True
+                    ):
+                        evidence.append(_archive_evidence(request, row, sha, size, len(blob)))
+                        results.append(
+                            ArchiveResult(
+                                tombstone_id=row["tombstone_id"],
+                                sha256=sha,
+                                size_bytes=size,
+                                compressed_size=len(blob),
+                                repo=request.repo,
+                                path=request.path.as_posix(),
+                            )
+                        )
+                    append_evidence_many(evidence)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return results
+
+    def _archive_entry(
+        self,
+        request: ArchiveRequest,
+        *,
+        sha: str,
+        size: int,
+        compressed_size: int,
+        blob: bytes | None,
+        chunk_refs: list[str] | None = None,
+        chunk_stats: dict[str, int] | None = None,
+        dictionary: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Keyword arguments for :meth:`ArchiveDAL.record_archive`."""
 
-        bytes_in = path.read_bytes()
-        sha = sha256_hex(bytes_in)
-        compressed = zstd_compress(bytes_in)
         codec = compression_codec()
-        mime = mime_type or (mimetypes.guess_type(path.as_posix())[0] or "application/octet-stream")
-        metadata = {
+        path = request.path.as_posix()
+        mime = request.mime_type or (mimetypes.guess_type(path)[0] or "application/octet-stream")
+        metadata: dict[str, object] = {
             "sha256": sha,
-            "size_bytes": len(bytes_in),
-            "compressed_size": len(compressed),
+            "size_bytes": size,
+            "compressed_size": compressed_size,
             "compression": codec,
             "mime_type": mime,
-            "language": language,
+            "language": request.language,
         }
-        if extra_metadata:
-            metadata.update(extra_metadata)
+        if chunk_stats is not None:
+            metadata["chunks"] = chunk_stats
+        if dictionary is not None:
+            metadata["compression_dict"] = {
+                "id": dictionary["id"],
+                "file_type": dictionary["file_type"],
+                "version": dictionary["version"],
+            }
+        if request.extra_metadata:
+            metadata.update(request.extra_metadata)
         context = {
-            "commit": commit_sha,
-            "repo": repo,
-            "path": path.as_posix(),
+            "commit": request.commit_sha,
+            "repo": request.repo,
+            "path": path,
             "python": os.getenv("PYTHON_VERSION") or _python_version(),
         }
         artifact_payload = {
             "content_sha256": sha,
-            "size_bytes": len(bytes_in),
+            "size_bytes": size,
             "compression": codec,
             "mime_type": mime,
-            "storage_driver": "db",
-            "blob_bytes": compressed,
+            "storage_driver": "db" if chunk_refs is None else "chunked",
+            "blob_bytes": blob,
             "object_url": None,
+            "dict_id": dictionary["id"] if dictionary is not None else None,
+        }
+        return {
+            "repo": request.repo,
+            "path": path,
+            "commit_sha": request.commit_sha,
+            "language": request.language,
+            "reason": request.reason,
+            "kind": request.kind,
+            "artifact_payload": artifact_payload,
+            "archived_by": request.archived_by,
+            "metadata": metadata,
+            "context": context,
+            "tags": list(request.tags),
+            "chunk_refs": chunk_refs,
         }
-        result = self.dal.record_archive(
-            repo=repo,
-            path=path.as_posix(),
-            commit_sha=commit_sha,
-            language=language,
-            reason=reason,
-            kind=kind,
-            artifact_payload=artifact_payload,
-            archived_by=archived_by,
-            metadata=metadata,
-            context=context,
-            tags=list(tags or ()),
-        )
-        append_evidence(
-            {
-                "action": "ARCHIVE",
-                "actor": archived_by,
-                "repo": repo,
-                "path": path.as_posix(),
-                "tombstone": result["tombstone_id"],
-                "sha256": sha,
-                "size": len(bytes_in),
-                "compressed_size": len(compressed),
-                "reason": reason,
-            }
-        )
-        return ArchiveResult(
-            tombstone_id=result["tombstone_id"],
-            sha256=sha,
-            size_bytes=len(bytes_in),
-            compressed_size=len(compressed),
-            repo=repo,
-            path=path.as_posix(),
-        )
 
     def restore_to_path(
         self,
@@ -199,7 +365,11 @@ class ArchiveService:
 
             artifact = payload["artifact"]
             blob = artifact.get("blob_bytes")
-            if blob is None:
+            if artifact.get("storage_driver") == "chunked":
+                decompress_duration, write_duration = self._restore_chunked(
+                    tombstone_id, artifact, output_path, actor=actor, backend=backend, url=raw_url
+                )
+            elif blob is None:
                 self._record_restore_failure(
                     tombstone_id=tombstone_id,
                     actor=actor,
@@ -208,28 +378,10 @@ class ArchiveService:
                     reason="Artifact payload has been purged; bytes unavailable",
                 )
                 raise RuntimeError("Artifact payload has been purged; bytes unavailable")
-
-            codec = artifact.get("compression") or compression_codec()
-            try:
-                with timer("decompress") as decompress_timer:
-                    restored = decompress_payload(blob, codec)
-            except (RuntimeError, ValueError) as exc:
-                self._record_restore_failure(
-                    tombstone_id=tombstone_id,
-                    actor=actor,
-                    backend=backend,
-                    url=raw_url,
-                    reason=f"Decompression failed with codec '{codec}'",
-                    error=exc,
-                )
-                raise RuntimeError(f"Unable to decompress artifact using codec '{codec}'") from exc
             else:
-                decompress_duration = decompress_timer.duration_ms
-
-            with timer("write") as write_timer:
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                output_path.write_bytes(restored)
-            write_duration = write_timer.duration_ms
+                decompress_duration, write_duration = self._restore_blob(
+                    tombstone_id, artifact, output_path, actor=actor, backend=backend, url=raw_url
+                )
 
             self.dal.record_restore(tombstone_id, actor=actor)
 
@@ -313,6 +465,257 @@ class ArchiveService:
     def ensure_schema(self) -> None:
         self.dal.ensure_schema()
 
+    def train_dictionaries(
+        self,
+        *,
+        file_types: Iterable[str] | None = None,
+        max_samples: int | None = None,
+        dict_size: int | None = None,
+        min_samples: int = 8,
+    ) -> list[dict[str, Any]]:
+        """Train a new dictionary version per file type from archived content.
+
+        Samples are the most recently archived whole-blob payloads of at most
+        ``storage.dict_max_file_size`` bytes, up to ``max_samples`` (default
+        ``storage.dict_samples``) per file extension; ``file_types`` limits
+        training to those extensions. Types with fewer than ``min_samples``
+        samples are skipped. Each returned row also reports the compressed
+        size of its samples without (``compressed_plain``) and with
+        (``compressed_dict``) the new dictionary.
+        """
+
+        storage = self.config.storage
+        limit = max_samples or storage.dict_samples
+        wanted = {_normalise_file_type(name) for name in file_types} if file_types else None
+        samples: dict[str, list[bytes]] = {}
+        for row in self.dal.iter_dictionary_samples(max_size=storage.dict_max_file_size):
+            file_type = _file_type(row["path"])
+            if not file_type or (wanted is not None and file_type not in wanted):
+                continue
+            bucket = samples.setdefault(file_type, [])
+            if len(bucket) >= limit:
+                continue
+            dictionary = self.dal.get_dictionary(row["dict_id"]) if row["dict_id"] else None
+            bucket.append(decompress_payload(row["blob_bytes"], row["compression"], dictionary))
+
+        trained: list[dict[str, Any]] = []
+        for file_type, bucket in sorted(samples.items()):
+            if len(bucket) < min_samples:
+                continue
+            try:
+                codec, data = train_dictionary(bucket, size=dict_size or storage.dict_size)
+            except ValueError as exc:
+                self.logger.info("Skipping dictionary for %s: %s", file_type, exc)
+                continue
+            row = self.dal.store_dictionary(
+                file_type=file_type,
+                codec=codec,
+                data=data,
+                sample_count=len(bucket),
+                sample_bytes=sum(map(len, bucket)),
+            )
+            row["compressed_plain"] = sum(len(zstd_compress(sample)) for sample in bucket)
+            row["compressed_dict"] = sum(
+                len(compress_with_dictionary(sample, data)) for sample in bucket
+            )
+            trained.append(row)
+        self._dictionaries = None
+        return trained
+
+    def _dictionary_for(self, path: Path) -> dict[str, Any] | None:
+        """Return the active dictionary to compress *path* with, if any."""
+
+        storage = self.config.storage
+        if not storage.dictionaries:
+            return None
+        if self._dictionaries is None:
+            self._dictionaries = self.dal.active_dictionaries(codec=compression_codec())
+        dictionary = self._dictionaries.get(_file_type(path.as_posix()))
+        if dictionary is None or path.stat().st_size > storage.dict_max_file_size:
+            return None
+        return dictionary
+
+    def _store_chunks(self, path: Path) -> tuple[str, int, int, list[str], dict[str, int]]:
+        """Stream *path* into the chunk store; return hash, size, new bytes, refs, stats.
+
+        Chunks are hashed as they are read and only those missing from the
+        archive are compressed. Writes are flushed every
+        ``_CHUNK_FLUSH_BYTES`` of new input so memory stays bounded. Chunks
+        stored before a failed ``record_archive`` are left for garbage
+        collection.
+        """
+
+        storage = self.config.storage
+        codec = compression_codec()
+        whole = hashlib.sha256()
+        refs: list[str] = []
+        seen: set[str] = set()
+        pending: list[tuple[str, bytes]] = []
+        totals = {"size": 0, "pending": 0, "stored_bytes": 0, "stored": 0}
+
+        def _flush() -> None:
+            if not pending:
+                return
+            present = self.dal.existing_chunks(sha for sha, _ in pending)
+            fresh: list[tuple[str, int, str, bytes]] = []
+            for sha, data in pending:
+                if sha not in present:
+                    blob = zstd_compress(data)
+                    fresh.append((sha, len(data), codec, blob))
+                    totals["stored_bytes"] += len(blob)
+            totals["stored"] += self.dal.store_chunks(fresh)
+            pending.clear()
+            totals["pending"] = 0
+
+        with path.open("rb") as handle:
+            for data in iter_chunks(
+                handle,
+                min_size=storage.chunk_min_size,
+                avg_size=storage.chunk_avg_size,
+                max_size=storage.chunk_max_size,
+            ):
+                whole.update(data)
+                totals["size"] += len(data)
+                sha = sha256_hex(data)
+                refs.append(sha)
+                if sha in seen:
+                    continue
+                seen.add(sha)
+                pending.append((sha, data))
+                totals["pending"] += len(data)
+                if totals["pending"] >= _CHUNK_FLUSH_BYTES:
+                    _flush()
+        _flush()
+        stats = {"count": len(refs), "unique": len(seen), "stored": totals["stored"]}
+        return whole.hexdigest(), totals["size"], totals["stored_bytes"], refs, stats
+
+    def _restore_blob(
+        self,
+        tombstone_id: str,
+        artifact: dict[str, Any],
+        output_path: Path,
+        *,
+        actor: str,
+        backend: str | None,
+        url: str | None,
+    ) -> tuple[float, float]:
+        """Stream-decompress a whole-blob artifact to *output_path*; return decompress/write ms.
+
+        Output is written block by block to a temporary file that replaces
+        *output_path* only once the content hash matches, so the decompressed
+        payload is never held in memory and readers never see partial files.
+        """
+
+        codec = artifact.get("compression") or compression_codec()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = _partial_path(output_path)
+        whole = hashlib.sha256()
+        decompress_ns = write_ns = 0
+        try:
+            with partial.open("wb") as handle:
+                blocks = iter_decompressed(
+                    artifact["blob_bytes"], codec, artifact.get("dictionary")
+                )
+                while True:
+                    started = time.perf_counter_ns()
+                    try:
+                        data = next(blocks, None)
+                    except (RuntimeError, ValueError) as exc:
+                        self._record_restore_failure(
+                            tombstone_id=tombstone_id,
+                            actor=actor,
+                            backend=backend,
+                            url=url,
+                            reason=f"Decompression failed with codec '{codec}'",
+                            error=exc,
+                        )
+                        raise RuntimeError(
+                            f"Unable to decompress artifact using codec '{codec}'"
+                        ) from exc
+                    decompress_ns += time.perf_counter_ns() - started
+                    if data is None:
+                        break
+                    whole.update(data)
+                    started = time.perf_counter_ns()
+                    handle.write(data)
+                    write_ns += time.perf_counter_ns() - started
+            if whole.hexdigest() != artifact["content_sha256"]:
+                self._record_restore_failure(
+                    tombstone_id=tombstone_id,
+                    actor=actor,
+                    backend=backend,
+                    url=url,
+                    reason="Restored content does not match the artifact sha256",
+                )
+                raise RuntimeError(f"Artifact for {tombstone_id} failed verification")
+            os.replace(partial, output_path)
+        finally:
+            partial.unlink(missing_ok=True)
+        return decompress_ns / 1_000_000, write_ns / 1_000_000
+
+    def _restore_chunked(
+        self,
+        tombstone_id: str,
+        artifact: dict[str, Any],
+        output_path: Path,
+        *,
+        actor: str,
+        backend: str | None,
+        url: str | None,
+    ) -> tuple[float, float]:
+        """Stream a chunked artifact to *output_path*; return decompress/write ms.
+
+        Chunks are verified against their hashes and the result against the
+        artifact hash before the temporary file replaces *output_path*.
+        """
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = _partial_path(output_path)
+        whole = hashlib.sha256()
+        decompress_ns = write_ns = 0
+        try:
+            with partial.open("wb") as handle:
+                for chunk in self.dal.iter_artifact_chunks(artifact["id"]):
+                    codec = chunk["compression"]
+                    started = time.perf_counter_ns()
+                    try:
+                        data = decompress_payload(chunk["blob_bytes"], codec)
+                    except (RuntimeError, ValueError) as exc:
+                        self._record_restore_failure(
+                            tombstone_id=tombstone_id,
+                            actor=actor,
+                            backend=backend,
+                            url=url,
+                            reason=f"Decompression failed with codec '{codec}'",
+                            error=exc,
+                        )
+                        raise RuntimeError(
+                            f"Unable to decompress artifact using codec '{codec}'"
+                        ) from exc
+                    decompress_ns += time.perf_counter_ns() - started
+                    if sha256_hex(data) != chunk["sha256"]:
+                        raise ValueError(f"Chunk {chunk['sha256']} failed verification")
+                    whole.update(data)
+                    started = time.perf_counter_ns()
+                    handle.write(data)
+                    write_ns += time.perf_counter_ns() - started
+            if whole.hexdigest() != artifact["content_sha256"]:
+                raise ValueError("Restored content does not match the artifact sha256")
+            os.replace(partial, output_path)
+        except (LookupError, ValueError) as exc:
+            self._record_restore_failure(
+                tombstone_id=tombstone_id,
+                actor=actor,
+                backend=backend,
+                url=url,
+                reason="Chunked artifact is incomplete or corrupt",
+                error=exc,
+            )
+            raise RuntimeError(f"Chunked artifact for {tombstone_id} failed verification") from exc
+        finally:
+            partial.unlink(missing_ok=True)
+        return decompress_ns / 1_000_000, write_ns / 1_000_000
+
     @staticmethod
     def _coerce_settings(
         config: SettingsArchiveConfig | BackendArchiveConfig | None,
@@ -371,6 +774,50 @@ class ArchiveService:
 # ----------------------------------------------------------------------
 
 
+def _compress_file(path: str, dictionary: bytes | None = None) -> tuple[str, int, bytes]:
+    """Read, hash and compress *path* (picklable for process pools)."""
+
+    data = Path(path).read_bytes()
+    if dictionary is not None:
+        return sha256_hex(data), len(data), compress_with_dictionary(data, dictionary)
+    return sha256_hex(data), len(data), zstd_compress(data)
+
+
+def _partial_path(output_path: Path) -> Path:
+    """Temporary sibling of *output_path*, unique per process and thread."""
+
+    name = f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.partial"
+    return output_path.with_name(name)
+
+
+def _file_type(path: str) -> str:
+    """Dictionary grouping key for *path*: its lower-cased extension."""
+
+    return PurePosixPath(path).suffix.lower()
+
+
+def _normalise_file_type(name: str) -> str:
+    name = name.strip().lower()
+    return name if not name or name.startswith(".") else f".{name}"
+
+
+def _archive_evidence(
+    request: ArchiveRequest, result: dict[str, Any], sha: str, size: int, compressed_size: int
+) -> dict[str, Any]:
+    return {
+        "action": "ARCHIVE",
+        "actor": request.archived_by,
+        "repo": request.repo,
+        "path": request.path.as_posix(),
+        "tombstone": result["tombstone_id"],
+        "sha256": sha,
+        "size": size,
+        "compressed_size": compressed_size,
+        "reason": request.reason,
+    }
+
+
+@lru_cache(maxsize=1)
 def _python_version() -> str:
     try:
         result = subprocess.run(
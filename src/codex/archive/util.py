@@ -7,7 +7,10 @@ import hashlib
 import json
 import os
 import re
-from collections.abc import Iterable
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlsplit
@@ -17,8 +20,6 @@ try:  # pragma: no cover - optional dependency
 except Exception:  # pragma: no cover - best-effort fallback
     _zstd = None
 
-import zlib
-
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 
 
@@ -56,12 +57,56 @@ def sha256_file(path: Path) -> str:
     return sha256_bytes(path.read_bytes())
 
 
+_CODEC_STATE = threading.local()
+
+
+def _zstd_compressor(level: int) -> Any:
+    """Return this thread's cached ``ZstdCompressor`` for *level*.
+
+    Compressor contexts are not thread-safe but are reusable, so each thread
+    (and each worker process) keeps one per level instead of rebuilding it
+    for every payload.
+    """
+
+    cache = getattr(_CODEC_STATE, "compressors", None)
+    if cache is None:
+        cache = _CODEC_STATE.compressors = {}
+    compressor = cache.get(level)
+    if compressor is None:
+        compressor = cache[level] = _zstd.ZstdCompressor(level=level)
+    return compressor
+
+
+def _zstd_decompressor() -> Any:
+    decompressor = getattr(_CODEC_STATE, "decompressor", None)
+    if decompressor is None:
+        decompressor = _CODEC_STATE.decompressor = _zstd.ZstdDecompressor()
+    return decompressor
+
+
+def _zstd_dict_codec(kind: str, dictionary: bytes, level: int = 0) -> Any:
+    """Return this thread's cached dictionary compressor or decompressor."""
+
+    cache = getattr(_CODEC_STATE, "dict_codecs", None)
+    if cache is None:
+        cache = _CODEC_STATE.dict_codecs = {}
+    key = (kind, level, dictionary)
+    codec = cache.get(key)
+    if codec is None:
+        data = _zstd.ZstdCompressionDict(dictionary)
+        if kind == "compress":
+            codec = _zstd.ZstdCompressor(level=level, dict_data=data)
+        else:
+            codec = _zstd.ZstdDecompressor(dict_data=data)
+        cache[key] = codec
+    return codec
+
+
 def zstd_compress(data: bytes, level: int = 9) -> bytes:
     """Compress *data* using zstandard if available, otherwise zlib."""
 
     if _zstd is not None:  # pragma: no branch - fast path
-        compressor = _zstd.ZstdCompressor(level=level)
-        return compressor.compress(data)
+        return _zstd_compressor(level).compress(data)
     # Fallback to deterministic zlib compression for environments without zstd.
     return zlib.compress(data, level)
 
@@ -76,24 +121,128 @@ def zstd_decompress(data: bytes) -> bytes:
     """Inverse operation for :func:`zstd_compress`."""
 
     if _zstd is not None:  # pragma: no branch - fast path
-        decompressor = _zstd.ZstdDecompressor()
-        return decompressor.decompress(data)
+        return _zstd_decompressor().decompress(data)
     return zlib.decompress(data)
 
 
-def decompress_payload(data: bytes, codec: str) -> bytes:
-    """Decompress *data* using the explicit *codec* identifier."""
+def decompress_payload(data: bytes, codec: str, dictionary: bytes | None = None) -> bytes:
+    """Decompress *data* using the explicit *codec* and optional *dictionary*."""
 
     if codec == "zstd":
         if _zstd is None:
             raise RuntimeError("zstandard codec requested but python-zstandard is not available")
-        decompressor = _zstd.ZstdDecompressor()
-        return decompressor.decompress(data)
+        if dictionary is not None:
+            return _zstd_dict_codec("decompress", dictionary).decompress(data)
+        return _zstd_decompressor().decompress(data)
     if codec == "zlib":
+        if dictionary is not None:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            return decompressor.decompress(data) + decompressor.flush()
         return zlib.decompress(data)
     raise ValueError(f"Unsupported compression codec: {codec}")
 
 
+def iter_decompressed(
+    data: bytes,
+    codec: str,
+    dictionary: bytes | None = None,
+    *,
+    block_size: int = 1024 * 1024,
+) -> Iterator[bytes]:
+    """Yield the decompressed form of *data* in blocks of at most *block_size* bytes.
+
+    Unlike :func:`decompress_payload` the output is never materialised whole,
+    so large payloads can be streamed to disk. Corrupt or truncated input
+    raises :class:`ValueError`.
+    """
+
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("zstandard codec requested but python-zstandard is not available")
+        if dictionary is not None:
+            decompressor = _zstd_dict_codec("decompress", dictionary)
+        else:
+            decompressor = _zstd_decompressor()
+        try:
+            with decompressor.stream_reader(data) as reader:
+                yield from iter(lambda: reader.read(block_size), b"")
+        except _zstd.ZstdError as exc:
+            raise ValueError(f"Corrupt zstd payload: {exc}") from exc
+        return
+    if codec != "zlib":
+        raise ValueError(f"Unsupported compression codec: {codec}")
+    if dictionary is not None:
+        stream = zlib.decompressobj(zdict=dictionary)
+    else:
+        stream = zlib.decompressobj()
+    pending = data
+    try:
+        while not stream.eof:
+            block = stream.decompress(pending, block_size)
+            pending = stream.unconsumed_tail
+            if not block and not pending:
+                break
+            if block:
+                yield block
+    except zlib.error as exc:
+        raise ValueError(f"Corrupt zlib payload: {exc}") from exc
+    if not stream.eof:
+        raise ValueError("Truncated zlib payload")
+
+
+def compress_with_dictionary(data: bytes, dictionary: bytes, level: int = 9) -> bytes:
+    """Compress *data* against a dictionary from :func:`train_dictionary`.
+
+    The dictionary must have been trained for :func:`compression_codec`.
+    """
+
+    if _zstd is not None:
+        return _zstd_dict_codec("compress", dictionary, level).compress(data)
+    compressor = zlib.compressobj(level, zdict=dictionary)
+    return compressor.compress(data) + compressor.flush()
+
+
+# zlib only consults the trailing 32 KiB of a preset dictionary
+_ZLIB_WINDOW = 32 * 1024
+
+
+def train_dictionary(samples: Sequence[bytes], *, size: int = 112_640) -> tuple[str, bytes]:
+    """Train a compression dictionary of at most *size* bytes from *samples*.
+
+    Returns ``(codec, dictionary)``. With python-zstandard this is a trained
+    zstd dictionary; the zlib fallback builds a raw preset dictionary from
+    the lines shared by the most samples.
+    """
+
+    if not samples:
+        raise ValueError("Dictionary training needs at least one sample")
+    if _zstd is not None:
+        try:
+            trained = _zstd.train_dictionary(size, list(samples))
+        except _zstd.ZstdError as exc:
+            raise ValueError(f"Dictionary training failed: {exc}") from exc
+        return "zstd", trained.as_bytes()
+    return "zlib", _raw_dictionary(samples, min(size, _ZLIB_WINDOW))
+
+
+def _raw_dictionary(samples: Sequence[bytes], size: int) -> bytes:
+    counts: Counter[bytes] = Counter()
+    for sample in samples:
+        counts.update(set(sample.splitlines(keepends=True)))
+    picked: list[bytes] = []
+    total = 0
+    for line, count in sorted(counts.items(), key=lambda entry: (-entry[1], entry[0])):
+        if count < 2 or total >= size:
+            break
+        if line.strip() and total + len(line) <= size:
+            picked.append(line)
+            total += len(line)
+    if not picked:
+        raise ValueError("Dictionary training failed: samples share no content")
+    # the most common lines go last, closest to the data and cheapest to reference
+    return b"".join(reversed(picked))
+
+
 def compression_codec() -> str:
     """Return the codec identifier used by :func:`zstd_compress`."""
 
@@ -123,11 +272,34 @@ def evidence_file() -> Path:
 def append_evidence(record: dict[str, Any]) -> None:
     """Append a JSON record to the evidence log."""
 
-    record = dict(record)
-    record.setdefault("ts", utcnow())
-    path = evidence_file()
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(json_dumps_sorted(record) + "\n")
+    append_evidence_many([record])
+
+
+def append_evidence_many(records: Iterable[dict[str, Any]]) -> int:
+    """Append several JSON records to the evidence log with a single write.
+
+    Inside :func:`codex.evidence.evidence_batch` for the same file the records
+    are buffered by the batch writer instead of opening the log each call.
+    """
+
+    # imported lazily: codex.evidence.core builds on this module
+    from codex.evidence.core import active_writer
+
+    now = utcnow()
+    prepared = []
+    for record in records:
+        record = dict(record)
+        record.setdefault("ts", now)
+        prepared.append(record)
+    if prepared:
+        path = evidence_file()
+        writer = active_writer(path)
+        if writer is not None:
+            writer.write_many(prepared)
+        else:
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write("".join(json_dumps_sorted(record) + "\n" for record in prepared))
+    return len(prepared)
 
 
 def redact_url_credentials(url: str | None) -> str:
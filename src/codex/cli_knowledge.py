@@ -6,6 +6,7 @@ from typing import Annotated
 
 import typer
 from codex.knowledge.build import archive_and_manifest, build_kb
+from codex.knowledge.retrieval import RetrievalIndex, build_index
 from codex.release.api import pack_release, verify_bundle
 
 DEFAULT_ROOT = Path("docs")
@@ -19,6 +20,7 @@ OUT_OPTION = typer.Option(DEFAULT_KB_OUT, "--out")
 ALLOW_GPL_OPTION = typer.Option(False, "--allow-gpl/--no-allow-gpl")
 MAX_TOKENS_OPTION = typer.Option(2048, "--max-tokens")
 DEDUP_OPTION = typer.Option(True, "--dedup/--no-dedup")
+WORKERS_OPTION = typer.Option(None, "--workers", help="Chunking processes (default: CPU count)")
 KB_ARGUMENT = typer.Argument(DEFAULT_KB_OUT, exists=True)
 INSTRUCTIONS_OPTION = typer.Option(None, "--instructions")
 EVAL_OPTION = typer.Option(None, "--eval")
@@ -26,6 +28,14 @@ ACTOR_OPTION = typer.Option("codex", "--by")
 MANIFEST_ARGUMENT = typer.Argument(DEFAULT_MANIFEST, exists=True)
 STAGING_OPTION = typer.Option(DEFAULT_STAGING, "--staging")
 BUNDLE_OPTION = typer.Option(DEFAULT_BUNDLE, "--out")
+DEFAULT_INDEX = Path("artifacts/kb.index")
+INDEX_OPTION = typer.Option(DEFAULT_INDEX, "--index")
+DENSE_OPTION = typer.Option(False, "--dense/--no-dense", help="Also embed chunks (needs numpy)")
+NLIST_OPTION = typer.Option(0, "--nlist", help="IVF lists for dense search (0 = brute force)")
+QUERY_ARGUMENT = typer.Argument(..., help="Query text")
+TOP_K_OPTION = typer.Option(10, "--k")
+MODE_OPTION = typer.Option("bm25", "--mode", help="bm25, dense or hybrid")
+FILTER_OPTION = typer.Option(None, "--filter", help="meta KEY=VALUE (repeatable)")
 
 app = typer.Typer(help="Codex Knowledge (ingest → normalize → chunk → build)")
 
@@ -37,6 +47,7 @@ def build_kb_cmd(
     allow_gpl: Annotated[bool, ALLOW_GPL_OPTION] = False,
     max_tokens: Annotated[int, MAX_TOKENS_OPTION] = 2048,
     dedup: Annotated[bool, DEDUP_OPTION] = True,
+    workers: Annotated[int | None, WORKERS_OPTION] = None,
 ) -> None:
     res = build_kb(
         root,
@@ -44,10 +55,40 @@ def build_kb_cmd(
         allow_gpl=allow_gpl,
         max_tokens_per_rec=max_tokens,
         dedup=dedup,
+        workers=workers,
     )
     typer.echo(json.dumps(res, indent=2))
 
 
+@app.command("build-index")
+def build_index_cmd(
+    kb: Annotated[Path, KB_ARGUMENT] = DEFAULT_KB_OUT,
+    index: Annotated[Path, INDEX_OPTION] = DEFAULT_INDEX,
+    dense: Annotated[bool, DENSE_OPTION] = False,
+    nlist: Annotated[int, NLIST_OPTION] = 0,
+) -> None:
+    res = build_index(kb, index, dense=dense, nlist=nlist)
+    typer.echo(json.dumps(res, indent=2))
+
+
+@app.command("search")
+def search_cmd(
+    query: Annotated[str, QUERY_ARGUMENT],
+    index: Annotated[Path, INDEX_OPTION] = DEFAULT_INDEX,
+    k: Annotated[int, TOP_K_OPTION] = 10,
+    mode: Annotated[str, MODE_OPTION] = "bm25",
+    filters: Annotated[list[str] | None, FILTER_OPTION] = None,
+) -> None:
+    wanted: dict[str, str] = {}
+    for item in filters or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise typer.BadParameter(f"expected KEY=VALUE, got {item!r}", param_hint="--filter")
+        wanted[key] = value
+    hits = RetrievalIndex(index).search(query, k=k, filters=wanted or None, mode=mode)
+    typer.echo(json.dumps(hits, indent=2))
+
+
 @app.command("archive-and-manifest")
 def archive_and_manifest_cmd(
     kb: Annotated[Path, KB_ARGUMENT] = DEFAULT_KB_OUT,
@@ -238,10 +238,16 @@ def diff(
     if resource == "guide":
         diffs = _diff_guide_resources(desired_file, current_file)
     else:
-        model_cls, diff_fn = _resolve_resource(resource)
-        desired_models = _load_models(desired_file, resource, model_cls)
-        current_models = _load_models(current_file, resource, model_cls)
-        diffs = diff_fn(desired_models, current_models)
+        _model_cls, diff_fn = _resolve_resource(resource)
+        # raw entries let the diff engine skip validating and diffing unchanged items
+        desired_items = _load_items(desired_file, resource)
+        current_items = _load_items(current_file, resource)
+        try:
+            diffs = diff_fn(desired_items, current_items)
+        except (TypeError, ValidationError) as exc:
+            raise typer.BadParameter(
+                f"Invalid {resource} entry in {desired_file} or {current_file}: {exc}"
+            ) from exc
 
     result = {resource: diffs}
     diff_text = json.dumps(result, indent=2, sort_keys=True)
@@ -467,23 +473,14 @@ def _diff_guide_resources(desired_file: Path, current_file: Path) -> list[dict[s
     return diff_guide(desired_themes, current_themes, desired_templates, current_templates)
 
 
-def _load_models(
-    path: Path,
-    resource: str,
-    model_cls: type[BaseModel],
-) -> list[BaseModel]:
+def _load_items(path: Path, resource: str) -> list[object]:
     payload = _read_structured_file(path)
     if isinstance(payload, Mapping) and resource in payload:
         payload = payload[resource]
-    return _coerce_model_sequence(payload, resource, model_cls, path)
+    return _item_sequence(payload, resource, path)
 
 
-def _coerce_model_sequence(
-    payload: object,
-    resource: str,
-    model_cls: type[BaseModel],
-    source: Path,
-) -> list[BaseModel]:
+def _item_sequence(payload: object, resource: str, source: Path) -> list[object]:
     if payload is None:
         return []
     if not isinstance(payload, Sequence):
@@ -494,8 +491,17 @@ def _coerce_model_sequence(
         raise typer.BadParameter(
             f"Expected a list of {resource} definitions in {source}.",
         )
+    return list(payload)
+
+
+def _coerce_model_sequence(
+    payload: object,
+    resource: str,
+    model_cls: type[BaseModel],
+    source: Path,
+) -> list[BaseModel]:
     models: list[BaseModel] = []
-    for item in payload:
+    for item in _item_sequence(payload, resource, source):
         try:
             if isinstance(item, model_cls):
                 models.append(item)
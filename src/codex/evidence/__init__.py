@@ -1,5 +1,17 @@
 """Evidence helpers for Codex operations."""
 
-from .core import evidence_append
+from .core import (
+    EvidenceWriter,
+    active_writer,
+    evidence_append,
+    evidence_batch,
+    evidence_path,
+)
 
-__all__ = ["evidence_append"]
+__all__ = [
+    "EvidenceWriter",
+    "active_writer",
+    "evidence_append",
+    "evidence_batch",
+    "evidence_path",
+]
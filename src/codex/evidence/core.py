@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import contextlib
+import contextvars
 import os
 import platform
+import threading
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
@@ -9,10 +13,23 @@ from codex.archive.util import json_dumps_sorted, utcnow_iso
 
 REQUIRED_FIELDS = ("action", "actor", "tool", "repo", "context")
 
+# buffered records are written once they exceed this size, bounding memory
+MAX_BUFFER_BYTES = 1024 * 1024
 
-def evidence_append(
+_ACTIVE_BATCH: contextvars.ContextVar[EvidenceWriter | None] = contextvars.ContextVar(
+    "codex_evidence_batch", default=None
+)
+
+
+def evidence_path() -> Path:
+    """Return the evidence log location for the current ``CODEX_EVIDENCE_DIR``."""
+
+    return Path(os.getenv("CODEX_EVIDENCE_DIR", ".codex/evidence")) / "archive_ops.jsonl"
+
+
+def _build_record(
     *, action: str, actor: str, tool: str, repo: str, context: dict[str, Any]
-) -> None:
+) -> dict[str, Any]:
     rec = {
         "ts": utcnow_iso(),
         "action": action,
@@ -28,7 +45,149 @@ def evidence_append(
     for field in REQUIRED_FIELDS:
         if not rec.get(field):
             raise ValueError(f"evidence missing required field: {field}")
-    evdir = Path(os.getenv("CODEX_EVIDENCE_DIR", ".codex/evidence"))
-    evdir.mkdir(parents=True, exist_ok=True)
-    with (evdir / "archive_ops.jsonl").open("a", encoding="utf-8") as fh:
+    return rec
+
+
+class EvidenceWriter:
+    """Append-only evidence writer that buffers records and writes them together.
+
+    The file is opened once, on the first flush, with ``O_APPEND`` and every
+    flush issues a single write of whole lines, so records from concurrent
+    writers never interleave mid-line. If the file ends in a torn line from an earlier crash, a newline
+    is written first so new records stay parseable; existing bytes are never
+    rewritten.
+    """
+
+    def __init__(
+        self, path: Path, *, fsync: bool = False, max_buffer_bytes: int = MAX_BUFFER_BYTES
+    ) -> None:
+        self.path = path
+        self._abspath = os.path.abspath(path)
+        self.fsync = fsync
+        self.max_buffer_bytes = max_buffer_bytes
+        self.written = 0
+        self._lines: list[str] = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        # opened on the first flush, so a batch that records nothing leaves no file
+        self._fd: int | None = None
+        self._closed = False
+
+    def append(
+        self, *, action: str, actor: str, tool: str, repo: str, context: dict[str, Any]
+    ) -> None:
+        """Validate and buffer one record (same fields as :func:`evidence_append`)."""
+
+        self.write(
+            _build_record(action=action, actor=actor, tool=tool, repo=repo, context=context)
+        )
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Buffer an already-built *record*."""
+
+        self.write_many([record])
+
+    def write_many(self, records: list[dict[str, Any]]) -> None:
+        """Buffer already-built *records*, keeping them adjacent in the log."""
+
+        lines = [json_dumps_sorted(record) + "\n" for record in records]
+        with self._lock:
+            self._lines.extend(lines)
+            self._buffered += sum(len(line) for line in lines)
+            if self._buffered >= self.max_buffer_bytes:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write all buffered records in one append (and ``fsync`` if enabled)."""
+
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                self._closed = True
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+
+    def _flush_locked(self) -> None:
+        if not self._lines:
+            return
+        if self._closed:
+            raise ValueError("evidence writer is closed")
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            if _ends_mid_line(self.path):
+                self._lines.insert(0, "\n")
+        payload = memoryview("".join(self._lines).encode("utf-8"))
+        records = sum(1 for line in self._lines if line != "\n")
+        self._lines.clear()
+        self._buffered = 0
+        while payload:
+            payload = payload[os.write(self._fd, payload) :]
+        if self.fsync:
+            os.fsync(self._fd)
+        self.written += records
+
+
+def _ends_mid_line(path: Path) -> bool:
+    try:
+        with path.open("rb") as fh:
+            if fh.seek(0, os.SEEK_END) == 0:
+                return False
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) != b"\n"
+    except FileNotFoundError:
+        return False
+
+
+def active_writer(path: Path) -> EvidenceWriter | None:
+    """Return the writer of the enclosing :func:`evidence_batch` if it targets *path*."""
+
+    active = _ACTIVE_BATCH.get()
+    if active is not None and active._abspath == os.path.abspath(path):
+        return active
+    return None
+
+
+@contextlib.contextmanager
+def evidence_batch(
+    path: Path | None = None, *, fsync: bool = False, max_buffer_bytes: int = MAX_BUFFER_BYTES
+) -> Iterator[EvidenceWriter]:
+    """Keep the evidence log open and write buffered records in batches.
+
+    ``with evidence_batch() as writer:`` yields an :class:`EvidenceWriter`.
+    While the block runs, :func:`evidence_append` and
+    :func:`codex.archive.util.append_evidence` calls for the same file in this
+    context are buffered too; worker threads must run in a copy of the
+    context (:func:`contextvars.copy_context`) to join the batch. Buffered records are written when the
+    block exits, including on error, because they describe actions that
+    already happened.
+    """
+
+    target = path or evidence_path()
+    writer = EvidenceWriter(target, fsync=fsync, max_buffer_bytes=max_buffer_bytes)
+    token = _ACTIVE_BATCH.set(writer)
+    try:
+        yield writer
+    finally:
+        _ACTIVE_BATCH.reset(token)
+        writer.close()
+
+
+def evidence_append(
+    *, action: str, actor: str, tool: str, repo: str, context: dict[str, Any]
+) -> None:
+    rec = _build_record(action=action, actor=actor, tool=tool, repo=repo, context=context)
+    path = evidence_path()
+    active = active_writer(path)
+    if active is not None:
+        active.write(rec)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as fh:
         fh.write(json_dumps_sorted(rec) + "\n")
@@ -1,17 +1,21 @@
 """Knowledge ingestion helpers (offline/deterministic)."""
 
 from .build import archive_and_manifest, build_kb
-from .chunk import approx_tokens, chunk_by_headings
+from .chunk import approx_tokens, chunk_by_headings, chunk_id
 from .normalize import html_to_markdown, normalize_file, pdf_to_text_bytes
 from .pii import scrub
+from .retrieval import RetrievalIndex, build_index
 from .schema import KBRecord, validate_kb
 
 __all__ = [
     "KBRecord",
+    "RetrievalIndex",
     "approx_tokens",
     "archive_and_manifest",
+    "build_index",
     "build_kb",
     "chunk_by_headings",
+    "chunk_id",
     "html_to_markdown",
     "normalize_file",
     "pdf_to_text_bytes",
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from codex.archive.api import store
 from codex.archive.util import json_dumps_sorted, utcnow_iso
 from codex.knowledge.chunk import approx_tokens, chunk_by_headings
-from codex.knowledge.dedup import dedup_records
+from codex.knowledge.dedup import SimHashIndex, simhash
 from codex.knowledge.normalize import normalize_file
 from codex.knowledge.pii import scrub
 from codex.knowledge.schema import validate_kb
@@ -35,15 +37,88 @@ def infer_intent(path: str) -> str:
     return "admin"
 
 
+_EXCLUDE_DIRS = {".git", ".venv", ".codex", "artifacts", "dist", "__pycache__"}
+_SOURCE_SUFFIXES = (".md", ".txt", ".html", ".htm", ".pdf")
+# bump when record construction changes so cached chunks are rebuilt
+_CACHE_VERSION = 1
+
+
 def iter_sources(root: Path):
-    exclude = {".git", ".venv", ".codex", "artifacts", "dist", "__pycache__"}
-    for p in root.rglob("*"):
-        if p.is_dir():
-            if p.name in exclude:
-                continue
+    """Yield knowledge source files under ``root`` in sorted, stable order."""
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in _EXCLUDE_DIRS)
+        for name in sorted(filenames):
+            if name.lower().endswith(_SOURCE_SUFFIXES):
+                yield Path(dirpath) / name
+
+
+def _source_records(
+    src: Path, *, allow_gpl: bool, max_tokens_per_rec: int
+) -> list[tuple[int, dict[str, object]]]:
+    """Normalize, scrub and chunk one source into ``(simhash, record)`` pairs."""
+
+    norm, mime = normalize_file(src)
+    scrubbed, flags = scrub(norm, allow_gpl=allow_gpl)
+    chunks = chunk_by_headings(
+        scrubbed, target_tokens=min(1024, max_tokens_per_rec), id_salt=src.as_posix()
+    )
+    out: list[tuple[int, dict[str, object]]] = []
+    for ch in chunks:
+        text = ch["text"]
+        if approx_tokens(text) > max_tokens_per_rec:
             continue
-        if p.suffix.lower() in (".md", ".txt", ".html", ".htm", ".pdf"):
-            yield p
+        rec = {
+            "id": ch["chunk_id"],
+            "text": text,
+            "meta": {
+                "source_path": src.as_posix(),
+                "domain": infer_domain(src.as_posix()),
+                "intent": infer_intent(src.as_posix()),
+                "lang": "en",
+                "title": ch.get("title", ""),
+                "chunk_idx": ch.get("chunk_idx", 0),
+                "mime": mime,
+                "flags": flags,
+            },
+        }
+        validate_kb(rec)
+        out.append((simhash(text), rec))
+    return out
+
+
+def _build_cache_entry(
+    src: str, cache_file: str, allow_gpl: bool, max_tokens_per_rec: int
+) -> int:
+    """Process-pool worker: chunk ``src`` and write its records to ``cache_file``."""
+
+    records = _source_records(
+        Path(src), allow_gpl=allow_gpl, max_tokens_per_rec=max_tokens_per_rec
+    )
+    target = Path(cache_file)
+    tmp = target.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        for fp, rec in records:
+            fh.write(json_dumps_sorted({"fp": fp, "rec": rec}) + "\n")
+    os.replace(tmp, target)
+    return len(records)
+
+
+def _cache_key(src: Path, digest: str, *, allow_gpl: bool, max_tokens_per_rec: int) -> str:
+    h = hashlib.sha256()
+    parts = (_CACHE_VERSION, src.as_posix(), digest, allow_gpl, max_tokens_per_rec)
+    for part in map(str, parts):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
 
 def build_kb(
@@ -53,49 +128,102 @@ def build_kb(
     allow_gpl: bool = False,
     max_tokens_per_rec: int = 2048,
     dedup: bool = True,
+    cache_dir: Path | None = None,
+    workers: int | None = None,
 ) -> dict:
-    staged: list[dict[str, object]] = []
+    """Build the knowledge NDJSON incrementally.
+
+    Each source's chunked records are cached under ``cache_dir`` (default
+    ``<out dir>/.<out name>.cache``) keyed by its content hash and build
+    options; a stat manifest avoids re-hashing untouched files. Only new or
+    changed sources are re-chunked, across a process pool of ``workers``
+    (default: CPU count, ``1`` runs in-process). The output is then streamed
+    source by source in sorted order, de-duplicated on the fly with a
+    :class:`~codex.knowledge.dedup.SimHashIndex`, and swapped into place
+    atomically.
+    """
+
+    cache = Path(cache_dir) if cache_dir else out_ndjson.parent / f".{out_ndjson.name}.cache"
+    cache.mkdir(parents=True, exist_ok=True)
+    manifest_path = cache / "manifest.json"
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+
+    plan: list[tuple[Path, Path]] = []
+    stale: list[tuple[Path, Path]] = []
+    new_manifest: dict[str, dict[str, object]] = {}
     for src in iter_sources(root):
-        norm, mime = normalize_file(src)
-        scrubbed, flags = scrub(norm, allow_gpl=allow_gpl)
-        chunks = chunk_by_headings(scrubbed, target_tokens=min(1024, max_tokens_per_rec))
-        for ch in chunks:
-            text = ch["text"]
-            if approx_tokens(text) > max_tokens_per_rec:
-                continue
-            rec = {
-                "id": ch["chunk_id"],
-                "text": text,
-                "meta": {
-                    "source_path": src.as_posix(),
-                    "domain": infer_domain(src.as_posix()),
-                    "intent": infer_intent(src.as_posix()),
-                    "lang": "en",
-                    "title": ch.get("title", ""),
-                    "chunk_idx": ch.get("chunk_idx", 0),
-                    "mime": mime,
-                    "flags": flags,
-                },
-            }
-            validate_kb(rec)
-            staged.append(rec)
+        st = src.stat()
+        key = src.as_posix()
+        prev = manifest.get(key)
+        if prev and prev.get("mtime_ns") == st.st_mtime_ns and prev.get("size") == st.st_size:
+            digest = str(prev["sha256"])
+        else:
+            digest = _file_sha256(src)
+        new_manifest[key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+        entry = cache / (
+            _cache_key(src, digest, allow_gpl=allow_gpl, max_tokens_per_rec=max_tokens_per_rec)
+            + ".ndjson"
+        )
+        plan.append((src, entry))
+        if not entry.exists():
+            stale.append((src, entry))
 
-    total_records = len(staged)
-    if dedup and staged:
-        keep = set(dedup_records((str(rec["text"]) for rec in staged), threshold=3))
-        staged = [rec for idx, rec in enumerate(staged) if idx in keep]
+    n_workers = workers if workers is not None else (os.cpu_count() or 1)
+    if stale and n_workers > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(stale))) as pool:
+            futures = [
+                pool.submit(
+                    _build_cache_entry,
+                    src.as_posix(),
+                    entry.as_posix(),
+                    allow_gpl,
+                    max_tokens_per_rec,
+                )
+                for src, entry in stale
+            ]
+            for future in futures:
+                future.result()
+    else:
+        for src, entry in stale:
+            _build_cache_entry(src.as_posix(), entry.as_posix(), allow_gpl, max_tokens_per_rec)
 
+    index = SimHashIndex(threshold=3) if dedup else None
+    total_records = 0
+    written = 0
     out_ndjson.parent.mkdir(parents=True, exist_ok=True)
-    with out_ndjson.open("w", encoding="utf-8") as fh:
-        for rec in staged:
-            fh.write(json_dumps_sorted(rec) + "\n")
+    tmp_out = out_ndjson.with_name(f".{out_ndjson.name}.tmp")
+    with tmp_out.open("w", encoding="utf-8") as out:
+        for _src, entry in plan:
+            with entry.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    item = json.loads(line)
+                    idx = total_records
+                    total_records += 1
+                    if index is not None:
+                        fp = int(item["fp"])
+                        if index.match(fp) is not None:
+                            continue
+                        index.add(idx, fp)
+                    out.write(json_dumps_sorted(item["rec"]) + "\n")
+                    written += 1
+    os.replace(tmp_out, out_ndjson)
+
+    live = {entry.name for _, entry in plan}
+    for cached in cache.glob("*.ndjson"):
+        if cached.name not in live:
+            cached.unlink(missing_ok=True)
+    manifest_path.write_text(json.dumps(new_manifest, sort_keys=True), encoding="utf-8")
 
-    written = len(staged)
     return {
         "written": written,
         "out": out_ndjson.as_posix(),
         "deduped": bool(dedup),
         "source_records": total_records,
+        "sources": len(plan),
+        "rebuilt_sources": len(stale),
     }
 
 
@@ -105,6 +233,7 @@ def archive_and_manifest(
     eval_path: Path | None,
     *,
     actor: str = "codex",
+    manifest_path: Path | None = None,
 ) -> dict:
     comps = []
 
@@ -144,7 +273,7 @@ def archive_and_manifest(
         "post_unpack_commands": [],
         "checks": {"sha256_manifest": "<filled at pack time>"},
     }
-    outp = Path("artifacts/knowledge.release.manifest.json")
+    outp = manifest_path or Path("artifacts/knowledge.release.manifest.json")
     outp.parent.mkdir(parents=True, exist_ok=True)
     outp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
     return {"manifest": outp.as_posix(), "components": len(comps)}
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+import hashlib
 import math
 import re
-import uuid
 
 _HDR = re.compile(r"^(#{1,6})\s+(.*)$", re.M)
 
@@ -11,6 +11,16 @@ def approx_tokens(s: str) -> int:
     return max(1, math.ceil(len(s) / 4))
 
 
+def chunk_id(text: str, *, title: str = "", idx: int = 0, salt: str = "") -> str:
+    """Deterministic chunk id derived from the chunk content and position."""
+
+    h = hashlib.blake2b(digest_size=6)
+    for part in (salt, title, str(idx), text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return "kb_" + h.hexdigest()
+
+
 def split_by_headings(md: str) -> list[dict]:
     parts = []
     matches = list(_HDR.finditer(md))
@@ -25,8 +35,14 @@ def split_by_headings(md: str) -> list[dict]:
 
 
 def chunk_by_headings(
-    md: str, *, target_tokens: int = 1024, overlap_tokens: int = 64
+    md: str, *, target_tokens: int = 1024, overlap_tokens: int = 64, id_salt: str = ""
 ) -> list[dict]:
+    """Split ``md`` into heading-aligned chunks of roughly ``target_tokens``.
+
+    Chunk ids are content-derived (see :func:`chunk_id`), so rebuilding the
+    same input yields the same ids; ``id_salt`` (e.g. the source path) keeps
+    identical chunks from different sources apart.
+    """
     sections = split_by_headings(md)
     out: list[dict] = []
     idx = 0
@@ -36,7 +52,7 @@ def chunk_by_headings(
             if approx_tokens(buf) <= target_tokens:
                 out.append(
                     {
-                        "chunk_id": "kb_" + uuid.uuid4().hex[:12],
+                        "chunk_id": chunk_id(buf, title=sec["title"], idx=idx, salt=id_salt),
                         "chunk_idx": idx,
                         "title": sec["title"],
                         "text": buf,
@@ -52,7 +68,7 @@ def chunk_by_headings(
                 left, right = buf[:cut], buf[cut:]
                 out.append(
                     {
-                        "chunk_id": "kb_" + uuid.uuid4().hex[:12],
+                        "chunk_id": chunk_id(left, title=sec["title"], idx=idx, salt=id_salt),
                         "chunk_idx": idx,
                         "title": sec["title"],
                         "text": left,
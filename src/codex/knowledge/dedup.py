@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import re
+from collections import Counter, defaultdict
 from collections.abc import Iterable
+from functools import lru_cache
 
 _WORD = re.compile(r"[A-Za-z0-9_]+")
 
@@ -10,17 +13,28 @@ def _tokens(text: str) -> list[str]:
     return _WORD.findall(text.lower())
 
 
+@lru_cache(maxsize=1 << 16)
+def _token_signs(token: str, bits: int) -> tuple[int, ...]:
+    """Per-bit +1/-1 votes of ``token``'s hash (bit 0 first)."""
+
+    # blake2b instead of hash(): str hashing is salted per process
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=(bits + 7) // 8).digest()
+    value = int.from_bytes(digest, "little")
+    return tuple(1 if (value >> idx) & 1 else -1 for idx in range(bits))
+
+
 def simhash(text: str, bits: int = 64) -> int:
-    """Compute a lightweight SimHash fingerprint for ``text``."""
-
-    weights = [0] * bits
-    for token in _tokens(text):
-        value = hash(token)
-        for idx in range(bits):
-            if (value >> idx) & 1:
-                weights[idx] += 1
-            else:
-                weights[idx] -= 1
+    """Compute a lightweight SimHash fingerprint for ``text``.
+
+    Token hashes use ``blake2b`` so fingerprints are identical across
+    processes and Python versions.
+    """
+
+    votes = [
+        _token_signs(token, bits) if count == 1 else [count * s for s in _token_signs(token, bits)]
+        for token, count in Counter(_tokens(text)).items()
+    ]
+    weights = [sum(column) for column in zip(*votes, strict=False)] if votes else [0] * bits
     fingerprint = 0
     for idx, weight in enumerate(weights):
         if weight >= 0:
@@ -34,21 +48,92 @@ def hamming(a: int, b: int) -> int:
     return (a ^ b).bit_count()
 
 
-def dedup_records(texts: Iterable[str], *, threshold: int = 3) -> list[int]:
-    """Return indices of records to keep after removing near-duplicates.
+class SimHashIndex:
+    """Banded LSH index over SimHash fingerprints.
 
-    Entries whose SimHash differs by ``threshold`` bits or fewer from an
-    earlier record are treated as duplicates and filtered out.
+    Fingerprints are split into ``bands`` contiguous bit ranges and bucketed
+    per band. By the pigeonhole principle two fingerprints within ``threshold``
+    bits share at least one identical band whenever ``bands > threshold``, so
+    the default ``bands = threshold + 1`` finds every match while only
+    comparing against records that collide in some band. Fewer bands trade
+    recall for speed.
     """
 
-    keep_indices: list[int] = []
-    fingerprints: list[int] = []
+    def __init__(self, *, threshold: int = 3, bits: int = 64, bands: int | None = None) -> None:
+        bands = threshold + 1 if bands is None else bands
+        if not 1 <= bands <= bits:
+            raise ValueError(f"bands must be between 1 and {bits}")
+        self.threshold = threshold
+        self.bits = bits
+        edges = [round(i * bits / bands) for i in range(bands + 1)]
+        self._bands = [
+            (lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:], strict=False)
+        ]
+        self._buckets: list[dict[int, list[int]]] = [defaultdict(list) for _ in self._bands]
+        self._fingerprints: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _keys(self, fingerprint: int) -> list[int]:
+        return [(fingerprint >> lo) & mask for lo, mask in self._bands]
+
+    def add(self, key: int, fingerprint: int) -> None:
+        self._fingerprints[key] = fingerprint
+        for bucket, band_key in zip(self._buckets, self._keys(fingerprint), strict=False):
+            bucket[band_key].append(key)
+
+    def match(self, fingerprint: int) -> int | None:
+        """Return the smallest key within ``threshold`` bits of ``fingerprint``."""
+
+        best: int | None = None
+        checked: set[int] = set()
+        for bucket, band_key in zip(self._buckets, self._keys(fingerprint), strict=False):
+            for key in bucket.get(band_key, ()):
+                if key in checked or (best is not None and key >= best):
+                    continue
+                checked.add(key)
+                if hamming(fingerprint, self._fingerprints[key]) <= self.threshold:
+                    best = key
+        return best
+
+
+def cluster_records(
+    texts: Iterable[str], *, threshold: int = 3, bands: int | None = None
+) -> list[list[int]]:
+    """Group record indices into near-duplicate clusters.
+
+    Records are visited in order; each joins the cluster of the earliest kept
+    record within ``threshold`` bits, or starts a new cluster. The output is
+    deterministic: clusters are ordered by their first (kept) index and list
+    members in input order.
+    """
+
+    index = SimHashIndex(threshold=threshold, bands=bands)
+    clusters: dict[int, list[int]] = {}
     for idx, text in enumerate(texts):
         fp = simhash(text)
-        if all(hamming(fp, existing) > threshold for existing in fingerprints):
-            keep_indices.append(idx)
-            fingerprints.append(fp)
-    return keep_indices
+        representative = index.match(fp)
+        if representative is None:
+            index.add(idx, fp)
+            clusters[idx] = [idx]
+        else:
+            clusters[representative].append(idx)
+    return list(clusters.values())
+
+
+def dedup_records(
+    texts: Iterable[str], *, threshold: int = 3, bands: int | None = None
+) -> list[int]:
+    """Return indices of records to keep after removing near-duplicates.
+
+    Entries whose SimHash differs by ``threshold`` bits or fewer from an
+    earlier record are treated as duplicates and filtered out. Candidates are
+    found through :class:`SimHashIndex`, so runtime grows roughly linearly
+    with the number of records.
+    """
+
+    return [cluster[0] for cluster in cluster_records(texts, threshold=threshold, bands=bands)]
 
 
-__all__ = ["dedup_records", "hamming", "simhash"]
+__all__ = ["SimHashIndex", "cluster_records", "dedup_records", "hamming", "simhash"]
@@ -0,0 +1,372 @@
+"""Query-time retrieval over knowledge-base chunks (BM25 plus optional dense vectors).
+
+:func:`build_index` turns a KB NDJSON file (as written by
+:func:`codex.knowledge.build.build_kb`) into an index directory:
+
+``meta.json``
+    Corpus statistics and BM25 parameters.
+``vocab.json``
+    ``term -> [start, df]`` into the postings arrays.
+``postings.ids`` / ``postings.tf``
+    Concatenated per-term posting lists (``uint32`` doc numbers and ``uint16``
+    term frequencies), memory-mapped at query time.
+``doclen.bin``
+    ``uint32`` token counts per document.
+``docs.jsonl`` / ``docs.idx``
+    ``{"id", "meta"}`` per document plus ``uint64`` line offsets, read lazily
+    for results and metadata filters.
+``dense.npy`` (optional)
+    L2-normalised ``float32`` embeddings; ``ivf_*.npy`` add an inverted-file
+    partition (k-means centroids) for sub-linear dense search.
+
+BM25 scoring works with the standard library alone; NumPy, when installed,
+vectorises scoring and is required for the dense index. The default
+:class:`HashingEmbedder` is a deterministic, dependency-free local embedding
+(signed feature hashing of tokens and bigrams); any callable mapping a list of
+strings to a 2-D array can be supplied instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import re
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+except Exception:  # pragma: no cover - numpy missing
+    np = None  # type: ignore[assignment]
+
+_WORD = re.compile(r"[A-Za-z0-9_]+")
+_FORMAT_VERSION = 1
+
+Embedder = Callable[[Sequence[str]], Any]
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _require_numpy(feature: str) -> None:
+    if np is None:
+        raise RuntimeError(f"{feature} requires numpy; install with `pip install numpy`")
+
+
+class HashingEmbedder:
+    """Deterministic local embedding via signed feature hashing (needs NumPy)."""
+
+    def __init__(self, dim: int = 256) -> None:
+        _require_numpy("HashingEmbedder")
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = tokenize(text)
+        yield from tokens
+        yield from (f"{a} {b}" for a, b in zip(tokens, tokens[1:], strict=False))
+
+    def __call__(self, texts: Sequence[str]) -> Any:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                out[row, value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+        return out
+
+
+def _normalise(vectors: Any) -> Any:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _kmeans(vectors: Any, nlist: int, *, iterations: int = 10, seed: int = 0) -> Any:
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids = _normalise(centroids)
+    return centroids
+
+
+def _iter_kb(path: Path) -> Iterable[dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_index(
+    kb_ndjson: Path,
+    index_dir: Path,
+    *,
+    k1: float = 1.2,
+    b: float = 0.75,
+    dense: bool = False,
+    embedder: Embedder | None = None,
+    nlist: int = 0,
+    batch_size: int = 1024,
+) -> dict[str, Any]:
+    """Build a retrieval index for ``kb_ndjson`` into ``index_dir``.
+
+    ``dense`` also embeds every chunk (``embedder`` defaults to
+    :class:`HashingEmbedder`); ``nlist > 0`` partitions the vectors into that
+    many k-means lists for IVF search.
+    """
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    doclen = array("I")
+    offsets = array("Q")
+    texts: list[str] = []
+    with (index_dir / "docs.jsonl").open("wb") as docs:
+        for doc, rec in enumerate(_iter_kb(kb_ndjson)):
+            text = str(rec.get("text", ""))
+            counts = Counter(tokenize(text))
+            for term, tf in counts.items():
+                postings[term].append((doc, min(tf, 0xFFFF)))
+            doclen.append(sum(counts.values()))
+            offsets.append(docs.tell())
+            line = {"id": rec.get("id"), "meta": rec.get("meta", {})}
+            docs.write(json.dumps(line, sort_keys=True).encode("utf-8") + b"\n")
+            if dense:
+                texts.append(text)
+
+    vocab: dict[str, list[int]] = {}
+    ids = array("I")
+    tfs = array("H")
+    for term in sorted(postings):
+        plist = postings[term]
+        vocab[term] = [len(ids), len(plist)]
+        ids.extend(doc for doc, _ in plist)
+        tfs.extend(tf for _, tf in plist)
+    with (index_dir / "postings.ids").open("wb") as fh:
+        ids.tofile(fh)
+    with (index_dir / "postings.tf").open("wb") as fh:
+        tfs.tofile(fh)
+    with (index_dir / "doclen.bin").open("wb") as fh:
+        doclen.tofile(fh)
+    with (index_dir / "docs.idx").open("wb") as fh:
+        offsets.tofile(fh)
+    (index_dir / "vocab.json").write_text(json.dumps(vocab), encoding="utf-8")
+
+    n_docs = len(doclen)
+    meta: dict[str, Any] = {
+        "version": _FORMAT_VERSION,
+        "n_docs": n_docs,
+        "avgdl": (sum(doclen) / n_docs) if n_docs else 0.0,
+        "k1": k1,
+        "b": b,
+        "dense": False,
+        "nlist": 0,
+    }
+    if dense and n_docs:
+        _require_numpy("dense retrieval")
+        embed = embedder or HashingEmbedder()
+        vectors = np.concatenate(
+            [
+                _normalise(embed(texts[start : start + batch_size]))
+                for start in range(0, n_docs, batch_size)
+            ]
+        )
+        np.save(index_dir / "dense.npy", vectors)
+        meta["dense"] = True
+        meta["dim"] = int(vectors.shape[1])
+        if nlist > 0:
+            nlist = min(nlist, n_docs)
+            centroids = _kmeans(vectors, nlist)
+            assign = np.argmax(vectors @ centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable").astype(np.uint32)
+            bounds = np.searchsorted(assign[order], np.arange(nlist + 1)).astype(np.int64)
+            np.save(index_dir / "ivf_centroids.npy", centroids)
+            np.save(index_dir / "ivf_order.npy", order)
+            np.save(index_dir / "ivf_bounds.npy", bounds)
+            meta["nlist"] = nlist
+    (index_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return {"index": index_dir.as_posix(), "docs": n_docs, "terms": len(vocab), **meta}
+
+
+def _map(path: Path) -> memoryview:
+    with path.open("rb") as fh:
+        if path.stat().st_size == 0:
+            return memoryview(b"")
+        return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _matches(meta: Mapping[str, Any], filters: Mapping[str, Any]) -> bool:
+    for key, wanted in filters.items():
+        value = meta.get(key)
+        if isinstance(wanted, (list, tuple, set, frozenset)):
+            if value not in wanted:
+                return False
+        elif value != wanted:
+            return False
+    return True
+
+
+class RetrievalIndex:
+    """Read-only handle over an index directory built by :func:`build_index`.
+
+    Dense queries must use the same ``embedder`` the index was built with.
+    """
+
+    def __init__(self, index_dir: Path, *, embedder: Embedder | None = None) -> None:
+        self.index_dir = Path(index_dir)
+        self.meta = json.loads((self.index_dir / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"unsupported retrieval index version: {self.meta.get('version')}")
+        self.vocab: dict[str, list[int]] = json.loads(
+            (self.index_dir / "vocab.json").read_text(encoding="utf-8")
+        )
+        self._ids = _map(self.index_dir / "postings.ids").cast("I")
+        self._tfs = _map(self.index_dir / "postings.tf").cast("H")
+        self._doclen = _map(self.index_dir / "doclen.bin").cast("I")
+        self._offsets = _map(self.index_dir / "docs.idx").cast("Q")
+        self._docs = _map(self.index_dir / "docs.jsonl")
+        self._embedder = embedder
+        self._dense = None
+        self._ivf: tuple[Any, Any, Any] | None = None
+        if np is not None:
+            self._np_ids = np.frombuffer(self._ids, dtype=np.uint32)
+            self._np_tfs = np.frombuffer(self._tfs, dtype=np.uint16)
+            self._np_doclen = np.frombuffer(self._doclen, dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return int(self.meta["n_docs"])
+
+    def document(self, doc: int) -> dict[str, Any]:
+        start = self._offsets[doc]
+        end = self._offsets[doc + 1] if doc + 1 < len(self._offsets) else len(self._docs)
+        return json.loads(bytes(self._docs[start:end]))
+
+    # ------------------------------------------------------------------ BM25
+    def _idf(self, df: int) -> float:
+        n = len(self)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25_scores(self, query: str) -> Any:
+        k1, b, avgdl = self.meta["k1"], self.meta["b"], self.meta["avgdl"] or 1.0
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.vocab]
+        if np is not None:
+            scores = np.zeros(len(self), dtype=np.float32)
+            for term in terms:
+                start, df = self.vocab[term]
+                docs = self._np_ids[start : start + df]
+                tf = self._np_tfs[start : start + df].astype(np.float32)
+                norm = k1 * (1.0 - b + b * self._np_doclen[docs] / avgdl)
+                # doc ids are unique within one posting list, so fancy += is safe
+                scores[docs] += self._idf(df) * tf * (k1 + 1.0) / (tf + norm)
+            return scores
+        acc: dict[int, float] = defaultdict(float)
+        for term in terms:
+            start, df = self.vocab[term]
+            idf = self._idf(df)
+            for i in range(start, start + df):
+                doc = self._ids[i]
+                tf = self._tfs[i]
+                norm = k1 * (1.0 - b + b * self._doclen[doc] / avgdl)
+                acc[doc] += idf * tf * (k1 + 1.0) / (tf + norm)
+        return acc
+
+    # ----------------------------------------------------------------- dense
+    def _dense_scores(self, query: str, nprobe: int) -> Any:
+        if not self.meta.get("dense"):
+            raise RuntimeError("index was built without dense vectors")
+        _require_numpy("dense retrieval")
+        if self._dense is None:
+            self._dense = np.load(self.index_dir / "dense.npy", mmap_mode="r")
+            if self.meta.get("nlist"):
+                self._ivf = (
+                    np.load(self.index_dir / "ivf_centroids.npy"),
+                    np.load(self.index_dir / "ivf_order.npy", mmap_mode="r"),
+                    np.load(self.index_dir / "ivf_bounds.npy"),
+                )
+        embed = self._embedder or HashingEmbedder(int(self.meta["dim"]))
+        q = _normalise(embed([query]))[0]
+        if self._ivf is None:
+            return np.asarray(self._dense @ q, dtype=np.float32)
+        centroids, order, bounds = self._ivf
+        probe = np.argsort(-(centroids @ q))[: max(1, nprobe)]
+        docs = np.concatenate([order[bounds[c] : bounds[c + 1]] for c in probe])
+        scores = np.full(len(self), -np.inf, dtype=np.float32)
+        scores[docs] = self._dense[docs] @ q
+        return scores
+
+    # ----------------------------------------------------------------- query
+    def _top(
+        self, scores: Any, k: int, filters: Mapping[str, Any] | None
+    ) -> list[tuple[int, float]]:
+        """Best ``(doc, score)`` pairs, ties broken by document order."""
+
+        ranked: Iterable[tuple[int, float]]
+        if isinstance(scores, dict):
+            if not filters:
+                return heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        else:
+            candidates = np.flatnonzero(np.isfinite(scores) & (scores != 0))
+            if not filters and len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            order = candidates[np.lexsort((candidates, -scores[candidates]))]
+            ranked = ((int(d), float(scores[d])) for d in order)
+        out: list[tuple[int, float]] = []
+        for doc, score in ranked:
+            if filters and not _matches(self.document(doc).get("meta", {}), filters):
+                continue
+            out.append((doc, score))
+            if len(out) >= k:
+                break
+        return out
+
+    def search(
+        self,
+        query: str,
+        *,
+        k: int = 10,
+        filters: Mapping[str, Any] | None = None,
+        mode: str = "bm25",
+        nprobe: int = 4,
+        alpha: float = 0.5,
+    ) -> list[dict[str, Any]]:
+        """Return the top ``k`` chunks for ``query`` as ``{"id", "score", "meta"}``.
+
+        ``mode`` is ``"bm25"``, ``"dense"`` or ``"hybrid"`` (``alpha`` weights
+        max-normalised BM25 against cosine similarity). ``filters`` maps meta
+        keys to a required value or a collection of allowed values.
+        """
+
+        if k <= 0:
+            return []
+        if mode == "bm25":
+            scores = self._bm25_scores(query)
+        elif mode == "dense":
+            scores = self._dense_scores(query, nprobe)
+        elif mode == "hybrid":
+            sparse = self._bm25_scores(query)
+            dense = self._dense_scores(query, nprobe)
+            peak = float(sparse.max()) if len(sparse) else 0.0
+            sparse = sparse / peak if peak > 0 else sparse
+            scores = alpha * sparse + (1.0 - alpha) * np.where(np.isfinite(dense), dense, 0.0)
+        else:
+            raise ValueError(f"unknown retrieval mode: {mode!r}")
+        results = []
+        for doc, score in self._top(scores, k, filters):
+            record = self.document(doc)
+            results.append({"id": record.get("id"), "score": score, "meta": record.get("meta")})
+        return results
+
+
+__all__ = ["HashingEmbedder", "RetrievalIndex", "build_index", "tokenize"]
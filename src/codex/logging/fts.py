@@ -0,0 +1,183 @@
+"""Full-text search and keyset pagination helpers for session log tables.
+
+``ensure_fts`` attaches an external-content FTS5 index (``<table>_fts``) to a
+log table and installs insert/update/delete triggers that keep it in sync, so
+message search becomes an index lookup instead of a ``LIKE`` scan. The index
+is optional: callers check :func:`fts_table_for` and fall back to ``LIKE``
+when it is absent or the SQLite build lacks FTS5.
+
+Keyset ("seek") pagination orders rows by ``(timestamp, rowid)``. SQLite
+appends the rowid to every index entry, so a ``(session_id, ts)`` index
+serves ``WHERE session_id = ? AND (ts, rowid) > (?, ?) ORDER BY ts, rowid``
+without sorting and without skipping ``OFFSET`` rows. Page positions are
+passed around as opaque cursor strings from :func:`encode_cursor`.
+
+Both rely on stable rowids. Tables created by the session logger declare an
+``INTEGER PRIMARY KEY``, which aliases the rowid. Legacy tables without one
+have their rowids renumbered by ``VACUUM``. After vacuuming such a table, call
+:func:`rebuild_fts`, and note that outstanding cursors no longer point at the
+same rows.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+import sqlite3
+from typing import Any, Optional, Tuple
+
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+KeysetKey = Tuple[Any, int]
+
+
+def _ident(name: str) -> str:
+    if not _IDENT_RE.fullmatch(name or ""):
+        raise ValueError(f"Unsafe identifier: {name!r}")
+    return name
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Return True when the SQLite library was compiled with FTS5."""
+
+    try:
+        rows = conn.execute("PRAGMA compile_options").fetchall()
+    except sqlite3.Error:
+        return False
+    return any(str(row[0]).upper() == "ENABLE_FTS5" for row in rows)
+
+
+def fts_table_for(conn: sqlite3.Connection, table: str) -> Optional[str]:
+    """Return the name of the FTS index attached to ``table`` if one exists."""
+
+    name = f"{_ident(table)}_fts"
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone()
+    return name if row else None
+
+
+def ensure_fts(conn: sqlite3.Connection, table: str, message_col: str = "message") -> bool:
+    """Create ``<table>_fts`` plus sync triggers; return False if FTS5 is missing.
+
+    Existing rows are indexed once when the virtual table is first created.
+    The caller owns the transaction (``conn.commit()``).
+    """
+
+    table = _ident(table)
+    col = _ident(message_col)
+    if not fts5_available(conn):
+        return False
+    fts = f"{table}_fts"
+    if fts_table_for(conn, table):
+        return True
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{col}, content='{table}', content_rowid='rowid')"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col}) VALUES (new.rowid, new.{col}); END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.rowid, old.{col}); END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {col} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.rowid, old.{col}); "
+        f"INSERT INTO {fts}(rowid, {col}) VALUES (new.rowid, new.{col}); END"
+    )
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return True
+
+
+def has_stable_rowid(conn: sqlite3.Connection, table: str) -> bool:
+    """Return True when ``table`` has an ``INTEGER PRIMARY KEY`` (a rowid alias)."""
+
+    pk = [
+        str(row[2]).upper()
+        for row in conn.execute(f"PRAGMA table_info({_ident(table)})")
+        if row[5]
+    ]
+    return pk == ["INTEGER"]
+
+
+def rebuild_fts(conn: sqlite3.Connection, table: str) -> bool:
+    """Re-index ``<table>_fts`` from the table; return False if there is no index.
+
+    Needed after ``VACUUM`` renumbers the rowids of a table without an
+    ``INTEGER PRIMARY KEY``.
+    """
+
+    fts = fts_table_for(conn, table)
+    if fts is None:
+        return False
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return True
+
+
+def fts_query(text: str) -> str:
+    """Quote each whitespace-separated term so user input is matched literally.
+
+    Terms are ANDed, mirroring how a substring ``--contains`` filter narrows
+    results, without exposing FTS5 operator syntax to the caller.
+    """
+
+    terms = [t for t in text.split() if t]
+    if not terms:
+        raise ValueError("search text must not be empty")
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def match_filter(table: str, fts_table: str) -> str:
+    """``WHERE`` fragment restricting ``table`` rows to FTS matches (one ``?``)."""
+
+    return (
+        f"{_ident(table)}.rowid IN "
+        f"(SELECT rowid FROM {_ident(fts_table)} WHERE {fts_table} MATCH ?)"
+    )
+
+
+def rank_join(table: str, fts_table: str) -> str:
+    """``JOIN`` exposing ``_hits._rank`` (bm25, lower is better) for FTS matches."""
+
+    fts = _ident(fts_table)
+    return (
+        f" JOIN (SELECT rowid AS _fts_rowid, bm25({fts}) AS _rank"
+        f" FROM {fts} WHERE {fts} MATCH ?) AS _hits"
+        f" ON _hits._fts_rowid = {_ident(table)}.rowid"
+    )
+
+
+def encode_cursor(ts: Any, rowid: int) -> str:
+    """Return an opaque token for the keyset position ``(ts, rowid)``."""
+
+    raw = json.dumps([ts, int(rowid)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> KeysetKey:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on bad tokens."""
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        ts, rowid = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return ts, int(rowid)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {token!r}") from exc
+
+
+__all__ = [
+    "decode_cursor",
+    "encode_cursor",
+    "ensure_fts",
+    "fts5_available",
+    "fts_query",
+    "fts_table_for",
+    "has_stable_rowid",
+    "match_filter",
+    "rank_join",
+    "rebuild_fts",
+]
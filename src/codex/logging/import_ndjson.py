@@ -68,6 +68,7 @@ def _init_db(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS session_events (
+            id INTEGER PRIMARY KEY,
             session_id TEXT NOT NULL,
             ts REAL,
             role TEXT,
@@ -10,6 +10,10 @@ Usage examples:
 Behavior:
 - Auto-detects table and column names via PRAGMA introspection
 - Accepts filters: session_id, role, after/before (ISO-8601), limit/offset, order
+- `--search` uses the FTS5 index (`--build-fts` creates it) and falls back to LIKE;
+  `--rank` orders matches by relevance
+- `--page-size N [--cursor TOKEN]` pages by (timestamp, rowid) keyset instead of
+  OFFSET; the next cursor is printed to stderr as `next-cursor: TOKEN`
 - Outputs 'text' (default) or 'json'
 
 Environment:
@@ -53,6 +57,16 @@ except Exception:  # pragma: no cover - fallback
 
 from .config import DEFAULT_LOG_DB
 from .db_utils import infer_columns, infer_probable_table, open_db, resolve_db_path
+from .fts import (
+    KeysetKey,
+    decode_cursor,
+    encode_cursor,
+    ensure_fts,
+    fts_query,
+    fts_table_for,
+    match_filter,
+    rank_join,
+)
 
 
 def parse_when(s: str) -> datetime:
@@ -91,12 +105,32 @@ def build_query(
     order: str,
     limit: Optional[int],
     offset: Optional[int],
+    *,
+    search: Optional[str] = None,
+    fts_table: Optional[str] = None,
+    rank: bool = False,
+    keyset: bool = False,
+    cursor: Optional[KeysetKey] = None,
 ) -> Tuple[str, List[Any]]:
+    """Return ``(sql, params)`` selecting transcript rows.
+
+    ``search`` matches message text through ``fts_table`` (an FTS5 index from
+    :func:`codex.logging.fts.ensure_fts`) when given, otherwise via ``LIKE``.
+    ``rank`` orders FTS matches by bm25 relevance instead of time. ``keyset``
+    orders by ``(timestamp, rowid)`` and adds a ``_rowid`` column so the last
+    row of a page can seed ``cursor`` for the next one; prefer it to
+    ``offset`` for deep pages.
+    """
     ts = mapcol["timestamp"]
     role_col = mapcol["role"]
     message_col = mapcol["message"]
     if not ts or not role_col or not message_col:
         raise ValueError("Required columns missing")
+    if rank and not (search and fts_table):
+        raise ValueError("rank requires search with an FTS index")
+    if rank and (keyset or cursor is not None):
+        raise ValueError("rank ordering cannot be combined with keyset pagination")
+    keyset = keyset or cursor is not None
     cols = [
         mapcol.get("id") or "NULL AS id",
         ts,
@@ -105,10 +139,21 @@ def build_query(
         mapcol.get("session_id") or "NULL AS session_id",
         mapcol.get("metadata") or "NULL AS metadata",
     ]
+    if keyset:
+        cols.append(f"{table}.rowid AS _rowid")
     select = ", ".join(cols)
     sql = f"SELECT {select} FROM {table}"
     where: List[str] = []
     params: List[Any] = []
+    if search and fts_table and rank:
+        sql += rank_join(table, fts_table)
+        params.append(fts_query(search))
+    elif search and fts_table:
+        where.append(match_filter(table, fts_table))
+        params.append(fts_query(search))
+    elif search:
+        where.append(f"LOWER({message_col}) LIKE ?")
+        params.append(f"%{search.lower()}%")
     if session_id and "session_id" in mapcol:
         where.append(f"{mapcol['session_id']} = ?")
         params.append(session_id)
@@ -121,20 +166,38 @@ def build_query(
     if before:
         where.append(f"{mapcol['timestamp']} <= ?")
         params.append(before)
-    if where:
-        sql += " WHERE " + " AND ".join(where)
     if order.lower() not in {"asc", "desc"}:
         order = "asc"
-    sql += f" ORDER BY {mapcol['timestamp']} {order.upper()}"
+    if cursor is not None:
+        op = ">" if order.lower() == "asc" else "<"
+        where.append(f"({ts}, {table}.rowid) {op} (?, ?)")
+        params.extend(cursor)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if rank:
+        sql += f" ORDER BY _hits._rank ASC, {mapcol['timestamp']} {order.upper()}"
+    else:
+        sql += f" ORDER BY {mapcol['timestamp']} {order.upper()}"
+        if keyset:
+            sql += f", {table}.rowid {order.upper()}"
     if limit is not None:
         sql += " LIMIT ?"
         params.append(int(limit))
-    if offset is not None:
+    if offset is not None and not keyset:
         sql += " OFFSET ?"
         params.append(int(offset))
     return sql, params
 
 
+def next_cursor(rows: List[sqlite3.Row], mapcol: Dict[str, Optional[str]]) -> Optional[str]:
+    """Cursor for the page after ``rows`` (rows must come from a keyset query)."""
+
+    if not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[mapcol["timestamp"]], last["_rowid"])
+
+
 def _print_rich(rows: List[sqlite3.Row], mapcol: Dict[str, Optional[str]], show_meta: bool) -> None:
     ts = mapcol["timestamp"]
     role = mapcol["role"]
@@ -215,6 +278,19 @@ def main(argv: Optional[List[str]] = None) -> int:
     parser.add_argument("--offset", type=int)
     parser.add_argument("--order", choices=["asc", "desc"], default="asc")
     parser.add_argument("--tail", type=int, help="Show latest N rows")
+    parser.add_argument("--search", help="Full-text search on messages (FTS5 when indexed)")
+    parser.add_argument(
+        "--rank", action="store_true", help="Order --search hits by relevance (needs FTS5)"
+    )
+    parser.add_argument(
+        "--build-fts",
+        action="store_true",
+        help="Create the FTS5 message index and sync triggers if missing",
+    )
+    parser.add_argument(
+        "--page-size", type=int, help="Keyset page size (use with --cursor for later pages)"
+    )
+    parser.add_argument("--cursor", help="Cursor printed by the previous --page-size page")
     args = parser.parse_args(argv)
 
     try:
@@ -233,6 +309,12 @@ def main(argv: Optional[List[str]] = None) -> int:
             if table is None:
                 raise SystemExit("No suitable table found.")
             mapcol = infer_columns(conn, table)
+            if args.build_fts and not ensure_fts(conn, table, mapcol["message"] or "message"):
+                print("FTS5 unavailable; --search falls back to LIKE", file=sys.stderr)
+            fts_table = fts_table_for(conn, table) if args.search else None
+            keyset = args.page_size is not None or args.cursor is not None
+            if args.page_size is not None:
+                args.limit = args.page_size
             sql, params = build_query(
                 table,
                 mapcol,
@@ -243,12 +325,22 @@ def main(argv: Optional[List[str]] = None) -> int:
                 args.order,
                 args.limit,
                 args.offset,
+                search=args.search,
+                fts_table=fts_table,
+                rank=args.rank,
+                keyset=keyset,
+                cursor=decode_cursor(args.cursor) if args.cursor else None,
             )
             rows = list(conn.execute(sql, params))
+            if keyset and args.limit is not None and len(rows) >= args.limit:
+                print(f"next-cursor: {next_cursor(rows, mapcol)}", file=sys.stderr)
             if args.tail is not None:
                 rows.reverse()
             if args.format == "json":
-                print(json.dumps([dict(r) for r in rows], ensure_ascii=False, indent=2))
+                records = [dict(r) for r in rows]
+                for record in records:
+                    record.pop("_rowid", None)
+                print(json.dumps(records, ensure_ascii=False, indent=2))
             else:
                 _print_rich(rows, mapcol, args.show_meta)
         return 0
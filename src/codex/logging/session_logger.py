@@ -5,6 +5,8 @@ Provides:
   `log_event`.
 - `log_message(session_id, role, message, db_path=None)`:
   validated message logging helper.
+- `flush_events(db_path=None)`: drain the background writer used when
+  `CODEX_SQLITE_BATCH=1`.
 
 If the repo already defines `log_event`, `init_db`, and `_DB_LOCK` under
 `codex.logging`, we import and use them. Otherwise we fall back to local,
@@ -23,6 +25,7 @@ import atexit
 import json
 import logging
 import os
+import queue
 import sqlite3
 import threading
 import time
@@ -105,6 +108,12 @@ def _close_pool() -> None:
 if USE_POOL:
     atexit.register(_close_pool)
 
+# Optional background writer: events are queued and inserted in batches
+USE_BATCH = os.getenv("CODEX_SQLITE_BATCH") == "1"
+BATCH_QUEUE_SIZE = int(os.getenv("CODEX_SQLITE_BATCH_QUEUE", "10000"))
+BATCH_MAX_EVENTS = int(os.getenv("CODEX_SQLITE_BATCH_MAX", "500"))
+BATCH_INTERVAL_S = float(os.getenv("CODEX_SQLITE_BATCH_INTERVAL_MS", "50")) / 1000.0
+
 
 def _default_db_path() -> Path:
     """Return default database path, honoring environment variable at call time."""
@@ -138,7 +147,10 @@ def init_db(db_path: Optional[Path] = None):
             pass
         try:
             conn.execute(
+                # ``id`` aliases the rowid so VACUUM keeps it stable for the
+                # FTS index and keyset cursors
                 """CREATE TABLE IF NOT EXISTS session_events(
+                       id INTEGER PRIMARY KEY,
                        ts REAL NOT NULL,
                        session_id TEXT NOT NULL,
                        role TEXT NOT NULL,
@@ -161,6 +173,11 @@ def init_db(db_path: Optional[Path] = None):
                 "CREATE UNIQUE INDEX IF NOT EXISTS session_events_session_seq_idx "
                 "ON session_events(session_id, seq)"
             )
+            if os.getenv("CODEX_LOG_FTS") == "1":
+                # optional FTS5 message index kept in sync by triggers
+                from .fts import ensure_fts
+
+                ensure_fts(conn, "session_events", "message")
             conn.commit()
         finally:
             conn.close()
@@ -186,6 +203,11 @@ def _fallback_log_event(
 ):
     p = init_db(db_path)
     key = str(p)
+    if USE_BATCH:
+        _batch_writer(p).submit(
+            (time.time(), session_id, role, message, json.dumps(meta) if meta else None)
+        )
+        return
     if USE_POOL:
         conn = CONN_POOL.get(key)
         if conn is None:
@@ -228,6 +250,176 @@ def _fallback_log_event(
             conn.close()
 
 
+_INSERT_EVENT_SQL = (
+    "INSERT INTO session_events(ts, session_id, role, message, seq, meta) VALUES(?,?,?,?,?,?)"
+)
+
+
+class _BatchWriter:
+    """Background thread inserting queued events for one database in batches.
+
+    Callers enqueue ``(ts, session_id, role, message, meta_json)`` tuples; the
+    bounded queue blocks producers when the writer falls behind. The thread
+    drains up to ``max_events`` per transaction with ``executemany`` and keeps
+    per-session ``seq`` counters in memory, seeded once from ``MAX(seq)``.
+    Counters are re-seeded if another writer inserted the same sequence.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        queue_size: int = BATCH_QUEUE_SIZE,
+        max_events: int = BATCH_MAX_EVENTS,
+        interval: float = BATCH_INTERVAL_S,
+    ) -> None:
+        self.db_path = db_path
+        self.max_events = max(1, int(max_events))
+        self.interval = max(0.0, float(interval))
+        self.written = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._seq: Dict[str, int] = {}
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"codex-session-writer:{db_path.name}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, event: tuple) -> None:
+        if self._closed:
+            raise RuntimeError("session event writer is closed")
+        self._queue.put(event)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event queued so far is committed (or ``timeout``)."""
+
+        if self._closed or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(("__flush__", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _next_seq(self, conn: sqlite3.Connection, session_id: str) -> int:
+        current = self._seq.get(session_id)
+        if current is None:
+            current = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM session_events WHERE session_id=?",
+                (session_id,),
+            ).fetchone()[0]
+        self._seq[session_id] = current + 1
+        return current + 1
+
+    def _write(self, conn: sqlite3.Connection, events: List[tuple]) -> None:
+        for attempt in range(2):
+            rows = [
+                (ts, sid, role, message, self._next_seq(conn, sid), meta)
+                for ts, sid, role, message, meta in events
+            ]
+            try:
+                with conn:
+                    conn.executemany(_INSERT_EVENT_SQL, rows)
+            except sqlite3.IntegrityError:
+                # another process advanced these sessions; reseed and retry once
+                for _, sid, *_rest in events:
+                    self._seq.pop(sid, None)
+                if attempt:
+                    raise
+                continue
+            self.written += len(rows)
+            return
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        _configure_connection(conn)
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                batch: List[tuple] = []
+                waiters: List[threading.Event] = []
+                deadline = time.monotonic() + self.interval
+                while True:
+                    if item is None:
+                        stopping = True
+                    elif item[0] == "__flush__":
+                        waiters.append(item[1])
+                    else:
+                        batch.append(item)
+                    if stopping or waiters or len(batch) >= self.max_events:
+                        break
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = (
+                            self._queue.get(timeout=remaining)
+                            if remaining > 0
+                            else self._queue.get_nowait()
+                        )
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        self._write(conn, batch)
+                    except Exception as exc:
+                        self.failed += len(batch)
+                        self._seq.clear()
+                        logging.getLogger(__name__).warning(
+                            "session event batch of %d dropped: %s", len(batch), exc
+                        )
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            conn.close()
+
+
+_BATCH_WRITERS: Dict[str, _BatchWriter] = {}
+
+
+def _batch_writer(path: Path) -> _BatchWriter:
+    key = str(path)
+    with _DB_LOCK:
+        writer = _BATCH_WRITERS.get(key)
+        if writer is None:
+            writer = _BatchWriter(path)
+            _BATCH_WRITERS[key] = writer
+        return writer
+
+
+def flush_events(db_path: Optional[Path] = None, timeout: Optional[float] = None) -> None:
+    """Wait until queued batch-mode events are committed.
+
+    Flushes the writer for ``db_path`` or, when omitted, every active writer.
+    A no-op unless ``CODEX_SQLITE_BATCH=1`` (or ``USE_BATCH``) queued events.
+    """
+
+    with _DB_LOCK:
+        if db_path is None:
+            writers = list(_BATCH_WRITERS.values())
+        else:
+            writer = _BATCH_WRITERS.get(str(Path(db_path)))
+            writers = [writer] if writer is not None else []
+    for writer in writers:
+        writer.flush(timeout)
+
+
+def _close_batch_writers() -> None:
+    with _DB_LOCK:
+        writers = list(_BATCH_WRITERS.values())
+        _BATCH_WRITERS.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(_close_batch_writers)
+
+
 def log_event(
     session_id: str,
     role: str,
@@ -367,6 +559,8 @@ class SessionLogger:
             import logging
 
             logging.exception("session_end DB log failed")
+        if USE_BATCH:
+            flush_events(self.db_path or _default_db_path())
         return False
 
     def log(self, role: str, message):
@@ -6,6 +6,7 @@ Usage:
       [--role user|assistant|system|tool] [--contains substring]
       [--after YYYY-MM-DD] [--before YYYY-MM-DD]
       [--order asc|desc] [--limit N] [--offset N] [--table logs]
+      [--search "terms" [--rank]]
 
 Environment:
     CODEX_LOG_DB_PATH   Path to SQLite file with log rows.
@@ -16,6 +17,11 @@ Examples:
     python -m codex.logging.session_query --session-id S123 --role user \
         --after 2025-01-01
 
+Search:
+    ``--search`` matches message text through the ``<table>_fts`` FTS5 index
+    when it exists (``codex.logging.fts.ensure_fts``) and otherwise falls back
+    to a LIKE scan. ``--rank`` orders FTS hits by bm25 relevance.
+
 Columns:
     Expects compatible column names (e.g., session_id/session, ts/timestamp,
     message/content, level/severity).
@@ -40,6 +46,7 @@ except Exception as exc:  # pragma: no cover - defensive
     logging.getLogger(__name__).debug("sqlite auto setup failed: %s", exc)
 
 from .config import DEFAULT_LOG_DB
+from .fts import fts_query, fts_table_for, match_filter, rank_join
 
 _IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
@@ -129,6 +136,9 @@ def fetch_rows(
     session_id: Optional[str],
     last_n: Optional[int],
     desc: bool,
+    *,
+    search: Optional[str] = None,
+    rank: bool = False,
 ) -> Tuple[List[sqlite3.Row], Dict[str, str]]:
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
@@ -146,14 +156,36 @@ def fetch_rows(
         select_list = ", ".join(select_cols)
         sql = f"SELECT {select_list} FROM {table}"
         params: List[object] = []
-        where_clause = ""
+        where: List[str] = []
+        join = ""
+        fts_table = fts_table_for(conn, table) if search else None
+        if rank and not fts_table:
+            raise RuntimeError("--rank requires --search and an FTS5 index on the table")
+        if search and fts_table and rank:
+            join = rank_join(table, fts_table)
+            params.append(fts_query(search))
+        elif search and fts_table:
+            where.append(match_filter(table, fts_table))
+            params.append(fts_query(search))
+        elif search:
+            where.append(f"LOWER({cols['message']}) LIKE ?")
+            params.append(f"%{search.lower()}%")
         if session_id:
             if not sid_col:
                 raise RuntimeError("Session filtering requested but no session id column found")
-            where_clause = f" WHERE {sid_col}=?"
+            where.append(f"{sid_col}=?")
             params.append(session_id)
+        where_clause = (" WHERE " + " AND ".join(where)) if where else ""
 
-        if last_n is not None:
+        if rank:
+            sql = (
+                f"SELECT {select_list} FROM {table}{join}{where_clause} "
+                f"ORDER BY _hits._rank ASC, {ts_col} {order_clause}"
+            )
+            if last_n is not None:
+                sql += " LIMIT ?"
+                params.append(last_n)
+        elif last_n is not None:
             inner_sql = (
                 f"SELECT {select_list} FROM {table}{where_clause} "
                 f"ORDER BY {ts_col} DESC LIMIT ?"
@@ -193,13 +225,19 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
         action="store_true",
         help="Sort output in descending order (default asc for session-id mode)",
     )
+    parser.add_argument("--search", help="Full-text search on messages (FTS5 when indexed)")
+    parser.add_argument(
+        "--rank", action="store_true", help="Order --search hits by relevance (needs FTS5)"
+    )
     args = parser.parse_args(list(argv) if argv is not None else None)
-    if args.session_id is None and args.last is None:
-        parser.error("Provide --session-id, --last, or both")
+    if args.session_id is None and args.last is None and args.search is None:
+        parser.error("Provide --session-id, --last, --search, or a combination")
 
     try:
         db = resolve_db_path(args.db)
-        rows, cols = fetch_rows(db, args.session_id, args.last, args.desc)
+        rows, cols = fetch_rows(
+            db, args.session_id, args.last, args.desc, search=args.search, rank=args.rank
+        )
         print_rows(rows, cols)
         return 0
     except Exception as exc:  # pragma: no cover - top-level guard
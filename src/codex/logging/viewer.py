@@ -8,6 +8,7 @@ Usage:
     python -m codex.logging.viewer --session-id <ID> [--db path/to.db]
       [--format json|text] [--level INFO --contains token]
       [--since 2025-01-01 --until 2025-12-31] [--limit 200] [--table logs]
+      [--search "timeout error"] [--page-size 200 --cursor TOKEN]
 
 Environment:
     CODEX_LOG_DB_PATH   Override default DB path (defaults to .codex/session_logs.db).
@@ -21,6 +22,10 @@ Examples:
 
 Notes:
     The README documents log viewing and exporting; flags here mirror that flow.
+    ``--search`` uses the ``<table>_fts`` FTS5 index when present (see
+    ``codex.logging.fts``) and falls back to a LIKE scan otherwise.
+    ``--page-size`` switches to keyset pagination; the cursor for the next page
+    is printed to stderr as ``next-cursor: TOKEN``.
 """
 
 from __future__ import annotations
@@ -51,6 +56,7 @@ except Exception:  # pragma: no cover - fallback for direct execution
     DEFAULT_LOG_DB = Path(".codex/session_logs.db")
 
 from .db_utils import get_columns, list_tables, resolve_db_path
+from .fts import KeysetKey, decode_cursor, encode_cursor, fts_query, fts_table_for, match_filter
 
 CANDIDATE_TS = ["ts", "timestamp", "time", "created_at", "logged_at"]
 CANDIDATE_SID = ["session_id", "session", "sid", "context_id"]
@@ -93,6 +99,9 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--since", help="ISO date/time lower bound (inclusive)")
     parser.add_argument("--until", help="ISO date/time upper bound (inclusive)")
     parser.add_argument("--limit", type=int, help="Max rows to return")
+    parser.add_argument("--search", help="Full-text search on messages (FTS5 when indexed)")
+    parser.add_argument("--page-size", type=int, help="Keyset page size (see --cursor)")
+    parser.add_argument("--cursor", help="Cursor printed by the previous page")
     parser.add_argument(
         "--table",
         type=_validate_table_name,
@@ -178,6 +187,11 @@ def build_query(
     since: Optional[str],
     until: Optional[str],
     limit: Optional[int],
+    *,
+    search: Optional[str] = None,
+    fts_table: Optional[str] = None,
+    keyset: bool = False,
+    cursor: Optional[KeysetKey] = None,
 ) -> Tuple[str, List[Any]]:
     table = schema["table"]
     sid_col = schema["sid"]
@@ -198,6 +212,12 @@ def build_query(
     if contains:
         where.append(f"LOWER({msg_col}) LIKE ?")
         args.append(f"%{contains.lower()}%")
+    if search and fts_table:
+        where.append(match_filter(table, fts_table))
+        args.append(fts_query(search))
+    elif search:
+        where.append(f"LOWER({msg_col}) LIKE ?")
+        args.append(f"%{search.lower()}%")
     since_iso = parse_iso(since)
     until_iso = parse_iso(until)
     if since_iso:
@@ -206,8 +226,15 @@ def build_query(
     if until_iso:
         where.append(f"{ts_col} <= ?")
         args.append(until_iso)
+    keyset = keyset or cursor is not None
+    if cursor is not None:
+        where.append(f"({ts_col}, rowid) > (?, ?)")
+        args.extend(cursor)
     where_clause = " AND ".join(where)
-    query = f"SELECT * FROM {table} WHERE {where_clause} ORDER BY {ts_col} ASC"  # nosec B608
+    select = "*, rowid AS _rowid" if keyset else "*"
+    query = f"SELECT {select} FROM {table} WHERE {where_clause} ORDER BY {ts_col} ASC"  # nosec B608
+    if keyset:
+        query += ", rowid ASC"
     if limit:
         query += " LIMIT ?"
         args.append(int(limit))
@@ -235,16 +262,33 @@ def main(argv: Optional[List[str]] = None) -> int:
     try:
         conn = connect_db(db_path)
         schema = infer_schema(conn, ns.table)
+        keyset = ns.page_size is not None or ns.cursor is not None
+        limit = ns.page_size if ns.page_size is not None else ns.limit
         query, args = build_query(
-            schema, ns.level, ns.contains, ns.since, ns.until, ns.limit
+            schema,
+            ns.level,
+            ns.contains,
+            ns.since,
+            ns.until,
+            limit,
+            search=ns.search,
+            fts_table=fts_table_for(conn, schema["table"]) if ns.search else None,
+            keyset=keyset,
+            cursor=decode_cursor(ns.cursor) if ns.cursor else None,
         )
         args[0] = ns.session_id
         rows = conn.execute(query, args).fetchall()
+        if keyset and limit and len(rows) >= limit:
+            last = rows[-1]
+            token = encode_cursor(last[schema["ts"]], last["_rowid"])
+            print(f"next-cursor: {token}", file=sys.stderr)
+        records = [dict(r) for r in rows]
+        for record in records:
+            record.pop("_rowid", None)
         if ns.format == "json":
-            print(json.dumps([dict(r) for r in rows], ensure_ascii=False, indent=2))
+            print(json.dumps(records, ensure_ascii=False, indent=2))
         else:
-            for row in rows:
-                d = dict(row)
+            for d in records:
                 ts = d.get(schema["ts"], "")
                 lvl = d.get(schema.get("lvl") or "", "")
                 msg = d.get(schema["msg"], "")
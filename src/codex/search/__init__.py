@@ -1,5 +1,6 @@
 """Search provider plugin architecture for codex."""
 
+from .index import TrigramIndex
 from .providers import (
     ExternalWebSearch,
     InternalRepoSearch,
@@ -12,4 +13,5 @@ __all__ = [
     "InternalRepoSearch",
     "ExternalWebSearch",
     "SearchRegistry",
+    "TrigramIndex",
 ]
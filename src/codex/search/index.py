@@ -0,0 +1,339 @@
+"""Persistent trigram index backing :class:`codex.search.providers.InternalRepoSearch`.
+
+The index lives in a small SQLite database (by default
+``<root>/.codex/search_index.sqlite``) holding one row per file
+(path, ``mtime_ns``, size) and a ``(trigram, file_id)`` posting table. Each
+refresh re-stats the tree and re-reads only files whose mtime or size changed,
+so repeated queries cost a stat walk rather than a full content scan.
+
+A query is narrowed to candidate files by intersecting the postings of the
+trigrams in its required literal fragments (see :func:`required_literals`);
+callers then confirm candidates line by line. Binary files and hidden entries
+are skipped, mirroring ``rg`` defaults. Inside a git work tree the file list
+comes from ``git ls-files --exclude-standard`` so ``.gitignore`` rules apply as
+they do for ``rg``; ``.ignore``/``.rgignore`` files are not consulted. Files
+above ``max_file_bytes`` are not tokenised and are always returned as
+candidates so results stay complete.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import sqlite3
+import stat
+import subprocess
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_INDEX_PATH = Path(".codex") / "search_index.sqlite"
+DEFAULT_SKIP_DIRS = frozenset({"node_modules", "__pycache__", "venv", "build", "dist"})
+
+_REGEX_META = set(".^$[](){}|\\")
+_OPTIONAL_QUANTIFIERS = set("?*{")
+
+# files.indexed states
+_UNINDEXED, _TEXT, _BINARY = 0, 1, 2
+
+
+def trigrams(data: bytes) -> Set[int]:
+    """Return the distinct byte trigrams of ``data`` packed into 24-bit ints."""
+
+    return {
+        (data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)
+    }
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Literal fragments every match of the regex ``pattern`` must contain.
+
+    The analysis is deliberately conservative: patterns with alternation or
+    groups yield no fragments (no pruning), characters made optional by
+    ``?``/``*``/``{`` are dropped, and escapes such as ``\\d`` end a fragment.
+    A pattern without metacharacters is returned whole.
+    """
+
+    if re.search(r"(?<!\\)(?:\\\\)*[|(]", pattern):
+        return []
+    fragments: List[str] = []
+    current: List[str] = []
+
+    def _flush() -> None:
+        if current:
+            fragments.append("".join(current))
+            current.clear()
+
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            i += 2
+            if nxt.isalnum():
+                _flush()
+                continue
+            ch = nxt
+        elif ch in _REGEX_META:
+            _flush()
+            if ch == "[":
+                close = pattern.find("]", i + 2)
+                i = close + 1 if close != -1 else len(pattern)
+            elif ch == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close != -1 else len(pattern)
+            else:
+                i += 1
+            continue
+        elif ch in "+?*":
+            _flush()
+            i += 1
+            continue
+        else:
+            i += 1
+        if i < len(pattern) and pattern[i] in _OPTIONAL_QUANTIFIERS:
+            _flush()
+            continue
+        current.append(ch)
+    _flush()
+    return [frag for frag in fragments if frag]
+
+
+def is_literal(pattern: str) -> bool:
+    """True when ``pattern`` contains no regex metacharacters."""
+
+    return not any(ch in _REGEX_META or ch in "?*+" for ch in pattern)
+
+
+class TrigramIndex:
+    """Incrementally maintained on-disk trigram index over a directory tree."""
+
+    def __init__(
+        self,
+        root: Path,
+        index_path: Optional[Path] = None,
+        *,
+        max_file_bytes: int = 4 * 1024 * 1024,
+        refresh_interval: float = 1.0,
+        skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.index_path = Path(index_path) if index_path else self.root / DEFAULT_INDEX_PATH
+        self.max_file_bytes = max_file_bytes
+        self.refresh_interval = refresh_interval
+        self.skip_dirs = frozenset(skip_dirs)
+        self._last_refresh = float("-inf")
+        self._lock = threading.Lock()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+        except sqlite3.Error:
+            pass
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files(
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                indexed INTEGER NOT NULL,
+                grams BLOB
+            );
+            CREATE TABLE IF NOT EXISTS postings(
+                tri INTEGER NOT NULL,
+                file_id INTEGER NOT NULL,
+                PRIMARY KEY (tri, file_id)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------ walk
+    def _git_files(self) -> Optional[List[str]]:
+        """Tracked and unignored untracked files, or ``None`` outside a git work tree."""
+
+        if shutil.which("git") is None:
+            return None
+        try:
+            completed = subprocess.run(
+                ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+                cwd=self.root,
+                check=True,
+                capture_output=True,
+                timeout=60,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return sorted({rel for rel in os.fsdecode(completed.stdout).split("\0") if rel})
+
+    def _walk(self) -> Iterator[Tuple[str, os.stat_result]]:
+        index_file = self.index_path.resolve()
+        listed = self._git_files()
+        if listed is not None:
+            for rel in listed:
+                parts = rel.split("/")
+                if any(part.startswith(".") for part in parts):
+                    continue
+                if any(part in self.skip_dirs for part in parts[:-1]):
+                    continue
+                path = self.root / rel
+                if path == index_file:
+                    continue
+                try:
+                    st = path.lstat()
+                except OSError:
+                    # deleted but still tracked
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield rel, st
+            return
+        stack = [self.root]
+        while stack:
+            base = stack.pop()
+            try:
+                entries = list(os.scandir(base))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.skip_dirs:
+                            stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        path = Path(entry.path)
+                        if path == index_file:
+                            continue
+                        rel = path.relative_to(self.root).as_posix()
+                        yield rel, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+    def _read_grams(self, rel: str, size: int) -> Tuple[int, Set[int]]:
+        """Return the ``files.indexed`` state and trigram set for ``rel``."""
+
+        if size > self.max_file_bytes:
+            return _UNINDEXED, set()
+        try:
+            data = (self.root / rel).read_bytes()
+        except OSError:
+            return _UNINDEXED, set()
+        if b"\0" in data[:8192]:
+            return _BINARY, set()
+        return _TEXT, trigrams(data)
+
+    # --------------------------------------------------------------- refresh
+    def refresh(self, *, force: bool = False) -> int:
+        """Re-index changed files; returns how many files were (re)indexed."""
+
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return 0
+            known = {
+                path: (file_id, mtime, size)
+                for file_id, path, mtime, size in self._conn.execute(
+                    "SELECT id, path, mtime_ns, size FROM files"
+                )
+            }
+            changed = 0
+            with self._conn:
+                for rel, st in self._walk():
+                    previous = known.pop(rel, None)
+                    if previous and previous[1:] == (st.st_mtime_ns, st.st_size):
+                        continue
+                    if previous:
+                        self._drop(previous[0])
+                    indexed, grams = self._read_grams(rel, st.st_size)
+                    packed = array("I", sorted(grams)).tobytes()
+                    cur = self._conn.execute(
+                        "INSERT INTO files(path, mtime_ns, size, indexed, grams) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (rel, st.st_mtime_ns, st.st_size, indexed, packed),
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO postings(tri, file_id) VALUES (?, ?)",
+                        ((gram, cur.lastrowid) for gram in grams),
+                    )
+                    changed += 1
+                for file_id, _, _ in known.values():
+                    self._drop(file_id)
+            self._last_refresh = time.monotonic()
+            return changed
+
+    def _drop(self, file_id: int) -> None:
+        row = self._conn.execute("SELECT grams FROM files WHERE id=?", (file_id,)).fetchone()
+        if row and row[0]:
+            grams = array("I")
+            grams.frombytes(row[0])
+            self._conn.executemany(
+                "DELETE FROM postings WHERE tri=? AND file_id=?",
+                ((gram, file_id) for gram in grams),
+            )
+        self._conn.execute("DELETE FROM files WHERE id=?", (file_id,))
+
+    # ---------------------------------------------------------------- lookup
+    def candidates(self, literals: Iterable[str]) -> List[str]:
+        """Relative paths of files that may contain every fragment in ``literals``.
+
+        Fragments shorter than three bytes cannot be looked up and do not
+        narrow the result; with no usable fragment every text file is returned.
+        """
+
+        grams: Set[int] = set()
+        for literal in literals:
+            grams |= trigrams(literal.encode("utf-8"))
+        with self._lock:
+            if not grams:
+                rows = self._conn.execute(
+                    "SELECT path FROM files WHERE indexed != ? ORDER BY path", (_BINARY,)
+                ).fetchall()
+                return [row[0] for row in rows]
+            ids: Optional[Set[int]] = None
+            # rarest trigrams first keeps the running intersection small
+            ordered = sorted(
+                grams,
+                key=lambda g: self._conn.execute(
+                    "SELECT COUNT(*) FROM postings WHERE tri=?", (g,)
+                ).fetchone()[0],
+            )
+            for gram in ordered:
+                found = {
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT file_id FROM postings WHERE tri=?", (gram,)
+                    )
+                }
+                ids = found if ids is None else ids & found
+                if not ids:
+                    break
+            ids = ids or set()
+            unindexed = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT id FROM files WHERE indexed = ?", (_UNINDEXED,)
+                )
+            }
+            wanted = sorted(ids | unindexed)
+            paths: List[str] = []
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start : start + 500]
+                marks = ",".join("?" for _ in chunk)
+                paths.extend(
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT path FROM files WHERE id IN ({marks})", chunk
+                    )
+                )
+            return sorted(paths)
+
+
+__all__ = ["TrigramIndex", "is_literal", "required_literals", "trigrams"]
@@ -11,20 +11,35 @@ from __future__ import annotations
 
 import abc
 import json
+import logging
+import re
+import shutil
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from tools.security import net
 
+from .index import TrigramIndex, is_literal, required_literals
+
+logger = logging.getLogger(__name__)
+
 
 class SearchProvider(abc.ABC):
     """Abstract base class for search providers."""
 
     @abc.abstractmethod
-    def search(self, query: str) -> List[Dict[str, Any]]:
-        """Search for *query* and return a list of results."""
+    def search(self, query: str, **options: Any) -> List[Dict[str, Any]]:
+        """Search for *query* and return a list of results.
+
+        ``options`` are passed through from :meth:`SearchRegistry.search`;
+        providers ignore the ones they do not understand.
+        """
 
 
 @dataclass
@@ -35,14 +50,37 @@ class InternalRepoSearch(SearchProvider):
     ----------
     root:
         Directory to search. Defaults to the current working directory.
+    use_index:
+        Answer queries from a persistent :class:`~codex.search.index.TrigramIndex`
+        instead of scanning the whole tree with ``rg`` each time. Literal
+        queries are confirmed in-process; regex queries run ``rg`` over the
+        candidate files only (Python ``re`` when ``rg`` is unavailable). If the
+        index cannot be opened or read, the failure is logged and the query
+        falls back to a plain ``rg`` scan.
+    index_path:
+        Location of the index database (default ``<root>/.codex/search_index.sqlite``).
     """
 
     root: Path = Path.cwd()
+    use_index: bool = False
+    index_path: Optional[Path] = None
+    _index: Optional[TrigramIndex] = field(default=None, init=False, repr=False, compare=False)
 
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    def search(self, query: str, **options: Any) -> List[Dict[str, Any]]:
+        if self.use_index:
+            try:
+                return self._indexed_search(query)
+            except Exception:
+                logger.warning(
+                    "search index for %s unusable; falling back to rg", self.root, exc_info=True
+                )
+                return self._rg(query, [str(self.root)])
+        return self._rg(query, [str(self.root)])
+
+    def _rg(self, query: str, paths: List[str]) -> List[Dict[str, Any]]:
         try:
             completed = subprocess.run(
-                ["rg", "--json", query, str(self.root)],
+                ["rg", "--json", query, *paths],
                 check=True,
                 capture_output=True,
                 text=True,
@@ -64,6 +102,44 @@ class InternalRepoSearch(SearchProvider):
                     results.append({"path": path, "line": line_text})
         return results
 
+    def _indexed_search(self, query: str) -> List[Dict[str, Any]]:
+        if self._index is None:
+            self._index = TrigramIndex(self.root, self.index_path)
+        self._index.refresh()
+        literal = is_literal(query)
+        candidates = self._index.candidates([query] if literal else required_literals(query))
+        paths = [str(self.root / rel) for rel in candidates]
+        if not paths:
+            return []
+        if not literal and shutil.which("rg"):
+            results: List[Dict[str, Any]] = []
+            # bounded argv per rg invocation
+            for start in range(0, len(paths), 512):
+                results.extend(self._rg(query, paths[start : start + 512]))
+            return results
+        if literal:
+            needle = query.encode("utf-8")
+
+            def matches(line: bytes) -> bool:
+                return needle in line
+
+        else:
+            pattern = re.compile(query.encode("utf-8"))
+
+            def matches(line: bytes) -> bool:
+                return pattern.search(line) is not None
+
+        results = []
+        for path in paths:
+            try:
+                data = Path(path).read_bytes()
+            except OSError:
+                continue
+            for line in data.split(b"\n"):
+                if matches(line):
+                    results.append({"path": path, "line": line.decode("utf-8", "replace")})
+        return results
+
 
 @dataclass
 class ExternalWebSearch(SearchProvider):
@@ -73,7 +149,7 @@ class ExternalWebSearch(SearchProvider):
     the rest of the system to continue operating.
     """
 
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    def search(self, query: str, **options: Any) -> List[Dict[str, Any]]:
         import urllib.error
         import urllib.parse
 
@@ -96,23 +172,160 @@ class ExternalWebSearch(SearchProvider):
 
 
 class SearchRegistry:
-    """Registry aggregating search providers."""
+    """Registry aggregating search providers.
+
+    Providers run concurrently. Each gets ``provider_timeout`` seconds and the
+    whole call is bounded by ``deadline`` seconds; providers that miss either
+    are reported in :attr:`last_status` and their results are omitted, so a
+    slow backend delays the answer by at most the deadline. Merged results
+    keep provider order, then each provider's own order, with exact duplicates
+    removed. With a positive ``cache_ttl`` (off by default) successful provider
+    answers are cached for that many seconds keyed on
+    ``(provider, query, options)``.
+    """
 
-    def __init__(self, enable_external: bool = False, root: Optional[Path] = None):
-        self.providers: List[SearchProvider] = [InternalRepoSearch(root=root or Path.cwd())]
+    def __init__(
+        self,
+        enable_external: bool = False,
+        root: Optional[Path] = None,
+        use_index: bool = False,
+        *,
+        provider_timeout: Optional[float] = 10.0,
+        deadline: Optional[float] = 15.0,
+        cache_ttl: float = 0.0,
+        cache_size: int = 256,
+    ):
+        self.providers: List[SearchProvider] = [
+            InternalRepoSearch(root=root or Path.cwd(), use_index=use_index)
+        ]
         if enable_external:
             self.providers.append(ExternalWebSearch())
+        self.provider_timeout = provider_timeout
+        self.deadline = deadline
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.last_status: Dict[str, str] = {}
+        self._cache: "OrderedDict[Tuple[Any, ...], Tuple[float, List[Dict[str, Any]]]]" = (
+            OrderedDict()
+        )
+        self._cache_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
 
-    def search(self, query: str) -> List[Dict[str, Any]]:
-        """Search all providers and concatenate their results."""
+    def _provider_key(self, index: int, provider: SearchProvider) -> str:
+        return f"{index}:{type(provider).__name__}"
 
-        results: List[Dict[str, Any]] = []
-        for provider in self.providers:
-            try:
-                results.extend(provider.search(query))
-            except Exception:
-                # Each provider is responsible for handling its own errors. If
-                # an unexpected exception bubbles up we swallow it here so that
-                # other providers still run.
+    def _cache_get(self, key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        if self.cache_ttl <= 0:
+            return None
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is None:
+                return None
+            stored_at, results = hit
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return list(results)
+
+    def _cache_put(self, key: Tuple[Any, ...], results: List[Dict[str, Any]]) -> None:
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), list(results))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # extra headroom so providers stuck past a deadline do not starve later calls
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(4, 2 * len(self.providers)), thread_name_prefix="codex-search"
+            )
+        return self._executor
+
+    def search(
+        self,
+        query: str,
+        *,
+        deadline: Optional[float] = None,
+        provider_timeout: Optional[float] = None,
+        **options: Any,
+    ) -> List[Dict[str, Any]]:
+        """Search all providers concurrently and merge their results.
+
+        ``options`` are forwarded to each provider's ``search`` and are part of
+        the cache key. ``deadline``/``provider_timeout`` override the registry
+        defaults for this call.
+        """
+
+        overall = self.deadline if deadline is None else deadline
+        per_provider = self.provider_timeout if provider_timeout is None else provider_timeout
+        option_key = tuple(sorted((k, repr(v)) for k, v in options.items()))
+        started = time.monotonic()
+        status: Dict[str, str] = {}
+        answers: Dict[int, List[Dict[str, Any]]] = {}
+        pending: Dict[Future, Tuple[int, Tuple[Any, ...]]] = {}
+
+        for index, provider in enumerate(self.providers):
+            name = self._provider_key(index, provider)
+            cache_key = (name, query, option_key)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                answers[index] = cached
+                status[name] = "cached"
                 continue
-        return results
+            future = self._pool().submit(provider.search, query, **options)
+            pending[future] = (index, cache_key)
+
+        end_all = started + overall if overall is not None else None
+        while pending:
+            now = time.monotonic()
+            budgets = []
+            if end_all is not None:
+                budgets.append(end_all - now)
+            if per_provider is not None:
+                budgets.append(started + per_provider - now)
+            wait_for = max(0.0, min(budgets)) if budgets else None
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                index, cache_key = pending.pop(future)
+                name = cache_key[0]
+                try:
+                    results = list(future.result())
+                except Exception:
+                    # Each provider is responsible for handling its own errors. If
+                    # an unexpected exception bubbles up we swallow it here so that
+                    # other providers still contribute.
+                    status[name] = "error"
+                    continue
+                answers[index] = results
+                status[name] = "ok"
+                self._cache_put(cache_key, results)
+        for future, (_, cache_key) in pending.items():
+            future.cancel()
+            status[cache_key[0]] = "timeout"
+        self.last_status = status
+
+        merged: List[Dict[str, Any]] = []
+        seen: set[str] = set()
+        for index in sorted(answers):
+            for result in answers[index]:
+                marker = json.dumps(result, sort_keys=True, default=str)
+                if marker in seen:
+                    continue
+                seen.add(marker)
+                merged.append(result)
+        return merged
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -7,12 +7,22 @@ import importlib
 import json
 import logging
 import os
-from collections.abc import Iterable, Mapping, Sequence
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from types import ModuleType
 from typing import Any
 
 from codex.zendesk.monitoring.zendesk_metrics import metrics as _metrics
+from codex.zendesk.transport import (
+    RateLimiter,
+    RestClient,
+    RetryPolicy,
+    call_with_retry,
+    retry_hint,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +41,30 @@ _RESOURCE_ENDPOINTS: dict[str, tuple[str, str]] = {
     "slas": ("sla_policies", "SLAPolicy"),
 }
 
+# REST payload wrapper key per endpoint ({"trigger": {...}})
+_REST_SINGULAR: dict[str, str] = {
+    "triggers": "trigger",
+    "ticket_fields": "ticket_field",
+    "ticket_forms": "ticket_form",
+    "groups": "group",
+    "macros": "macro",
+    "views": "view",
+    "webhooks": "webhook",
+    "sla_policies": "sla_policy",
+}
+
+# resources referenced by others go first: forms list fields, rules and views use groups
+APPLY_ORDER: tuple[str, ...] = (
+    "groups",
+    "fields",
+    "forms",
+    "webhooks",
+    "slas",
+    "macros",
+    "views",
+    "triggers",
+)
+
 
 def _evidence_dir() -> Path:
     base = Path(os.getenv("CODEX_EVIDENCE_DIR", ".codex/evidence")).resolve()
@@ -57,11 +91,7 @@ def _emit_evidence(resource: str, operation: Mapping[str, Any], env: str, phase:
 
 def _emit_apply_evidence(resource: str, operations: Sequence[Mapping[str, Any]], env: str) -> None:
     for entry in operations:
-        payload = entry.get("data") or entry.get("value") or {}
-        if hasattr(payload, "model_dump"):
-            payload = payload.model_dump()
-        if not isinstance(payload, Mapping):
-            payload = {}
+        payload = _operation_payload(entry)
         action = entry.get("action") or entry.get("op")
         name = _operation_name(resource, entry, payload)
         _emit_evidence(
@@ -85,6 +115,13 @@ _RESOURCE_NAME_FIELDS: dict[str, tuple[str, ...]] = {
 
 
 def _get_client(env: str):
+    prefix = f"ZENDESK_{env.upper()}_"
+    base_url = os.getenv(f"{prefix}URL")
+    if base_url:
+        return RestClient(
+            base_url, email=os.getenv(f"{prefix}EMAIL"), token=os.getenv(f"{prefix}TOKEN")
+        )
+
     module_spec = importlib.util.find_spec("zenpy")
     if module_spec is None:
         LOGGER.error("Zenpy package is not installed; cannot apply changes.")
@@ -95,7 +132,6 @@ def _get_client(env: str):
         LOGGER.error("Zenpy client class is unavailable; cannot apply changes.")
         return None
 
-    prefix = f"ZENDESK_{env.upper()}_"
     subdomain = os.getenv(f"{prefix}SUBDOMAIN")
     email = os.getenv(f"{prefix}EMAIL")
     token = os.getenv(f"{prefix}TOKEN")
@@ -123,26 +159,6 @@ def _get_api_class(class_name: str):
     return getattr(module, class_name, None)
 
 
-def _list_existing(endpoint: Any) -> list[Any]:
-    if endpoint is None:
-        return []
-    try:
-        if callable(endpoint):
-            result = endpoint()
-        elif hasattr(endpoint, "list") and callable(endpoint.list):
-            result = endpoint.list()
-        else:
-            return []
-        if result is None:
-            return []
-        if isinstance(result, list):
-            return result
-        return list(result)
-    except Exception as exc:  # pragma: no cover - network interactions mocked in tests
-        LOGGER.debug("Unable to enumerate existing resources: %s", exc)
-        return []
-
-
 def _operation_name(resource: str, entry: Mapping[str, Any], data: Mapping[str, Any]) -> str:
     name = entry.get("name")
     if isinstance(name, str) and name:
@@ -161,20 +177,49 @@ def _operation_name(resource: str, entry: Mapping[str, Any], data: Mapping[str,
     return ""
 
 
-def _find_existing(existing: list[Any], resource: str, name: str):
-    if not name:
-        return None
-    for item in existing:
-        for field in _RESOURCE_NAME_FIELDS.get(resource, ("name", "title", "id")):
-            value = getattr(item, field, None)
-            if value is None:
-                continue
-            if str(value) == name:
-                return item
-    return None
+def _item_value(item: Any, field_name: str) -> Any:
+    if isinstance(item, Mapping):
+        return item.get(field_name)
+    return getattr(item, field_name, None)
 
 
-def _apply_patch_set(target: Any, patches: Sequence[Mapping[str, Any]]) -> None:
+class _ResourceIndex:
+    """Name/title/id lookup over one resource listing.
+
+    Each key maps to the items carrying it in listing order, so :meth:`find`
+    returns the same item a linear scan of the listing would.
+    """
+
+    def __init__(self, resource: str, items: Iterable[Any]) -> None:
+        self.fields = _RESOURCE_NAME_FIELDS.get(resource, ("name", "title", "id"))
+        self._items: dict[str, list[Any]] = {}
+        for item in items:
+            self.add(item)
+
+    def _keys(self, item: Any) -> set[str]:
+        values = (_item_value(item, name) for name in self.fields)
+        return {str(value) for value in values if value is not None}
+
+    def add(self, item: Any) -> None:
+        for key in self._keys(item):
+            self._items.setdefault(key, []).append(item)
+
+    def discard(self, item: Any) -> None:
+        for key in self._keys(item):
+            bucket = self._items.get(key, [])
+            bucket[:] = [other for other in bucket if other is not item]
+
+    def find(self, name: str) -> Any:
+        if not name:
+            return None
+        bucket = self._items.get(name)
+        return bucket[0] if bucket else None
+
+
+def _patch_fields(patches: Sequence[Mapping[str, Any]]) -> dict[str, Any]:
+    """Map each patch to the top-level attribute it replaces."""
+
+    updates: dict[str, Any] = {}
     for patch in patches:
         path = patch.get("path")
         if not isinstance(path, str):
@@ -183,65 +228,255 @@ def _apply_patch_set(target: Any, patches: Sequence[Mapping[str, Any]]) -> None:
         if not attr:
             continue
         if "value" in patch:
-            setattr(target, attr, patch.get("value"))
+            updates[attr] = patch.get("value")
+    return updates
 
 
-def _apply_named_resource(
-    resource: str,
-    plan_data: Any,
-    env: str,
-    dry_run: bool,
-) -> None:
-    endpoint_attr, class_name = _RESOURCE_ENDPOINTS[resource]
-    operations = _extract_operations(plan_data, resource)
-    _log_pending(resource, operations, env)
-    if not operations:
-        return
-    if dry_run:
-        LOGGER.info("Dry-run enabled; skipping apply for resource '%s'.", resource)
-        return
+def _apply_patch_set(target: Any, patches: Sequence[Mapping[str, Any]]) -> None:
+    for attr, value in _patch_fields(patches).items():
+        setattr(target, attr, value)
 
-    client = _get_client(env)
-    if client is None:
-        return
-    endpoint = getattr(client, endpoint_attr, None)
-    if endpoint is None:
-        LOGGER.error(
-            "Zendesk client does not expose endpoint '%s' for resource '%s'.",
-            endpoint_attr,
-            resource,
+
+Call = Callable[..., Any]
+
+
+class _ZenpyBackend:
+    """Resource operations through a zenpy client."""
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+        self._endpoints: dict[str, tuple[Any, Any]] = {}
+
+    def prepare(self, resource: str) -> bool:
+        if resource in self._endpoints:
+            return True
+        endpoint_attr, class_name = _RESOURCE_ENDPOINTS[resource]
+        endpoint = getattr(self.client, endpoint_attr, None)
+        if endpoint is None:
+            LOGGER.error(
+                "Zendesk client does not expose endpoint '%s' for resource '%s'.",
+                endpoint_attr,
+                resource,
+            )
+            return False
+        api_class = _get_api_class(class_name)
+        if api_class is None:
+            LOGGER.error("Zenpy API object '%s' not found; cannot apply %s.", class_name, resource)
+            return False
+        self._endpoints[resource] = (endpoint, api_class)
+        return True
+
+    def supports(self, resource: str, method: str) -> bool:
+        endpoint, _api_class = self._endpoints[resource]
+        return callable(getattr(endpoint, method, None))
+
+    def list(self, resource: str, call: Call) -> list[Any]:
+        endpoint, _api_class = self._endpoints[resource]
+        if callable(endpoint):
+            fetch = endpoint
+        elif hasattr(endpoint, "list") and callable(endpoint.list):
+            fetch = endpoint.list
+        else:
+            return []
+        # zenpy pages lazily, so drain the generator inside the retried call
+        return call(lambda: list(fetch() or []))
+
+    def create(self, resource: str, payload: Mapping[str, Any]) -> Any:
+        endpoint, api_class = self._endpoints[resource]
+        return endpoint.create(api_class(**payload))
+
+    def update(self, resource: str, target: Any, changes: Sequence[Mapping[str, Any]]) -> Any:
+        endpoint, _api_class = self._endpoints[resource]
+        _apply_patch_set(target, changes)
+        endpoint.update(target)
+        return target
+
+    def delete(self, resource: str, target: Any) -> None:
+        endpoint, _api_class = self._endpoints[resource]
+        endpoint.delete(target)
+
+
+class _RestBackend:
+    """Resource operations through :class:`~codex.zendesk.transport.RestClient`."""
+
+    def __init__(self, client: RestClient) -> None:
+        self.client = client
+
+    def prepare(self, resource: str) -> bool:
+        return True
+
+    def supports(self, resource: str, method: str) -> bool:
+        return True
+
+    def _names(self, resource: str) -> tuple[str, str]:
+        endpoint = _RESOURCE_ENDPOINTS[resource][0]
+        return endpoint, _REST_SINGULAR[endpoint]
+
+    def list(self, resource: str, call: Call) -> list[Any]:
+        endpoint, _singular = self._names(resource)
+        items: list[Any] = []
+        url: str | None = f"{endpoint}.json"
+        while url:
+            page = call(lambda url=url: self.client.request("GET", url)) or {}
+            items.extend(page.get(endpoint) or [])
+            url = RestClient.next_page(page)
+        return items
+
+    def create(self, resource: str, payload: Mapping[str, Any]) -> Any:
+        endpoint, singular = self._names(resource)
+        response = self.client.request("POST", f"{endpoint}.json", {singular: dict(payload)})
+        return (response or {}).get(singular)
+
+    def update(self, resource: str, target: Any, changes: Sequence[Mapping[str, Any]]) -> Any:
+        endpoint, singular = self._names(resource)
+        body = {singular: _patch_fields(changes)}
+        response = self.client.request("PUT", f"{endpoint}/{target['id']}.json", body)
+        return (response or {}).get(singular) or {**target, **body[singular]}
+
+    def delete(self, resource: str, target: Any) -> None:
+        endpoint, _singular = self._names(resource)
+        self.client.request("DELETE", f"{endpoint}/{target['id']}.json")
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        LOGGER.warning("Ignoring non-numeric %s=%r.", name, raw)
+        return default
+
+
+@dataclass(frozen=True)
+class ApplyOptions:
+    """Concurrency, rate limit and retry settings for an apply run.
+
+    :meth:`from_env` reads ``CODEX_ZENDESK_APPLY_WORKERS``, ``CODEX_ZENDESK_RPM``
+    (requests per minute), ``CODEX_ZENDESK_BURST`` and
+    ``CODEX_ZENDESK_MAX_RETRIES``.
+    """
+
+    workers: int = 8
+    requests_per_minute: float = 400.0
+    burst: int = 10
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+
+    @classmethod
+    def from_env(cls) -> ApplyOptions:
+        default = cls()
+        retries = _env_number("CODEX_ZENDESK_MAX_RETRIES", default.retry.max_retries)
+        return cls(
+            workers=max(1, int(_env_number("CODEX_ZENDESK_APPLY_WORKERS", default.workers))),
+            requests_per_minute=_env_number("CODEX_ZENDESK_RPM", default.requests_per_minute),
+            burst=max(1, int(_env_number("CODEX_ZENDESK_BURST", default.burst))),
+            retry=RetryPolicy(max_retries=max(0, int(retries))),
         )
-        return
 
-    api_class = _get_api_class(class_name)
-    if api_class is None:
-        LOGGER.error("Zenpy API object '%s' not found; cannot apply %s.", class_name, resource)
-        return
 
-    existing_items = _list_existing(endpoint)
-    create_fn = getattr(endpoint, "create", None)
-    update_fn = getattr(endpoint, "update", None)
-    delete_fn = getattr(endpoint, "delete", None)
+def _count(name: str, amount: int = 1) -> None:
+    try:
+        _metrics.emit_counter(name, amount)
+    except Exception:  # pragma: no cover - metrics are best effort in offline runs
+        LOGGER.debug("Skipping metrics emission for '%s'.", name)
 
-    successful_ops: list[Mapping[str, Any]] = []
 
-    for entry in operations:
+class ApplySession:
+    """State shared by every operation of one apply run.
+
+    Holds the client, a :class:`~codex.zendesk.transport.RateLimiter` and each
+    resource's listing, fetched once and indexed by name/title/id. Operations
+    on different names run concurrently on ``options.workers`` threads;
+    operations that share a name run in plan order.
+    """
+
+    def __init__(self, client: Any, env: str, options: ApplyOptions | None = None) -> None:
+        self.env = env
+        self.options = options or ApplyOptions.from_env()
+        self.limiter = RateLimiter(self.options.requests_per_minute, self.options.burst)
+        if isinstance(client, RestClient):
+            self.backend: Any = _RestBackend(client)
+        else:
+            self.backend = _ZenpyBackend(client)
+        self._indexes: dict[str, _ResourceIndex] = {}
+        self._lock = threading.Lock()
+
+    def _call(self, fn: Callable[[], Any], *, idempotent: bool = True) -> Any:
+        def counted() -> Any:
+            _count("zendesk_api_calls_total")
+            return fn()
+
+        return call_with_retry(
+            counted,
+            limiter=self.limiter,
+            policy=self.options.retry,
+            idempotent=idempotent,
+            on_retry=self._on_retry,
+        )
+
+    @staticmethod
+    def _on_retry(exc: BaseException, delay: float) -> None:
+        if retry_hint(exc)[0] == "later":
+            _count("zendesk_rate_limit_retries_total")
+        LOGGER.warning("Transient Zendesk error (%s); retrying in %.1fs.", exc, delay)
+
+    def index(self, resource: str) -> _ResourceIndex:
+        """Return the cached index for *resource*, listing it on first use."""
+
+        with self._lock:
+            cached = self._indexes.get(resource)
+        if cached is not None:
+            return cached
+        try:
+            items = self.backend.list(resource, self._call)
+        except Exception as exc:
+            LOGGER.debug("Unable to enumerate existing resources: %s", exc)
+            items = []
+        with self._lock:
+            return self._indexes.setdefault(resource, _ResourceIndex(resource, items))
+
+    def apply(
+        self, resource: str, operations: Sequence[Mapping[str, Any]]
+    ) -> list[Mapping[str, Any]]:
+        """Apply *operations*; return the successful ones in plan order."""
+
+        if not operations or not self.backend.prepare(resource):
+            return []
+        index = self.index(resource)
+        done = [False] * len(operations)
+
+        def run(chain: list[int]) -> None:
+            for position in chain:
+                done[position] = self._apply_one(resource, operations[position], index)
+
+        chains = list(_name_chains(resource, operations))
+        workers = min(self.options.workers, len(chains))
+        if workers <= 1:
+            for chain in chains:
+                run(chain)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run, chains))
+        _count("zendesk_apply_success_total", sum(done))
+        _count("zendesk_apply_failure_total", len(done) - sum(done))
+        return [entry for entry, ok in zip(operations, done) if ok]
+
+    def _apply_one(self, resource: str, entry: Mapping[str, Any], index: _ResourceIndex) -> bool:
+        env = self.env
         action = entry.get("action") or entry.get("op")
-        payload = entry.get("data") or entry.get("value") or {}
-        if hasattr(payload, "model_dump"):
-            payload = payload.model_dump()
-        if not isinstance(payload, Mapping):
-            payload = {}
+        payload = _operation_payload(entry)
         name = _operation_name(resource, entry, payload)
 
         if action in {"add", "create"}:
-            if not callable(create_fn):
+            if not self.backend.supports(resource, "create"):
                 LOGGER.error("Create operation not supported for resource '%s'.", resource)
-                continue
-            instance = api_class(**payload)
+                return False
             try:
-                create_fn(instance)
-            except Exception as exc:  # pragma: no cover - API interactions mocked in tests
+                created = self._call(
+                    lambda: self.backend.create(resource, payload), idempotent=False
+                )
+            except Exception as exc:
                 LOGGER.error(
                     "Failed to create %s '%s' in environment '%s': %s",
                     resource,
@@ -249,19 +484,23 @@ def _apply_named_resource(
                     env,
                     exc,
                 )
-                continue
-            successful_ops.append(entry)
-        elif action in {"remove", "delete"}:
-            if not callable(delete_fn):
+                return False
+            if created is not None:
+                with self._lock:
+                    index.add(created)
+            return True
+        if action in {"remove", "delete"}:
+            if not self.backend.supports(resource, "delete"):
                 LOGGER.error("Delete operation not supported for resource '%s'.", resource)
-                continue
-            target = _find_existing(existing_items, resource, name)
+                return False
+            with self._lock:
+                target = index.find(name)
             if target is None:
                 LOGGER.warning("Resource '%s' named '%s' not found for deletion.", resource, name)
-                continue
+                return False
             try:
-                delete_fn(target)
-            except Exception as exc:  # pragma: no cover - API interactions mocked in tests
+                self._call(lambda: self.backend.delete(resource, target))
+            except Exception as exc:
                 LOGGER.error(
                     "Failed to delete %s '%s' in environment '%s': %s",
                     resource,
@@ -269,22 +508,25 @@ def _apply_named_resource(
                     env,
                     exc,
                 )
-                continue
-            successful_ops.append(entry)
-        elif action in {"patch", "update"}:
-            if not callable(update_fn):
+                return False
+            with self._lock:
+                index.discard(target)
+            return True
+        if action in {"patch", "update"}:
+            if not self.backend.supports(resource, "update"):
                 LOGGER.error("Update operation not supported for resource '%s'.", resource)
-                continue
-            target = _find_existing(existing_items, resource, name)
+                return False
+            with self._lock:
+                target = index.find(name)
             if target is None:
                 LOGGER.warning("Resource '%s' named '%s' not found for update.", resource, name)
-                continue
+                return False
             changes = entry.get("changes") or entry.get("patches") or []
-            if isinstance(changes, Sequence):
-                _apply_patch_set(target, changes)
+            if not isinstance(changes, Sequence):
+                changes = []
             try:
-                update_fn(target)
-            except Exception as exc:  # pragma: no cover - API interactions mocked in tests
+                updated = self._call(lambda: self.backend.update(resource, target, changes))
+            except Exception as exc:
                 LOGGER.error(
                     "Failed to update %s '%s' in environment '%s': %s",
                     resource,
@@ -292,9 +534,82 @@ def _apply_named_resource(
                     env,
                     exc,
                 )
-                continue
-            successful_ops.append(entry)
+                return False
+            with self._lock:
+                index.discard(target)
+                index.add(updated if updated is not None else target)
+            return True
+        return False
+
+
+def _operation_payload(entry: Mapping[str, Any]) -> Mapping[str, Any]:
+    payload = entry.get("data") or entry.get("value") or {}
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump()
+    if not isinstance(payload, Mapping):
+        payload = {}
+    return payload
+
+
+def _name_chains(resource: str, operations: Sequence[Mapping[str, Any]]) -> Iterator[list[int]]:
+    """Group operation positions by target name, keeping plan order inside each group."""
+
+    chains: dict[str, list[int]] = {}
+    for position, entry in enumerate(operations):
+        name = _operation_name(resource, entry, _operation_payload(entry))
+        chains.setdefault(name or f"#{position}", []).append(position)
+    return iter(chains.values())
+
+
+def _split_deletes(
+    resource: str, operations: Sequence[Mapping[str, Any]]
+) -> tuple[list[Mapping[str, Any]], list[Mapping[str, Any]]]:
+    """Separate deletes that can wait until dependents are gone.
+
+    A delete whose name is also created or updated in the same plan is a
+    replacement and keeps its place; the rest are returned second, to run
+    after every resource has been created and updated.
+    """
+
+    def is_delete(entry: Mapping[str, Any]) -> bool:
+        return (entry.get("action") or entry.get("op")) in {"remove", "delete"}
+
+    def name_of(entry: Mapping[str, Any]) -> str:
+        return _operation_name(resource, entry, _operation_payload(entry))
 
+    rewritten = {name_of(entry) for entry in operations if not is_delete(entry)}
+    kept: list[Mapping[str, Any]] = []
+    deferred: list[Mapping[str, Any]] = []
+    for entry in operations:
+        if is_delete(entry) and name_of(entry) not in rewritten:
+            deferred.append(entry)
+        else:
+            kept.append(entry)
+    return kept, deferred
+
+
+def _apply_named_resource(
+    resource: str,
+    plan_data: Any,
+    env: str,
+    dry_run: bool,
+    session: ApplySession | None = None,
+) -> None:
+    operations = _extract_operations(plan_data, resource)
+    _log_pending(resource, operations, env)
+    if not operations:
+        return
+    if dry_run:
+        LOGGER.info("Dry-run enabled; skipping apply for resource '%s'.", resource)
+        return
+
+    if session is None:
+        client = _get_client(env)
+        if client is None:
+            return
+        session = ApplySession(client, env)
+
+    successful_ops = session.apply(resource, operations)
     if successful_ops:
         _emit_apply_evidence(resource, successful_ops, env)
 
@@ -464,13 +779,71 @@ def apply_slas(plan_data: Any, env: str, dry_run: bool = False) -> None:
     _apply_named_resource("slas", plan_data, env, dry_run)
 
 
+def apply_plan(
+    plan_data: Mapping[str, Any],
+    env: str,
+    dry_run: bool = False,
+    *,
+    options: ApplyOptions | None = None,
+) -> None:
+    """Apply a plan keyed by resource type (``{"groups": [...], "triggers": [...]}``).
+
+    Creates and updates run in :data:`APPLY_ORDER`, so dependencies such as
+    groups exist before the triggers that reference them. Deletes then run in
+    reverse order, removing dependents before what they depend on; a delete
+    of a name that is also created or updated stays in plan order. Each step
+    finishes before the next starts, and all share one :class:`ApplySession`
+    (client, rate limiter and cached listings). Resources without API support
+    are logged only.
+    """
+
+    logged_only: dict[str, Callable[[Any, str, bool], None]] = {
+        "apps": apply_apps,
+        "guide": apply_guide,
+        "routing": apply_routing,
+        "talk": apply_talk,
+        "widgets": apply_widgets,
+    }
+    unknown = sorted(set(plan_data) - set(_RESOURCE_ENDPOINTS) - set(logged_only))
+    if unknown:
+        raise ValueError(f"Unsupported resource(s) in plan: {', '.join(unknown)}.")
+
+    writes: list[tuple[str, list[Mapping[str, Any]]]] = []
+    deletes: list[tuple[str, list[Mapping[str, Any]]]] = []
+    for resource in APPLY_ORDER:
+        if resource not in plan_data:
+            continue
+        operations = _extract_operations({resource: plan_data[resource]}, resource)
+        kept, deferred = _split_deletes(resource, operations)
+        if kept or not deferred:
+            writes.append((resource, kept))
+        if deferred:
+            deletes.insert(0, (resource, deferred))
+
+    session: ApplySession | None = None
+    for resource, operations in writes + deletes:
+        if session is None and not dry_run and operations:
+            client = _get_client(env)
+            if client is None:
+                return
+            session = ApplySession(client, env, options)
+        _apply_named_resource(resource, {resource: operations}, env, dry_run, session)
+    for resource, handler in logged_only.items():
+        if resource in plan_data:
+            handler({resource: plan_data[resource]}, env, dry_run)
+
+
 __all__ = [
+    "APPLY_ORDER",
+    "ApplyOptions",
+    "ApplySession",
     "apply_apps",
     "apply_fields",
     "apply_forms",
     "apply_groups",
     "apply_guide",
     "apply_macros",
+    "apply_plan",
     "apply_slas",
     "apply_routing",
     "apply_talk",
@@ -1,8 +1,20 @@
-"""Diff helpers for Zendesk administrative resources."""
+"""Diff helpers for Zendesk administrative resources.
+
+Mapping inputs are hashed after dropping keys the model ignores. When the
+desired and current items for a key hash alike they are equal, so the model
+diff is skipped. Validation is skipped too once a hash has been validated;
+those hashes are memoised in :class:`ContentHashCache`, which persists to
+``CODEX_ZENDESK_DIFF_CACHE`` when that variable names a file.
+"""
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
+import os
 from collections.abc import Iterable, Mapping
+from pathlib import Path
 from typing import Any, TypeVar
 
 from pydantic import BaseModel
@@ -25,6 +37,135 @@ from codex.zendesk.model import (
 ModelT = TypeVar("ModelT", bound=BaseModel)
 ModelInput = ModelT | Mapping[str, Any]
 
+DIFF_CACHE_ENV = "CODEX_ZENDESK_DIFF_CACHE"
+_CACHE_VERSION = 1
+# validated hashes kept per model; the oldest are dropped beyond this
+MAX_CACHED_HASHES = 100_000
+_CANONICAL_JSON = json.JSONEncoder(
+    sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False
+)
+
+
+class ContentHashCache:
+    """Content hashes already validated against each model, optionally persisted.
+
+    Entries are keyed by a fingerprint of the model's JSON schema, so changing
+    a model invalidates its hashes.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.hashes: dict[str, dict[str, None]] = {}
+        self.dirty = False
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("version") == _CACHE_VERSION:
+                models = data.get("models")
+                if isinstance(models, dict):
+                    self.hashes = {
+                        str(model): dict.fromkeys(digests)
+                        for model, digests in models.items()
+                        if isinstance(digests, list)
+                    }
+
+    def known(self, model_cls: type[BaseModel], digest: str) -> bool:
+        return digest in self.hashes.get(_model_fingerprint(model_cls), ())
+
+    def add(self, model_cls: type[BaseModel], digest: str) -> None:
+        bucket = self.hashes.setdefault(_model_fingerprint(model_cls), {})
+        if digest in bucket:
+            return
+        bucket[digest] = None
+        if len(bucket) > MAX_CACHED_HASHES:
+            del bucket[next(iter(bucket))]
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        payload = {
+            "version": _CACHE_VERSION,
+            "models": {model: list(digests) for model, digests in self.hashes.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+_DEFAULT_CACHE: ContentHashCache | None = None
+
+
+def default_hash_cache() -> ContentHashCache:
+    """Return the process-wide cache, loaded from ``CODEX_ZENDESK_DIFF_CACHE`` if set."""
+
+    global _DEFAULT_CACHE
+    path = os.getenv(DIFF_CACHE_ENV) or None
+    if _DEFAULT_CACHE is None or _DEFAULT_CACHE.path != (Path(path) if path else None):
+        _DEFAULT_CACHE = ContentHashCache(path)
+    return _DEFAULT_CACHE
+
+
+@functools.lru_cache(maxsize=None)
+def _model_fingerprint(model_cls: type[BaseModel]) -> str:
+    schema = json.dumps(model_cls.model_json_schema(), sort_keys=True)
+    digest = hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+    return f"{model_cls.__module__}.{model_cls.__qualname__}:{digest}"
+
+
+@functools.lru_cache(maxsize=None)
+def _model_keys(model_cls: type[BaseModel]) -> frozenset[str]:
+    keys: set[str] = set()
+    for name, info in model_cls.model_fields.items():
+        keys.add(name)
+        if info.alias:
+            keys.add(info.alias)
+    return frozenset(keys)
+
+
+def content_hash(value: Mapping[str, Any], model_cls: type[BaseModel]) -> str | None:
+    """Return a canonical hash of *value* restricted to the keys *model_cls* reads.
+
+    Returns ``None`` for values that are not plain JSON, which always take the
+    full validate-and-diff path.
+    """
+
+    keys = _model_keys(model_cls)
+    normalized = {key: item for key, item in value.items() if key in keys}
+    try:
+        text = _CANONICAL_JSON.encode(normalized)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    """One input item with its content hash and lazily validated model."""
+
+    __slots__ = ("digest", "model_cls", "value", "_model")
+
+    def __init__(self, value: Any, model_cls: type[ModelT], digest: str | None) -> None:
+        self.value = value
+        self.model_cls = model_cls
+        self.digest = digest
+        self._model: ModelT | None = None
+
+    def model(self) -> ModelT:
+        if self._model is None:
+            self._model = _coerce_model(self.value, self.model_cls)
+        return self._model
+
+    def validate(self, cache: ContentHashCache) -> None:
+        if self.digest is None:
+            self.model()
+        elif not cache.known(self.model_cls, self.digest):
+            self.model()
+            cache.add(self.model_cls, self.digest)
+
 
 def diff_triggers(
     desired: Iterable[ModelInput],
@@ -131,27 +272,32 @@ def _diff_named_resources(
     *,
     base_path: str,
     key_attr: str = "name",
+    cache: ContentHashCache | None = None,
 ) -> list[dict[str, Any]]:
-    desired_models = _coerce_models(desired, model_cls)
-    actual_models = _coerce_models(actual, model_cls)
+    cache = cache if cache is not None else default_hash_cache()
+    desired_map = _index_entries(desired, model_cls, key_attr, cache)
+    actual_map = _index_entries(actual, model_cls, key_attr, cache)
     diffs: list[dict[str, Any]] = []
 
-    desired_map = {getattr(item, key_attr): item for item in desired_models}
-    actual_map = {getattr(item, key_attr): item for item in actual_models}
-
-    for key, desired_item in desired_map.items():
-        current_item = actual_map.get(key)
+    for key, desired_entry in desired_map.items():
+        current_entry = actual_map.get(key)
         key_str = str(key)
-        if current_item is None:
+        if current_entry is None:
             diffs.append(
                 {
                     "op": "add",
                     "path": f"{base_path}/{_escape_json_pointer_token(key_str)}",
-                    "value": _dump_model(desired_item),
+                    "value": _dump_model(desired_entry.model()),
                 }
             )
+            desired_entry.validate(cache)
             continue
-        patches = _call_diff(desired_item, current_item)
+        if desired_entry.digest is not None and desired_entry.digest == current_entry.digest:
+            desired_entry.validate(cache)
+            continue
+        patches = _call_diff(desired_entry.model(), current_entry.model())
+        desired_entry.validate(cache)
+        current_entry.validate(cache)
         if patches:
             diffs.append(
                 {
@@ -162,6 +308,7 @@ def _diff_named_resources(
             )
 
     for name in sorted(actual_map.keys() - desired_map.keys()):
+        actual_map[name].validate(cache)
         diffs.append(
             {
                 "op": "remove",
@@ -169,29 +316,45 @@ def _diff_named_resources(
             }
         )
 
+    cache.save()
     return diffs
 
 
-def _coerce_models(
+def _index_entries(
     values: Iterable[ModelInput] | None,
     model_cls: type[ModelT],
-) -> list[ModelT]:
+    key_attr: str,
+    cache: ContentHashCache,
+) -> dict[Any, _Entry]:
+    """Key entries by *key_attr*; mappings are hashed instead of validated up front."""
+
+    entries: dict[Any, _Entry] = {}
     if values is None:
-        return []
-    models: list[ModelT] = []
+        return entries
     for value in values:
-        if isinstance(value, model_cls):
-            models.append(value)
-        elif isinstance(value, BaseModel):
-            models.append(model_cls.model_validate(value.model_dump()))
+        key = value.get(key_attr) if isinstance(value, Mapping) else None
+        if isinstance(key, str):
+            entry = _Entry(value, model_cls, content_hash(value, model_cls))
         else:
-            if not isinstance(value, Mapping):
-                expected = model_cls.__name__
-                raise TypeError(
-                    f"Expected mapping or {expected} instance, received {type(value)!r}"
-                )
-            models.append(model_cls.model_validate(value))
-    return models
+            entry = _Entry(value, model_cls, None)
+            key = getattr(entry.model(), key_attr)
+        shadowed = entries.get(key)
+        if shadowed is not None:
+            # a later duplicate replaces the earlier one, which is still validated
+            shadowed.validate(cache)
+        entries[key] = entry
+    return entries
+
+
+def _coerce_model(value: ModelInput, model_cls: type[ModelT]) -> ModelT:
+    if isinstance(value, model_cls):
+        return value
+    if isinstance(value, BaseModel):
+        return model_cls.model_validate(value.model_dump())
+    if not isinstance(value, Mapping):
+        expected = model_cls.__name__
+        raise TypeError(f"Expected mapping or {expected} instance, received {type(value)!r}")
+    return model_cls.model_validate(value)
 
 
 def _escape_json_pointer(token: str) -> str:
@@ -216,6 +379,9 @@ def _escape_json_pointer_token(value: str) -> str:
 
 
 __all__ = [
+    "ContentHashCache",
+    "content_hash",
+    "default_hash_cache",
     "diff_apps",
     "diff_fields",
     "diff_forms",
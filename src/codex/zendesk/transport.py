@@ -0,0 +1,267 @@
+"""Rate limiting, retries and a minimal REST client for Zendesk apply runs."""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# statuses that mean "not processed, try again later"
+_RETRY_LATER = {429, 503}
+_SERVER_ERROR = 500
+
+
+class ZendeskHTTPError(RuntimeError):
+    """Non-2xx response from the Zendesk REST API."""
+
+    def __init__(self, status: int, message: str, retry_after: float | None = None) -> None:
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request of an apply run.
+
+    ``requests_per_minute`` tokens are added evenly over each minute, up to
+    ``burst`` saved tokens. :meth:`pause` blocks all callers, e.g. after a
+    ``429`` with ``Retry-After``, because Zendesk limits are account-wide.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.rate = requests_per_minute / 60.0
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter; server ``Retry-After`` hints take precedence."""
+
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+
+    def delay(self, attempt: int, hint: float | None = None) -> float:
+        if hint is not None:
+            return min(self.backoff_max, max(0.0, hint))
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return ceiling * (0.5 + random.random() / 2)
+
+
+def _header(headers: Any, name: str) -> str | None:
+    if headers is None:
+        return None
+    try:
+        value = headers.get(name)
+    except Exception:  # pragma: no cover - exotic header containers
+        return None
+    return str(value) if value is not None else None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the delay in seconds from a ``Retry-After`` header value."""
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def retry_hint(exc: BaseException) -> tuple[str | None, float | None]:
+    """Classify *exc* as ``("later" | "server" | "network" | None, retry_after)``.
+
+    Understands :class:`ZendeskHTTPError` and exceptions carrying a
+    ``response`` with ``status_code`` and headers (zenpy/requests).
+    """
+
+    status: int | None = None
+    retry_after: float | None = None
+    if isinstance(exc, ZendeskHTTPError):
+        status, retry_after = exc.status, exc.retry_after
+    else:
+        response = getattr(exc, "response", None)
+        code = getattr(response, "status_code", None)
+        if isinstance(code, int):
+            status = code
+            headers = getattr(response, "headers", None)
+            retry_after = parse_retry_after(_header(headers, "Retry-After"))
+    if status is not None:
+        if status in _RETRY_LATER:
+            return "later", retry_after
+        if status >= _SERVER_ERROR:
+            return "server", retry_after
+        return None, None
+    if isinstance(exc, (urllib.error.URLError, ConnectionError, TimeoutError)):
+        return "network", None
+    return None, None
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    *,
+    limiter: RateLimiter | None,
+    policy: RetryPolicy,
+    idempotent: bool = True,
+    sleep: Callable[[float], None] = time.sleep,
+    on_retry: Callable[[BaseException, float], None] | None = None,
+) -> T:
+    """Run *fn* under *limiter*, retrying transient failures per *policy*.
+
+    ``429``/``503`` responses are always retried (the request was not
+    processed). Other server and network errors are only retried for
+    *idempotent* calls, so a create is never sent twice.
+    """
+
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception as exc:
+            kind, hint = retry_hint(exc)
+            if kind is None or (kind != "later" and not idempotent):
+                raise
+            if attempt >= policy.max_retries:
+                raise
+            delay = policy.delay(attempt, hint)
+            if kind == "later" and limiter is not None:
+                limiter.pause(delay)
+            if on_retry is not None:
+                on_retry(exc, delay)
+            sleep(delay)
+            attempt += 1
+
+
+def _origin(url: str) -> tuple[str, str]:
+    parts = urllib.parse.urlsplit(url)
+    return parts.scheme.lower(), parts.netloc.lower()
+
+
+class RestClient:
+    """Minimal JSON client for the Zendesk REST API (``/api/v2``).
+
+    Used instead of zenpy when ``ZENDESK_<ENV>_URL`` is configured, e.g. for
+    a sandbox proxy or a local stub server. Authentication uses API tokens,
+    which are only ever sent to ``base_url``: absolute URLs (pagination links)
+    on another origin are refused, and credentials are not replayed on
+    redirects.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        email: str | None = None,
+        token: str | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._auth: str | None = None
+        if email and token:
+            raw = f"{email}/token:{token}".encode()
+            self._auth = "Basic " + base64.b64encode(raw).decode("ascii")
+
+    def url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            if _origin(path) != _origin(self.base_url):
+                raise ValueError(f"Refusing to follow {path!r} outside {self.base_url!r}.")
+            return path
+        return f"{self.base_url}/api/v2/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, body: Mapping[str, Any] | None = None) -> Any:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.url(path), data=data, method=method)
+        req.add_header("Accept", "application/json")
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        if self._auth:
+            req.add_unredirected_header("Authorization", self._auth)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                payload = resp.read()
+        except urllib.error.HTTPError as exc:
+            retry_after = parse_retry_after(_header(exc.headers, "Retry-After"))
+            detail = exc.read().decode("utf-8", errors="replace")[:200]
+            raise ZendeskHTTPError(exc.code, detail or str(exc.reason), retry_after) from exc
+        if not payload:
+            return None
+        return json.loads(payload)
+
+    @staticmethod
+    def next_page(page: Mapping[str, Any]) -> str | None:
+        """Return the next page URL for offset (``next_page``) or cursor pagination."""
+
+        nxt = page.get("next_page")
+        if isinstance(nxt, str) and nxt:
+            return nxt
+        links = page.get("links")
+        meta = page.get("meta")
+        if isinstance(links, Mapping) and isinstance(meta, Mapping) and meta.get("has_more"):
+            cursor_next = links.get("next")
+            if isinstance(cursor_next, str) and cursor_next:
+                return cursor_next
+        return None
+
+
+__all__ = [
+    "RateLimiter",
+    "RestClient",
+    "RetryPolicy",
+    "ZendeskHTTPError",
+    "call_with_retry",
+    "parse_retry_after",
+    "retry_hint",
+]
@@ -38,6 +38,22 @@ def _build_parser() -> argparse.ArgumentParser:
         "--dest",
         help="Destination path when writing CSV output (defaults to metrics_summary.csv)",
     )
+    ndjson.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep tailing the shards and re-emit the summary when new records arrive",
+    )
+    ndjson.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds for --follow",
+    )
+    ndjson.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Do not read or write the incremental checkpoint sidecar",
+    )
     ndjson.set_defaults(func=_cmd_ndjson_summary)
 
     metrics = sub.add_parser(
@@ -79,150 +79,302 @@ def _coerce_epoch(value: Any) -> Any:
     return value
 
 
-def _write_csv(rows: Iterable[Row], out_csv: Path) -> int:
-    out_csv.parent.mkdir(parents=True, exist_ok=True)
-    written = 0
-    with out_csv.open("w", encoding="utf-8", newline="") as fh:
-        writer = csv.DictWriter(fh, fieldnames=["run_id", "epoch", "key", "value"])
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-            written += 1
-    return written
+_COLUMNS = ("run_id", "epoch", "key", "value")
 
 
-def _try_write_parquet(in_csv: Path, out_parquet: Path) -> bool:
-    try:
-        import pandas as pd  # type: ignore
+def _iter_ndjson_batches(path: Path, batch_size: int) -> Iterable[list[dict[str, Any]]]:
+    """Yield lists of at most ``batch_size`` parsed records from ``path``."""
+
+    batch: list[dict[str, Any]] = []
+    size = max(1, int(batch_size))
+    for record in _iter_ndjson(path):
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-        df = pd.read_csv(in_csv)
-        df.to_parquet(out_parquet)
-        return True
-    except Exception:
-        return False
 
+def _compile_schema(schema_path: Path) -> Any | None:
+    """Return a reusable ``Draft7Validator`` for ``schema_path`` (``None`` if unavailable)."""
 
-def _validate_with_jsonschema(data_path: Path, schema_path: Path) -> None:
     try:
         import jsonschema  # type: ignore
     except Exception:  # pragma: no cover - import guards
         print("[metrics-cli] jsonschema not installed; skipping validation", file=sys.stderr)
-        return
+        return None
 
     schema = json.loads(schema_path.read_text(encoding="utf-8"))
-    validator = jsonschema.Draft7Validator(schema)
-    for idx, record in enumerate(_iter_ndjson(data_path), start=1):
-        try:
-            validator.validate(record)
-        except jsonschema.exceptions.ValidationError as exc:  # type: ignore[attr-defined]
-            raise ValueError(f"schema validation failed at record {idx}: {exc.message}") from exc
+    jsonschema.Draft7Validator.check_schema(schema)
+    return jsonschema.Draft7Validator(schema)
 
 
-def _csv_to_sqlite(
-    csv_path: Path,
-    sqlite_db: Path,
-    table: str,
-    *,
-    chunk_size: int = 5000,
-    create_index: bool = False,
-    allow_unsafe_table_name: bool = False,
-) -> None:
-    """Bulk load CSV into SQLite using chunked executemany and optional index."""
-
-    sqlite_db.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(sqlite_db)
-    try:
-        cur = con.cursor()
-        table_safe = _validate_table(table or "metrics", allow_unsafe_table_name)
-        cur.execute(
-            f"CREATE TABLE IF NOT EXISTS {table_safe} "
-            "(run_id TEXT, epoch REAL, key TEXT, value TEXT)"
-        )
-        con.execute("BEGIN IMMEDIATE")
-        import csv as _csv
-
-        with csv_path.open("r", encoding="utf-8", newline="") as fh:
-            reader = _csv.DictReader(fh)
-            buf: list[tuple[Any, Any, Any, Any]] = []
-            batch = max(1, int(chunk_size))
-            for row in reader:
-                buf.append(
-                    (
-                        row.get("run_id"),
-                        _coerce_epoch(row.get("epoch")),
-                        row.get("key"),
-                        row.get("value"),
-                    )
-                )
-                if len(buf) >= batch:
-                    cur.executemany(
-                        f"INSERT INTO {table_safe} (run_id, epoch, key, value) VALUES (?, ?, ?, ?)",
-                        buf,
-                    )
-                    buf.clear()
-            if buf:
-                cur.executemany(
-                    f"INSERT INTO {table_safe} (run_id, epoch, key, value) VALUES (?, ?, ?, ?)",
-                    buf,
-                )
-        if create_index:
-            cur.execute(
-                f"CREATE INDEX IF NOT EXISTS idx_{table_safe}_rke ON {table_safe}(run_id, key, epoch)"
-            )
-        con.commit()
-    finally:
-        con.close()
+def _validate_batch(validator: Any, records: list[dict[str, Any]], offset: int) -> None:
+    """Validate ``records`` with a precompiled validator; ``offset`` is the 0-based index."""
 
+    for idx, record in enumerate(records, start=offset + 1):
+        error = next(iter(validator.iter_errors(record)), None)
+        if error is not None:
+            raise ValueError(f"schema validation failed at record {idx}: {error.message}")
 
-def _csv_to_duckdb(
-    csv_path: Path,
-    duck_db: Path,
-    table: str,
-    *,
-    mode: str = "replace",
-    allow_unsafe_table_name: bool = False,
-) -> bool:
-    """Bulk load CSV into DuckDB with selectable write mode."""
 
+def _tidy_columns(rows: list[Row]) -> dict[str, list[Any]]:
+    """Column-major view of tidy rows with ``epoch`` coerced to a number."""
+
+    return {
+        "run_id": [row["run_id"] for row in rows],
+        "epoch": [_epoch_as_float(row["epoch"]) for row in rows],
+        "key": [row["key"] for row in rows],
+        "value": [None if row["value"] is None else str(row["value"]) for row in rows],
+    }
+
+
+def _epoch_as_float(value: Any) -> float | None:
+    coerced = _coerce_epoch(value)
+    if isinstance(coerced, (int, float)) and not isinstance(coerced, bool):
+        return float(coerced)
+    return None
+
+
+def _arrow_schema(pa: Any) -> Any:
+    return pa.schema(
+        [
+            ("run_id", pa.string()),
+            ("epoch", pa.float64()),
+            ("key", pa.string()),
+            ("value", pa.string()),
+        ]
+    )
+
+
+def _import_pyarrow() -> Any | None:
     try:
-        import duckdb  # type: ignore
-    except ModuleNotFoundError as exc:  # pragma: no cover - import guard
-        raise SystemExit(
-            "[metrics-cli] duckdb dependency missing; install with `pip install duckdb`"
-        ) from exc
-    except Exception as exc:  # pragma: no cover - defensive import guard
-        raise SystemExit(f"[metrics-cli] unable to import duckdb: {exc}") from exc
-
-    duck_db.parent.mkdir(parents=True, exist_ok=True)
-    con = duckdb.connect(duck_db.as_posix())
-    try:
-        table_safe = _validate_table(table or "metrics", allow_unsafe_table_name)
-        csvp = csv_path.as_posix()
+        import pyarrow as pa  # type: ignore
+    except Exception:
+        return None
+    return pa
+
+
+def _staging_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.partial")
+
+
+class _CsvSink:
+    """Stream tidy rows to CSV, publishing atomically on commit."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._staging = _staging_path(path)
+        self._fh = self._staging.open("w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._fh, fieldnames=list(_COLUMNS))
+        self._writer.writeheader()
+
+    def write(self, rows: list[Row], columns: dict[str, list[Any]], batch: Any) -> None:
+        self._writer.writerows(rows)
+
+    def commit(self) -> None:
+        self._fh.close()
+        self._staging.replace(self.path)
+
+    def abort(self) -> None:
+        self._fh.close()
+        self._staging.unlink(missing_ok=True)
+
+
+class _ParquetSink:
+    """Append one Parquet row group per ingest batch via ``pyarrow.parquet``."""
+
+    def __init__(self, path: Path, pa: Any) -> None:
+        import pyarrow.parquet as pq  # type: ignore
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._staging = _staging_path(path)
+        self._pa = pa
+        self._writer = pq.ParquetWriter(self._staging.as_posix(), _arrow_schema(pa))
+
+    def write(self, rows: list[Row], columns: dict[str, list[Any]], batch: Any) -> None:
+        self._writer.write_table(self._pa.Table.from_batches([batch]))
+
+    def commit(self) -> None:
+        self._writer.close()
+        self._staging.replace(self.path)
+
+    def abort(self) -> None:
+        self._writer.close()
+        self._staging.unlink(missing_ok=True)
+
+
+class _SqliteSink:
+    """Insert each batch with ``executemany`` inside a single transaction."""
+
+    def __init__(
+        self,
+        db: Path,
+        table: str,
+        *,
+        create_index: bool = False,
+        allow_unsafe_table_name: bool = False,
+    ) -> None:
+        db.parent.mkdir(parents=True, exist_ok=True)
+        self._table = _validate_table(table or "metrics", allow_unsafe_table_name)
+        self._create_index = create_index
+        self._con = sqlite3.connect(db)
+        try:
+            self._con.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} "
+                "(run_id TEXT, epoch REAL, key TEXT, value TEXT)"
+            )
+            self._con.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._con.close()
+            raise
+
+    def write(self, rows: list[Row], columns: dict[str, list[Any]], batch: Any) -> None:
+        self._con.executemany(
+            f"INSERT INTO {self._table} (run_id, epoch, key, value) VALUES (?, ?, ?, ?)",
+            [
+                (row["run_id"], _coerce_epoch(row["epoch"]), row["key"], row["value"])
+                for row in rows
+            ],
+        )
+
+    def commit(self) -> None:
+        try:
+            if self._create_index:
+                self._con.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{self._table}_rke "
+                    f"ON {self._table}(run_id, key, epoch)"
+                )
+            self._con.commit()
+        finally:
+            self._con.close()
+
+    def abort(self) -> None:
+        self._con.rollback()
+        self._con.close()
+
+
+class _DuckdbSink:
+    """Bulk-append batches to DuckDB (Arrow scans when ``pyarrow`` is present)."""
+
+    def __init__(
+        self,
+        db: Path,
+        table: str,
+        *,
+        mode: str = "replace",
+        allow_unsafe_table_name: bool = False,
+    ) -> None:
+        try:
+            import duckdb  # type: ignore
+        except ModuleNotFoundError as exc:  # pragma: no cover - import guard
+            raise SystemExit(
+                "[metrics-cli] duckdb dependency missing; install with `pip install duckdb`"
+            ) from exc
+        except Exception as exc:  # pragma: no cover - defensive import guard
+            raise SystemExit(f"[metrics-cli] unable to import duckdb: {exc}") from exc
+
+        self._table = _validate_table(table or "metrics", allow_unsafe_table_name)
+        columns = "(run_id VARCHAR, epoch DOUBLE, key VARCHAR, value VARCHAR)"
         mode_normalized = (mode or "replace").lower()
         if mode_normalized == "replace":
-            con.execute(
-                f"CREATE OR REPLACE TABLE {table_safe} AS SELECT * FROM read_csv_auto(?)",
-                [csvp],
-            )
+            create = f"CREATE OR REPLACE TABLE {self._table} {columns}"
         elif mode_normalized == "append":
-            con.execute(
-                f"CREATE TABLE IF NOT EXISTS {table_safe} AS SELECT * FROM read_csv_auto(?) WHERE 1=0",
-                [csvp],
-            )
-            con.execute(
-                f"INSERT INTO {table_safe} SELECT * FROM read_csv_auto(?)",
-                [csvp],
-            )
+            create = f"CREATE TABLE IF NOT EXISTS {self._table} {columns}"
         elif mode_normalized == "fail":
-            con.execute(
-                f"CREATE TABLE {table_safe} AS SELECT * FROM read_csv_auto(?)",
-                [csvp],
-            )
+            create = f"CREATE TABLE {self._table} {columns}"
         else:
             raise SystemExit(f"[metrics-cli] unsupported --mode: {mode!r}")
-        return True
-    finally:
-        con.close()
+
+        db.parent.mkdir(parents=True, exist_ok=True)
+        self._con = duckdb.connect(db.as_posix())
+        try:
+            self._con.execute("BEGIN TRANSACTION")
+            self._con.execute(create)
+        except BaseException:
+            self._con.close()
+            raise
+
+    def write(self, rows: list[Row], columns: dict[str, list[Any]], batch: Any) -> None:
+        if batch is not None:
+            self._con.register("_metrics_batch", batch)
+            try:
+                self._con.execute(f"INSERT INTO {self._table} SELECT * FROM _metrics_batch")
+            finally:
+                self._con.unregister("_metrics_batch")
+            return
+        self._con.executemany(
+            f"INSERT INTO {self._table} VALUES (?, ?, ?, ?)",
+            list(zip(*(columns[name] for name in _COLUMNS))),
+        )
+
+    def commit(self) -> None:
+        try:
+            self._con.execute("COMMIT")
+        finally:
+            self._con.close()
+
+    def abort(self) -> None:
+        try:
+            self._con.execute("ROLLBACK")
+        finally:
+            self._con.close()
+
+
+def _ingest_stream(
+    input_path: Path,
+    sinks: list[Any],
+    *,
+    run_id: str,
+    validator: Any | None,
+    batch_size: int,
+    pa: Any | None,
+) -> int:
+    """Validate, flatten and fan out ``input_path`` to ``sinks`` batch by batch.
+
+    Each batch is parsed once, converted to columns once and (with ``pyarrow``)
+    to a single Arrow record batch shared by every sink. Sinks are committed
+    only after the whole file has been read; any failure aborts all of them.
+    """
+
+    written = 0
+    seen = 0
+    try:
+        for records in _iter_ndjson_batches(input_path, batch_size):
+            if validator is not None:
+                _validate_batch(validator, records, seen)
+            seen += len(records)
+            rows = list(_flatten_records(records, run_id=run_id))
+            if not rows:
+                continue
+            columns = _tidy_columns(rows)
+            batch = (
+                pa.RecordBatch.from_pydict(columns, schema=_arrow_schema(pa))
+                if pa is not None
+                else None
+            )
+            for sink in sinks:
+                sink.write(rows, columns, batch)
+            written += len(rows)
+    except BaseException:
+        _abort_sinks(sinks)
+        raise
+    for sink in sinks:
+        sink.commit()
+    return written
+
+
+def _abort_sinks(sinks: list[Any]) -> None:
+    """Roll back every sink, ignoring errors so the original failure surfaces."""
+
+    for sink in sinks:
+        try:
+            sink.abort()
+        except Exception:  # pragma: no cover - best effort cleanup
+            pass
 
 
 def cmd_ingest(args: argparse.Namespace) -> int:
@@ -233,62 +385,77 @@ def cmd_ingest(args: argparse.Namespace) -> int:
 
     run_id = args.run_id or input_path.stem
     schema_path = Path(args.schema).expanduser().resolve() if args.schema else None
+    validator = None
     if schema_path is not None:
         if not schema_path.exists():
             print(f"[metrics-cli] schema not found: {schema_path}", file=sys.stderr)
             return 2
-        try:
-            _validate_with_jsonschema(input_path, schema_path)
-        except ValueError as exc:
-            print(f"[metrics-cli] {exc}", file=sys.stderr)
-            return 3
-
-    rows = _flatten_records(_iter_ndjson(input_path), run_id=run_id)
-    out_csv = Path(args.out_csv).expanduser().resolve()
-    written = _write_csv(rows, out_csv)
+        validator = _compile_schema(schema_path)
 
+    pa = _import_pyarrow()
+    sinks: list[Any] = []
+    sink_info: dict[str, Any] = {}
+    out_csv = Path(args.out_csv).expanduser().resolve() if args.out_csv else None
     parquet_path: Path | None = None
     if args.out_parquet:
-        candidate = Path(args.out_parquet).expanduser().resolve()
-        if _try_write_parquet(out_csv, candidate):
-            parquet_path = candidate
+        if pa is None:
+            print("[metrics-cli] pyarrow not installed; skipping Parquet output", file=sys.stderr)
+        else:
+            parquet_path = Path(args.out_parquet).expanduser().resolve()
+    table = args.table or "metrics"
+    allow_unsafe = bool(getattr(args, "allow_unsafe_table_name", False))
+    # a later sink failing to open (bad table name, missing duckdb) must not leak
+    # the staging files or open transactions of the sinks built before it
+    try:
+        if out_csv is not None:
+            sinks.append(_CsvSink(out_csv))
+        if parquet_path is not None:
+            sinks.append(_ParquetSink(parquet_path, pa))
+        if args.to_sqlite:
+            db = Path(args.to_sqlite).expanduser().resolve()
+            sinks.append(
+                _SqliteSink(
+                    db,
+                    table,
+                    create_index=bool(getattr(args, "create_index", False)),
+                    allow_unsafe_table_name=allow_unsafe,
+                )
+            )
+            sink_info["sqlite"] = {"db": db.as_posix(), "table": table}
+        if args.to_duckdb:
+            db = Path(args.to_duckdb).expanduser().resolve()
+            sinks.append(
+                _DuckdbSink(
+                    db,
+                    table,
+                    mode=str(getattr(args, "mode", "replace")),
+                    allow_unsafe_table_name=allow_unsafe,
+                )
+            )
+            sink_info["duckdb"] = {"db": db.as_posix(), "table": table, "enabled": True}
+    except BaseException:
+        _abort_sinks(sinks)
+        raise
 
-    sink_info: dict[str, Any] = {}
-    if args.to_sqlite:
-        db = Path(args.to_sqlite).expanduser().resolve()
-        table = args.table or "metrics"
-        _csv_to_sqlite(
-            out_csv,
-            db,
-            table,
-            chunk_size=int(getattr(args, "chunk_size", 5000)),
-            create_index=bool(getattr(args, "create_index", False)),
-            allow_unsafe_table_name=bool(getattr(args, "allow_unsafe_table_name", False)),
-        )
-        sink_info["sqlite"] = {"db": db.as_posix(), "table": table}
-
-    if args.to_duckdb:
-        db = Path(args.to_duckdb).expanduser().resolve()
-        table = args.table or "metrics"
-        enabled = _csv_to_duckdb(
-            out_csv,
-            db,
-            table,
-            mode=str(getattr(args, "mode", "replace")),
-            allow_unsafe_table_name=bool(getattr(args, "allow_unsafe_table_name", False)),
+    try:
+        written = _ingest_stream(
+            input_path,
+            sinks,
+            run_id=run_id,
+            validator=validator,
+            batch_size=int(getattr(args, "chunk_size", 5000)),
+            pa=pa,
         )
-        sink_info["duckdb"] = {
-            "db": db.as_posix(),
-            "table": table,
-            "enabled": enabled,
-        }
+    except ValueError as exc:
+        print(f"[metrics-cli] {exc}", file=sys.stderr)
+        return 3
 
     print(
         json.dumps(
             {
                 "ok": True,
                 "rows": written,
-                "csv": out_csv.as_posix(),
+                "csv": out_csv.as_posix() if out_csv else None,
                 "parquet": parquet_path.as_posix() if parquet_path else None,
                 **sink_info,
             }
@@ -465,13 +632,13 @@ def build_parser() -> argparse.ArgumentParser:
     sub = parser.add_subparsers(dest="subcommand", required=True)
 
     ingest = sub.add_parser(
-        "ingest", help="Ingest NDJSON into tidy CSV rows (optional Parquet/DBs)"
+        "ingest", help="Stream NDJSON into tidy rows (CSV, Parquet, SQLite and/or DuckDB)"
     )
     ingest.add_argument("--input", required=True, help="Path to NDJSON (one JSON per line)")
-    ingest.add_argument("--out-csv", required=True, help="Output CSV file path")
+    ingest.add_argument("--out-csv", help="Optional CSV output file path")
     ingest.add_argument(
         "--out-parquet",
-        help="Optional Parquet file path (requires pandas with pyarrow or fastparquet)",
+        help="Optional Parquet file path; one row group per chunk (requires pyarrow)",
     )
     ingest.add_argument("--run-id", help="Run identifier (defaults to input stem)")
     ingest.add_argument("--schema", help="Optional JSON Schema file for validation")
@@ -488,7 +655,7 @@ def build_parser() -> argparse.ArgumentParser:
         "--chunk-size",
         type=int,
         default=5000,
-        help="SQLite INSERT chunk size for executemany() (default: 5000)",
+        help="NDJSON records per ingest batch / Parquet row group (default: 5000)",
     )
     ingest.add_argument(
         "--create-index",
@@ -214,7 +214,15 @@ def load_causal_lm(
     dtype: Optional[str] = None,
     peft_cfg: Optional[Dict[str, Any]] = None,
     peft_path: Optional[Union[str, os.PathLike[str]]] = None,
+    quantization: Optional[str] = None,
 ) -> PreTrainedModel:
+    """Load a causal LM, optionally attaching LoRA/PEFT and quantizing for CPU.
+
+    ``quantization`` accepts the modes from :mod:`codex_ml.models.quantization`
+    (``dynamic_int8``, ``int8``, ``int4``). PEFT adapters are merged before
+    quantizing so that adapter weights are quantized with the base layers.
+    """
+
     if not TRANSFORMERS_AVAILABLE or AutoModelForCausalLM is None:
         raise ImportError("transformers is required to load causal language models")
     if isinstance(repo_id, str):
@@ -227,7 +235,7 @@ def load_causal_lm(
                 kwargs["dtype"] = dtype
             if peft_cfg is not None:
                 kwargs["peft_cfg"] = peft_cfg
-            return ctor(**kwargs)
+            return _maybe_quantize(ctor(**kwargs), quantization)
 
     rev = _required_revision(repo_id, revision)
     torch_dtype = _map_amp_dtype(dtype)
@@ -297,7 +305,21 @@ def load_causal_lm(
             except Exception as exc:  # pragma: no cover - runtime failure
                 logger.info("load_causal_lm: PEFT adapter not applied (runtime error): %s", exc)
 
-    return model
+    return _maybe_quantize(model, quantization)
+
+
+def _maybe_quantize(model: Any, quantization: Optional[str]) -> Any:
+    if not quantization or quantization == "none":
+        return model
+    from codex_ml.models.quantization import quantize_model
+
+    merge = getattr(model, "merge_and_unload", None)
+    if callable(merge):
+        try:
+            model = merge()
+        except Exception as exc:  # pragma: no cover - PEFT runtime failure
+            logger.info("load_causal_lm: adapters not merged before quantization: %s", exc)
+    return quantize_model(model, quantization, inplace=True)
 
 
 __all__ = [
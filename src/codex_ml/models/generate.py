@@ -37,9 +37,18 @@ def generate(
     top_p: float = 1.0,
     eos_id: Optional[int] = None,
     pad_id: Optional[int] = None,
+    quantization: Optional[str] = None,
 ) -> torch.Tensor:
-    """Generate tokens from ``model`` starting from ``prompt_ids``."""
+    """Generate tokens from ``model`` starting from ``prompt_ids``.
 
+    ``quantization`` selects a quantized CPU inference mode (see
+    :mod:`codex_ml.models.quantization`); the quantized copy is cached per model.
+    """
+
+    if quantization is not None:
+        from .quantization import get_quantized
+
+        model = get_quantized(model, quantization)
     model.eval()
     input_ids = prompt_ids.clone()
     past = None
@@ -0,0 +1,309 @@
+"""Quantized CPU inference helpers.
+
+Three modes are supported:
+
+``dynamic_int8``
+    ``torch.ao.quantization.quantize_dynamic`` over ``nn.Linear`` layers:
+    int8 weights, activations quantized on the fly. Fastest CPU decode.
+``int8`` / ``int4``
+    Weight-only quantization with symmetric per-output-channel scales. Weights
+    are stored packed and dequantized inside ``forward``; mainly a memory
+    saving, and usable on backends without quantized kernels.
+
+GPT-2 style ``Conv1D`` projections are converted to ``nn.Linear`` first so
+they are quantized as well. Linear layers whose weight is tied to an embedding
+(e.g. a tied LM head) are left in floating point to avoid storing the matrix
+twice. :func:`check_quantization` and :func:`select_quantization` compare
+perplexity (via :func:`codex_ml.eval.metrics.perplexity`) before and after
+quantization on caller-supplied calibration batches.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Sequence
+
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+from codex_ml.eval.metrics import perplexity
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("none", "dynamic_int8", "int8", "int4")
+
+_QUANTIZED_CACHE: "weakref.WeakKeyDictionary[nn.Module, dict[str, nn.Module]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _normalise_mode(mode: Optional[str]) -> str:
+    value = (mode or "none").strip().lower()
+    aliases = {"": "none", "fp32": "none", "dynamic": "dynamic_int8", "qint8": "dynamic_int8"}
+    value = aliases.get(value, value)
+    if value not in QUANTIZATION_MODES:
+        raise ValueError(
+            f"unknown quantization mode {mode!r}; expected one of {QUANTIZATION_MODES}"
+        )
+    return value
+
+
+class WeightOnlyQuantLinear(nn.Module):
+    """``nn.Linear`` replacement storing int8/int4 weights with per-channel scales."""
+
+    def __init__(self, linear: nn.Linear, bits: int = 8) -> None:
+        super().__init__()
+        if bits not in (4, 8):
+            raise ValueError("bits must be 4 or 8")
+        self.in_features = linear.in_features
+        self.out_features = linear.out_features
+        self.bits = bits
+        weight = linear.weight.detach().float()
+        qmax = 2 ** (bits - 1) - 1
+        scale = weight.abs().amax(dim=1).clamp(min=1e-8) / qmax
+        q = torch.clamp(torch.round(weight / scale[:, None]), -qmax, qmax).to(torch.int8)
+        if bits == 4:
+            if q.shape[1] % 2:
+                q = F.pad(q, (0, 1))
+            # two signed nibbles per byte: low nibble = even column
+            nibbles = q.to(torch.int16) & 0x0F
+            q = (nibbles[:, 0::2] | (nibbles[:, 1::2] << 4)).to(torch.uint8)
+        self.register_buffer("qweight", q.contiguous())
+        self.register_buffer("scale", scale.to(linear.weight.dtype))
+        if linear.bias is not None:
+            self.register_buffer("bias", linear.bias.detach().clone())
+        else:
+            self.bias = None
+
+    def dequantize(self) -> torch.Tensor:
+        q = self.qweight
+        if self.bits == 4:
+            low = (q & 0x0F).to(torch.int8)
+            high = (q >> 4).to(torch.int8)
+            low = torch.where(low > 7, low - 16, low)
+            high = torch.where(high > 7, high - 16, high)
+            q = torch.stack((low, high), dim=-1).reshape(q.shape[0], -1)[:, : self.in_features]
+        return q.to(self.scale.dtype) * self.scale[:, None]
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        weight = self.dequantize().to(x.dtype)
+        bias = self.bias.to(x.dtype) if self.bias is not None else None
+        return F.linear(x, weight, bias)
+
+    def extra_repr(self) -> str:
+        return f"in_features={self.in_features}, out_features={self.out_features}, bits={self.bits}"
+
+
+def _is_conv1d(module: nn.Module) -> bool:
+    # transformers.pytorch_utils.Conv1D: weight is (in, out), forward is x @ W + b
+    return type(module).__name__ == "Conv1D" and hasattr(module, "nf") and hasattr(module, "weight")
+
+
+def _conv1d_to_linear(module: nn.Module) -> nn.Linear:
+    in_features, out_features = module.weight.shape
+    linear = nn.Linear(in_features, out_features, bias=module.bias is not None)
+    linear = linear.to(device=module.weight.device, dtype=module.weight.dtype)
+    with torch.no_grad():
+        linear.weight.copy_(module.weight.t())
+        if module.bias is not None:
+            linear.bias.copy_(module.bias)
+    return linear
+
+
+def _tied_parameter_ids(model: nn.Module) -> set[int]:
+    return {
+        id(param)
+        for module in model.modules()
+        if isinstance(module, nn.Embedding)
+        for param in module.parameters(recurse=False)
+    }
+
+
+def _set_submodule(model: nn.Module, name: str, module: nn.Module) -> None:
+    parent_name, _, child = name.rpartition(".")
+    parent = model.get_submodule(parent_name) if parent_name else model
+    setattr(parent, child, module)
+
+
+def _quantizable_linears(model: nn.Module) -> list[str]:
+    tied = _tied_parameter_ids(model)
+    for name, module in list(model.named_modules()):
+        if name and _is_conv1d(module):
+            _set_submodule(model, name, _conv1d_to_linear(module))
+    return [
+        name
+        for name, module in model.named_modules()
+        # exact type: Linear subclasses such as the out_proj inside
+        # nn.MultiheadAttention are read directly by their parent module
+        if type(module) is nn.Linear and id(module.weight) not in tied
+    ]
+
+
+def quantize_model(
+    model: nn.Module, mode: Optional[str] = "dynamic_int8", *, inplace: bool = False
+) -> nn.Module:
+    """Return ``model`` quantized for CPU inference according to ``mode``.
+
+    ``mode`` is one of :data:`QUANTIZATION_MODES`; ``"none"``/``None`` returns
+    the model unchanged. Unless ``inplace`` is set the input model is copied.
+    The result is put in eval mode.
+    """
+
+    selected = _normalise_mode(mode)
+    if selected == "none":
+        return model
+    target = model if inplace else copy.deepcopy(model)
+    target.eval()
+    names = _quantizable_linears(target)
+    if not names:
+        logger.info("quantize_model: no nn.Linear layers to quantize in %s", type(model).__name__)
+        return target
+    if selected == "dynamic_int8":
+        qconfig = torch.ao.quantization.default_dynamic_qconfig
+        target = torch.ao.quantization.quantize_dynamic(
+            target, {name: qconfig for name in names}, dtype=torch.qint8, inplace=True
+        )
+    else:
+        bits = 8 if selected == "int8" else 4
+        for name in names:
+            _set_submodule(target, name, WeightOnlyQuantLinear(target.get_submodule(name), bits))
+    setattr(target, "codex_quantization", selected)
+    logger.info("quantize_model: %s applied to %d linear layers", selected, len(names))
+    return target
+
+
+def get_quantized(model: nn.Module, mode: Optional[str]) -> nn.Module:
+    """Return a cached quantized copy of ``model`` (``model`` itself for ``none``)."""
+
+    selected = _normalise_mode(mode)
+    if selected == "none" or getattr(model, "codex_quantization", None) == selected:
+        return model
+    per_model = _QUANTIZED_CACHE.setdefault(model, {})
+    if selected not in per_model:
+        per_model[selected] = quantize_model(model, selected)
+    return per_model[selected]
+
+
+def model_size_bytes(model: nn.Module) -> int:
+    """Approximate in-memory size of parameters, buffers and packed weights."""
+
+    total = 0
+    seen: set[int] = set()
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        if id(tensor) in seen:
+            continue
+        seen.add(id(tensor))
+        total += tensor.numel() * tensor.element_size()
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is None:
+            continue
+        try:
+            weight, bias = packed._weight_bias()
+        except Exception:  # pragma: no cover - backend specific
+            continue
+        total += weight.numel() * weight.element_size()
+        if bias is not None:
+            total += bias.numel() * bias.element_size()
+    return total
+
+
+def _extract_logits(output: Any) -> torch.Tensor:
+    if isinstance(output, torch.Tensor):
+        return output
+    if isinstance(output, dict):
+        return output["logits"]
+    return output.logits
+
+
+@torch.no_grad()
+def evaluate_perplexity(model: nn.Module, batches: Iterable[torch.Tensor]) -> float:
+    """Next-token perplexity of ``model`` over ``[batch, seq]`` token id tensors."""
+
+    nll: list[float] = []
+    for input_ids in batches:
+        logits = _extract_logits(model(input_ids))
+        shift_logits = logits[:, :-1].reshape(-1, logits.size(-1)).float()
+        shift_targets = input_ids[:, 1:].reshape(-1)
+        nll.extend(F.cross_entropy(shift_logits, shift_targets, reduction="none").tolist())
+    return perplexity(nll, [0] * len(nll), from_logits=False)
+
+
+@dataclass
+class QuantizationReport:
+    mode: str
+    baseline_ppl: float
+    quantized_ppl: float
+    relative_increase: float
+    size_bytes_before: int
+    size_bytes_after: int
+    passed: bool
+
+
+def check_quantization(
+    model: nn.Module,
+    batches: Sequence[torch.Tensor],
+    mode: str = "dynamic_int8",
+    *,
+    tolerance: float = 0.05,
+    quantized: Optional[nn.Module] = None,
+) -> QuantizationReport:
+    """Compare perplexity before/after quantization on calibration ``batches``.
+
+    The check passes when the relative perplexity increase is within
+    ``tolerance`` (``0.05`` = 5%).
+    """
+
+    selected = _normalise_mode(mode)
+    model.eval()
+    qmodel = quantized if quantized is not None else quantize_model(model, selected)
+    baseline = evaluate_perplexity(model, batches)
+    after = evaluate_perplexity(qmodel, batches)
+    increase = (after - baseline) / baseline if baseline > 0 else 0.0
+    return QuantizationReport(
+        mode=selected,
+        baseline_ppl=baseline,
+        quantized_ppl=after,
+        relative_increase=increase,
+        size_bytes_before=model_size_bytes(model),
+        size_bytes_after=model_size_bytes(qmodel),
+        passed=increase <= tolerance,
+    )
+
+
+def select_quantization(
+    model: nn.Module,
+    batches: Sequence[torch.Tensor],
+    *,
+    candidates: Sequence[str] = ("int4", "dynamic_int8", "int8"),
+    tolerance: float = 0.05,
+) -> tuple[str, list[QuantizationReport]]:
+    """Return the first mode in ``candidates`` within ``tolerance`` plus all reports.
+
+    Falls back to ``"none"`` when no candidate passes the accuracy check.
+    """
+
+    reports: list[QuantizationReport] = []
+    for mode in candidates:
+        report = check_quantization(model, batches, mode, tolerance=tolerance)
+        reports.append(report)
+        if report.passed:
+            return report.mode, reports
+    return "none", reports
+
+
+__all__ = [
+    "QUANTIZATION_MODES",
+    "QuantizationReport",
+    "WeightOnlyQuantLinear",
+    "check_quantization",
+    "evaluate_perplexity",
+    "get_quantized",
+    "model_size_bytes",
+    "quantize_model",
+    "select_quantization",
+]
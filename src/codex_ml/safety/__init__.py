@@ -1,6 +1,6 @@
 # BEGIN: CODEX_SAFETY_INIT
 from .filters import SafetyFilters, SafetyViolation
-from .sanitizers import SafetyConfig, sanitize_output, sanitize_prompt
+from .sanitizers import SafetyConfig, StreamRedactor, sanitize_output, sanitize_prompt
 
 # On some platforms (e.g., Windows), the sandbox implementation depends on
 # POSIX-only modules (like `resource`). Import it defensively and provide
@@ -25,6 +25,7 @@ __all__ = [
     "docker_available",
     "firejail_available",
     "SafetyConfig",
+    "StreamRedactor",
     "sanitize_prompt",
     "sanitize_output",
     "SafetyViolation",
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Pattern
+from typing import Callable, Dict, Iterable, List, Pattern
 
 try:  # pragma: no cover - optional dependency
     import yaml
@@ -56,6 +56,56 @@ def _redact(text: str, patterns: List[Pattern[str]], label: str) -> tuple[str, i
     return text, count
 
 
+class StreamRedactor:
+    """Redact secrets from text that arrives in pieces, e.g. streamed tokens.
+
+    Secrets usually span several tokens, so pieces cannot be redacted one by
+    one. :meth:`feed` buffers text and releases only the part no pattern match
+    can still reach, passed through ``redact``; the last ``holdback``
+    characters (and any match touching them) stay buffered until
+    :meth:`flush`. ``holdback`` must cover the length a secret has when its
+    pattern first matches.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[Pattern[str]] = DEFAULT_SECRET_PATTERNS,
+        redact: Callable[[str], str] | None = None,
+        *,
+        holdback: int = 128,
+    ) -> None:
+        self.patterns = list(patterns)
+        self.redact = redact or (lambda text: _redact(text, self.patterns, "SECRET")[0])
+        self.holdback = holdback
+        self._pending = ""
+
+    def feed(self, piece: str) -> str:
+        """Add ``piece`` and return the redacted text that is now settled."""
+
+        self._pending += piece
+        cut = len(self._pending) - self.holdback
+        while cut > 0:
+            starts = [
+                match.start()
+                for pattern in self.patterns
+                for match in pattern.finditer(self._pending)
+                if match.start() < cut < match.end()
+            ]
+            if not starts:
+                break
+            cut = min(starts)
+        if cut <= 0:
+            return ""
+        settled, self._pending = self._pending[:cut], self._pending[cut:]
+        return self.redact(settled)
+
+    def flush(self) -> str:
+        """Return the redacted remainder once the stream has ended."""
+
+        rest, self._pending = self._pending, ""
+        return self.redact(rest) if rest else ""
+
+
 def _safe_load_yaml(policy_yaml: str) -> Dict:
     if not policy_yaml or yaml is None:
         return {}
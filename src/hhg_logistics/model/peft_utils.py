@@ -50,8 +50,13 @@ def load_hf_llm(
     use_fast: bool | None = None,
     trust_remote_code: bool = False,
     low_cpu_mem_usage: bool = True,
+    quantization: str | None = None,
 ) -> HFModelBundle:
-    """Load a Hugging Face causal LM and tokenizer with conservative defaults."""
+    """Load a Hugging Face causal LM and tokenizer with conservative defaults.
+
+    ``quantization`` (``dynamic_int8``/``int8``/``int4``) quantizes the model for
+    CPU inference; leave it unset when adapters will be attached afterwards.
+    """
 
     if AutoModelForCausalLM is None or AutoTokenizer is None:
         msg = "transformers missing"
@@ -92,6 +97,10 @@ def load_hf_llm(
         low_cpu_mem_usage=low_cpu_mem_usage,
         trust_remote_code=trust_remote_code,
     )
+    if quantization and quantization != "none":
+        from codex_ml.models.quantization import quantize_model
+
+        model = quantize_model(model, quantization, inplace=True)
     return HFModelBundle(model=model, tokenizer=tokenizer)
 
 
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import threading
 import time
-from collections.abc import Hashable, Mapping, Sequence
+from collections.abc import AsyncIterator, Hashable, Iterator, Mapping, Sequence
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
 import ray
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from ray import serve
 
 import hydra
 from common.ndjson_tools import append_event_ndjson, make_run_metrics_path
+from codex_ml.safety.sanitizers import StreamRedactor
 from hhg_logistics.model.adapters import load_adapters_into
 from hhg_logistics.model.peft_utils import load_hf_llm
+from hhg_logistics.serve.prefix_cache import PrefixKVCache
 from omegaconf import DictConfig, OmegaConf
 
 logger = logging.getLogger(__name__)
@@ -55,6 +60,10 @@ def _make_override_key(overrides: Mapping[str, Any]) -> Hashable:
     )
 
 
+def _sse_event(event: str, data: Mapping[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(dict(data))}\n\n"
+
+
 @dataclass
 class GenConfig:
     max_new_tokens: int = 32
@@ -106,6 +115,15 @@ class LLMService:
             else:
                 logger.warning("Adapters dir %s not found; using base model.", adapters_dir)
 
+        quantization = getattr(serve_cfg.model, "quantization", None)
+        if quantization and str(quantization) != "none":
+            from codex_ml.models.quantization import quantize_model
+
+            # Quantize after adapters are attached so they are folded in first.
+            if hasattr(model, "merge_and_unload"):
+                model = model.merge_and_unload()
+            model = quantize_model(model, str(quantization), inplace=True)
+
         self.model = model
         self.tokenizer = tokenizer
         self.gen_cfg = GenConfig(
@@ -120,6 +138,14 @@ class LLMService:
         self.batch_size = int(serve_cfg.batching.max_batch_size)
         self.batch_timeout_s = float(int(serve_cfg.batching.timeout_ms) / 1000.0)
 
+        prefix_cfg = getattr(serve_cfg, "prefix_cache", None)
+        self.prefix_cache: PrefixKVCache | None = None
+        if prefix_cfg is not None and bool(getattr(prefix_cfg, "enabled", False)):
+            self.prefix_cache = PrefixKVCache(
+                block_size=int(getattr(prefix_cfg, "block_size", 16)),
+                max_bytes=int(getattr(prefix_cfg, "max_mb", 512)) * 1024 * 1024,
+            )
+
         self.ready = True
         logger.info("LLMService ready. Model=%s", cfg.model.pretrained)
 
@@ -159,24 +185,103 @@ class LLMService:
             "latency_ms": latency_ms,
             "model": str(self.cfg.model.pretrained),
         }
+        self._log_request("/predict", prompts, outputs, latency_ms)
+        return JSONResponse(response)
 
-        if self.enable_req_log:
-            record = {
-                "ts": int(time.time()),
-                "route": "/predict",
-                "n_prompts": len(prompts),
-                "prompt_len": sum(len(p) for p in prompts),
-                "gen_len": sum(len(o) for o in outputs),
-                "latency_ms": latency_ms,
-                "model": str(self.cfg.model.pretrained),
-                "source": str(self.cfg.serve.model.source),
-            }
-            try:
-                append_event_ndjson(self.metrics_file, record)
-            except Exception:  # pragma: no cover - logging best effort
-                logger.debug("Failed to append request log", exc_info=True)
+    @api.post("/predict/stream")
+    async def predict_stream(self, request: Request):
+        """Stream generated text for a single prompt as Server-Sent Events.
 
-        return JSONResponse(response)
+        ``token`` events carry text as soon as ``generate()`` emits it and a
+        final ``done`` event carries the full completion. Secrets are redacted
+        over the accumulated text, holding back a tail that could still turn
+        into one, because a secret spans several streamed pieces. A client
+        disconnect stops generation at the next decode step.
+        """
+
+        started = time.perf_counter()
+        body = await request.json()
+        prompt = body.get("inputs")
+        if not isinstance(prompt, str):
+            return JSONResponse({"error": "inputs must be a string"}, status_code=400)
+        overrides = body.get("generate_kwargs") or {}
+        cancel = threading.Event()
+        chunks = self._generate_stream(prompt, overrides, cancel)
+
+        async def events() -> AsyncIterator[str]:
+            redactor = StreamRedactor()
+            pieces: list[str] = []
+            first_token_ms: int | None = None
+            cancelled = False
+            try:
+                while True:
+                    piece = await asyncio.to_thread(next, chunks, None)
+                    if piece is None:
+                        break
+                    if await request.is_disconnected():
+                        cancelled = True
+                        break
+                    if first_token_ms is None:
+                        first_token_ms = int((time.perf_counter() - started) * 1000)
+                    settled = redactor.feed(piece)
+                    if settled:
+                        pieces.append(settled)
+                        yield _sse_event("token", {"text": settled})
+                if not cancelled:
+                    rest = redactor.flush()
+                    if rest:
+                        pieces.append(rest)
+                        yield _sse_event("token", {"text": rest})
+                    yield _sse_event(
+                        "done",
+                        {
+                            "output": "".join(pieces),
+                            "latency_ms": int((time.perf_counter() - started) * 1000),
+                            "model": str(self.cfg.model.pretrained),
+                        },
+                    )
+            except (asyncio.CancelledError, GeneratorExit):
+                cancelled = True
+                raise
+            finally:
+                # Stops the generate() thread at its next step if still running.
+                cancel.set()
+                self._log_request(
+                    "/predict/stream",
+                    [prompt],
+                    ["".join(pieces)],
+                    int((time.perf_counter() - started) * 1000),
+                    ttft_ms=first_token_ms,
+                    cancelled=cancelled,
+                )
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    def _log_request(
+        self,
+        route: str,
+        prompts: Sequence[str],
+        outputs: Sequence[str],
+        latency_ms: int,
+        **extra: Any,
+    ) -> None:
+        if not self.enable_req_log:
+            return
+        record = {
+            "ts": int(time.time()),
+            "route": route,
+            "n_prompts": len(prompts),
+            "prompt_len": sum(len(p) for p in prompts),
+            "gen_len": sum(len(o) for o in outputs),
+            "latency_ms": latency_ms,
+            "model": str(self.cfg.model.pretrained),
+            "source": str(self.cfg.serve.model.source),
+            **extra,
+        }
+        try:
+            append_event_ndjson(self.metrics_file, record)
+        except Exception:  # pragma: no cover - logging best effort
+            logger.debug("Failed to append request log", exc_info=True)
 
     def _collect_generate_kwargs(self, overrides: dict[str, Any]) -> dict[str, Any]:
         base = asdict(self.gen_cfg)
@@ -187,6 +292,39 @@ class LLMService:
 
     def _generate(
         self, prompts: Sequence[str], overrides: dict[str, Any] | None = None
+    ) -> list[str]:
+        if self.prefix_cache is None:
+            return self._generate_batch(prompts, overrides)
+        # Prompts with a cached prefix are decoded one by one on top of it; the
+        # rest keep batched generation and seed the cache for later requests.
+        outputs: list[str | None] = [None] * len(prompts)
+        misses: list[int] = []
+        for index, prompt in enumerate(prompts):
+            ids = self.tokenizer(prompt, truncation=True, max_length=256)["input_ids"]
+            if self.prefix_cache.match_length(ids):
+                outputs[index] = self._generate_cached(prompt, overrides or {})
+            else:
+                misses.append(index)
+        if misses:
+            batch = self._generate_batch([prompts[i] for i in misses], overrides)
+            for index, text in zip(misses, batch):
+                outputs[index] = text
+            self._seed_prefix_cache([prompts[i] for i in misses])
+        return [text or "" for text in outputs]
+
+    def _seed_prefix_cache(self, prompts: Sequence[str]) -> None:
+        for prompt in prompts:
+            encode = self.tokenizer(
+                [prompt],
+                truncation=True,
+                max_length=256,
+                return_tensors="pt",
+            )
+            with _TorchInferenceContext():
+                self._prefill_prefix(encode["input_ids"])
+
+    def _generate_batch(
+        self, prompts: Sequence[str], overrides: dict[str, Any] | None = None
     ) -> list[str]:
         encode = self.tokenizer(
             list(prompts),
@@ -209,6 +347,106 @@ class LLMService:
         texts = self.tokenizer.batch_decode(output, skip_special_tokens=True)
         return texts
 
+    def _prefill_prefix(self, input_ids: Any) -> dict[str, Any]:
+        """Return ``generate()`` kwargs reusing cached KV for the prompt prefix.
+
+        Only the block-aligned part of the prompt not already in the cache is
+        run through the model; the result is cached for later requests.
+        """
+
+        if self.prefix_cache is None:
+            return {}
+        ids = input_ids[0].tolist()
+        aligned = self.prefix_cache.aligned_length(len(ids))
+        hit = self.prefix_cache.lookup(ids)
+        cached = hit[0] if hit is not None else 0
+        if aligned > cached:
+            out = self.model(
+                input_ids=input_ids[:, cached:aligned],
+                past_key_values=hit[1] if hit is not None else None,
+                use_cache=True,
+            )
+            self.prefix_cache.insert(ids[:aligned], out.past_key_values)
+            hit = self.prefix_cache.lookup(ids)
+        if hit is None:
+            return {}
+        return {"past_key_values": hit[1]}
+
+    def _generate_cached(self, prompt: str, overrides: dict[str, Any]) -> str:
+        encode = self.tokenizer(
+            [prompt],
+            truncation=True,
+            max_length=256,
+            return_tensors="pt",
+        )
+        generate_kwargs = self._collect_generate_kwargs(overrides)
+        with _TorchInferenceContext():
+            prefix_kwargs = self._prefill_prefix(encode["input_ids"])
+            output = self.model.generate(
+                input_ids=encode["input_ids"],
+                attention_mask=encode.get("attention_mask"),
+                max_new_tokens=generate_kwargs.get("max_new_tokens", 32),
+                do_sample=generate_kwargs.get("do_sample", False),
+                temperature=generate_kwargs.get("temperature", 0.7),
+                top_p=generate_kwargs.get("top_p", 0.95),
+                top_k=generate_kwargs.get("top_k"),
+                **prefix_kwargs,
+            )
+        return self.tokenizer.decode(output[0], skip_special_tokens=True)
+
+    def _generate_stream(
+        self, prompt: str, overrides: dict[str, Any], cancel: threading.Event
+    ) -> Iterator[str]:
+        """Run ``generate()`` in a thread and yield decoded text as it is produced.
+
+        Setting ``cancel`` stops generation at the next decode step.
+        """
+
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        class _CancelCriteria(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs) -> bool:  # noqa: ANN001
+                return cancel.is_set()
+
+        encode = self.tokenizer(
+            [prompt],
+            truncation=True,
+            max_length=256,
+            return_tensors="pt",
+        )
+        generate_kwargs = self._collect_generate_kwargs(overrides)
+        streamer = TextIteratorStreamer(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=True
+        )
+        errors: list[BaseException] = []
+
+        def _run() -> None:
+            try:
+                with _TorchInferenceContext():
+                    prefix_kwargs = self._prefill_prefix(encode["input_ids"])
+                    self.model.generate(
+                        input_ids=encode["input_ids"],
+                        attention_mask=encode.get("attention_mask"),
+                        max_new_tokens=generate_kwargs.get("max_new_tokens", 32),
+                        do_sample=generate_kwargs.get("do_sample", False),
+                        temperature=generate_kwargs.get("temperature", 0.7),
+                        top_p=generate_kwargs.get("top_p", 0.95),
+                        top_k=generate_kwargs.get("top_k"),
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_CancelCriteria()]),
+                        **prefix_kwargs,
+                    )
+            except BaseException as exc:  # surfaced to the consumer below
+                errors.append(exc)
+                streamer.end()
+
+        worker = threading.Thread(target=_run, name="hhg-generate-stream", daemon=True)
+        worker.start()
+        yield from streamer
+        worker.join()
+        if errors:
+            raise errors[0]
+
     @serve.batch(max_batch_size=8, batch_wait_timeout_s=0.02)
     async def _predict_batch(self, payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
         payload_infos: list[dict[str, Any]] = []
@@ -0,0 +1,217 @@
+"""Shared prompt-prefix KV cache for :class:`hhg_logistics.serve.app.LLMService`.
+
+Prompts are split into fixed-size token blocks. Every block boundary is keyed
+by a chained ``blake2b`` digest of all tokens up to that boundary, so two
+prompts sharing a system prompt or few-shot preamble map to the same keys for
+their common blocks. Each stored entry holds the KV state (legacy
+``((key, value), ...)`` layout) for one block-aligned prefix; shorter matches
+are served by cropping that state along the sequence dimension, so an entry
+that is a prefix of a newer, longer one is dropped. Entries are evicted
+least-recently-used once ``max_bytes`` is exceeded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+LegacyKV = tuple[tuple[Any, Any], ...]
+
+
+def _to_legacy(kv: Any) -> LegacyKV:
+    if hasattr(kv, "to_legacy_cache"):
+        kv = kv.to_legacy_cache()
+    return tuple((layer[0], layer[1]) for layer in kv)
+
+
+def _crop(kv: LegacyKV, length: int) -> LegacyKV:
+    return tuple((k[:, :, :length, :], v[:, :, :length, :]) for k, v in kv)
+
+
+def _nbytes(kv: LegacyKV) -> int:
+    total = 0
+    for layer in kv:
+        for tensor in layer:
+            nbytes = getattr(tensor, "nbytes", None)
+            if nbytes is None:
+                nbytes = tensor.numel() * tensor.element_size()
+            total += int(nbytes)
+    return total
+
+
+def _restore(kv: LegacyKV) -> Any:
+    """Wrap ``kv`` in the cache class ``generate()`` expects when available."""
+
+    try:  # pragma: no cover - optional dependency
+        from transformers import DynamicCache
+    except Exception:  # pragma: no cover - transformers missing or too old
+        return kv
+    return DynamicCache.from_legacy_cache(kv)
+
+
+@dataclass
+class _Entry:
+    length: int
+    kv: LegacyKV
+    nbytes: int
+    keys: list[bytes] = field(default_factory=list)
+
+
+@dataclass
+class PrefixCacheStats:
+    hits: int = 0
+    misses: int = 0
+    hit_tokens: int = 0
+    evictions: int = 0
+
+
+class PrefixKVCache:
+    """LRU map from block-aligned token prefixes to computed KV states."""
+
+    def __init__(self, block_size: int = 16, max_bytes: int = 512 * 1024 * 1024) -> None:
+        if block_size < 1:
+            raise ValueError("block_size must be >= 1")
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.stats = PrefixCacheStats()
+        self._blocks: dict[bytes, tuple[_Entry, int]] = {}
+        # every entry whose prefix contains the block, to re-point keys on removal
+        self._holders: dict[bytes, list[_Entry]] = {}
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def aligned_length(self, n_tokens: int) -> int:
+        """Longest block-aligned prefix that still leaves one token to prefill."""
+
+        if n_tokens <= 1:
+            return 0
+        return ((n_tokens - 1) // self.block_size) * self.block_size
+
+    def _block_keys(self, token_ids: Sequence[int], length: int) -> list[bytes]:
+        keys: list[bytes] = []
+        digest = b""
+        for start in range(0, length, self.block_size):
+            block = token_ids[start : start + self.block_size]
+            hasher = hashlib.blake2b(digest, digest_size=16)
+            hasher.update(struct.pack(f"<{len(block)}q", *block))
+            digest = hasher.digest()
+            keys.append(digest)
+        return keys
+
+    def match_length(self, token_ids: Sequence[int]) -> int:
+        """Tokens :meth:`lookup` would serve from cache, without counting a hit or miss."""
+
+        aligned = self.aligned_length(len(token_ids))
+        length = 0
+        with self._lock:
+            for key in self._block_keys(token_ids, aligned):
+                match = self._blocks.get(key)
+                if match is None:
+                    break
+                length = match[1]
+        return length
+
+    def lookup(self, token_ids: Sequence[int], *, raw: bool = False) -> tuple[int, Any] | None:
+        """Return ``(n_tokens, kv)`` for the longest cached prefix of ``token_ids``.
+
+        The match never covers the final token so the caller always has at
+        least one position left to compute logits for. ``kv`` is wrapped for
+        ``generate()`` unless ``raw`` is set.
+        """
+
+        aligned = self.aligned_length(len(token_ids))
+        with self._lock:
+            best: tuple[_Entry, int] | None = None
+            for key in self._block_keys(token_ids, aligned):
+                match = self._blocks.get(key)
+                if match is None:
+                    break
+                best = match
+            if best is None:
+                self.stats.misses += 1
+                return None
+            entry, length = best
+            self._entries.move_to_end(id(entry))
+            self.stats.hits += 1
+            self.stats.hit_tokens += length
+            kv = entry.kv if length == entry.length else _crop(entry.kv, length)
+        return length, (kv if raw else _restore(kv))
+
+    def insert(self, token_ids: Sequence[int], kv: Any) -> None:
+        """Store ``kv`` computed for ``token_ids`` (length must be block-aligned)."""
+
+        length = len(token_ids)
+        if length == 0 or length % self.block_size:
+            raise ValueError("token_ids length must be a positive multiple of block_size")
+        legacy = _to_legacy(kv)
+        entry = _Entry(length=length, kv=legacy, nbytes=_nbytes(legacy))
+        if entry.nbytes > self.max_bytes:
+            return
+        keys = self._block_keys(token_ids, length)
+        with self._lock:
+            current = self._blocks.get(keys[-1])
+            if current is not None and current[0].length == length:
+                self._entries.move_to_end(id(current[0]))
+                return
+            entry.keys = keys
+            for index, key in enumerate(keys):
+                self._holders.setdefault(key, []).append(entry)
+                previous = self._blocks.get(key)
+                # Prefer the entry with the most tokens behind each boundary so
+                # long shared preambles stay reachable after short entries go.
+                if previous is None or previous[0].length <= length:
+                    self._blocks[key] = (entry, (index + 1) * self.block_size)
+                    if previous is not None and previous[0].keys[-1] == key:
+                        # ``previous`` is a prefix of ``entry``, which serves it by cropping
+                        self._unlink(previous[0])
+            self._entries[id(entry)] = entry
+            self._bytes += entry.nbytes
+            self._evict()
+
+    def _unlink(self, entry: _Entry) -> None:
+        """Remove ``entry``; blocks it served fall back to the longest other holder."""
+
+        if self._entries.pop(id(entry), None) is not None:
+            self._bytes -= entry.nbytes
+        for key in entry.keys:
+            holders = self._holders.get(key, [])
+            holders[:] = [other for other in holders if other is not entry]
+            if not holders:
+                self._holders.pop(key, None)
+                self._blocks.pop(key, None)
+                continue
+            match = self._blocks.get(key)
+            if match is not None and match[0] is entry:
+                best = max(reversed(holders), key=lambda other: other.length)
+                self._blocks[key] = (best, match[1])
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            entry = next(iter(self._entries.values()))
+            self._unlink(entry)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._holders.clear()
+            self._entries.clear()
+            self._bytes = 0
+
+
+__all__ = ["PrefixCacheStats", "PrefixKVCache"]
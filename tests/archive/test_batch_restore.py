@@ -92,3 +92,111 @@ def test_save_results_persists_summary(tmp_path: Path) -> None:
     content = json.loads(output_path.read_text())
     assert content["total"] == 1
     assert content["results"][0]["tombstone"] == "a"
+
+
+def _archive_service(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from codex.archive.config import ArchiveAppConfig, BackendConfig
+    from codex.archive.service import ArchiveService
+
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", (tmp_path / "evidence").as_posix())
+    db_path = tmp_path / "archive.sqlite"
+    settings = ArchiveAppConfig(
+        backend=BackendConfig(backend="sqlite", url=f"sqlite:///{db_path.as_posix()}")
+    )
+    return ArchiveService(settings)
+
+
+def _archive_files(service, tmp_path: Path, count: int) -> list[tuple[str, bytes]]:
+    src = tmp_path / "src"
+    src.mkdir()
+    archived = []
+    for idx in range(count):
+        path = src / f"file{idx}.txt"
+        path.write_bytes(f"payload {idx}\n".encode() * (idx + 1) * 50)
+        result = service.archive_path(
+            repo="repo",
+            path=path,
+            reason="legacy",
+            archived_by="tester",
+            commit_sha="f" * 40,
+        )
+        archived.append((result.tombstone_id, path.read_bytes()))
+    return archived
+
+
+def test_concurrent_restore_keeps_manifest_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = _archive_service(tmp_path, monkeypatch)
+    archived = _archive_files(service, tmp_path, 12)
+    manifest_path = tmp_path / "batch.json"
+    entries = [{"tombstone": t, "output": f"out/{i}.txt"} for i, (t, _) in enumerate(archived)]
+    entries.append({"tombstone": "missing", "output": "out/missing.txt"})
+    manifest_path.write_text(json.dumps(entries))
+    manifest = batch.BatchManifest.from_path(manifest_path, default_actor="actor")
+
+    progress: list[int] = []
+    runner = batch.BatchRestore(
+        service,
+        batch_config=BatchConfig(concurrent=4),
+        progress_callback=lambda index, total, entry: progress.append(index),
+    )
+    plan = runner.plan(manifest)
+    assert (plan.total, plan.found, plan.missing) == (13, 12, ["missing"])
+    assert plan.total_bytes == sum(len(data) for _, data in archived)
+    assert plan.overwrites == 0 and plan.workers == 4
+    assert plan.estimated_seconds > 0
+    assert not (tmp_path / "out").exists()
+
+    result = runner.restore(manifest)
+    assert (result.succeeded, result.failed) == (12, 1)
+    assert [entry["tombstone"] for entry in result.results] == [e["tombstone"] for e in entries]
+    assert progress == list(range(1, 14))
+    for idx, (_, data) in enumerate(archived):
+        assert (tmp_path / "out" / f"{idx}.txt").read_bytes() == data
+    assert not [p for p in (tmp_path / "out").iterdir() if p.name.endswith(".partial")]
+    assert runner.plan(manifest).overwrites == 12
+
+
+def test_corrupt_payload_leaves_existing_output(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = _archive_service(tmp_path, monkeypatch)
+    [(tombstone, _)] = _archive_files(service, tmp_path, 1)
+    conn = service.dal._conn
+    assert conn is not None
+    conn.execute("UPDATE artifact SET blob_bytes = :blob", {"blob": b"not compressed"})
+    conn.commit()
+
+    out = tmp_path / "out.txt"
+    out.write_text("previous")
+    with pytest.raises(RuntimeError):
+        service.restore_to_path(tombstone, output_path=out, actor="tester")
+    assert out.read_text() == "previous"
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".partial")] == []
+
+
+def test_batch_restore_writes_worker_evidence_in_one_batch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = _archive_service(tmp_path, monkeypatch)
+    archived = _archive_files(service, tmp_path, 6)
+    log = tmp_path / "evidence" / "archive_ops.jsonl"
+    before = log.read_text(encoding="utf-8")
+    manifest_path = tmp_path / "batch.json"
+    entries = [{"tombstone": t, "output": f"out/{i}.txt"} for i, (t, _) in enumerate(archived)]
+    manifest_path.write_text(json.dumps(entries))
+    manifest = batch.BatchManifest.from_path(manifest_path, default_actor="actor")
+
+    # records from the worker threads are buffered until the batch ends
+    unchanged: list[bool] = []
+    runner = batch.BatchRestore(
+        service,
+        batch_config=BatchConfig(concurrent=3),
+        progress_callback=lambda *_: unchanged.append(log.read_text(encoding="utf-8") == before),
+    )
+    assert runner.restore(manifest).succeeded == 6
+    assert unchanged == [True] * 6
+    added = log.read_text(encoding="utf-8")[len(before) :].splitlines()
+    restored = [json.loads(line) for line in added if json.loads(line)["action"] == "RESTORE"]
+    assert sorted(r["tombstone"] for r in restored) == sorted(t for t, _ in archived)
@@ -0,0 +1,169 @@
+"""Filesystem content-addressed blob store for archive payloads."""
+
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from codex.archive.blobstore import FilesystemBlobStore, cas_digest
+from codex.archive.config import ArchiveAppConfig, BackendConfig, StorageConfig
+from codex.archive.service import ArchiveService
+
+COMMON = dict(repo="repo", reason="legacy", archived_by="tester", commit_sha="d" * 40)
+
+
+def _service(tmp_path: Path, **storage: object) -> ArchiveService:
+    db_path = tmp_path / "archive.sqlite"
+    settings = ArchiveAppConfig(
+        backend=BackendConfig(backend="sqlite", url=f"sqlite:///{db_path.as_posix()}"),
+        storage=StorageConfig(blob_root=tmp_path / "blobs", **storage),  # type: ignore[arg-type]
+    )
+    return ArchiveService(settings)
+
+
+@pytest.fixture(autouse=True)
+def _evidence(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", (tmp_path / "evidence").as_posix())
+
+
+def _rows(service: ArchiveService, sql: str) -> list[tuple]:
+    conn = service.dal._conn
+    assert isinstance(conn, sqlite3.Connection)
+    return [tuple(row) for row in conn.execute(sql)]
+
+
+def test_store_is_content_addressed_and_atomic(tmp_path: Path) -> None:
+    store = FilesystemBlobStore(tmp_path / "blobs")
+    url = store.put(b"payload")
+    assert store.put(b"payload") == url
+    path = store.path_for(url)
+    digest = cas_digest(url)
+    assert path.relative_to(store.root).parts == (digest[:2], digest[2:4], digest)
+    assert store.get(url) == b"payload"
+    assert store.verify(url)
+    assert not list(path.parent.glob(".tmp-*"))
+
+    path.write_bytes(b"tampered")
+    assert not store.verify(url)
+    with pytest.raises(ValueError):
+        store.path_for("cas://sha256/../../etc/passwd")
+
+
+def test_fs_blob_store_keeps_payloads_out_of_db(tmp_path: Path) -> None:
+    service = _service(tmp_path, blob_store="fs")
+    source = tmp_path / "module.py"
+    source.write_text("print('hello')\n" * 50, encoding="utf-8")
+    result = service.archive_path(path=source, kind="code", **COMMON)
+
+    [(driver, blob, url)] = _rows(
+        service, "SELECT storage_driver, blob_bytes, object_url FROM artifact"
+    )
+    assert (driver, blob) == ("fs", None)
+    assert url.startswith("cas://sha256/")
+    assert FilesystemBlobStore(tmp_path / "blobs").exists(url)
+
+    out = tmp_path / "restored.py"
+    service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == source.read_bytes()
+    assert service.dal.verify_blobs()["ok"]
+
+
+def test_chunked_payloads_use_blob_store(tmp_path: Path) -> None:
+    service = _service(
+        tmp_path,
+        blob_store="fs",
+        chunking=True,
+        chunk_min_size=1024,
+        chunk_avg_size=4096,
+        chunk_max_size=16384,
+    )
+    source = tmp_path / "data.bin"
+    source.write_bytes(random.Random(1).randbytes(50_000))
+    result = service.archive_path(path=source, kind="asset", **COMMON)
+    assert _rows(service, "SELECT COUNT(*) FROM chunk WHERE blob_bytes IS NOT NULL") == [(0,)]
+
+    out = tmp_path / "out.bin"
+    service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == source.read_bytes()
+
+
+def test_gc_keeps_old_orphan_chunks_reused_before_record(tmp_path: Path) -> None:
+    service = _service(
+        tmp_path,
+        blob_store="fs",
+        chunking=True,
+        chunk_min_size=1024,
+        chunk_avg_size=4096,
+        chunk_max_size=16384,
+    )
+    source = tmp_path / "data.bin"
+    source.write_bytes(random.Random(2).randbytes(50_000))
+    # chunks left behind by an earlier run whose record_archive never happened
+    service._store_chunks(source)
+    conn = service.dal._conn
+    assert isinstance(conn, sqlite3.Connection)
+    conn.execute("UPDATE chunk SET created_at = '2000-01-01T00:00:00Z'")
+    conn.commit()
+    store = FilesystemBlobStore(tmp_path / "blobs")
+    urls = [url for url, _ in store.iter_urls()]
+    for url in urls:
+        old = store.path_for(url).stat().st_mtime - 7200
+        os.utime(store.path_for(url), (old, old))
+
+    # a new archive run dedups against them, then GC runs before its references land
+    _, _, stored_bytes, refs, _ = service._store_chunks(source)
+    assert stored_bytes == 0
+    report = service.dal.gc_blobs(grace_seconds=3600)
+    assert report["chunk_rows"] == 0 and report["blobs"] == 0
+    assert service.dal.existing_chunks(refs) == set(refs)
+    assert urls and all(store.exists(url) for url in urls)
+
+
+def test_migrate_verify_and_gc(tmp_path: Path) -> None:
+    db_service = _service(tmp_path)
+    sources = []
+    for idx in range(5):
+        source = tmp_path / f"file{idx}.txt"
+        source.write_text(f"content {idx}\n" * 20, encoding="utf-8")
+        sources.append((db_service.archive_path(path=source, kind="doc", **COMMON), source))
+    assert _rows(db_service, "SELECT COUNT(*) FROM artifact WHERE storage_driver = 'db'") == [
+        (5,)
+    ]
+
+    fs_service = _service(tmp_path, blob_store="fs")
+    moved = fs_service.dal.migrate_blobs(to="fs", batch_size=2)
+    assert moved["artifacts"] == 5
+    assert _rows(fs_service, "SELECT COUNT(*) FROM artifact WHERE blob_bytes IS NOT NULL") == [
+        (0,)
+    ]
+    assert fs_service.dal.compact() is True
+    report = fs_service.dal.verify_blobs()
+    assert report["checked"] == 5 and report["ok"]
+
+    result, source = sources[0]
+    out = tmp_path / "restored.txt"
+    fs_service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == source.read_bytes()
+
+    store = FilesystemBlobStore(tmp_path / "blobs")
+    broken = next(url for url, _ in store.iter_urls())
+    store.path_for(broken).write_bytes(b"bitrot")
+    assert fs_service.dal.verify_blobs()["corrupt"] == [broken]
+
+    # an unreferenced blob is only collected once it is older than the grace period
+    stray = store.put(b"orphaned payload")
+    assert fs_service.dal.gc_blobs(grace_seconds=3600)["blobs"] == 0
+    old = store.path_for(stray).stat().st_mtime - 7200
+    os.utime(store.path_for(stray), (old, old))
+    assert fs_service.dal.gc_blobs(grace_seconds=3600, dry_run=True)["blobs"] == 1
+    assert store.exists(stray)
+    assert fs_service.dal.gc_blobs(grace_seconds=3600)["blobs"] == 1
+    assert not store.exists(stray)
+
+    back = fs_service.dal.migrate_blobs(to="db")
+    assert back["artifacts"] == 5
+    assert _rows(fs_service, "SELECT COUNT(*) FROM artifact WHERE storage_driver = 'fs'") == [(0,)]
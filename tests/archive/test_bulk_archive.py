@@ -0,0 +1,100 @@
+"""Bulk archive ingestion with batched transactions and evidence writes."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from codex.archive import util
+from codex.archive.config import ArchiveAppConfig, BackendConfig
+from codex.archive.service import ArchiveRequest, ArchiveService
+
+
+@pytest.fixture
+def service(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ArchiveService:
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", (tmp_path / "evidence").as_posix())
+    db_path = tmp_path / "archive.sqlite"
+    settings = ArchiveAppConfig(
+        backend=BackendConfig(backend="sqlite", url=f"sqlite:///{db_path.as_posix()}")
+    )
+    return ArchiveService(settings)
+
+
+def _requests(tmp_path: Path, count: int) -> list[ArchiveRequest]:
+    src = tmp_path / "src"
+    src.mkdir()
+    requests = []
+    for idx in range(count):
+        path = src / f"mod{idx:03d}.py"
+        # every fourth file duplicates an earlier payload
+        path.write_text(f"VALUE = {idx % 4 if idx % 4 == 0 else idx}\n" * 10, encoding="utf-8")
+        requests.append(
+            ArchiveRequest(
+                repo="repo",
+                path=path,
+                reason="dead",
+                archived_by="tester",
+                commit_sha="e" * 40,
+                tags=("bulk",),
+            )
+        )
+    return requests
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_archive_paths_batches_commits_and_evidence(
+    service: ArchiveService,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    workers: int,
+) -> None:
+    requests = _requests(tmp_path, 25)
+    transactions = []
+    original = service.dal.record_archives
+
+    def _spy(entries):
+        transactions.append(len(entries))
+        return original(entries)
+
+    monkeypatch.setattr(service.dal, "record_archives", _spy)
+    results = service.archive_paths(requests, workers=workers, batch_size=10)
+
+    assert transactions == [10, 10, 5]
+    assert [r.path for r in results] == [r.path.as_posix() for r in requests]
+    assert len({r.tombstone_id for r in results}) == 25
+
+    conn = sqlite3.connect(tmp_path / "archive.sqlite")
+    assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 25
+    unique = len({r.sha256 for r in results})
+    assert conn.execute("SELECT COUNT(*) FROM artifact").fetchone()[0] == unique < 25
+    assert conn.execute("SELECT COUNT(*) FROM tag WHERE tag = 'bulk'").fetchone()[0] == 25
+
+    lines = (tmp_path / "evidence" / "archive_ops.jsonl").read_text().splitlines()
+    assert [json.loads(line)["action"] for line in lines] == ["ARCHIVE"] * 25
+
+    out = tmp_path / "restored.py"
+    service.restore_to_path(results[7].tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == requests[7].path.read_bytes()
+
+
+def test_failed_batch_rolls_back_only_that_batch(
+    service: ArchiveService, tmp_path: Path
+) -> None:
+    requests = _requests(tmp_path, 6)
+    requests[4] = ArchiveRequest(**{**requests[4].__dict__, "kind": "not-a-kind"})
+    with pytest.raises(sqlite3.IntegrityError):
+        service.archive_paths(requests, workers=1, batch_size=3)
+    conn = sqlite3.connect(tmp_path / "archive.sqlite")
+    assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 3
+    lines = (tmp_path / "evidence" / "archive_ops.jsonl").read_text().splitlines()
+    assert len(lines) == 3
+
+
+def test_compressor_context_is_reused() -> None:
+    if util._zstd is None:
+        pytest.skip("zstandard not installed")
+    assert util._zstd_compressor(9) is util._zstd_compressor(9)
+    assert util.zstd_decompress(util.zstd_compress(b"abc" * 100)) == b"abc" * 100
@@ -0,0 +1,119 @@
+"""Streaming, content-defined chunked archive storage."""
+
+from __future__ import annotations
+
+import io
+import os
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from codex.archive.cdc import iter_chunks
+from codex.archive.config import ArchiveAppConfig, BackendConfig, StorageConfig
+from codex.archive.service import ArchiveService
+
+
+def _payload(size: int, seed: int = 7) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.fixture
+def service(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ArchiveService:
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", (tmp_path / "evidence").as_posix())
+    db_path = tmp_path / "archive.sqlite"
+    settings = ArchiveAppConfig(
+        backend=BackendConfig(backend="sqlite", url=f"sqlite:///{db_path.as_posix()}"),
+        storage=StorageConfig(
+            chunking=True, chunk_min_size=1024, chunk_avg_size=4096, chunk_max_size=16384
+        ),
+    )
+    return ArchiveService(settings)
+
+
+def _count(service: ArchiveService, table: str) -> int:
+    conn = service.dal._conn
+    assert isinstance(conn, sqlite3.Connection)
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_iter_chunks_is_lossless_and_content_defined() -> None:
+    data = _payload(200_000)
+    sizes = dict(min_size=1024, avg_size=4096, max_size=16384)
+    chunks = list(iter_chunks(io.BytesIO(data), read_size=5000, **sizes))
+    assert b"".join(chunks) == data
+    assert all(len(c) <= 16384 for c in chunks)
+    assert all(len(c) >= 1024 for c in chunks[:-1])
+
+    shifted = list(iter_chunks(io.BytesIO(b"prefix" + data), **sizes))
+    assert len(set(chunks) & set(shifted)) >= len(chunks) - 2
+
+    with pytest.raises(ValueError):
+        list(iter_chunks(io.BytesIO(data), min_size=10, avg_size=3000, max_size=9000))
+
+
+def test_chunked_archive_dedups_and_restores(service: ArchiveService, tmp_path: Path) -> None:
+    base = _payload(120_000)
+    first = tmp_path / "v1.bin"
+    second = tmp_path / "v2.bin"
+    first.write_bytes(base)
+    second.write_bytes(base[:60_000] + b"edited region" + base[60_000:])
+
+    common = dict(repo="repo", reason="legacy", archived_by="tester", commit_sha="a" * 40)
+    one = service.archive_path(path=first, kind="asset", **common)
+    chunks_after_first = _count(service, "chunk")
+    two = service.archive_path(path=second, kind="asset", **common)
+
+    assert one.size_bytes == len(base)
+    new_chunks = _count(service, "chunk") - chunks_after_first
+    assert 0 < new_chunks <= 3
+    assert two.compressed_size < one.compressed_size
+    item = service.show_item(two.tombstone_id)
+    assert item["metadata"]["chunks"]["stored"] == new_chunks
+
+    for result, source in ((one, first), (two, second)):
+        out = tmp_path / "restored" / source.name
+        service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+        assert out.read_bytes() == source.read_bytes()
+    assert not [p for p in (tmp_path / "restored").iterdir() if p.name.endswith(".partial")]
+
+
+def test_chunked_and_blob_archives_share_artifact(
+    service: ArchiveService, tmp_path: Path
+) -> None:
+    source = tmp_path / "data.bin"
+    source.write_bytes(_payload(30_000, seed=3))
+    common = dict(repo="repo", reason="legacy", archived_by="tester", commit_sha="b" * 40)
+    blob = service.archive_path(path=source, kind="asset", chunked=False, **common)
+    chunked = service.archive_path(path=source, kind="asset", **common)
+    assert blob.sha256 == chunked.sha256
+    assert _count(service, "artifact") == 1
+
+    out = tmp_path / "out.bin"
+    service.restore_to_path(blob.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == source.read_bytes()
+
+
+def test_chunked_restore_detects_corruption(service: ArchiveService, tmp_path: Path) -> None:
+    source = tmp_path / "data.bin"
+    source.write_bytes(_payload(20_000, seed=5))
+    result = service.archive_path(
+        path=source,
+        kind="asset",
+        repo="repo",
+        reason="legacy",
+        archived_by="tester",
+        commit_sha="c" * 40,
+    )
+    conn = service.dal._conn
+    assert conn is not None
+    conn.execute("DELETE FROM artifact_chunk WHERE seq = 1")
+    conn.commit()
+
+    out = tmp_path / "out.bin"
+    with pytest.raises(RuntimeError):
+        service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+    assert not out.exists()
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".partial")]
+    assert os.path.exists(tmp_path / "evidence" / "archive_ops.jsonl")
@@ -0,0 +1,162 @@
+"""Trained compression dictionaries for small-file archiving."""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from codex.archive import util
+from codex.archive.config import ArchiveAppConfig, BackendConfig, StorageConfig
+from codex.archive.service import ArchiveRequest, ArchiveService
+
+COMMON = dict(repo="repo", reason="legacy", archived_by="tester", commit_sha="e" * 40)
+
+TEMPLATE = '''"""Handler module {idx}."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+
+
+def handle_{name}(path: Path, *, retries: int = {retries}) -> dict[str, object]:
+    """Process ``path`` and return a status payload."""
+
+    LOGGER.info("processing %s", path)
+    return {{"path": path.as_posix(), "retries": retries, "status": "{status}"}}
+'''
+
+
+def _module(idx: int) -> str:
+    rng = random.Random(idx)
+    name = "".join(rng.choice("abcdefghij") for _ in range(8))
+    status = rng.choice(["ok", "skipped", "failed"])
+    return TEMPLATE.format(idx=idx, name=name, retries=rng.randint(1, 9), status=status)
+
+
+def _service(tmp_path: Path, **storage: object) -> ArchiveService:
+    db_path = tmp_path / "archive.sqlite"
+    settings = ArchiveAppConfig(
+        backend=BackendConfig(backend="sqlite", url=f"sqlite:///{db_path.as_posix()}"),
+        storage=StorageConfig(blob_root=tmp_path / "blobs", **storage),  # type: ignore[arg-type]
+    )
+    return ArchiveService(settings)
+
+
+@pytest.fixture(autouse=True)
+def _evidence(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", (tmp_path / "evidence").as_posix())
+
+
+def _write(tmp_path: Path, start: int, count: int) -> list[Path]:
+    src = tmp_path / "src"
+    src.mkdir(exist_ok=True)
+    paths = []
+    for idx in range(start, start + count):
+        path = src / f"handler_{idx}.py"
+        path.write_text(_module(idx), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _seed(service: ArchiveService, tmp_path: Path) -> None:
+    for path in _write(tmp_path, 0, 20):
+        service.archive_path(path=path, **COMMON)
+
+
+def test_trained_dictionary_shrinks_and_restores(tmp_path: Path) -> None:
+    service = _service(tmp_path)
+    _seed(service, tmp_path)
+    [plain_path] = _write(tmp_path, 100, 1)
+    plain = service.archive_path(path=plain_path, **COMMON)
+
+    [row] = service.train_dictionaries(min_samples=5)
+    assert (row["file_type"], row["version"], row["codec"]) == (".py", 1, util.compression_codec())
+    assert row["compressed_dict"] < row["compressed_plain"]
+
+    [path] = _write(tmp_path, 200, 1)
+    result = service.archive_path(path=path, **COMMON)
+    assert result.compressed_size < plain.compressed_size
+    assert service.show_item(result.tombstone_id)["metadata"]["compression_dict"] == {
+        "id": row["id"],
+        "file_type": ".py",
+        "version": 1,
+    }
+
+    out = tmp_path / "restored.py"
+    service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == path.read_bytes()
+    # a fresh service (no cached dictionaries) restores from the stored version
+    fresh = _service(tmp_path)
+    fresh.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == path.read_bytes()
+
+
+def test_retraining_versions_and_keeps_old_artifacts_restorable(tmp_path: Path) -> None:
+    service = _service(tmp_path, blob_store="fs")
+    _seed(service, tmp_path)
+    [first] = service.train_dictionaries(min_samples=5)
+    [path] = _write(tmp_path, 300, 1)
+    old = service.archive_path(path=path, **COMMON)
+
+    # retraining samples dictionary-compressed payloads from the blob store
+    [second] = service.train_dictionaries(min_samples=5)
+    assert second["version"] == 2 and second["sample_count"] == first["sample_count"] + 1
+    [new_path] = _write(tmp_path, 301, 1)
+    new = service.archive_path(path=new_path, **COMMON)
+    assert service.show_item(new.tombstone_id)["metadata"]["compression_dict"]["version"] == 2
+
+    versions = {row["version"]: row["artifacts"] for row in service.dal.list_dictionaries()}
+    assert versions == {1: 1, 2: 1}
+    out = tmp_path / "old.py"
+    service.restore_to_path(old.tombstone_id, output_path=out, actor="tester")
+    assert out.read_bytes() == path.read_bytes()
+
+
+def test_dictionary_limits(tmp_path: Path) -> None:
+    service = _service(tmp_path, dict_max_file_size=600)
+    _seed(service, tmp_path)
+    assert service.train_dictionaries(min_samples=50) == []
+    assert service.train_dictionaries(file_types=["md"], min_samples=1) == []
+    assert [row["file_type"] for row in service.train_dictionaries(file_types=["py"])] == [".py"]
+
+    large = tmp_path / "src" / "large.py"
+    large.write_text(_module(1) * 5, encoding="utf-8")
+    result = service.archive_path(path=large, **COMMON)
+    assert "compression_dict" not in service.show_item(result.tombstone_id)["metadata"]
+
+    disabled = _service(tmp_path, dictionaries=False)
+    [path] = _write(tmp_path, 400, 1)
+    result = disabled.archive_path(path=path, **COMMON)
+    assert "compression_dict" not in disabled.show_item(result.tombstone_id)["metadata"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_archive_uses_dictionaries(tmp_path: Path, workers: int) -> None:
+    service = _service(tmp_path)
+    _seed(service, tmp_path)
+    service.train_dictionaries(min_samples=5)
+    paths = _write(tmp_path, 500, 4)
+    requests = [ArchiveRequest(path=path, **COMMON) for path in paths]
+    results = service.archive_paths(requests, workers=workers)
+
+    conn = service.dal._conn
+    assert isinstance(conn, sqlite3.Connection)
+    assert conn.execute("SELECT COUNT(*) FROM artifact_dict").fetchone()[0] == 4
+    for result, path in zip(results, paths, strict=True):
+        out = tmp_path / "out" / path.name
+        service.restore_to_path(result.tombstone_id, output_path=out, actor="tester")
+        assert out.read_bytes() == path.read_bytes()
+
+
+def test_train_dictionary_rejects_unrelated_samples() -> None:
+    with pytest.raises(ValueError):
+        util.train_dictionary([])
+    if util.compression_codec() == "zlib":
+        with pytest.raises(ValueError):
+            util.train_dictionary([b"alpha", b"beta"])
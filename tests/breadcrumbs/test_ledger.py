@@ -23,3 +23,66 @@ def test_tamper_detect(tmp_path: Path) -> None:
     path.write_text(json.dumps(first) + "\n" + lines[1] + "\n")
     with pytest.raises(ValueError):
         ledger.verify_chain(path)
+
+
+def test_append_reads_only_tail(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "ledger.jsonl"
+    for idx in range(50):
+        ledger.append_event({"event": f"e{idx}", "status": "ok", "run_id": "r1"}, path)
+    monkeypatch.setattr(Path, "read_text", lambda *a, **k: pytest.fail("full read"))
+    rec = ledger.append_event({"event": "last", "status": "ok", "run_id": "r1"}, path)
+    monkeypatch.undo()
+    assert ledger.verify_chain(path) == rec["hash"]
+
+
+def test_partial_trailing_record_is_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    ledger.append_event({"event": "a", "status": "ok", "run_id": "r1"}, path)
+    with path.open("a") as fh:
+        fh.write('{"event": "torn"')
+    with pytest.raises(ValueError):
+        ledger.append_event({"event": "b", "status": "ok", "run_id": "r1"}, path)
+
+
+def test_checkpoints_enable_incremental_verify(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CODEX_LEDGER_KEY", "secret")
+    path = tmp_path / "ledger.jsonl"
+    for idx in range(40):
+        ledger.append_event(
+            {"event": f"e{idx}", "status": "ok", "run_id": "r1"}, path, checkpoint_bytes=1000
+        )
+    checkpoints = (tmp_path / "ledger.jsonl.checkpoints.jsonl").read_text().splitlines()
+    assert len(checkpoints) >= 3
+    assert json.loads(checkpoints[-1])["alg"] == "hmac-sha256"
+    last = ledger.verify_chain(path)
+    assert ledger.verify_chain(path, incremental=True) == last
+
+    # records before the checkpoint are not re-read by the incremental walk
+    lines = path.read_text().splitlines()
+    first = json.loads(lines[0])
+    first["status"] = "no"  # same length, so checkpoint offsets stay valid
+    lines[0] = json.dumps(first, sort_keys=True)
+    path.write_text("\n".join(lines) + "\n")
+    assert ledger.verify_chain(path, incremental=True) == last
+    with pytest.raises(ValueError):
+        ledger.verify_chain(path)
+
+    monkeypatch.setenv("CODEX_LEDGER_KEY", "other")
+    with pytest.raises(ValueError):
+        ledger.verify_chain(path, incremental=True)
+
+
+def test_tampering_after_checkpoint_is_detected(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    ledger.append_event({"event": "a", "status": "ok", "run_id": "r1"}, path)
+    cp = ledger.checkpoint(path)
+    assert cp is not None and cp["alg"] == "sha256"
+    ledger.append_event({"event": "b", "status": "ok", "run_id": "r1"}, path)
+    lines = path.read_text().splitlines()
+    second = json.loads(lines[1])
+    second["status"] = "bad"
+    path.write_text(lines[0] + "\n" + json.dumps(second) + "\n")
+    with pytest.raises(ValueError):
+        ledger.verify_chain(path, incremental=True)
@@ -7,14 +7,11 @@ from pathlib import Path
 
 import pytest
 
-from codex_ml.cli.metrics_cli import _csv_to_duckdb
+from codex_ml.cli.metrics_cli import _DuckdbSink
 
 
 def test_duckdb_missing_dependency(monkeypatch, tmp_path: Path) -> None:
-    """`_csv_to_duckdb` should raise SystemExit when duckdb is unavailable."""
-
-    csv = tmp_path / "metrics.csv"
-    csv.write_text("run_id,epoch,key,value\nrun-1,0,loss,0.1\n", encoding="utf-8")
+    """`_DuckdbSink` should raise SystemExit when duckdb is unavailable."""
 
     original_import = builtins.__import__
 
@@ -26,6 +23,6 @@ def test_duckdb_missing_dependency(monkeypatch, tmp_path: Path) -> None:
     monkeypatch.setattr(builtins, "__import__", fake_import)
 
     with pytest.raises(SystemExit) as exc:
-        _csv_to_duckdb(csv, tmp_path / "metrics.duckdb", "metrics")
+        _DuckdbSink(tmp_path / "metrics.duckdb", "metrics")
 
     assert "duckdb dependency missing" in str(exc.value)
@@ -0,0 +1,140 @@
+"""Streaming ingest tests for ``codex_ml.cli.metrics_cli``."""
+
+from __future__ import annotations
+
+import csv
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from codex_ml.cli import metrics_cli
+from codex_ml.cli.metrics_cli import _CsvSink, _SqliteSink, _ingest_stream, main
+
+
+def _write_ndjson(path: Path, count: int) -> None:
+    lines = [json.dumps({"epoch": i, "loss": 1.0 / (i + 1), "tag": {"i": i}}) for i in range(count)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_ingest_streams_batches_to_csv_and_sqlite(tmp_path: Path, capsys) -> None:
+    src = tmp_path / "run.ndjson"
+    _write_ndjson(src, 7)
+    out_csv = tmp_path / "out" / "metrics.csv"
+    db = tmp_path / "metrics.sqlite"
+
+    rc = main(
+        [
+            "ingest",
+            "--input",
+            str(src),
+            "--out-csv",
+            str(out_csv),
+            "--to-sqlite",
+            str(db),
+            "--chunk-size",
+            "3",
+            "--create-index",
+        ]
+    )
+    assert rc == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["rows"] == 14
+
+    with out_csv.open(encoding="utf-8", newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert len(rows) == 14
+    assert rows[1] == {"run_id": "run", "epoch": "0", "key": "tag", "value": '{"i": 0}'}
+
+    con = sqlite3.connect(db)
+    try:
+        count, max_epoch = con.execute("SELECT COUNT(*), MAX(epoch) FROM metrics").fetchone()
+    finally:
+        con.close()
+    assert (count, max_epoch) == (14, 6)
+    assert not list(tmp_path.rglob("*.partial"))
+
+
+def test_ingest_without_csv_output(tmp_path: Path, capsys) -> None:
+    src = tmp_path / "run.ndjson"
+    _write_ndjson(src, 2)
+    db = tmp_path / "metrics.sqlite"
+
+    assert main(["ingest", "--input", str(src), "--to-sqlite", str(db)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["csv"] is None
+    assert report["rows"] == 4
+
+
+class _RejectEpoch:
+    """Precompiled-validator stand-in failing on a given epoch."""
+
+    def __init__(self, bad_epoch: int) -> None:
+        self.bad_epoch = bad_epoch
+        self.calls = 0
+
+    def iter_errors(self, record):
+        self.calls += 1
+        if record.get("epoch") == self.bad_epoch:
+            yield type("Err", (), {"message": "epoch rejected"})()
+
+
+def test_validation_failure_aborts_every_sink(tmp_path: Path) -> None:
+    src = tmp_path / "run.ndjson"
+    _write_ndjson(src, 10)
+    out_csv = tmp_path / "metrics.csv"
+    db = tmp_path / "metrics.sqlite"
+    validator = _RejectEpoch(8)
+
+    sinks = [_CsvSink(out_csv), _SqliteSink(db, "metrics")]
+    with pytest.raises(ValueError, match="record 9: epoch rejected"):
+        _ingest_stream(src, sinks, run_id="r", validator=validator, batch_size=4, pa=None)
+
+    assert validator.calls == 9
+    assert not out_csv.exists()
+    assert not list(tmp_path.glob("*.partial"))
+    con = sqlite3.connect(db)
+    try:
+        assert con.execute("SELECT COUNT(*) FROM metrics").fetchone() == (0,)
+    finally:
+        con.close()
+
+
+def test_sink_setup_failure_aborts_sinks_already_built(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "run.ndjson"
+    _write_ndjson(src, 3)
+    out_csv = tmp_path / "metrics.csv"
+    db = tmp_path / "metrics.sqlite"
+
+    def missing_duckdb(*args, **kwargs):
+        raise SystemExit("[metrics-cli] duckdb dependency missing")
+
+    monkeypatch.setattr(metrics_cli, "_DuckdbSink", missing_duckdb)
+    argv = ["ingest", "--input", str(src), "--out-csv", str(out_csv), "--to-sqlite", str(db)]
+    with pytest.raises(SystemExit, match="duckdb dependency missing"):
+        main([*argv, "--to-duckdb", str(tmp_path / "metrics.duckdb")])
+
+    assert not out_csv.exists()
+    assert not list(tmp_path.glob("*.partial"))
+    # the SQLite write transaction was rolled back, so the database is not left locked
+    con = sqlite3.connect(db, timeout=0)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        assert con.execute("SELECT COUNT(*) FROM metrics").fetchone() == (0,)
+    finally:
+        con.close()
+
+
+def test_parquet_skipped_without_pyarrow(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(metrics_cli, "_import_pyarrow", lambda: None)
+    src = tmp_path / "run.ndjson"
+    _write_ndjson(src, 1)
+    parquet = tmp_path / "metrics.parquet"
+
+    rc = main(["ingest", "--input", str(src), "--out-parquet", str(parquet)])
+    captured = capsys.readouterr()
+    assert rc == 0
+    assert json.loads(captured.out)["parquet"] is None
+    assert "pyarrow not installed" in captured.err
+    assert not parquet.exists()
@@ -0,0 +1,115 @@
+import json
+import os
+from pathlib import Path
+
+from codex_utils.cli.ndjson_summary import (
+    IncrementalSummarizer,
+    QuantileSketch,
+    StreamingSummary,
+    default_checkpoint_path,
+)
+
+
+def _append(path: Path, rows: list[dict], *, newline: bool = True) -> None:
+    text = "\n".join(json.dumps(row) for row in rows)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(text + ("\n" if newline else ""))
+
+
+def _loss(step: int, value: float) -> dict:
+    return {"run_id": "r1", "metric": "loss", "step": step, "value": value}
+
+
+def test_checkpoint_resumes_from_byte_offset(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.ndjson"
+    _append(path, [_loss(0, 1.0), _loss(1, 0.5)])
+
+    first = IncrementalSummarizer(tmp_path)
+    assert first.update() == 2
+    assert default_checkpoint_path(tmp_path).exists()
+
+    _append(path, [_loss(2, 0.25)])
+    resumed = IncrementalSummarizer(tmp_path)
+    assert resumed.update() == 1
+    (row,) = resumed.rows()
+    assert row["count"] == 3
+    assert row["first_value"] == 1.0
+    assert row["last_value"] == 0.25
+    assert row["min_value"] == 0.25
+    assert row["mean_value"] == (1.0 + 0.5 + 0.25) / 3
+
+
+def test_rotation_is_followed_by_inode(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.ndjson"
+    _append(path, [_loss(0, 1.0)])
+    IncrementalSummarizer(tmp_path).update()
+
+    os.replace(path, tmp_path / "metrics.ndjson.1")
+    _append(path, [_loss(1, 0.5)])
+    resumed = IncrementalSummarizer(tmp_path)
+    assert resumed.update() == 1
+    assert resumed.rows()[0]["count"] == 2
+
+
+def test_truncated_shard_triggers_rescan(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.ndjson"
+    _append(path, [_loss(0, 1.0), _loss(1, 0.5)])
+    IncrementalSummarizer(tmp_path).update()
+
+    path.write_text(json.dumps(_loss(5, 9.0)) + "\n", encoding="utf-8")
+    resumed = IncrementalSummarizer(tmp_path)
+    resumed.update()
+    (row,) = resumed.rows()
+    assert row["count"] == 1
+    assert row["last_value"] == 9.0
+
+
+def test_partial_trailing_line_is_retried(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.ndjson"
+    _append(path, [_loss(0, 1.0)])
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('{"run_id": "r1", "metric": "loss", "st')
+    summarizer = IncrementalSummarizer(tmp_path, checkpoint=False)
+    assert summarizer.update() == 1
+
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('ep": 1, "value": 0.5}\n')
+    assert summarizer.update() == 1
+    assert summarizer.rows()[0]["count"] == 2
+
+
+def test_follow_emits_on_new_records(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.ndjson"
+    _append(path, [_loss(0, 1.0)])
+    seen: list[int] = []
+    writes = iter([[_loss(1, 0.5)], [], [_loss(2, 0.2)]])
+
+    def _sleep(_: float) -> None:
+        rows = next(writes)
+        if rows:
+            _append(path, rows)
+
+    IncrementalSummarizer(tmp_path, checkpoint=False).follow(
+        lambda rows: seen.append(rows[0]["count"]), max_updates=3, sleep=_sleep
+    )
+    assert seen == [1, 2, 3]
+
+
+def test_state_roundtrips_through_json() -> None:
+    summary = StreamingSummary()
+    for step in range(100):
+        summary.update(_loss(step, float(step)))
+    restored = StreamingSummary.from_json(json.loads(json.dumps(summary.to_json())))
+    restored.update(_loss(100, 100.0))
+    summary.update(_loss(100, 100.0))
+    assert restored.rows() == summary.rows()
+
+
+def test_quantile_sketch_relative_error() -> None:
+    sketch = QuantileSketch(alpha=0.01)
+    values = [float(v) for v in range(1, 1001)]
+    for value in values:
+        sketch.add(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
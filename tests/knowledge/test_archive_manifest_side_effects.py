@@ -30,9 +30,14 @@ def test_archive_and_manifest_creates_components(
     assert kb_out.exists()
     assert result["written"] >= 1
 
-    manifest_info = archive_and_manifest(kb_out, None, None, actor="tester")
+    manifest_out = tmp_path / "artifacts" / "knowledge.release.manifest.json"
+    manifest_info = archive_and_manifest(
+        kb_out, None, None, actor="tester", manifest_path=manifest_out
+    )
     manifest_path = Path(manifest_info["manifest"])
-    assert manifest_path.exists()
+    assert manifest_path == manifest_out and manifest_path.exists()
+    # archive evidence follows CODEX_EVIDENCE_DIR even though the module was imported earlier
+    assert "tester" in (evidence_dir / "archive_ops.jsonl").read_text(encoding="utf-8")
 
     manifest_payload = json.loads(manifest_path.read_text(encoding="utf-8"))
     components = manifest_payload.get("components", [])
@@ -17,3 +17,48 @@ def test_build_kb(tmp_path: Path):
     assert len(lines) >= 1
     rec = json.loads(lines[0])
     assert "id" in rec and "text" in rec and "meta" in rec
+
+
+def _docs(root: Path) -> None:
+    root.mkdir()
+    (root / "a.md").write_text("# Alpha\nFirst source body\n", encoding="utf-8")
+    (root / "b.md").write_text("# Beta\nSecond source body text\n", encoding="utf-8")
+    (root / ".git").mkdir()
+    (root / ".git" / "ignored.md").write_text("# Hidden\nnope\n", encoding="utf-8")
+
+
+def test_build_kb_is_deterministic_and_incremental(tmp_path: Path):
+    d = tmp_path / "docs"
+    _docs(d)
+    out = tmp_path / "artifacts" / "kb.ndjsonl"
+
+    first = build_kb(d, out, workers=2)
+    assert first["rebuilt_sources"] == 2
+    snapshot = out.read_text(encoding="utf-8")
+    assert "ignored.md" not in snapshot
+
+    again = build_kb(d, out)
+    assert again["rebuilt_sources"] == 0
+    assert out.read_text(encoding="utf-8") == snapshot
+
+    (d / "b.md").write_text("# Beta\nSecond source body text, revised\n", encoding="utf-8")
+    changed = build_kb(d, out)
+    assert changed["rebuilt_sources"] == 1
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    by_source = {Path(r["meta"]["source_path"]).name: r for r in records}
+    assert by_source["a.md"]["id"] in snapshot
+    assert "revised" in by_source["b.md"]["text"]
+    cache = out.parent / ".kb.ndjsonl.cache"
+    assert len(list(cache.glob("*.ndjson"))) == 2
+
+
+def test_build_kb_dedups_across_sources(tmp_path: Path):
+    d = tmp_path / "docs"
+    d.mkdir()
+    (d / "a.md").write_text("# Same\nrepeated paragraph text\n", encoding="utf-8")
+    (d / "b.md").write_text("# Same\nrepeated paragraph text\n", encoding="utf-8")
+    out = tmp_path / "kb.ndjsonl"
+    res = build_kb(d, out, workers=1)
+    assert res["source_records"] == 2
+    assert res["written"] == 1
+    assert build_kb(d, out, dedup=False)["written"] == 2
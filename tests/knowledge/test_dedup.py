@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from codex.knowledge.dedup import dedup_records, hamming, simhash
+from codex.knowledge.dedup import cluster_records, dedup_records, hamming, simhash
 
 
 def test_simhash_stability_for_similar_text() -> None:
@@ -22,3 +22,57 @@ def test_dedup_records_filters_near_duplicates() -> None:
     assert len(keep) == 2
     assert 0 in keep  # first entry kept
     assert 2 in keep  # unrelated entry kept
+
+
+def _brute_force_keep(texts: list[str], threshold: int) -> list[int]:
+    keep: list[int] = []
+    fps: list[int] = []
+    for idx, text in enumerate(texts):
+        fp = simhash(text)
+        if all(hamming(fp, other) > threshold for other in fps):
+            keep.append(idx)
+            fps.append(fp)
+    return keep
+
+
+def test_banded_index_matches_pairwise_scan() -> None:
+    import random
+
+    rng = random.Random(7)
+    vocab = [f"w{i}" for i in range(40)]
+    base = [" ".join(rng.choices(vocab, k=12)) for _ in range(60)]
+    texts = []
+    for text in base:
+        texts.append(text)
+        words = text.split()
+        words[rng.randrange(len(words))] = rng.choice(vocab)
+        texts.append(" ".join(words))
+    for threshold in (3, 6):
+        assert dedup_records(texts, threshold=threshold) == _brute_force_keep(texts, threshold)
+
+
+def test_simhash_is_stable_across_processes() -> None:
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    src = Path(__file__).resolve().parents[2] / "src"
+    code = "from codex.knowledge.dedup import simhash; print(simhash('stable hashing please'))"
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONHASHSEED": seed, "PYTHONPATH": str(src)},
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert outputs == {str(simhash("stable hashing please"))}
+
+
+def test_cluster_records_is_deterministic() -> None:
+    texts = ["alpha beta gamma", "zeta eta theta", "alpha beta gamma!", "zeta eta theta"]
+    assert cluster_records(texts) == [[0, 2], [1, 3]]
+    assert cluster_records(texts) == cluster_records(list(texts))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from codex.knowledge import retrieval
+from codex.knowledge.build import build_kb
+from codex.knowledge.retrieval import RetrievalIndex, build_index
+
+
+def _kb(path: Path, records: list[dict]) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return path
+
+
+RECORDS = [
+    {"id": "a", "text": "install the codex cli with pip", "meta": {"domain": "ops"}},
+    {"id": "b", "text": "training loop checkpoints and resume", "meta": {"domain": "ml"}},
+    {"id": "c", "text": "resume training from the latest checkpoint", "meta": {"domain": "ml"}},
+    {"id": "d", "text": "pip install extras for training", "meta": {"domain": "ops"}},
+]
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(retrieval, "np", None)
+    return request.param
+
+
+def test_bm25_ranks_and_filters(tmp_path: Path, backend: str):
+    kb = _kb(tmp_path / "kb.ndjson", RECORDS)
+    stats = build_index(kb, tmp_path / "idx")
+    assert stats["docs"] == 4
+    index = RetrievalIndex(tmp_path / "idx")
+
+    hits = index.search("resume training checkpoint", k=2)
+    assert [h["id"] for h in hits] == ["c", "b"]
+    assert hits[0]["score"] > hits[1]["score"] > 0
+
+    # the shorter chunk wins on length normalisation
+    assert [h["id"] for h in index.search("pip install", k=5)] == ["d", "a"]
+    filtered = index.search("training", k=5, filters={"domain": "ops"})
+    assert [h["id"] for h in filtered] == ["d"]
+    assert [h["meta"]["domain"] for h in filtered] == ["ops"]
+    assert index.search("training", k=5, filters={"domain": ["ml", "ops"]})
+    assert index.search("nonexistent", k=3) == []
+
+
+def test_backends_agree(tmp_path: Path):
+    np = pytest.importorskip("numpy")
+    assert np is not None
+    kb = _kb(tmp_path / "kb.ndjson", RECORDS)
+    build_index(kb, tmp_path / "idx")
+    vectorised = RetrievalIndex(tmp_path / "idx").search("install training", k=4)
+    retrieval.np, saved = None, retrieval.np
+    try:
+        pure = RetrievalIndex(tmp_path / "idx").search("install training", k=4)
+    finally:
+        retrieval.np = saved
+    assert [h["id"] for h in vectorised] == [h["id"] for h in pure]
+    for left, right in zip(vectorised, pure, strict=True):
+        assert left["score"] == pytest.approx(right["score"], rel=1e-5)
+
+
+def test_index_over_built_kb(tmp_path: Path, backend: str):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "guide.md").write_text(
+        "# Setup\nInstall dependencies first\n\n## Usage\nRun the nightly report\n",
+        encoding="utf-8",
+    )
+    kb = tmp_path / "kb.ndjsonl"
+    build_kb(docs, kb)
+    build_index(kb, tmp_path / "idx")
+    hits = RetrievalIndex(tmp_path / "idx").search("nightly report", k=1)
+    assert hits and "nightly" in _text_for(kb, hits[0]["id"])
+
+
+def _text_for(kb: Path, chunk_id: str) -> str:
+    for line in kb.read_text(encoding="utf-8").splitlines():
+        rec = json.loads(line)
+        if rec["id"] == chunk_id:
+            return rec["text"]
+    raise AssertionError(chunk_id)
+
+
+def test_dense_and_ivf(tmp_path: Path):
+    pytest.importorskip("numpy")
+    kb = _kb(tmp_path / "kb.ndjson", RECORDS)
+    build_index(kb, tmp_path / "flat", dense=True)
+    build_index(kb, tmp_path / "ivf", dense=True, nlist=2)
+    flat = RetrievalIndex(tmp_path / "flat").search("resume training", k=1, mode="dense")
+    assert flat[0]["id"] in {"b", "c"}
+    # probing every list is exact
+    ivf = RetrievalIndex(tmp_path / "ivf").search("resume training", k=1, mode="dense", nprobe=2)
+    assert ivf[0]["id"] == flat[0]["id"]
+    hybrid = RetrievalIndex(tmp_path / "flat").search(
+        "resume training", k=2, mode="hybrid", filters={"domain": "ml"}
+    )
+    assert {h["id"] for h in hybrid} == {"b", "c"}
+
+
+def test_dense_requires_dense_index(tmp_path: Path):
+    pytest.importorskip("numpy")
+    kb = _kb(tmp_path / "kb.ndjson", RECORDS)
+    build_index(kb, tmp_path / "idx")
+    with pytest.raises(RuntimeError):
+        RetrievalIndex(tmp_path / "idx").search("x", mode="dense")
+    with pytest.raises(ValueError):
+        RetrievalIndex(tmp_path / "idx").search("x", mode="nope")
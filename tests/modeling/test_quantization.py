@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from codex_ml.models.decoder_only import DecoderOnlyLM, ModelConfig
+from codex_ml.models.generate import generate
+from codex_ml.models.quantization import (
+    WeightOnlyQuantLinear,
+    check_quantization,
+    get_quantized,
+    model_size_bytes,
+    quantize_model,
+)
+
+pytestmark = pytest.mark.requires_torch
+
+torch = pytest.importorskip("torch")
+
+
+def _tiny_model() -> DecoderOnlyLM:
+    torch.manual_seed(0)
+    cfg = ModelConfig(vocab_size=64, d_model=32, n_heads=4, n_layers=2, max_seq_len=32)
+    return DecoderOnlyLM(cfg)
+
+
+@pytest.mark.parametrize("bits,atol", [(8, 1e-2), (4, 1e-1)])
+def test_weight_only_linear_roundtrip(bits: int, atol: float) -> None:
+    torch.manual_seed(0)
+    linear = torch.nn.Linear(7, 5)
+    qlinear = WeightOnlyQuantLinear(linear, bits=bits)
+    assert torch.allclose(qlinear.dequantize(), linear.weight, atol=atol)
+    x = torch.randn(3, 7)
+    assert torch.allclose(qlinear(x), linear(x), atol=atol * 7)
+
+
+@pytest.mark.parametrize("mode", ["int8", "int4"])
+def test_weight_only_keeps_tied_head_and_shrinks(mode: str) -> None:
+    model = _tiny_model()
+    qmodel = quantize_model(model, mode)
+    assert isinstance(qmodel.blocks[0].attn.qkv, WeightOnlyQuantLinear)
+    assert type(qmodel.head) is torch.nn.Linear
+    assert qmodel.head.weight is qmodel.tok_emb.weight
+    assert model_size_bytes(qmodel) < model_size_bytes(model)
+    # original model is untouched unless inplace=True
+    assert type(model.blocks[0].attn.qkv) is torch.nn.Linear
+
+
+def test_dynamic_int8_passes_accuracy_check() -> None:
+    model = _tiny_model()
+    batches = [torch.randint(0, 64, (2, 16)) for _ in range(2)]
+    report = check_quantization(model, batches, "dynamic_int8", tolerance=0.05)
+    assert report.mode == "dynamic_int8"
+    assert report.passed, report
+    assert report.size_bytes_after < report.size_bytes_before
+
+
+def test_generate_with_quantization_uses_cached_copy() -> None:
+    model = _tiny_model()
+    prompt = torch.randint(0, 64, (1, 4))
+    out = generate(model, None, prompt, max_new_tokens=3, top_k=1, quantization="int8")
+    assert out.shape == (1, 7)
+    assert get_quantized(model, "int8") is get_quantized(model, "int8")
+    assert get_quantized(model, None) is model
+
+
+def test_unknown_mode_rejected() -> None:
+    with pytest.raises(ValueError):
+        quantize_model(_tiny_model(), "int3")
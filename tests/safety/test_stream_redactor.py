@@ -0,0 +1,29 @@
+import re
+
+from codex_ml.safety.sanitizers import StreamRedactor
+
+AWS = "AKIA" + "ABCDEFGHIJKLMNOP"
+
+
+def _stream(redactor: StreamRedactor, pieces: list[str]) -> list[str]:
+    out = [redactor.feed(piece) for piece in pieces]
+    out.append(redactor.flush())
+    return [chunk for chunk in out if chunk]
+
+
+def test_secret_split_over_pieces_is_redacted() -> None:
+    pieces = ["key: ", "AK", "IA", "ABCD", "EFGH", "IJKL", "MNOP", " done. "] + ["more "] * 40
+    chunks = _stream(StreamRedactor(), pieces)
+    assert "".join(chunks) == "key: «REDACTED:SECRET» done. " + "more " * 40
+    assert not any(part in chunk for chunk in chunks for part in ("AKIA", "MNOP"))
+    # settled text is released before the stream ends
+    assert len(chunks) > 1
+
+
+def test_growing_match_is_held_until_it_ends() -> None:
+    pattern = re.compile(r"sk-[a-z0-9]{10,}")
+    redactor = StreamRedactor([pattern], lambda text: pattern.sub("[S]", text), holdback=16)
+    pieces = ["x" * 8, "sk-", *["a1b2c3"] * 10, " end of it"]
+    chunks = _stream(redactor, pieces)
+    assert "".join(chunks) == "x" * 8 + "[S] end of it"
+    assert not any("a1b2" in chunk for chunk in chunks)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from scripts.space_traversal import dup_similarity
+
+
+def _words(rng: random.Random, n: int) -> list[str]:
+    return [f"w{rng.randrange(5000)}" for _ in range(n)]
+
+
+def _corpus(root: Path) -> list[str]:
+    rng = random.Random(7)
+    base = _words(rng, 400)
+    near = list(base)
+    for i in range(0, 400, 50):  # ~2% of words changed
+        near[i] = "edited"
+    texts = {
+        "a/orig.py": " ".join(base),
+        "b/copy.py": " ".join(base),
+        "c/near.md": " ".join(near),
+        "d/other.txt": " ".join(_words(rng, 400)),
+        "e/empty.txt": "",
+    }
+    for rel, text in texts.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(text, encoding="utf-8")
+    return sorted(texts)
+
+
+def test_signatures_are_deterministic_and_estimate_jaccard() -> None:
+    rng = random.Random(3)
+    a = {rng.getrandbits(64) for _ in range(2000)}
+    shared = set(list(a)[:1500])
+    b = shared | {rng.getrandbits(64) for _ in range(500)}
+    sig_a = dup_similarity.minhash_signature(a)
+    assert sig_a == dup_similarity.minhash_signature(set(a))
+    assert len(sig_a) == dup_similarity.NUM_PERM
+    sig_b = dup_similarity.minhash_signature(b)
+    est = sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+    assert abs(est - len(a & b) / len(a | b)) < 0.15
+    assert dup_similarity.minhash_signature(set()) == ()
+
+    bands, rows = dup_similarity.lsh_params(0.8)
+    assert bands * rows <= dup_similarity.NUM_PERM
+    assert dup_similarity.lsh_params(0.5)[0] > bands
+
+
+def test_near_duplicates_verified_and_sorted(tmp_path: Path) -> None:
+    files = _corpus(tmp_path)
+    pairs = dup_similarity.near_duplicates(files, tmp_path, 0.8)
+    assert [(a, b) for a, b, _ in pairs] == [
+        ("a/orig.py", "b/copy.py"),
+        ("a/orig.py", "c/near.md"),
+        ("b/copy.py", "c/near.md"),
+    ]
+    assert pairs[0][2] == 1.0
+    assert 0.8 <= pairs[1][2] < 1.0
+
+    # a single band holding the whole signature only proposes identical files
+    assert dup_similarity.near_duplicates(files, tmp_path, 0.8, bands=1) == pairs[:1]
+    # candidates are checked against the exact Jaccard similarity
+    assert dup_similarity.near_duplicates(files, tmp_path, 1.0) == pairs[:1]
+    with pytest.raises(ValueError):
+        dup_similarity.near_duplicates(files, tmp_path, 0.0)
+
+    ratio = dup_similarity.estimate_content(files, tmp_path, 0.8)
+    assert ratio == pytest.approx(3 / 10)
+    assert dup_similarity.estimate_content(files[:1], tmp_path) == 0.0
+
+
+def test_signature_cache_reused_across_runs(tmp_path: Path, monkeypatch) -> None:
+    files = _corpus(tmp_path)
+    cache_path = tmp_path / "cache" / "_minhash_cache.json"
+    calls: list[int] = []
+    real = dup_similarity.minhash_signature
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(dup_similarity, "minhash_signature", counting)
+    cache = dup_similarity.SignatureCache(cache_path)
+    first = dup_similarity.near_duplicates(files, tmp_path, cache=cache)
+    cache.save()
+    # identical contents share one signature entry
+    assert len(calls) == 4 and len(cache.signatures) == 4
+
+    calls.clear()
+    cache = dup_similarity.SignatureCache(cache_path)
+    assert dup_similarity.near_duplicates(files, tmp_path, cache=cache) == first
+    assert calls == [] and not cache.dirty
+
+    # different parameters invalidate the cached signatures
+    other = dup_similarity.SignatureCache(cache_path, num_perm=64)
+    assert other.signatures == {}
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+from scripts.space_traversal import file_index
+
+
+def _tree(root: Path) -> None:
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "a.py").write_text("print('a')\n", encoding="utf-8")
+    (root / "src" / "b.MD").write_text("# b\n", encoding="utf-8")
+    (root / "build").mkdir()
+    (root / "build" / "out.bin").write_bytes(b"\0" * 10)
+    (root / "big.dat").write_bytes(b"x" * 64)
+
+
+def _age(path: Path, seconds: int = 60) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10**9))
+
+
+def _counting(monkeypatch) -> list[str]:
+    hashed: list[str] = []
+    real = file_index._sha256_file
+
+    def counting(path: Path) -> str:
+        hashed.append(path.name)
+        return real(path)
+
+    monkeypatch.setattr(file_index, "_sha256_file", counting)
+    return hashed
+
+
+def test_scan_lists_sorted_entries_and_prunes_skipped_dirs(tmp_path: Path) -> None:
+    root = tmp_path / "repo"
+    root.mkdir()
+    _tree(root)
+    (root / "link").symlink_to(root / "src", target_is_directory=True)
+
+    entries = file_index.scan(root, skip_prefixes=("build/",), hash_limit=32)
+
+    assert [e["path"] for e in entries] == ["big.dat", "src/b.MD", "src/pkg/a.py"]
+    by_path = {e["path"]: e for e in entries}
+    assert by_path["src/b.MD"]["ext"] == ".md"
+    assert by_path["big.dat"]["sha"] is None
+    a = by_path["src/pkg/a.py"]
+    assert a["sha"] == hashlib.sha256(b"print('a')\n").hexdigest()
+    st = (root / "src" / "pkg" / "a.py").stat()
+    assert (a["size"], a["mtime_ns"], a["inode"]) == (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def test_rescan_only_rehashes_changed_files(tmp_path: Path, monkeypatch) -> None:
+    root = tmp_path / "repo"
+    root.mkdir()
+    _tree(root)
+    for path in root.rglob("*"):
+        if path.is_file():
+            _age(path)
+    cache = tmp_path / "cache" / "_file_index_cache.json"
+    hashed = _counting(monkeypatch)
+
+    first = file_index.scan(root, cache, workers=4)
+    assert sorted(hashed) == ["a.py", "b.MD", "big.dat", "out.bin"]
+    assert cache.exists()
+
+    hashed.clear()
+    assert file_index.scan(root, cache, workers=4) == first
+    assert hashed == []
+
+    changed = root / "src" / "pkg" / "a.py"
+    changed.write_text("print('changed')\n", encoding="utf-8")
+    (root / "new.txt").write_text("new\n", encoding="utf-8")
+    (root / "big.dat").unlink()
+    third = file_index.scan(root, cache, workers=4)
+    assert sorted(hashed) == ["a.py", "new.txt"]
+    assert "big.dat" not in {e["path"] for e in third}
+    by_path = {e["path"]: e for e in third}
+    assert by_path["src/pkg/a.py"]["sha"] == hashlib.sha256(b"print('changed')\n").hexdigest()
+
+
+def test_racily_clean_and_foreign_caches_are_rehashed(tmp_path: Path, monkeypatch) -> None:
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "fresh.py").write_text("x = 1\n", encoding="utf-8")
+    cache = tmp_path / "cache.json"
+    hashed = _counting(monkeypatch)
+
+    file_index.scan(root, cache)
+    # modified just before the cached scan started: its cached hash is not trusted
+    hashed.clear()
+    file_index.scan(root, cache)
+    assert hashed == ["fresh.py"]
+
+    _age(root / "fresh.py")
+    file_index.scan(root, cache)
+    hashed.clear()
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "fresh.py").write_text("x = 1\n", encoding="utf-8")
+    _age(other / "fresh.py")
+    file_index.scan(other, cache)
+    assert hashed == ["fresh.py"]
+
+    cache.write_text("{not json", encoding="utf-8")
+    hashed.clear()
+    file_index.scan(other, cache)
+    assert hashed == ["fresh.py"]
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from services.api import main  # noqa: E402
+
+SECRET = "sk-abc123XYZsecret"
+PIECES = ["", "The key is ", "sk", "-", "abc", "123", "XYZ", "secret", " ok"]
+
+
+class _PieceTokenizer:
+    def decode(self, ids):
+        return "".join(PIECES[i] for i in ids)
+
+
+class _FakeScheduler:
+    def stream(self, tokens, max_new_tokens):
+        async def gen():
+            for token in range(1, len(PIECES)):
+                yield token
+
+        return gen()
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        kind, data = block.split("\n", 1)
+        events.append((kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(main, "_load_components", lambda: (_PieceTokenizer(), object()))
+    monkeypatch.setattr(main, "_prepare_prompt", lambda req, tok, model: ("", [0], 16))
+    monkeypatch.setattr(main, "_get_scheduler", lambda: _FakeScheduler())
+    return TestClient(main.app)
+
+
+def test_stream_masks_secret_split_across_tokens(client):
+    resp = client.post("/infer/stream", json={"prompt": "hi"})
+    assert resp.status_code == 200
+    assert SECRET not in resp.text
+    events = _events(resp.text)
+    streamed = "".join(data["text"] for kind, data in events if kind == "token")
+    assert streamed == "The key is [SECRET] ok"
+    # raw ids would let a client decode the secret again
+    assert all("token" not in data for kind, data in events if kind == "token")
+    assert events[-1] == ("done", {"completion": "The key is [SECRET] ok", "tokens": 9})
+
+
+def test_stream_sends_raw_tokens_when_filter_disabled(client, monkeypatch):
+    monkeypatch.setenv("DISABLE_SECRET_FILTER", "1")
+    events = _events(client.post("/infer/stream", json={"prompt": "hi"}).text)
+    tokens = [data for kind, data in events if kind == "token"]
+    assert [data["token"] for data in tokens] == list(range(1, len(PIECES)))
+    assert "".join(data["text"] for data in tokens) == "".join(PIECES)
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.api.scheduler import InferenceScheduler
+
+
+def _echo_step(batch):
+    # next token = last token + 1 so progress is easy to assert
+    return [tokens[-1] + 1 for tokens in batch]
+
+
+def test_concurrent_requests_share_batches():
+    sizes: list[int] = []
+
+    def step(batch):
+        sizes.append(len(batch))
+        return _echo_step(batch)
+
+    async def main():
+        scheduler = InferenceScheduler(step, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(scheduler.submit([i], 1) for i in range(4)))
+        await scheduler.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert results == [[0, 1], [1, 2], [2, 3], [3, 4]]
+    assert sizes == [4]
+
+
+def test_max_batch_size_bounds_each_step():
+    sizes: list[int] = []
+
+    def step(batch):
+        sizes.append(len(batch))
+        return _echo_step(batch)
+
+    async def main():
+        scheduler = InferenceScheduler(step, max_batch_size=2, max_wait_ms=20)
+        await asyncio.gather(*(scheduler.submit([i], 1) for i in range(5)))
+        await scheduler.stop()
+
+    asyncio.run(main())
+    assert max(sizes) <= 2
+    assert sum(sizes) == 5
+
+
+def test_new_requests_join_inflight_batch():
+    release = threading.Event()
+    sizes: list[int] = []
+
+    def step(batch):
+        sizes.append(len(batch))
+        if len(sizes) == 1:
+            release.wait(timeout=5)
+        return _echo_step(batch)
+
+    async def main():
+        scheduler = InferenceScheduler(step, max_batch_size=4, max_wait_ms=0)
+        long_running = asyncio.create_task(scheduler.submit([10], 3))
+        while not sizes:
+            await asyncio.sleep(0.001)
+        late = asyncio.create_task(scheduler.submit([20], 1))
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(long_running, late)
+        await scheduler.stop()
+        return results
+
+    long_result, late_result = asyncio.run(main())
+    assert long_result == [10, 11, 12, 13]
+    assert late_result == [20, 21]
+    # the late request was admitted at the next step boundary
+    assert sizes[:2] == [1, 2]
+
+
+def test_eos_stops_sequence_early():
+    async def main():
+        scheduler = InferenceScheduler(_echo_step, eos_id=3, max_wait_ms=0)
+        result = await scheduler.submit([1], 10)
+        await scheduler.stop()
+        return result
+
+    assert asyncio.run(main()) == [1, 2, 3]
+
+
+def test_step_failure_propagates_to_callers():
+    def step(batch):
+        raise RuntimeError("boom")
+
+    async def main():
+        scheduler = InferenceScheduler(step, max_wait_ms=0)
+        with pytest.raises(RuntimeError, match="boom"):
+            await scheduler.submit([1], 1)
+        # worker keeps serving after a failed step
+        scheduler.step_fn = _echo_step
+        result = await scheduler.submit([5], 1)
+        await scheduler.stop()
+        return result
+
+    assert asyncio.run(main()) == [5, 6]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        InferenceScheduler(_echo_step, max_batch_size=0)
+
+    async def main():
+        scheduler = InferenceScheduler(_echo_step)
+        with pytest.raises(ValueError):
+            await scheduler.submit([], 1)
+
+    asyncio.run(main())
+
+
+def test_stream_yields_tokens_per_step():
+    async def main():
+        scheduler = InferenceScheduler(_echo_step, max_wait_ms=0)
+        tokens = [token async for token in scheduler.stream([1], 3)]
+        await scheduler.stop()
+        return tokens
+
+    assert asyncio.run(main()) == [2, 3, 4]
+
+
+def test_closing_stream_cancels_request():
+    sizes: list[int] = []
+
+    def step(batch):
+        sizes.append(len(batch))
+        return _echo_step(batch)
+
+    async def main():
+        scheduler = InferenceScheduler(step, max_wait_ms=0)
+        stream = scheduler.stream([1], 1000)
+        first = await stream.__anext__()
+        await stream.aclose()
+        # let the worker reach the next step boundary and drop the request
+        await asyncio.sleep(0.05)
+        steps_after_close = scheduler.steps
+        await asyncio.sleep(0.05)
+        assert scheduler.steps == steps_after_close
+        result = await scheduler.submit([7], 1)
+        await scheduler.stop()
+        return first, result
+
+    first, result = asyncio.run(main())
+    assert first == 2
+    assert result == [7, 8]
+    assert len(sizes) < 1000
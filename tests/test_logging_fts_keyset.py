@@ -0,0 +1,197 @@
+import sqlite3
+
+import pytest
+
+from codex.logging import query_logs, session_query, viewer
+from codex.logging.db_utils import infer_columns
+from codex.logging.fts import (
+    decode_cursor,
+    encode_cursor,
+    ensure_fts,
+    fts5_available,
+    has_stable_rowid,
+    rebuild_fts,
+)
+from codex.logging.session_logger import init_db
+from tools.purge_session_logs import purge
+
+
+@pytest.fixture(autouse=True)
+def _log_paths(tmp_path, monkeypatch):
+    # CLIs fall back to .codex/session_logs.db and .codex/sessions when unset
+    monkeypatch.setenv("CODEX_LOG_DB_PATH", str(tmp_path / "session_logs.db"))
+    monkeypatch.setenv("CODEX_SESSION_LOG_DIR", str(tmp_path / "sessions"))
+
+
+def _make_db(path, n=25):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE session_events(ts REAL, session_id TEXT, role TEXT, message TEXT, "
+        "seq INTEGER, meta TEXT)"
+    )
+    conn.execute("CREATE INDEX session_events_sid_ts_idx ON session_events(session_id, ts)")
+    rows = []
+    for i in range(n):
+        # duplicate timestamps exercise the rowid tie-breaker
+        message = "disk timeout on node" if i % 5 == 0 else f"step {i} ok"
+        rows.append((float(i // 2), "S1", "user", message, i + 1, None))
+    conn.executemany("INSERT INTO session_events VALUES (?,?,?,?,?,?)", rows)
+    conn.commit()
+    return conn
+
+
+def _page_all(conn, mapcol, page_size, order="asc"):
+    conn.row_factory = sqlite3.Row
+    cursor = None
+    seen = []
+    while True:
+        sql, params = query_logs.build_query(
+            "session_events", mapcol, "S1", None, None, None, order, page_size, None,
+            keyset=True, cursor=cursor,
+        )
+        rows = conn.execute(sql, params).fetchall()
+        seen.extend(r["message"] for r in rows)
+        if len(rows) < page_size:
+            return seen
+        cursor = decode_cursor(query_logs.next_cursor(rows, mapcol))
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_keyset_pages_cover_rows_once(tmp_path, order):
+    conn = _make_db(tmp_path / "logs.db")
+    mapcol = infer_columns(conn, "session_events")
+    paged = _page_all(conn, mapcol, 4, order)
+    sql, params = query_logs.build_query(
+        "session_events", mapcol, "S1", None, None, None, order, None, None, keyset=True
+    )
+    assert paged == [r["message"] for r in conn.execute(sql, params)]
+    assert len(paged) == 25
+
+
+def test_keyset_uses_session_ts_index(tmp_path):
+    conn = _make_db(tmp_path / "logs.db")
+    mapcol = infer_columns(conn, "session_events")
+    sql, params = query_logs.build_query(
+        "session_events", mapcol, "S1", None, None, None, "asc", 10, None,
+        cursor=(3.0, 7),
+    )
+    plan = " ".join(str(r[-1]) for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert "session_events_sid_ts_idx" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor("2025-01-01T00:00:00", 42)) == ("2025-01-01T00:00:00", 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+fts = pytest.mark.skipif(
+    not fts5_available(sqlite3.connect(":memory:")), reason="SQLite built without FTS5"
+)
+
+
+@fts
+def test_fts_index_tracks_inserts_updates_and_deletes(tmp_path):
+    conn = _make_db(tmp_path / "logs.db", n=10)
+    assert ensure_fts(conn, "session_events")
+    conn.execute(
+        "INSERT INTO session_events VALUES (99, 'S2', 'tool', 'disk quota exceeded', 1, NULL)"
+    )
+    conn.execute("UPDATE session_events SET message='all clear' WHERE seq=1 AND session_id='S1'")
+    conn.execute("DELETE FROM session_events WHERE seq=6")
+    conn.commit()
+
+    mapcol = infer_columns(conn, "session_events")
+    sql, params = query_logs.build_query(
+        "session_events", mapcol, None, None, None, None, "asc", None, None,
+        search="disk", fts_table="session_events_fts",
+    )
+    # seq 1 was reworded and seq 6 deleted, so only the new S2 row matches
+    assert [r[3] for r in conn.execute(sql, params)] == ["disk quota exceeded"]
+
+
+@fts
+def test_ranked_search_through_clis(tmp_path, capsys):
+    db = tmp_path / "logs.db"
+    conn = _make_db(db, n=10)
+    conn.execute(
+        "INSERT INTO session_events VALUES (1.5, 'S1', 'tool', 'timeout timeout timeout', 99, NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    assert query_logs.main(["--db", str(db), "--build-fts", "--search", "timeout", "--rank"]) == 0
+    lines = capsys.readouterr().out
+    assert lines.index("timeout timeout timeout") < lines.index("disk timeout on node")
+
+    rows, _ = session_query.fetch_rows(str(db), "S1", None, False, search="timeout", rank=True)
+    assert rows[0]["message"] == "timeout timeout timeout"
+    assert len(rows) == 3
+
+    assert viewer.main(["--db", str(db), "--session-id", "S1", "--search", "node"]) == 0
+    assert capsys.readouterr().out.count("disk timeout on node") == 2
+
+
+def test_search_falls_back_to_like_without_index(tmp_path):
+    db = tmp_path / "logs.db"
+    _make_db(db, n=10).close()
+    rows, _ = session_query.fetch_rows(str(db), "S1", None, False, search="TIMEOUT")
+    assert [r["message"] for r in rows] == ["disk timeout on node"] * 2
+
+
+def _search(conn, text):
+    mapcol = infer_columns(conn, "session_events")
+    sql, params = query_logs.build_query(
+        "session_events", mapcol, None, None, None, None, "asc", None, None,
+        search=text, fts_table="session_events_fts",
+    )
+    return [r[3] for r in conn.execute(sql, params)]
+
+
+@fts
+def test_search_after_purge_and_vacuum_on_legacy_table(tmp_path):
+    db = tmp_path / "logs.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE session_events(ts REAL, session_id TEXT, role TEXT, message TEXT, "
+        "seq INTEGER, meta TEXT)"
+    )
+    assert not has_stable_rowid(conn, "session_events")
+    rows = [
+        (float(i), "S1", "user", f"msg{i} alpha" if i == 9 else f"msg{i}", i, None)
+        for i in range(10)
+    ]
+    conn.executemany("INSERT INTO session_events VALUES (?,?,?,?,?,?)", rows)
+    assert ensure_fts(conn, "session_events")
+    conn.commit()
+    conn.close()
+
+    # rows 0-4 fall outside the retention window, rows 5-9 lie in the future
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE session_events SET ts = ts + 1e12 WHERE seq >= 5")
+    conn.commit()
+    conn.close()
+    _, deleted = purge(days=1, log_dir=tmp_path / "sessions", db_path=db)
+    assert deleted == 5
+
+    conn = sqlite3.connect(db)
+    assert _search(conn, "alpha") == ["msg9 alpha"]
+    assert rebuild_fts(conn, "session_events")
+
+
+def test_session_logger_table_keeps_rowids_across_vacuum(tmp_path):
+    db = init_db(tmp_path / "session_logs.db")
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO session_events(ts, session_id, role, message, seq) VALUES (?,?,?,?,?)",
+        [(float(i), "S1", "user", f"m{i}", i) for i in range(6)],
+    )
+    conn.commit()
+    assert has_stable_rowid(conn, "session_events")
+    before = dict(conn.execute("SELECT message, rowid FROM session_events"))
+    conn.execute("DELETE FROM session_events WHERE message IN ('m0', 'm1')")
+    conn.commit()
+    conn.execute("VACUUM")
+    after = dict(conn.execute("SELECT message, rowid FROM session_events"))
+    assert after == {m: rid for m, rid in before.items() if m not in ("m0", "m1")}
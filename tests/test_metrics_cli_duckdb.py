@@ -5,41 +5,70 @@ import types
 
 import pytest
 
-from codex_ml.cli.metrics_cli import _csv_to_duckdb
+from codex_ml.cli.metrics_cli import _DuckdbSink, _tidy_columns
 
 
 class DummyConnection:
-    def __init__(self, executed: list[tuple[str, tuple[str, ...]]]):
+    def __init__(self, executed: list[str], fail_on: str | None = None):
         self._executed = executed
+        self._fail_on = fail_on
+        self.closed = False
 
     def execute(self, sql: str, params: list[str] | None = None):
-        self._executed.append((sql, tuple(params or ())))
+        if self._fail_on and sql.startswith(self._fail_on):
+            raise RuntimeError("table already exists")
+        self._executed.append(sql)
         return self
 
-    def close(self) -> None:
-        return None
+    def executemany(self, sql: str, rows: list[tuple]):
+        self._executed.append(sql)
+        return self
 
+    def close(self) -> None:
+        self.closed = True
 
-@pytest.mark.parametrize("mode", ["replace", "append", "fail"])
-def test_csv_to_duckdb_uses_parameterized_paths(monkeypatch, tmp_path, mode):
-    csv_path = tmp_path / "foo'bar" / "metrics.csv"
-    csv_path.parent.mkdir(parents=True)
-    csv_path.write_text("run_id,epoch,key,value\n", encoding="utf-8")
 
+@pytest.mark.parametrize(
+    ("mode", "create"),
+    [
+        ("replace", "CREATE OR REPLACE TABLE metrics"),
+        ("append", "CREATE TABLE IF NOT EXISTS metrics"),
+        ("fail", "CREATE TABLE metrics"),
+    ],
+)
+def test_duckdb_sink_modes_run_in_one_transaction(monkeypatch, tmp_path, mode, create):
     duck_db = tmp_path / "out.duckdb"
-
-    executed: list[tuple[str, tuple[str, ...]]] = []
+    executed: list[str] = []
+    connections: list[DummyConnection] = []
 
     def fake_connect(path: str):
         assert path == duck_db.as_posix()
-        return DummyConnection(executed)
+        connections.append(DummyConnection(executed))
+        return connections[-1]
+
+    monkeypatch.setitem(sys.modules, "duckdb", types.SimpleNamespace(connect=fake_connect))
 
-    fake_duckdb = types.SimpleNamespace(connect=fake_connect)
-    monkeypatch.setitem(sys.modules, "duckdb", fake_duckdb)
+    sink = _DuckdbSink(duck_db, "metrics", mode=mode)
+    rows = [{"run_id": "r", "epoch": 0, "key": "loss", "value": 0.5}]
+    sink.write(rows, _tidy_columns(rows), None)
+    sink.commit()
+
+    assert executed[0] == "BEGIN TRANSACTION"
+    assert executed[1].startswith(create)
+    assert executed[2].startswith("INSERT INTO metrics")
+    assert executed[-1] == "COMMIT"
+    assert connections[0].closed
+
+
+def test_duckdb_sink_closes_connection_when_create_fails(monkeypatch, tmp_path):
+    connections: list[DummyConnection] = []
+
+    def fake_connect(path: str):
+        connections.append(DummyConnection([], fail_on="CREATE TABLE metrics"))
+        return connections[-1]
 
-    result = _csv_to_duckdb(csv_path, duck_db, "metrics", mode=mode)
-    assert result is True
+    monkeypatch.setitem(sys.modules, "duckdb", types.SimpleNamespace(connect=fake_connect))
 
-    assert executed, "expected SQL commands to be executed"
-    for _, params in executed:
-        assert params and params[0] == csv_path.as_posix()
+    with pytest.raises(RuntimeError):
+        _DuckdbSink(tmp_path / "out.duckdb", "metrics", mode="fail")
+    assert connections[0].closed
@@ -0,0 +1,133 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from codex.search import InternalRepoSearch, TrigramIndex
+from codex.search.index import required_literals
+
+
+def _tree(root: Path) -> None:
+    (root / "pkg").mkdir()
+    (root / "pkg" / "alpha.py").write_text("def alpha():\n    return 'needle here'\n")
+    (root / "pkg" / "beta.py").write_text("def beta():\n    return 'nothing'\n")
+    (root / "blob.bin").write_bytes(b"needle\0binary")
+    (root / ".hidden").mkdir()
+    (root / ".hidden" / "secret.txt").write_text("needle\n")
+
+
+def _bump(path: Path, text: str) -> None:
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+def test_indexed_literal_search_matches_result_schema(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    monkeypatch.setattr("shutil.which", lambda _name: None)
+    provider = InternalRepoSearch(root=tmp_path, use_index=True)
+    results = provider.search("needle here")
+    assert results == [
+        {"path": str(tmp_path / "pkg" / "alpha.py"), "line": "    return 'needle here'"}
+    ]
+    assert (tmp_path / ".codex" / "search_index.sqlite").exists()
+
+
+def test_index_updates_incrementally(tmp_path):
+    _tree(tmp_path)
+    index = TrigramIndex(tmp_path, refresh_interval=0)
+    assert index.refresh() == 3
+    assert index.candidates(["needle"]) == ["pkg/alpha.py"]
+
+    assert index.refresh() == 0
+    _bump(tmp_path / "pkg" / "beta.py", "needle too\n")
+    (tmp_path / "pkg" / "alpha.py").unlink()
+    assert index.refresh() == 1
+    assert index.candidates(["needle"]) == ["pkg/beta.py"]
+    index.close()
+
+    reopened = TrigramIndex(tmp_path, refresh_interval=0)
+    assert reopened.refresh() == 0
+    assert reopened.candidates(["needle"]) == ["pkg/beta.py"]
+    reopened.close()
+
+
+def test_large_files_are_always_candidates(tmp_path):
+    _tree(tmp_path)
+    (tmp_path / "big.txt").write_text("x" * 64 + "\n")
+    index = TrigramIndex(tmp_path, max_file_bytes=48)
+    index.refresh()
+    assert index.candidates(["needle"]) == ["big.txt", "pkg/alpha.py"]
+    index.close()
+
+
+def test_regex_search_prunes_by_required_literals(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    monkeypatch.setattr("shutil.which", lambda _name: None)
+    provider = InternalRepoSearch(root=tmp_path, use_index=True)
+    results = provider.search(r"def \w+\(\):")
+    assert sorted(r["path"] for r in results) == sorted(
+        str(tmp_path / "pkg" / name) for name in ("alpha.py", "beta.py")
+    )
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("plain text", ["plain text"]),
+        (r"foo\.bar+baz", ["foo.bar", "baz"]),
+        (r"\(x\)|y", []),
+        ("colou?r", ["colo", "r"]),
+        (r"def \w+\(", ["def ", "("]),
+        ("a|b", []),
+        ("x[abc]yz", ["x", "yz"]),
+    ],
+)
+def test_required_literals(pattern, expected):
+    assert required_literals(pattern) == expected
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+def test_indexed_regex_matches_plain_rg(tmp_path):
+    _tree(tmp_path)
+    plain = InternalRepoSearch(root=tmp_path).search(r"return '\w+")
+    indexed = InternalRepoSearch(root=tmp_path, use_index=True).search(r"return '\w+")
+    key = lambda r: (r["path"], r["line"])  # noqa: E731
+    assert sorted(indexed, key=key) == sorted(plain, key=key)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_index_honours_gitignore_in_work_tree(tmp_path):
+    _tree(tmp_path)
+    (tmp_path / "pkg" / "gen.py").write_text("needle generated\n")
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "run.log").write_text("needle log\n")
+    (tmp_path / ".gitignore").write_text("logs/\n")
+    (tmp_path / "pkg" / ".gitignore").write_text("gen.py\n")
+    index = TrigramIndex(tmp_path, refresh_interval=0)
+    # outside a git work tree .gitignore is not consulted, like rg
+    index.refresh()
+    assert "pkg/gen.py" in index.candidates(["needle"])
+
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    index.refresh()
+    assert index.candidates(["needle"]) == ["pkg/alpha.py"]
+
+
+def test_unreadable_index_falls_back_to_rg(tmp_path, monkeypatch, caplog):
+    _tree(tmp_path)
+    provider = InternalRepoSearch(root=tmp_path, use_index=True)
+
+    def corrupt(_query):
+        raise OSError("file is not a database")
+
+    monkeypatch.setattr(provider, "_indexed_search", corrupt)
+    scanned = []
+    monkeypatch.setattr(
+        provider, "_rg", lambda query, paths: scanned.append((query, paths)) or ["hit"]
+    )
+    assert provider.search("needle") == ["hit"]
+    assert scanned == [("needle", [str(tmp_path)])]
+    assert "falling back to rg" in caplog.text
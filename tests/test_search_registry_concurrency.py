@@ -0,0 +1,89 @@
+import threading
+import time
+
+from codex.search import SearchProvider, SearchRegistry
+
+
+class _Provider(SearchProvider):
+    def __init__(self, results, delay=0.0, error=None):
+        self.results = results
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+
+    def search(self, query, **options):
+        self.calls += 1
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.error:
+            raise self.error
+        return [dict(r, q=query, **options) for r in self.results]
+
+
+def _registry(*providers, **kwargs):
+    registry = SearchRegistry(**kwargs)
+    registry.providers = list(providers)
+    return registry
+
+
+def test_providers_run_concurrently():
+    a = _Provider([{"id": 1}], delay=0.2)
+    b = _Provider([{"id": 2}], delay=0.2)
+    registry = _registry(a, b, cache_ttl=0)
+    started = time.monotonic()
+    assert [r["id"] for r in registry.search("x")] == [1, 2]
+    assert time.monotonic() - started < 0.35
+    registry.close()
+
+
+def test_deadline_returns_partial_results():
+    fast = _Provider([{"id": 1}])
+    slow = _Provider([{"id": 2}], delay=5)
+    registry = _registry(fast, slow, deadline=0.1, cache_ttl=0)
+    started = time.monotonic()
+    assert [r["id"] for r in registry.search("x")] == [1]
+    assert time.monotonic() - started < 1.0
+    assert registry.last_status == {"0:_Provider": "ok", "1:_Provider": "timeout"}
+    slow.release.set()
+    registry.close()
+
+
+def test_errors_are_isolated_and_duplicates_merged_in_order():
+    a = _Provider([{"id": 1}, {"id": 2}])
+    broken = _Provider([], error=RuntimeError("boom"))
+    b = _Provider([{"id": 2}, {"id": 3}])
+    registry = _registry(a, broken, b, cache_ttl=0)
+    assert [r["id"] for r in registry.search("x")] == [1, 2, 3]
+    assert registry.last_status["1:_Provider"] == "error"
+    registry.close()
+
+
+def test_ttl_cache_keys_on_query_and_options():
+    a = _Provider([{"id": 1}])
+    registry = _registry(a, cache_ttl=60)
+    registry.search("x", lang="py")
+    registry.search("x", lang="py")
+    assert a.calls == 1
+    assert registry.last_status == {"0:_Provider": "cached"}
+    assert registry.search("x", lang="md")[0]["lang"] == "md"
+    registry.search("y", lang="py")
+    assert a.calls == 3
+
+    registry.cache_ttl = 1e-9
+    time.sleep(0.01)
+    registry.search("x", lang="py")
+    assert a.calls == 4
+    registry.close()
+
+
+def test_builtin_providers_accept_options_and_cache_is_opt_in(tmp_path, monkeypatch):
+    from tools.security import net
+
+    monkeypatch.setattr(net, "safe_fetch", lambda *_a, **_k: b"{}")
+    registry = SearchRegistry(enable_external=True, root=tmp_path)
+    assert registry.cache_ttl == 0
+    registry.search("x", lang="py")
+    registry.search("x", lang="py")
+    assert registry.last_status == {"0:InternalRepoSearch": "ok", "1:ExternalWebSearch": "ok"}
+    registry.close()
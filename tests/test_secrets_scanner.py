@@ -27,3 +27,135 @@ def test_scanner_reads_archive(tmp_path: Path) -> None:
     hits = scan_file(archive)
     kinds = {name for (name, _line, _text) in hits}
     assert "aws_access_key" in kinds
+
+
+def _aws() -> str:
+    return "AKIA1234567890" + "ABCD" + "EF"
+
+
+def test_streaming_scan_matches_line_numbers_across_windows(tmp_path: Path) -> None:
+    from tools import scan_secrets
+
+    lines = [f"filler line {i} " + "x" * 50 for i in range(5000)]
+    lines[1234] = f"key: {_aws()}"
+    lines[4321] = "PASSWORD = hunter2 api_key=abc"
+    target = tmp_path / "big.txt"
+    target.write_text("\r\n".join(lines) + "\n", encoding="utf-8")
+
+    with target.open("rb") as handle:
+        hits = scan_secrets.scan_stream(handle, window=4096)
+    assert hits == [
+        ("aws_access_key", 1235, f"key: {_aws()}"),
+        ("password_kv", 4322, "PASSWORD = hunter2 api_key=abc"),
+        ("api_key_kv", 4322, "PASSWORD = hunter2 api_key=abc"),
+    ]
+    assert scan_file(target) == hits
+
+
+def test_many_matches_per_window_count_each_newline_once(tmp_path: Path) -> None:
+    from tools import scan_secrets
+
+    class CountingBlock(str):
+        scanned = 0
+
+        def count(self, sub, start=0, end=None):  # type: ignore[override]
+            stop = len(self) if end is None else end
+            CountingBlock.scanned += max(0, stop - start)
+            return super().count(sub, start, end)
+
+    lines = [f"password = hunter{i}" if i % 3 else "plain" for i in range(3000)]
+    block = CountingBlock("\n".join(lines) + "\n")
+    hits: list[scan_secrets.Hit] = []
+    assert scan_secrets._scan_block(block, 10, hits, set()) == 3010
+    assert [line for _name, line, _text in hits] == [10 + i for i in range(3000) if i % 3]
+    assert hits[-1] == ("password_kv", 3009, "password = hunter2999")
+    # newline counting stays linear in the block size
+    assert CountingBlock.scanned <= 2 * len(block)
+
+    target = tmp_path / "many.txt"
+    target.write_text(str(block), encoding="utf-8")
+    with target.open("rb") as handle:
+        streamed = scan_secrets.scan_stream(handle, window=1024)
+    assert [(name, line - 9, text) for name, line, text in hits] == streamed
+
+
+def test_long_lines_are_scanned_in_overlapping_segments(tmp_path: Path, monkeypatch) -> None:
+    from tools import scan_secrets
+
+    monkeypatch.setattr(scan_secrets, "MAX_LINE_CHARS", 10_000)
+    target = tmp_path / "minified.js"
+    target.write_text("a" * 9_990 + _aws() + "b" * 50_000 + "\nok\n", encoding="utf-8")
+    with target.open("rb") as handle:
+        hits = scan_secrets.scan_stream(handle, window=4096)
+    assert [(name, line) for name, line, _text in hits] == [("aws_access_key", 1)]
+
+
+def test_nested_archives_respect_depth(tmp_path: Path) -> None:
+    import io
+
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as zf:
+        zf.writestr("deep/creds.txt", f"aws={_aws()}\n")
+    outer = tmp_path / "outer.zip"
+    with zipfile.ZipFile(outer, "w") as zf:
+        zf.writestr("inner.zip", inner.getvalue())
+        zf.writestr("logo.png", f"{_aws()}\n")
+
+    assert scan_file(outer) == []
+    hits = scan_file(outer, nested_depth=1)
+    assert [(name, where) for name, where, _text in hits] == [
+        ("aws_access_key", "inner.zip!deep/creds.txt:1")
+    ]
+
+
+def test_parallel_scan_with_clean_cache(tmp_path: Path, monkeypatch) -> None:
+    from tools import scan_secrets
+
+    src = tmp_path / "src"
+    src.mkdir()
+    for idx in range(6):
+        (src / f"clean_{idx}.py").write_text(f"value = {idx}\n", encoding="utf-8")
+    leaky = src / "leaky.py"
+    leaky.write_text(f"token = '{_aws()}'\n", encoding="utf-8")
+    targets = sorted(src.iterdir())
+    cache = tmp_path / "cache.json"
+
+    found = scan_secrets.scan_paths(targets, workers=2, cache_path=cache)
+    assert found == [f"[SECRET?] {leaky}:1 aws_access_key: token = '{_aws()}'"]
+    assert scan_secrets.scan_paths(targets, workers=1) == found
+    # the cache holds clean digests only, never matched text
+    assert _aws() not in cache.read_text(encoding="utf-8")
+
+    scanned: list[Path] = []
+    real = scan_secrets._findings
+
+    def tracking(target: Path, nested_depth: int) -> list[str]:
+        scanned.append(target)
+        return real(target, nested_depth)
+
+    monkeypatch.setattr(scan_secrets, "_findings", tracking)
+    (src / "clean_0.py").write_text("value = 'changed'\n", encoding="utf-8")
+    assert scan_secrets.scan_paths(targets, workers=1, cache_path=cache) == found
+    assert scanned == [src / "clean_0.py", leaky]
+    # cached results are only valid for the same scan rules
+    scanned.clear()
+    scan_secrets.scan_paths(targets, workers=1, nested_depth=1, cache_path=cache)
+    assert len(scanned) == len(targets)
+
+
+def test_clean_cache_ignores_files_skipped_by_extension(tmp_path: Path) -> None:
+    from tools import scan_secrets
+
+    leak = f"token = '{_aws()}'\n".encode("utf-8")
+    logo = tmp_path / "logo.png"
+    notes = tmp_path / "notes.txt"
+    logo.write_bytes(leak)
+    notes.write_bytes(leak)
+    cache = tmp_path / "cache.json"
+    expected = [f"[SECRET?] {notes}:1 aws_access_key: token = '{_aws()}'"]
+
+    assert scan_secrets.scan_paths([logo], workers=1, cache_path=cache) == []
+    assert scan_secrets.scan_paths([logo, notes], workers=1, cache_path=cache) == expected
+    assert scan_secrets.scan_paths([logo, notes], workers=1, cache_path=cache) == expected
+    assert scan_secrets._cache_key(logo, "d") is None
+    assert scan_secrets._cache_key(notes, "d") != scan_secrets._cache_key(tmp_path / "a.zip", "d")
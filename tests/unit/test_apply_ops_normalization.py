@@ -17,7 +17,10 @@ def test_extract_operations_scalar_raises() -> None:
         zapply._extract_operations("oops", "triggers")
 
 
-def test_apply_functions_noop_ok(caplog: pytest.LogCaptureFixture) -> None:
+def test_apply_functions_noop_ok(
+    caplog: pytest.LogCaptureFixture, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", str(tmp_path / "evidence"))
     caplog.set_level("INFO")
     plan = {"fields": [{"op": "add", "path": "/fields/A", "value": {"name": "A"}}]}
     zapply.apply_fields(plan, env="dev")
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("ray")
+pytest.importorskip("fastapi")
+pytest.importorskip("hydra")
+
+from hhg_logistics.serve import app as serve_app  # noqa: E402
+
+SECRET = "ghp_" + "A" * 36
+PIECES = ["token: ", "gh", "p_", *["AAAA"] * 9, " end"]
+
+
+class _Request:
+    async def json(self) -> dict:
+        return {"inputs": "hi"}
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def _service() -> SimpleNamespace:
+    logged: list[list[str]] = []
+
+    def generate_stream(prompt: str, overrides: dict, cancel: threading.Event):
+        return iter(PIECES)
+
+    def log_request(route, prompts, outputs, latency_ms, **extra) -> None:
+        logged.append(list(outputs))
+
+    return SimpleNamespace(
+        cfg=SimpleNamespace(model=SimpleNamespace(pretrained="stub")),
+        _generate_stream=generate_stream,
+        _log_request=log_request,
+        logged=logged,
+    )
+
+
+def test_predict_stream_redacts_secret_split_across_pieces() -> None:
+    service = _service()
+    predict_stream = serve_app.LLMService.func_or_class.predict_stream
+
+    async def collect() -> str:
+        response = await predict_stream(service, _Request())
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    body = asyncio.run(collect())
+    assert SECRET not in body
+    assert "AAAA" not in body
+    events = [block.split("\n", 1) for block in body.strip().split("\n\n")]
+    payloads = [(kind.removeprefix("event: "), json.loads(data[6:])) for kind, data in events]
+    streamed = "".join(data["text"] for kind, data in payloads if kind == "token")
+    assert streamed == "token: «REDACTED:SECRET» end"
+    assert payloads[-1][0] == "done" and payloads[-1][1]["output"] == streamed
+    assert service.logged == [[streamed]]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+
+from hhg_logistics.serve.prefix_cache import PrefixKVCache
+
+
+class _FakeTensor:
+    """Stands in for a ``[batch, heads, seq, dim]`` tensor; 1 byte per position."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    @property
+    def nbytes(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        return _FakeTensor(len(range(self.length)[index[2]]))
+
+
+def _kv(length: int, layers: int = 2):
+    return tuple((_FakeTensor(length), _FakeTensor(length)) for _ in range(layers))
+
+
+def test_lookup_returns_longest_shared_prefix() -> None:
+    cache = PrefixKVCache(block_size=4, max_bytes=10_000)
+    system = list(range(8))
+    cache.insert(system, _kv(8))
+
+    hit = cache.lookup(system + [100, 101, 102], raw=True)
+    assert hit is not None
+    length, kv = hit
+    assert length == 8
+    assert kv[0][0].length == 8
+
+
+def test_partial_match_crops_kv_to_shared_blocks() -> None:
+    cache = PrefixKVCache(block_size=4, max_bytes=10_000)
+    cache.insert(list(range(12)), _kv(12))
+
+    prompt = list(range(4)) + [50, 51, 52, 53, 54]
+    length, kv = cache.lookup(prompt, raw=True)
+    assert length == 4
+    assert all(k.length == 4 and v.length == 4 for k, v in kv)
+
+
+def test_match_always_leaves_a_token_to_prefill() -> None:
+    cache = PrefixKVCache(block_size=4, max_bytes=10_000)
+    cache.insert(list(range(8)), _kv(8))
+
+    length, _ = cache.lookup(list(range(8)), raw=True)
+    assert length == 4
+    assert cache.aligned_length(8) == 4
+    assert cache.aligned_length(9) == 8
+
+
+def test_miss_on_different_first_block() -> None:
+    cache = PrefixKVCache(block_size=4, max_bytes=10_000)
+    cache.insert(list(range(8)), _kv(8))
+
+    assert cache.lookup([9, 9, 9, 9, 1, 2, 3, 4, 5], raw=True) is None
+    assert cache.stats.misses == 1
+
+
+def test_lru_eviction_respects_budget() -> None:
+    # each entry of 4 tokens x 2 layers x (k, v) costs 16 bytes
+    cache = PrefixKVCache(block_size=4, max_bytes=40)
+    a, b, c = [1, 1, 1, 1], [2, 2, 2, 2], [3, 3, 3, 3]
+    cache.insert(a, _kv(4))
+    cache.insert(b, _kv(4))
+    assert cache.lookup(a + [0], raw=True) is not None  # refresh a
+    cache.insert(c, _kv(4))
+
+    assert cache.nbytes <= 40
+    assert cache.lookup(b + [0], raw=True) is None
+    assert cache.lookup(a + [0], raw=True) is not None
+    assert cache.lookup(c + [0], raw=True) is not None
+    assert cache.stats.evictions == 1
+
+
+def test_insert_requires_block_aligned_prefix() -> None:
+    cache = PrefixKVCache(block_size=4)
+    with pytest.raises(ValueError):
+        cache.insert([1, 2, 3], _kv(3))
+
+
+def test_longer_entry_replaces_its_prefix() -> None:
+    cache = PrefixKVCache(block_size=4, max_bytes=10_000)
+    cache.insert(list(range(4)), _kv(4))
+    cache.insert(list(range(12)), _kv(12))
+
+    # the short entry is unreachable, so its bytes are released immediately
+    assert len(cache) == 1
+    assert cache.nbytes == 48
+    length, kv = cache.lookup(list(range(4)) + [99], raw=True)
+    assert length == 4 and kv[0][0].length == 4
+
+
+def test_shared_blocks_fall_back_when_owner_is_evicted() -> None:
+    # each 8-token entry costs 32 bytes, so only two fit
+    cache = PrefixKVCache(block_size=4, max_bytes=64)
+    shared = [7, 7, 7, 7]
+    cache.insert(shared + [1, 1, 1, 1], _kv(8))
+    cache.insert(shared + [2, 2, 2, 2], _kv(8))  # takes over the shared block
+    cache.lookup(shared + [1, 1, 1, 1, 0], raw=True)  # refresh the first entry
+    cache.insert([5] * 8, _kv(8))  # evicts the second entry
+
+    assert cache.stats.evictions == 1
+    assert cache.match_length(shared + [1, 1, 1, 1, 0]) == 8
+    assert cache.match_length(shared + [2, 2, 2, 2, 0]) == 4
+    assert cache.stats.hits == 1 and cache.stats.misses == 0
@@ -0,0 +1,269 @@
+"""Apply engine tests against a local stub of the Zendesk REST API."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from codex.zendesk import apply as zapply
+from codex.zendesk.transport import RateLimiter, RestClient, RetryPolicy
+
+
+class _StubZendesk:
+    """In-memory triggers/groups store with scriptable failures."""
+
+    def __init__(self) -> None:
+        self.items: dict[str, list[dict]] = {
+            "triggers": [{"id": 1, "title": "Existing", "active": True}],
+            "groups": [],
+        }
+        # (method, path, title sent in the body)
+        self.requests: list[tuple[str, str, str | None]] = []
+        self.auth: list[str | None] = []
+        self.failures: list[tuple[str, int, dict[str, str]]] = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self._next_id = 100
+
+    def handle(self, method: str, path: str, body: dict | None) -> tuple[int, dict, dict]:
+        with self.lock:
+            sent = next(iter((body or {}).values()), {})
+            self.requests.append((method, path, sent.get("title")))
+            for position, (fail_method, status, headers) in enumerate(self.failures):
+                if fail_method == method:
+                    del self.failures[position]
+                    return status, {"error": "stub"}, headers
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return self._route(method, path, body)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _route(self, method: str, path: str, body: dict | None) -> tuple[int, dict, dict]:
+        parts = path.removeprefix("/api/v2/").removesuffix(".json").split("/")
+        resource = parts[0]
+        singular = zapply._REST_SINGULAR[resource]
+        with self.lock:
+            store = self.items.setdefault(resource, [])
+            if method == "GET":
+                return 200, {resource: list(store), "next_page": None}, {}
+            if method == "POST":
+                self._next_id += 1
+                item = {"id": self._next_id, **(body or {})[singular]}
+                store.append(item)
+                return 201, {singular: item}, {}
+            item_id = int(parts[1])
+            item = next(entry for entry in store if entry["id"] == item_id)
+            if method == "PUT":
+                item.update((body or {})[singular])
+                return 200, {singular: item}, {}
+            store.remove(item)
+            return 204, {}, {}
+
+
+@pytest.fixture()
+def stub(monkeypatch: pytest.MonkeyPatch, tmp_path) -> Iterator[_StubZendesk]:
+    state = _StubZendesk()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _serve(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            state.auth.append(self.headers.get("Authorization"))
+            status, payload, headers = state.handle(self.command, self.path, body)
+            data = json.dumps(payload).encode() if status != 204 else b""
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+        def log_message(self, *args) -> None:  # keep pytest output quiet
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("ZENDESK_DEV_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", str(tmp_path / "evidence"))
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _options(workers: int = 4, max_retries: int = 2) -> zapply.ApplyOptions:
+    retry = RetryPolicy(max_retries=max_retries, backoff_base=0.0)
+    return zapply.ApplyOptions(workers=workers, requests_per_minute=60_000, burst=50, retry=retry)
+
+
+def _methods(stub: _StubZendesk) -> list[str]:
+    return [method for method, _path, _title in stub.requests]
+
+
+def _add(name: str) -> dict:
+    return {"op": "add", "path": f"/triggers/{name}", "value": {"title": name}}
+
+
+def test_plan_lists_each_resource_once_and_applies_concurrently(stub: _StubZendesk) -> None:
+    stub.delay = 0.05
+    patch = {
+        "op": "patch",
+        "path": "/triggers/Existing",
+        "value": {"title": "Existing"},
+        "changes": [{"op": "replace", "path": "/active", "value": False}],
+    }
+    plan = {
+        "triggers": [_add(f"T{i}") for i in range(6)] + [patch],
+        "groups": [{"op": "add", "path": "/groups/Tier 2", "value": {"name": "Tier 2"}}],
+    }
+
+    zapply.apply_plan(plan, "dev", options=_options())
+
+    gets = [path for method, path, _title in stub.requests if method == "GET"]
+    assert sorted(gets) == ["/api/v2/groups.json", "/api/v2/triggers.json"]
+    # groups are a dependency of triggers and are applied first
+    assert _methods(stub)[:2] == ["GET", "POST"]
+    assert stub.requests[0][1] == stub.requests[1][1] == "/api/v2/groups.json"
+    titles = sorted(item["title"] for item in stub.items["triggers"])
+    assert titles == ["Existing", "T0", "T1", "T2", "T3", "T4", "T5"]
+    assert stub.items["triggers"][0]["active"] is False
+    assert stub.max_in_flight > 1
+
+    with pytest.raises(ValueError):
+        zapply.apply_plan({"tickets": []}, "dev")
+
+
+def test_operations_on_one_name_keep_plan_order(stub: _StubZendesk) -> None:
+    stub.delay = 0.02
+    plan = {
+        "triggers": [
+            {"op": "remove", "path": "/triggers/Existing", "value": {"title": "Existing"}},
+            _add("Existing"),
+            {
+                "op": "patch",
+                "path": "/triggers/Existing",
+                "value": {"title": "Existing"},
+                "changes": [{"op": "replace", "path": "/active", "value": False}],
+            },
+            _add("Other"),
+        ]
+    }
+    zapply.apply_plan(plan, "dev", options=_options())
+
+    writes = [(method, title) for method, _path, title in stub.requests if method != "GET"]
+    writes.remove(("POST", "Other"))
+    assert writes == [("DELETE", None), ("POST", "Existing"), ("PUT", None)]
+    existing = [item for item in stub.items["triggers"] if item["title"] == "Existing"]
+    assert len(existing) == 1 and existing[0]["id"] != 1
+    # the update found the created item through the session index, not a re-listing
+    assert existing[0]["active"] is False
+    assert _methods(stub).count("GET") == 1
+
+
+def test_deletes_run_after_writes_in_reverse_dependency_order(stub: _StubZendesk) -> None:
+    stub.items["groups"] = [{"id": 5, "name": "Tier 1"}]
+    plan = {
+        "groups": [{"op": "remove", "path": "/groups/Tier 1", "value": {"name": "Tier 1"}}],
+        "triggers": [
+            {"op": "remove", "path": "/triggers/Existing", "value": {"title": "Existing"}},
+            _add("New"),
+        ],
+    }
+    zapply.apply_plan(plan, "dev", options=_options())
+
+    writes = [(method, path) for method, path, _title in stub.requests if method != "GET"]
+    # the trigger referencing the group goes before the group itself
+    assert writes == [
+        ("POST", "/api/v2/triggers.json"),
+        ("DELETE", "/api/v2/triggers/1.json"),
+        ("DELETE", "/api/v2/groups/5.json"),
+    ]
+    assert stub.items["groups"] == []
+    assert [item["title"] for item in stub.items["triggers"]] == ["New"]
+
+
+def test_rate_limited_calls_are_retried_but_failed_creates_are_not(
+    stub: _StubZendesk,
+) -> None:
+    stub.failures.append(("GET", 429, {"Retry-After": "0"}))
+    zapply.apply_plan({"triggers": [_add("A")]}, "dev", options=_options())
+    assert _methods(stub) == ["GET", "GET", "POST"]
+
+    stub.requests.clear()
+    stub.failures.append(("POST", 500, {}))
+    zapply.apply_plan({"triggers": [_add("B")]}, "dev", options=_options())
+    # a 500 may have created the trigger, so the create is not sent twice
+    assert _methods(stub) == ["GET", "POST"]
+    assert "B" not in {item["title"] for item in stub.items["triggers"]}
+
+    stub.requests.clear()
+    stub.failures.append(("POST", 429, {"Retry-After": "0"}))
+    zapply.apply_plan({"triggers": [_add("C")]}, "dev", options=_options())
+    assert _methods(stub) == ["GET", "POST", "POST"]
+    assert "C" in {item["title"] for item in stub.items["triggers"]}
+
+
+def test_rest_client_only_sends_credentials_to_base_url(stub: _StubZendesk) -> None:
+    base = os.environ["ZENDESK_DEV_URL"]
+    elsewhere = base.replace("127.0.0.1", "localhost")
+    client = RestClient(base, email="agent@example.com", token="secret")
+
+    client.request("GET", f"{base}/api/v2/triggers.json")
+    assert stub.auth[-1] and stub.auth[-1].startswith("Basic ")
+    with pytest.raises(ValueError):
+        client.request("GET", f"{elsewhere}/api/v2/triggers.json?page=2")
+    assert len(stub.requests) == 1
+
+    # a redirect to another origin is followed without the credentials
+    stub.failures.append(("GET", 302, {"Location": f"{elsewhere}/api/v2/triggers.json"}))
+    assert client.request("GET", "triggers.json")["triggers"]
+    assert stub.auth[-2:] == [stub.auth[0], None]
+
+
+def test_rate_limiter_spaces_calls_after_burst() -> None:
+    now = [0.0]
+    slept: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        slept.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(60, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        limiter.acquire()
+    assert slept == pytest.approx([1.0, 1.0])
+
+    limiter.pause(5)
+    limiter.acquire()
+    assert now[0] == pytest.approx(7.0)
+
+
+def test_resource_index_matches_first_listed_item() -> None:
+    first = {"id": 1, "title": "Dup"}
+    second = {"id": 2, "title": "Dup"}
+    index = zapply._ResourceIndex("triggers", [first, second])
+    assert index.find("Dup") is first
+    assert index.find("2") is second
+    assert index.find("") is None
+
+    index.discard(first)
+    assert index.find("Dup") is second
+    created = {"id": 3, "title": "New"}
+    index.add(created)
+    assert index.find("New") is created
@@ -0,0 +1,117 @@
+"""Tests for the content-hash fast path of the Zendesk diff engine."""
+
+from __future__ import annotations
+
+import pytest
+from pydantic import ValidationError
+
+from codex.zendesk.model import Group, Trigger
+from codex.zendesk.plan import diff_engine
+
+
+def _trigger(i: int, **overrides: object) -> dict:
+    data = {
+        "name": f"T{i}",
+        "category": "notifications",
+        "conditions": {"all": [{"field": "priority", "operator": "is", "value": "high"}]},
+        "actions": [{"field": "group_id", "value": i}],
+        "position": i,
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture(autouse=True)
+def _isolated_paths(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", str(tmp_path / "evidence"))
+    monkeypatch.delenv(diff_engine.DIFF_CACHE_ENV, raising=False)
+
+
+@pytest.fixture()
+def validations(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    seen: list[str] = []
+    real = Trigger.model_validate
+
+    def counting(value, *args, **kwargs):
+        seen.append(value.get("name"))
+        return real(value, *args, **kwargs)
+
+    monkeypatch.setattr(Trigger, "model_validate", counting)
+    return seen
+
+
+def test_unchanged_items_skip_diff_and_repeat_validation(validations: list[str]) -> None:
+    desired = [_trigger(i) for i in range(50)]
+    # the API adds fields the model ignores; they do not count as changes
+    current = [{**_trigger(i), "id": 1000 + i, "url": "https://x"} for i in range(50)]
+    desired[7] = _trigger(7, category="assignment")
+    cache = diff_engine.ContentHashCache()
+
+    diffs = diff_engine._diff_named_resources(
+        desired, current, Trigger, base_path="/triggers", cache=cache
+    )
+    expected = diff_engine.diff_triggers(
+        [Trigger.model_validate(item) for item in desired],
+        [Trigger.model_validate(item) for item in current],
+    )
+    assert diffs == expected
+    assert diffs == [
+        {
+            "op": "patch",
+            "name": "T7",
+            "patches": [{"op": "replace", "path": "/category", "value": "assignment"}],
+        }
+    ]
+
+    validations.clear()
+    again = diff_engine._diff_named_resources(
+        desired, current, Trigger, base_path="/triggers", cache=cache
+    )
+    assert again == diffs
+    # only the changed pair is validated and diffed again
+    assert validations == ["T7", "T7"]
+
+
+def test_invalid_entries_are_still_rejected() -> None:
+    cache = diff_engine.ContentHashCache()
+    broken = {"name": "Broken", "category": "x", "position": -1}
+    with pytest.raises(ValidationError):
+        diff_engine._diff_named_resources(
+            [broken], [dict(broken)], Trigger, base_path="/triggers", cache=cache
+        )
+    with pytest.raises(ValidationError):
+        diff_engine._diff_named_resources(
+            [], [{"category": "missing name"}], Trigger, base_path="/triggers", cache=cache
+        )
+    with pytest.raises(TypeError):
+        diff_engine._diff_named_resources(
+            ["oops"], [], Trigger, base_path="/triggers", cache=cache
+        )
+
+
+def test_validated_hashes_persist_between_runs(
+    tmp_path, monkeypatch: pytest.MonkeyPatch, validations: list[str]
+) -> None:
+    path = tmp_path / "cache" / "zendesk_diff_hashes.json"
+    monkeypatch.setenv(diff_engine.DIFF_CACHE_ENV, str(path))
+    items = [_trigger(i) for i in range(3)]
+
+    assert diff_engine.diff_triggers(items, [dict(item) for item in items]) == []
+    assert validations == ["T0", "T1", "T2"]
+    assert path.exists()
+
+    validations.clear()
+    fresh = diff_engine.ContentHashCache(path)
+    digest = diff_engine.content_hash(items[0], Trigger)
+    assert digest is not None and fresh.known(Trigger, digest)
+    assert diff_engine._diff_named_resources(
+        items, [dict(item) for item in items], Trigger, base_path="/triggers", cache=fresh
+    ) == []
+    assert validations == []
+    assert not fresh.dirty
+
+    # hashes of one model are not trusted for another
+    assert not fresh.known(Group, digest)
+    # keys the model ignores are dropped before hashing; other non-JSON values opt out
+    assert diff_engine.content_hash({"name": "x", "extra": object()}, Trigger) is not None
+    assert diff_engine.content_hash({"name": "x", "position": object()}, Trigger) is None
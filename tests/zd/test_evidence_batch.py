@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from codex.evidence import evidence_append, evidence_batch
+
+
+@pytest.fixture
+def evdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    evdir = tmp_path / "evidence"
+    monkeypatch.setenv("CODEX_EVIDENCE_DIR", evdir.as_posix())
+    return evdir
+
+
+def _records(evdir: Path) -> list[dict]:
+    text = (evdir / "archive_ops.jsonl").read_text(encoding="utf-8")
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+def _append(action: str) -> None:
+    evidence_append(action=action, actor="tester", tool="zendesk", repo="_codex_", context={})
+
+
+def test_batch_buffers_until_exit(evdir: Path) -> None:
+    _append("BEFORE")
+    with evidence_batch(fsync=True) as writer:
+        writer.append(action="A", actor="tester", tool="t", repo="_codex_", context={"n": 1})
+        _append("B")  # routed through the active batch
+        assert [r["action"] for r in _records(evdir)] == ["BEFORE"]
+    assert [r["action"] for r in _records(evdir)] == ["BEFORE", "A", "B"]
+    assert writer.written == 2
+    assert all("python" in r["context"] for r in _records(evdir))
+
+
+def test_batch_flushes_on_error_and_validates(evdir: Path) -> None:
+    with pytest.raises(RuntimeError):
+        with evidence_batch() as writer:
+            _append("DONE")
+            raise RuntimeError("boom")
+    assert [r["action"] for r in _records(evdir)] == ["DONE"]
+    with evidence_batch() as writer:
+        with pytest.raises(ValueError):
+            writer.append(action="", actor="tester", tool="t", repo="_codex_", context={})
+
+
+def test_batch_repairs_torn_tail_and_bounds_buffer(evdir: Path) -> None:
+    evdir.mkdir()
+    (evdir / "archive_ops.jsonl").write_text('{"action": "torn"', encoding="utf-8")
+    with evidence_batch(max_buffer_bytes=1) as writer:
+        writer.append(action="A", actor="tester", tool="t", repo="_codex_", context={})
+        assert writer.written == 1  # flushed as soon as the buffer limit is reached
+    lines = (evdir / "archive_ops.jsonl").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == '{"action": "torn"'
+    assert json.loads(lines[1])["action"] == "A"
+
+
+def test_batch_is_thread_safe(evdir: Path) -> None:
+    with evidence_batch(max_buffer_bytes=4096) as writer:
+
+        def work(worker: int) -> None:
+            for idx in range(50):
+                writer.write({"action": "T", "worker": worker, "idx": idx})
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(_records(evdir)) == 200
+
+
+def test_archive_util_evidence_joins_the_batch(evdir: Path) -> None:
+    from codex.archive.util import append_evidence, append_evidence_many
+
+    with evidence_batch() as writer:
+        append_evidence({"action": "ARCHIVE"})
+        append_evidence_many([{"action": "RESTORE"}, {"action": "RESTORE"}])
+        assert not (evdir / "archive_ops.jsonl").exists()
+    assert [r["action"] for r in _records(evdir)] == ["ARCHIVE", "RESTORE", "RESTORE"]
+    assert writer.written == 3
+    assert all("ts" in r for r in _records(evdir))
+
+
+def test_empty_batch_leaves_no_file(evdir: Path) -> None:
+    with evidence_batch():
+        pass
+    assert not evdir.exists()
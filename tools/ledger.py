@@ -1,18 +1,36 @@
 """Append-only JSON ledger with hash chaining.
 
 Provides helpers to append events and verify the chain integrity.
+
+Appends find the previous hash by scanning backwards from the end of the file,
+so their cost does not grow with the ledger, and hold an advisory lock on a
+``<ledger>.lock`` file so concurrent writers cannot fork the chain. Every
+``checkpoint_bytes`` of new records a signed checkpoint (byte offset and hash of
+the record ending there) is appended to ``<ledger>.checkpoints.jsonl``;
+``verify_chain(..., incremental=True)`` trusts the newest valid checkpoint and
+re-walks only the records after it. Checkpoints are HMAC-SHA256 signed with
+``CODEX_LEDGER_KEY`` when it is set and carry a plain SHA-256 digest otherwise.
 """
 from __future__ import annotations
 
 import argparse
+import contextlib
 import datetime as _dt
 import hashlib
+import hmac
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
+
+try:  # pragma: no cover - platform dependent
+    import fcntl
+except Exception:  # pragma: no cover - windows fallback
+    fcntl = None  # type: ignore[assignment]
 
 LEDGER_PATH = Path(".codex/ledger.jsonl")
+CHECKPOINT_BYTES = 1024 * 1024
+_TAIL_BLOCK = 8192
 
 
 def _canonical(obj: Dict[str, Any]) -> bytes:
@@ -20,7 +38,76 @@ def _canonical(obj: Dict[str, Any]) -> bytes:
     return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
 
 
-def append_event(event: Dict[str, Any], path: Path = LEDGER_PATH) -> Dict[str, Any]:
+def _record_hash(rec: Dict[str, Any]) -> str:
+    payload = {k: v for k, v in rec.items() if k != "hash"}
+    return hashlib.sha256(_canonical(payload)).hexdigest()
+
+
+def _checkpoint_path(path: Path) -> Path:
+    return path.with_name(path.name + ".checkpoints.jsonl")
+
+
+@contextlib.contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``<path>.lock`` (no-op without fcntl)."""
+    lock_path = path.with_name(path.name + ".lock")
+    with lock_path.open("a") as fh:
+        if fcntl is not None:  # pragma: no cover - depends on platform
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:  # pragma: no cover - depends on platform
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _tail_line(path: Path, end: Optional[int] = None) -> Optional[bytes]:
+    """Return the last complete line ending at byte ``end`` (default: EOF).
+
+    Reads backwards in small blocks, so the cost depends on the line length
+    rather than the file size. Returns ``None`` for an empty file and raises
+    ``ValueError`` if the data does not end with a newline (a torn write).
+    """
+    with path.open("rb") as fh:
+        if end is None:
+            end = fh.seek(0, os.SEEK_END)
+        if end == 0:
+            return None
+        fh.seek(end - 1)
+        if fh.read(1) != b"\n":
+            raise ValueError("ledger ends with a partial record")
+        pos = end - 1
+        chunk = b""
+        while True:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            fh.seek(pos)
+            chunk = fh.read(step) + chunk
+            idx = chunk.rfind(b"\n")
+            if idx != -1:
+                return chunk[idx + 1 :]
+            if pos == 0:
+                return chunk
+
+
+def _signing_key() -> Optional[bytes]:
+    key = os.environ.get("CODEX_LEDGER_KEY")
+    return key.encode("utf-8") if key else None
+
+
+def _sign(checkpoint: Dict[str, Any], key: Optional[bytes]) -> str:
+    payload = _canonical({k: v for k, v in checkpoint.items() if k != "sig"})
+    if key is not None:
+        return hmac.new(key, payload, hashlib.sha256).hexdigest()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def append_event(
+    event: Dict[str, Any],
+    path: Path = LEDGER_PATH,
+    *,
+    checkpoint_bytes: Optional[int] = CHECKPOINT_BYTES,
+) -> Dict[str, Any]:
     """Append an event to the ledger and return the full record.
 
     Parameters
@@ -30,6 +117,9 @@ def append_event(event: Dict[str, Any], path: Path = LEDGER_PATH) -> Dict[str, A
         are optional. ``ts`` is auto-populated in UTC if absent.
     path: Path
         Location of the ledger file.
+    checkpoint_bytes: int, optional
+        Write a checkpoint once this many bytes were appended since the last
+        one; ``None`` disables automatic checkpoints.
     """
     path.parent.mkdir(parents=True, exist_ok=True)
     rec = {
@@ -41,32 +131,97 @@ def append_event(event: Dict[str, Any], path: Path = LEDGER_PATH) -> Dict[str, A
         "status": event.get("status"),
         "data": event.get("data"),
     }
-    prev_hash: Optional[str]
-    if path.exists():
-        last = path.read_text().splitlines()[-1]
-        prev_hash = json.loads(last)["hash"]
-    else:
-        prev_hash = None
-    rec["prev_hash"] = prev_hash
-    hash_payload = {k: v for k, v in rec.items() if k != "hash"}
-    rec["hash"] = hashlib.sha256(_canonical(hash_payload)).hexdigest()
-    with path.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(rec, sort_keys=True) + "\n")
+    with _locked(path):
+        last = _tail_line(path) if path.exists() else None
+        rec["prev_hash"] = json.loads(last)["hash"] if last is not None else None
+        rec["hash"] = _record_hash(rec)
+        with path.open("ab") as fh:
+            fh.write((json.dumps(rec, sort_keys=True) + "\n").encode("utf-8"))
+            offset = fh.tell()
+        if checkpoint_bytes is not None:
+            latest = _latest_checkpoint(path)
+            if offset - (latest["offset"] if latest else 0) >= checkpoint_bytes:
+                _write_checkpoint(path, offset, rec["hash"])
     return rec
 
 
-def verify_chain(path: Path = LEDGER_PATH) -> Optional[str]:
-    """Validate the ledger chain and return the last hash."""
+def checkpoint(path: Path = LEDGER_PATH) -> Optional[Dict[str, Any]]:
+    """Record a signed checkpoint at the current end of the ledger."""
+    if not path.exists():
+        return None
+    with _locked(path):
+        last = _tail_line(path)
+        if last is None:
+            return None
+        return _write_checkpoint(path, path.stat().st_size, json.loads(last)["hash"])
+
+
+def _write_checkpoint(path: Path, offset: int, last_hash: str) -> Dict[str, Any]:
+    key = _signing_key()
+    cp: Dict[str, Any] = {
+        "ts": _dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "offset": offset,
+        "hash": last_hash,
+        "alg": "hmac-sha256" if key is not None else "sha256",
+    }
+    cp["sig"] = _sign(cp, key)
+    with _checkpoint_path(path).open("ab") as fh:
+        fh.write((json.dumps(cp, sort_keys=True) + "\n").encode("utf-8"))
+    return cp
+
+
+def _latest_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    cp_path = _checkpoint_path(path)
+    if not cp_path.exists():
+        return None
+    line = _tail_line(cp_path)
+    return json.loads(line) if line is not None else None
+
+
+def _trusted_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the newest checkpoint after checking its signature and anchor record."""
+    cp = _latest_checkpoint(path)
+    if cp is None:
+        return None
+    key = _signing_key()
+    signed = cp.get("alg") == "hmac-sha256"
+    if signed and key is None:
+        raise ValueError("checkpoint is HMAC-signed; set CODEX_LEDGER_KEY to verify it")
+    if key is not None and not signed:
+        raise ValueError("unsigned checkpoint found while CODEX_LEDGER_KEY is set")
+    if not hmac.compare_digest(_sign(cp, key), str(cp.get("sig"))):
+        raise ValueError("checkpoint signature mismatch")
+    if cp["offset"] > path.stat().st_size:
+        raise ValueError("ledger is shorter than its last checkpoint")
+    anchor = _tail_line(path, cp["offset"])
+    rec = json.loads(anchor) if anchor is not None else None
+    if rec is None or rec.get("hash") != cp["hash"] or _record_hash(rec) != cp["hash"]:
+        raise ValueError("checkpoint does not match the ledger")
+    return cp
+
+
+def verify_chain(path: Path = LEDGER_PATH, *, incremental: bool = False) -> Optional[str]:
+    """Validate the ledger chain and return the last hash.
+
+    With ``incremental`` the walk starts at the newest checkpoint (after
+    verifying its signature and the record it anchors) instead of the start
+    of the file.
+    """
     if not path.exists():
         return None
     prev: Optional[str] = None
     last_hash: Optional[str] = None
-    with path.open(encoding="utf-8") as fh:
+    start = 0
+    if incremental:
+        cp = _trusted_checkpoint(path)
+        if cp is not None:
+            start = cp["offset"]
+            prev = last_hash = cp["hash"]
+    with path.open("rb") as fh:
+        fh.seek(start)
         for line in fh:
             rec = json.loads(line)
-            payload = {k: v for k, v in rec.items() if k != "hash"}
-            calc = hashlib.sha256(_canonical(payload)).hexdigest()
-            if calc != rec["hash"]:
+            if _record_hash(rec) != rec["hash"]:
                 raise ValueError("hash mismatch")
             if rec.get("prev_hash") != prev:
                 raise ValueError("prev_hash mismatch")
@@ -96,6 +251,12 @@ def _main() -> int:
 
     ap_v = sub.add_parser("verify", help="verify ledger chain")
     ap_v.add_argument("--path", default=str(LEDGER_PATH))
+    ap_v.add_argument(
+        "--incremental", action="store_true", help="start from the last signed checkpoint"
+    )
+
+    ap_c = sub.add_parser("checkpoint", help="write a signed checkpoint at the ledger end")
+    ap_c.add_argument("--path", default=str(LEDGER_PATH))
 
     ns = ap.parse_args()
     if ns.cmd == "append":
@@ -108,8 +269,12 @@ def _main() -> int:
         })
         print(json.dumps(rec, indent=2))
         return 0
+    if ns.cmd == "checkpoint":
+        cp = checkpoint(Path(ns.path))
+        print(json.dumps(cp, indent=2) if cp else "")
+        return 0
     else:  # verify
-        last = verify_chain(Path(ns.path))
+        last = verify_chain(Path(ns.path), incremental=ns.incremental)
         print(last or "")
         return 0
 
@@ -11,6 +11,21 @@ from typing import Tuple
 DEFAULT_RETENTION_DAYS = 30
 
 
+def _rebuild_fts(conn: sqlite3.Connection) -> None:
+    """Re-index the optional FTS5 message index after VACUUM.
+
+    VACUUM renumbers the rowids of legacy tables without an INTEGER PRIMARY
+    KEY, which would leave the external-content index pointing at wrong rows.
+    """
+
+    cur = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='session_events_fts'"
+    )
+    if cur.fetchone():
+        conn.execute("INSERT INTO session_events_fts(session_events_fts) VALUES ('rebuild')")
+        conn.commit()
+
+
 def purge(
     days: int = DEFAULT_RETENTION_DAYS,
     dry_run: bool = False,
@@ -66,6 +81,7 @@ def purge(
                     )
                     conn.commit()
                     conn.execute("VACUUM")
+                    _rebuild_fts(conn)
             else:
                 print(f"Table 'session_events' not found in {db_path}")
         finally:
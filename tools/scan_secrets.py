@@ -4,22 +4,41 @@
 Usage:
   python tools/scan_secrets.py --diff HEAD            # scan staged vs HEAD
   python tools/scan_secrets.py path/to/file_or_dir    # scan files
+  python tools/scan_secrets.py --workers 8 --cache .codex/cache/secrets.json src/
 
 Exit non-zero if suspicious patterns are found. Designed for local use and
 invoked via `make` targets; no external services required.
+
+Files are scanned on a process pool (``--workers``). Each file is streamed in
+``WINDOW_BYTES`` blocks that always end on a line boundary (the trailing
+partial line is carried into the next block), so memory stays bounded and no
+match is split. One combined regex finds candidate lines; only those lines
+are checked against the individual ``PATTERNS``. Archive members are streamed
+the same way, and archives nested inside archives are scanned up to
+``--nested-depth`` levels. With ``--cache`` the content hashes of files that
+had no findings are remembered per scan mode (never the findings
+themselves), so unchanged clean files are skipped on the next run. Files
+skipped by extension are never recorded as clean.
 """
 
 from __future__ import annotations
 
 import argparse
+import codecs
+import hashlib
+import io
+import json
 import logging
+import os
 import re
 import subprocess
 import sys
 import tarfile
 import zipfile
 from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import IO
 
 PATTERNS = {
     "aws_access_key": re.compile(r"AKIA[0-9A-Z]{16}"),
@@ -32,24 +51,86 @@ PATTERNS = {
 
 SKIP_EXT = {"png", "jpg", "jpeg", "gif", "pdf", "mp4"}
 
+# bytes read per block; a line longer than MAX_LINE_CHARS is scanned in
+# segments that overlap by LINE_OVERLAP_CHARS so matches across a cut are seen
+WINDOW_BYTES = 1024 * 1024
+MAX_LINE_CHARS = 4 * 1024 * 1024
+LINE_OVERLAP_CHARS = 4096
+# nested archives are buffered in memory, so larger ones are skipped
+MAX_NESTED_BYTES = 64 * 1024 * 1024
+CACHE_VERSION = 2
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _scan_lines(lines: Iterable[str]) -> list[tuple[str, int, str]]:
-    """Return matches for each pattern found in *lines*.
+def _scoped(pattern: re.Pattern[str]) -> str:
+    """Return *pattern* with leading global flags rewritten as a scoped group."""
+
+    source = pattern.pattern
+    match = re.match(r"\(\?([aiLmsux]+)\)", source)
+    if match:
+        return f"(?{match.group(1)}:{source[match.end():]})"
+    return f"(?:{source})"
+
+
+# any-pattern prefilter; per-pattern checks only run on lines it selects
+COMBINED = re.compile("|".join(_scoped(p) for p in PATTERNS.values()))
+
+Hit = tuple[str, int, str]
 
-    This helper is shared by the plain-text and archive scanners so that new
-    signatures only need to be added in one place.
+
+def _scan_block(block: str, first_line: int, hits: list[Hit], seen: set[tuple[str, int]]) -> int:
+    """Scan the whole lines in *block*; return the line number after it.
+
+    Plain files and archive members both end up here, so new signatures
+    only need to be added to ``PATTERNS``.
     """
 
-    hits: list[tuple[str, int, str]] = []
-    for idx, raw_line in enumerate(lines, 1):
-        line = raw_line.rstrip("\r\n")
+    pos = 0
+    # running line count, so each newline in the block is counted once
+    counted, line_no = 0, first_line
+    while True:
+        match = COMBINED.search(block, pos)
+        if match is None:
+            break
+        start = block.rfind("\n", 0, match.start()) + 1
+        end = block.find("\n", match.start())
+        end = len(block) if end < 0 else end
+        line = block[start:end].rstrip("\r")
+        line_no += block.count("\n", counted, start)
+        counted = start
         for name, pattern in PATTERNS.items():
-            if pattern.search(line):
-                hits.append((name, idx, line))
-    return hits
+            if (name, line_no) not in seen and pattern.search(line):
+                seen.add((name, line_no))
+                hits.append((name, line_no, line))
+        pos = end + 1
+    return first_line + block.count("\n")
+
+
+def scan_stream(stream: IO[bytes], *, window: int = WINDOW_BYTES) -> list[Hit]:
+    """Scan a binary *stream* block by block without reading it whole."""
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    hits: list[Hit] = []
+    seen: set[tuple[str, int]] = set()
+    line_no = 1
+    carry = ""
+    while True:
+        chunk = stream.read(window)
+        buf = carry + decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            _scan_block(buf, line_no, hits, seen)
+            return hits
+        cut = buf.rfind("\n") + 1
+        if cut:
+            line_no = _scan_block(buf[:cut], line_no, hits, seen)
+            carry = buf[cut:]
+        elif len(buf) > MAX_LINE_CHARS:
+            # one very long line: scan what we have and keep an overlapping tail
+            _scan_block(buf, line_no, hits, seen)
+            carry = buf[-LINE_OVERLAP_CHARS:]
+        else:
+            carry = buf
 
 
 def _archive_kind(path: Path) -> str | None:
@@ -72,126 +153,141 @@ def iter_changed_paths(diff_ref: str) -> list[Path]:
     return [Path(p) for p in out.splitlines() if p.strip()]
 
 
-def scan_file(path: Path) -> list[tuple[str, int | str, str]]:
+def scan_file(path: Path, *, nested_depth: int = 0) -> list[tuple[str, int | str, str]]:
+    """Scan *path*; archive members are reported as ``member:line``.
+
+    Archives found inside archives are scanned up to *nested_depth* levels,
+    with locations like ``outer/inner.zip!member:line``.
+    """
+
     kind = _archive_kind(path)
     if kind == "zip":
-        return _scan_zip(path)
+        return _scan_zip(path, nested_depth)
     if kind == "tar":
-        return _scan_tar(path)
+        return _scan_tar(path, nested_depth)
     if path.suffix.lstrip(".") in SKIP_EXT:
         return []
 
     try:
-        with path.open("r", encoding="utf-8", errors="ignore") as handle:
-            return _scan_lines(handle)
+        with path.open("rb") as handle:
+            return list(scan_stream(handle))
     except OSError as exc:
         LOGGER.debug("Failed to read %s: %s", path, exc)
         return []
 
 
-def _iter_zip_members(path: Path) -> Iterator[tuple[str, Sequence[str]]]:
-    with zipfile.ZipFile(path) as archive:
-        for name in archive.namelist():
-            if name.endswith("/"):
-                continue
-            suffix = Path(name).suffix.lstrip(".")
-            if suffix in SKIP_EXT:
-                continue
-            try:
-                raw = archive.read(name)
-            except Exception as exc:
-                LOGGER.debug("Unable to read %s from %s: %s", name, path, exc)
-                continue
-            text = raw.decode("utf-8", errors="ignore").splitlines()
-            yield name, text
+def scan_archive(path: Path) -> list[tuple[str, int, str, str]]:
+    """Scan the members of *path* if its content is a ZIP or TAR archive."""
+
+    hits: list[tuple[str, int, str, str]] = []
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                _scan_archive_members(_open_zip_members(archive, path), hits)
+        elif tarfile.is_tarfile(path):
+            with tarfile.open(path) as archive:
+                _scan_archive_members(_open_tar_members(archive, path), hits)
+    except Exception:
+        return hits
+    return hits
 
 
-def _iter_tar_members(path: Path) -> Iterator[tuple[str, Sequence[str]]]:
-    with tarfile.open(path) as archive:
-        for member in archive.getmembers():
-            if not member.isfile():
+def _scan_archive_members(
+    members: Iterator[tuple[str, IO[bytes]]], hits: list[tuple[str, int, str, str]]
+) -> None:
+    for name, stream in members:
+        with stream:
+            if Path(name).suffix.lstrip(".") in SKIP_EXT:
                 continue
-            suffix = Path(member.name).suffix.lstrip(".")
-            if suffix in SKIP_EXT:
+            for pattern, line_no, text in scan_stream(stream):
+                hits.append((pattern, line_no, text, name))
+
+
+def _open_zip_members(
+    archive: zipfile.ZipFile, label: object
+) -> Iterator[tuple[str, IO[bytes]]]:
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        try:
+            stream = archive.open(info)
+        except Exception as exc:
+            LOGGER.debug("Skipping ZIP member %s in %s: %s", info.filename, label, exc)
+            continue
+        yield info.filename, stream
+
+
+def _open_tar_members(archive: tarfile.TarFile, label: object) -> Iterator[tuple[str, IO[bytes]]]:
+    for member in archive:
+        if not member.isfile():
+            continue
+        try:
+            extracted = archive.extractfile(member)
+        except Exception as exc:
+            LOGGER.debug("Skipping TAR member %s in %s: %s", member.name, label, exc)
+            continue
+        if extracted is not None:
+            yield member.name, extracted
+
+
+def _scan_members(
+    members: Iterator[tuple[str, IO[bytes]]], label: object, depth: int
+) -> list[tuple[str, str, str]]:
+    hits: list[tuple[str, str, str]] = []
+    for member, stream in members:
+        with stream:
+            kind = _archive_kind(Path(member))
+            if kind is not None:
+                if depth > 0:
+                    for name, where, line in _scan_nested(stream, kind, member, depth - 1):
+                        hits.append((name, f"{member}!{where}", line))
                 continue
-            try:
-                extracted = archive.extractfile(member)
-            except Exception as exc:
-                LOGGER.debug("Unable to extract %s from %s: %s", member.name, path, exc)
-                extracted = None
-            if extracted is None:
+            if Path(member).suffix.lstrip(".") in SKIP_EXT:
                 continue
             try:
-                text = extracted.read().decode("utf-8", errors="ignore").splitlines()
+                member_hits = scan_stream(stream)
             except Exception as exc:
-                LOGGER.debug("Unable to decode %s from %s: %s", member.name, path, exc)
+                LOGGER.debug("Failed to read member %s in %s: %s", member, label, exc)
                 continue
-            yield member.name, text
+        for name, idx, line in member_hits:
+            hits.append((name, f"{member}:{idx}", line))
+    return hits
 
 
-def scan_archive(path: Path) -> list[tuple[str, int, str, str]]:
-    hits: list[tuple[str, int, str, str]] = []
+def _scan_nested(
+    stream: IO[bytes], kind: str, label: str, depth: int
+) -> list[tuple[str, str, str]]:
+    data = stream.read(MAX_NESTED_BYTES + 1)
+    if len(data) > MAX_NESTED_BYTES:
+        LOGGER.debug("Skipping nested archive %s larger than %d bytes", label, MAX_NESTED_BYTES)
+        return []
     try:
-        if zipfile.is_zipfile(path):
-            for name, lines in _iter_zip_members(path):
-                for pattern, line_no, text in _scan_lines(lines):
-                    hits.append((pattern, line_no, text, name))
-        elif tarfile.is_tarfile(path):
-            for name, lines in _iter_tar_members(path):
-                for pattern, line_no, text in _scan_lines(lines):
-                    hits.append((pattern, line_no, text, name))
-    except Exception:
-        return hits
-    return hits
+        if kind == "zip":
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                return _scan_members(_open_zip_members(archive, label), label, depth)
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            return _scan_members(_open_tar_members(archive, label), label, depth)
+    except Exception as exc:
+        LOGGER.debug("Failed to scan nested archive %s: %s", label, exc)
+        return []
 
 
-def _scan_zip(path: Path) -> list[tuple[str, str, str]]:
-    hits: list[tuple[str, str, str]] = []
+def _scan_zip(path: Path, nested_depth: int = 0) -> list[tuple[str, str, str]]:
     try:
         with zipfile.ZipFile(path) as archive:
-            for member in archive.namelist():
-                if member.endswith("/"):
-                    continue
-                try:
-                    data = archive.read(member).decode("utf-8", errors="ignore")
-                except Exception as exc:
-                    LOGGER.debug("Skipping ZIP member %s in %s: %s", member, path, exc)
-                    continue
-                for name, idx, line in _scan_lines(data.splitlines()):
-                    hits.append((name, f"{member}:{idx}", line))
+            return _scan_members(_open_zip_members(archive, path), path, nested_depth)
     except Exception as exc:
         LOGGER.debug("Failed to scan ZIP archive %s: %s", path, exc)
-        return hits
-    return hits
+        return []
 
 
-def _scan_tar(path: Path) -> list[tuple[str, str, str]]:
-    hits: list[tuple[str, str, str]] = []
+def _scan_tar(path: Path, nested_depth: int = 0) -> list[tuple[str, str, str]]:
     try:
         with tarfile.open(path) as archive:
-            for member in archive.getmembers():
-                if not member.isfile():
-                    continue
-                try:
-                    extracted = archive.extractfile(member)
-                except Exception as exc:
-                    LOGGER.debug("Skipping TAR member %s in %s: %s", member.name, path, exc)
-                    continue
-                if extracted is None:
-                    continue
-                try:
-                    data = extracted.read().decode("utf-8", errors="ignore")
-                except Exception as exc:
-                    LOGGER.debug("Failed to read TAR member %s in %s: %s", member.name, path, exc)
-                    continue
-                finally:
-                    extracted.close()
-                for name, idx, line in _scan_lines(data.splitlines()):
-                    hits.append((name, f"{member.name}:{idx}", line))
+            return _scan_members(_open_tar_members(archive, path), path, nested_depth)
     except Exception as exc:
         LOGGER.debug("Failed to scan TAR archive %s: %s", path, exc)
-        return hits
-    return hits
+        return []
 
 
 def _iter_targets(paths: Iterable[str]) -> list[Path]:
@@ -205,26 +301,158 @@ def _iter_targets(paths: Iterable[str]) -> list[Path]:
     return targets
 
 
+def _findings(target: Path, nested_depth: int) -> list[str]:
+    """Return the report lines for one target (runs in worker processes)."""
+
+    lines: list[str] = []
+    if _archive_kind(target) is None:
+        # archives without a recognised extension (wheels, jars, ...)
+        for name, line_no, text, member in scan_archive(target):
+            lines.append(f"[SECRET?] {target}!{member}:{line_no} {name}: {text}")
+    for name, where, text in scan_file(target, nested_depth=nested_depth):
+        lines.append(f"[SECRET?] {target}:{where} {name}: {text}")
+    return lines
+
+
+def _file_digest(path: Path) -> str | None:
+    digest = hashlib.sha256()
+    try:
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _cache_key(path: Path, digest: str | None) -> str | None:
+    """Clean-cache key for *path*: its digest qualified by how it is scanned.
+
+    The same bytes are only clean in the same scan mode, so a digest recorded
+    for an archive or a text file says nothing about a copy under another
+    extension. Files whose contents are skipped by extension get no key.
+    """
+
+    if digest is None:
+        return None
+    kind = _archive_kind(path)
+    if kind is None and path.suffix.lstrip(".") in SKIP_EXT:
+        return None
+    return f"{kind or 'text'}:{digest}"
+
+
+def _rules_fingerprint(nested_depth: int) -> str:
+    """Identify the scan rules, so cached results are dropped when they change."""
+
+    rules = {name: p.pattern for name, p in PATTERNS.items()}
+    payload = [CACHE_VERSION, rules, sorted(SKIP_EXT), nested_depth, MAX_NESTED_BYTES]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CleanCache:
+    """Scan-mode qualified content hashes of files that produced no findings.
+
+    Only clean digests are stored, never matched text, so the cache file
+    cannot leak secrets. Files with findings are rescanned every run.
+    """
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.clean: set[str] = set()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("rules") == fingerprint:
+            self.clean = set(data.get("clean") or [])
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"rules": self.fingerprint, "clean": sorted(self.clean)}
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def scan_paths(
+    targets: Sequence[Path],
+    *,
+    workers: int | None = None,
+    nested_depth: int = 0,
+    cache_path: Path | None = None,
+) -> list[str]:
+    """Scan *targets* on a process pool and return report lines in target order.
+
+    With *cache_path*, targets whose content hash is recorded as clean are
+    skipped, and newly clean targets are recorded.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    cache = CleanCache(cache_path, _rules_fingerprint(nested_depth)) if cache_path else None
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(targets) > 1 else None
+    chunksize = max(1, len(targets) // (workers * 4))
+
+    def run(fn, items, *extra):  # type: ignore[no-untyped-def]
+        if pool is None:
+            return [fn(item, *extra) for item in items]
+        columns = [[value] * len(items) for value in extra]
+        return list(pool.map(fn, items, *columns, chunksize=chunksize))
+
+    try:
+        pending = list(targets)
+        keys: list[str | None] = []
+        if cache is not None:
+            keys = [
+                _cache_key(target, digest)
+                for target, digest in zip(pending, run(_file_digest, pending))
+            ]
+            keep = [i for i, key in enumerate(keys) if key is None or key not in cache.clean]
+            pending = [pending[i] for i in keep]
+            keys = [keys[i] for i in keep]
+        results = dict(zip(pending, run(_findings, pending, nested_depth)))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if cache is not None:
+        for target, key in zip(pending, keys):
+            if key is not None and not results[target]:
+                cache.clean.add(key)
+        cache.save()
+    return [line for target in targets for line in results.get(target, [])]
+
+
 def main(argv: list[str]) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("paths", nargs="*")
     parser.add_argument("--diff", default=None)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Scanner processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--nested-depth",
+        type=int,
+        default=0,
+        help="Also scan archives nested inside archives, up to this many levels",
+    )
+    parser.add_argument(
+        "--cache", type=Path, default=None, help="Remember clean file hashes in this JSON file"
+    )
     args = parser.parse_args(argv)
 
     if args.diff:
-        targets = [p for p in iter_changed_paths(args.diff) if Path(p).exists()]
+        targets = [p for p in iter_changed_paths(args.diff) if Path(p).is_file()]
     else:
         targets = _iter_targets(args.paths)
 
-    found = 0
-    for target in targets:
-        archive_hits = scan_archive(target) if target.is_file() else []
-        for name, line_no, text, member in archive_hits:
-            print(f"[SECRET?] {target}!{member}:{line_no} {name}: {text}")
-            found += 1
-        for name, line_no, text in scan_file(target):
-            print(f"[SECRET?] {target}:{line_no} {name}: {text}")
-            found += 1
+    found = scan_paths(
+        targets,
+        workers=args.workers,
+        nested_depth=max(0, args.nested_depth),
+        cache_path=args.cache,
+    )
+    for line in found:
+        print(line)
     return 1 if found else 0
 
 